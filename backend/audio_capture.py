@@ -0,0 +1,163 @@
+# File: audio_capture.py - Purpose: This file handles Audio Capture functionality.
+"""
+Dedicated microphone capture thread.
+
+Instead of paying a thread-pool hop (`asyncio.to_thread(stream.read)`) for every
+64 ms chunk, a single long-lived thread blocks on the PyAudio stream and copies
+each chunk into a preallocated ring buffer. The event loop is poked with
+`call_soon_threadsafe` and drains the ring in batches, so a busy default
+executor (CAD subprocesses, slicing, file I/O) can no longer starve the mic.
+"""
+
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size single-producer / single-consumer ring of PCM chunks.
+
+    Storage is one preallocated bytearray split into `capacity` slots of
+    `chunk_bytes`. The producer only advances `_write_index` and the consumer
+    only advances `_read_index`; each index is a plain int written by one
+    thread, so no lock is needed under the GIL. The slot copy happens before
+    the write index is published, so the reader never sees a partial chunk.
+    """
+
+    def __init__(self, chunk_bytes: int, capacity: int = 64):
+        self.chunk_bytes = chunk_bytes
+        self.capacity = capacity
+        self._buffer = bytearray(chunk_bytes * capacity)
+        self._view = memoryview(self._buffer)
+        self._lengths = [0] * capacity
+        self._write_index = 0
+        self._read_index = 0
+
+        # Counters
+        self.chunks_written = 0
+        self.overflows = 0   # chunks dropped because the consumer fell behind
+        self.underruns = 0   # drains that found the ring empty
+
+    def __len__(self) -> int:
+        return self._write_index - self._read_index
+
+    def write(self, data: bytes) -> bool:
+        """Producer side. Returns False (and counts an overflow) if the ring is full."""
+        if self._write_index - self._read_index >= self.capacity:
+            self.overflows += 1
+            return False
+
+        slot = self._write_index % self.capacity
+        size = min(len(data), self.chunk_bytes)
+        start = slot * self.chunk_bytes
+        self._view[start:start + size] = data[:size]
+        self._lengths[slot] = size
+
+        # Publish only after the copy is complete
+        self._write_index += 1
+        self.chunks_written += 1
+        return True
+
+    def read_batch(self, max_chunks: Optional[int] = None) -> List[bytes]:
+        """Consumer side. Returns every available chunk (or up to max_chunks)."""
+        available = self._write_index - self._read_index
+        if available <= 0:
+            self.underruns += 1
+            return []
+        if max_chunks is not None:
+            available = min(available, max_chunks)
+
+        chunks = []
+        for _ in range(available):
+            slot = self._read_index % self.capacity
+            start = slot * self.chunk_bytes
+            chunks.append(bytes(self._view[start:start + self._lengths[slot]]))
+            self._read_index += 1
+        return chunks
+
+    def clear(self):
+        """Consumer side. Drops everything currently buffered."""
+        self._read_index = self._write_index
+
+
+class AudioCaptureThread(threading.Thread):
+    """
+    Blocks on `stream.read` in a loop and feeds an AudioRingBuffer.
+
+    Args:
+        stream: An open PyAudio input stream (anything with `read(n, **kw)`).
+        ring: The ring buffer to write into.
+        chunk_size: Frames per read.
+        sample_rate: Used to detect late reads (possible device overflow).
+        loop: Event loop to signal via call_soon_threadsafe.
+        on_data: Loop-side callback run after each chunk is written.
+        is_paused: Optional callable; while it returns True chunks are read and discarded.
+        read_kwargs: Extra keyword args for stream.read (e.g. exception_on_overflow).
+    """
+
+    def __init__(self, stream, ring: AudioRingBuffer, chunk_size: int, sample_rate: int,
+                 loop=None, on_data: Optional[Callable[[], None]] = None,
+                 is_paused: Optional[Callable[[], bool]] = None, read_kwargs: Optional[dict] = None):
+        super().__init__(name="jarvis-audio-capture", daemon=True)
+        self.stream = stream
+        self.ring = ring
+        self.chunk_size = chunk_size
+        self.chunk_seconds = chunk_size / float(sample_rate)
+        self.loop = loop
+        self.on_data = on_data
+        self.is_paused = is_paused
+        self.read_kwargs = read_kwargs or {}
+        self._stop_event = threading.Event()
+
+        # Counters
+        self.late_reads = 0    # gaps long enough that the device buffer may have overflowed
+        self.read_errors = 0
+        self.paused_chunks = 0
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    def run(self):
+        last_read_end = None
+        while not self._stop_event.is_set():
+            try:
+                data = self.stream.read(self.chunk_size, **self.read_kwargs)
+            except Exception as e:
+                self.read_errors += 1
+                print(f"[AUDIO CAPTURE] [ERR] Error reading audio: {e}")
+                time.sleep(0.1)
+                last_read_end = None
+                continue
+
+            now = time.monotonic()
+            # A blocking read normally returns every chunk_seconds; a gap of more
+            # than two chunks means we were away and the device may have dropped audio.
+            if last_read_end is not None and now - last_read_end > 2 * self.chunk_seconds:
+                self.late_reads += 1
+            last_read_end = now
+
+            if self.is_paused and self.is_paused():
+                self.paused_chunks += 1
+                continue
+
+            self.ring.write(data)
+
+            if self.loop and self.on_data:
+                try:
+                    self.loop.call_soon_threadsafe(self.on_data)
+                except RuntimeError:
+                    # Loop closed underneath us - we are shutting down
+                    break
+
+    def stats(self) -> dict:
+        return {
+            "chunks_captured": self.ring.chunks_written,
+            "buffered_chunks": len(self.ring),
+            "overflows": self.ring.overflows,
+            "underruns": self.ring.underruns,
+            "late_reads": self.late_reads,
+            "read_errors": self.read_errors,
+        }
@@ -0,0 +1,212 @@
+# File: audio_playback.py - Purpose: This file handles Audio Playback functionality.
+"""
+Jitter-buffered speaker playback.
+
+Gemini sends audio in chunks of varying size. Writing each one with
+`asyncio.to_thread(stream.write, chunk)` costs a thread hop per chunk and
+clicks whenever the default executor is busy. PlaybackEngine owns a single
+writer thread instead: the event loop `feed()`s bytes into a buffer, the
+writer waits until `jitter_ms` of audio is queued, then writes fixed-size
+periods. `flush()` drops everything instantly for barge-in.
+"""
+
+import threading
+import time
+from typing import Optional
+
+DEFAULT_JITTER_MS = 80
+DEFAULT_PERIOD_MS = 40
+
+
+class PlaybackEngine:
+    """
+    Args:
+        stream: An open PyAudio output stream (anything with `write(bytes)`).
+        sample_rate: Output sample rate in Hz.
+        sample_width: Bytes per sample (2 for paInt16).
+        channels: Output channel count.
+        jitter_ms: Audio to accumulate before starting a burst.
+        period_ms: Size of each write to the device.
+    """
+
+    def __init__(self, stream, sample_rate: int, sample_width: int = 2, channels: int = 1,
+                 jitter_ms: int = DEFAULT_JITTER_MS, period_ms: int = DEFAULT_PERIOD_MS):
+        self.stream = stream
+        self.sample_rate = sample_rate
+        self.frame_bytes = sample_width * channels
+        self.bytes_per_ms = sample_rate * self.frame_bytes / 1000.0
+        self.jitter_ms = jitter_ms
+        self.period_ms = period_ms
+        self.period_bytes = self._align(period_ms * self.bytes_per_ms)
+        self.prebuffer_bytes = self._align(jitter_ms * self.bytes_per_ms)
+
+        self._buffer = bytearray()
+        self._cond = threading.Condition()
+        self._playing = False
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._burst_start: Optional[float] = None  # when the first byte of the burst arrived
+        self._last_feed: float = 0.0
+
+        # Metrics
+        self.bytes_fed = 0
+        self.bytes_written = 0
+        self.periods_written = 0
+        self.underruns = 0
+        self.flushes = 0
+        self.bursts = 0
+        self.last_latency_ms: Optional[float] = None
+        self._latency_total_ms = 0.0
+        self._latency_samples = 0
+
+    def _align(self, size: float) -> int:
+        size = int(size)
+        return max(self.frame_bytes, size - size % self.frame_bytes)
+
+    # --- Producer side (event loop) ---
+
+    def feed(self, data: bytes):
+        """Queue audio for playback. Never blocks on the device."""
+        if not data:
+            return
+        with self._cond:
+            if not self._buffer and not self._playing:
+                self._burst_start = time.monotonic()
+            self._buffer += data
+            self.bytes_fed += len(data)
+            self._last_feed = time.monotonic()
+            self._cond.notify()
+
+    def flush(self) -> int:
+        """Drop all queued audio (barge-in). Returns the number of bytes discarded."""
+        with self._cond:
+            dropped = len(self._buffer)
+            self._buffer.clear()
+            self._playing = False
+            self._burst_start = None
+            if dropped:
+                self.flushes += 1
+            self._cond.notify()
+        return dropped
+
+    # --- Lifecycle ---
+
+    def start(self):
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="jarvis-audio-playback", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread and self._thread.is_alive() and threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+
+    # --- Writer thread ---
+
+    def _next_period(self) -> Optional[bytes]:
+        """Blocks until a period is ready to write. Returns None on stop."""
+        period_s = self.period_ms / 1000.0
+        jitter_s = self.jitter_ms / 1000.0
+
+        with self._cond:
+            while not self._stopped:
+                buffered = len(self._buffer)
+
+                if not self._playing:
+                    if buffered == 0:
+                        self._cond.wait()
+                        continue
+                    # Start the burst once the jitter buffer is full, or when the
+                    # producer has gone quiet (short utterance smaller than the buffer)
+                    quiet_for = time.monotonic() - self._last_feed
+                    if buffered < self.prebuffer_bytes and quiet_for < jitter_s:
+                        self._cond.wait(jitter_s - quiet_for)
+                        continue
+                    self._playing = True
+                    self.bursts += 1
+
+                if buffered >= self.period_bytes:
+                    break
+
+                if buffered == 0:
+                    # Ran dry mid-burst: either the utterance ended or we underran
+                    got_more = self._cond.wait_for(lambda: self._buffer or self._stopped, jitter_s)
+                    if self._stopped:
+                        return None
+                    if not got_more:
+                        self._playing = False
+                        self._burst_start = None
+                    elif self._playing:
+                        self.underruns += 1
+                    continue
+
+                # Partial period: give the producer one period to top it up,
+                # then pad the tail with silence so writes stay fixed-size
+                quiet_for = time.monotonic() - self._last_feed
+                if quiet_for < period_s:
+                    self._cond.wait(period_s - quiet_for)
+                    continue
+                self._buffer += bytes(self.period_bytes - buffered)
+                break
+
+            if self._stopped:
+                return None
+
+            period = bytes(self._buffer[:self.period_bytes])
+            del self._buffer[:self.period_bytes]
+            return period
+
+    def _run(self):
+        while True:
+            period = self._next_period()
+            if period is None:
+                return
+            try:
+                self.stream.write(period)
+            except Exception as e:
+                print(f"[AUDIO PLAYBACK] [ERR] Error writing audio: {e}")
+                time.sleep(0.05)
+                continue
+
+            self.bytes_written += len(period)
+            self.periods_written += 1
+
+            with self._cond:
+                burst_start = self._burst_start
+                self._burst_start = None
+            if burst_start is not None:
+                self._record_latency(time.monotonic() - burst_start)
+
+    def _record_latency(self, elapsed_s: float):
+        """First byte in -> first period accepted by the device, plus device output latency."""
+        device_latency = 0.0
+        try:
+            device_latency = float(self.stream.get_output_latency())
+        except Exception:
+            pass
+        latency_ms = (elapsed_s + device_latency) * 1000.0
+        self.last_latency_ms = latency_ms
+        self._latency_total_ms += latency_ms
+        self._latency_samples += 1
+
+    # --- Metrics ---
+
+    @property
+    def queued_ms(self) -> float:
+        return len(self._buffer) / self.bytes_per_ms
+
+    def stats(self) -> dict:
+        return {
+            "queued_bytes": len(self._buffer),
+            "queued_ms": round(self.queued_ms, 1),
+            "jitter_ms": self.jitter_ms,
+            "period_ms": self.period_ms,
+            "bursts": self.bursts,
+            "periods_written": self.periods_written,
+            "underruns": self.underruns,
+            "flushes": self.flushes,
+            "last_latency_ms": round(self.last_latency_ms, 1) if self.last_latency_ms is not None else None,
+            "avg_latency_ms": round(self._latency_total_ms / self._latency_samples, 1) if self._latency_samples else None,
+        }
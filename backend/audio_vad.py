@@ -0,0 +1,164 @@
+# File: audio_vad.py - Purpose: This file handles Audio Vad functionality.
+"""
+Voice Activity Detection for the microphone stream.
+
+AudioLoop.listen_audio asks a detector whether each 16-bit PCM chunk contains
+speech. The detectors work directly on the raw buffer with NumPy
+(np.frombuffer -> float32 dot product) instead of unpacking every sample into
+a Python int, which keeps the per-chunk cost flat on low-power machines.
+
+Available modes:
+- energy:   RMS above a threshold (same decision as the old struct/sum code)
+- zcr:      energy gate plus a zero-crossing-rate band check, rejects hum and hiss
+- hangover: energy decision smoothed with attack/hangover chunk counts
+"""
+
+import math
+from typing import Dict, Optional, Type
+
+import numpy as np
+
+
+DEFAULT_VAD_MODE = "energy"
+DEFAULT_VAD_THRESHOLD = 800  # RMS on 16-bit samples (800 is conservative)
+
+
+class VoiceActivityDetector:
+    """
+    Base detector: computes RMS for a chunk and classifies it by energy.
+    Subclasses override `is_speech` to add extra criteria.
+    """
+
+    mode = "energy"
+
+    def __init__(self, threshold: float = DEFAULT_VAD_THRESHOLD, max_samples: int = 4096):
+        self.threshold = threshold
+        self.last_rms = 0
+        # Preallocated float32 scratch buffer, grown on demand
+        self._scratch = np.empty(max_samples, dtype=np.float32)
+
+    def _as_float(self, data: bytes) -> np.ndarray:
+        """View the int16 buffer and copy it into the float32 scratch buffer."""
+        samples = np.frombuffer(data, dtype=np.int16, count=len(data) // 2)
+        count = samples.size
+        if count > self._scratch.size:
+            self._scratch = np.empty(count, dtype=np.float32)
+        out = self._scratch[:count]
+        np.copyto(out, samples, casting="unsafe")
+        return out
+
+    def rms(self, data: bytes) -> int:
+        """Root-mean-square of a 16-bit little-endian PCM chunk."""
+        floats = self._as_float(data)
+        count = floats.size
+        if count == 0:
+            self.last_rms = 0
+            return 0
+        energy = float(np.dot(floats, floats))
+        self.last_rms = int(math.sqrt(energy / count))
+        return self.last_rms
+
+    def is_speech(self, data: bytes) -> bool:
+        """Returns True if the chunk should be treated as speech."""
+        return self.rms(data) > self.threshold
+
+    def reset(self):
+        """Clears any smoothing state (called when capture restarts)."""
+        self.last_rms = 0
+
+
+class ZeroCrossingVAD(VoiceActivityDetector):
+    """
+    Energy gate plus zero-crossing rate band.
+    Voiced speech sits roughly between 2% and 35% crossings per sample at 16 kHz;
+    mains hum is far below that and broadband hiss far above.
+    """
+
+    mode = "zcr"
+
+    def __init__(self, threshold: float = DEFAULT_VAD_THRESHOLD, min_zcr: float = 0.02,
+                 max_zcr: float = 0.35, max_samples: int = 4096):
+        super().__init__(threshold=threshold, max_samples=max_samples)
+        self.min_zcr = min_zcr
+        self.max_zcr = max_zcr
+        self.last_zcr = 0.0
+
+    def zero_crossing_rate(self, data: bytes) -> float:
+        samples = np.frombuffer(data, dtype=np.int16, count=len(data) // 2)
+        if samples.size < 2:
+            self.last_zcr = 0.0
+            return 0.0
+        signs = np.signbit(samples)
+        crossings = int(np.count_nonzero(signs[1:] != signs[:-1]))
+        self.last_zcr = crossings / (samples.size - 1)
+        return self.last_zcr
+
+    def is_speech(self, data: bytes) -> bool:
+        if self.rms(data) <= self.threshold:
+            return False
+        zcr = self.zero_crossing_rate(data)
+        return self.min_zcr <= zcr <= self.max_zcr
+
+    def reset(self):
+        super().reset()
+        self.last_zcr = 0.0
+
+
+class HangoverVAD(VoiceActivityDetector):
+    """
+    Energy decision with hysteresis.
+    Speech starts after `attack_chunks` consecutive loud chunks and is held for
+    `hangover_chunks` quiet chunks afterwards, so short pauses between words and
+    single clicks do not toggle the state.
+    """
+
+    mode = "hangover"
+
+    def __init__(self, threshold: float = DEFAULT_VAD_THRESHOLD, attack_chunks: int = 2,
+                 hangover_chunks: int = 4, max_samples: int = 4096):
+        super().__init__(threshold=threshold, max_samples=max_samples)
+        self.attack_chunks = max(1, attack_chunks)
+        self.hangover_chunks = max(0, hangover_chunks)
+        self._voiced_run = 0
+        self._hangover_left = 0
+        self._active = False
+
+    def is_speech(self, data: bytes) -> bool:
+        loud = self.rms(data) > self.threshold
+
+        if loud:
+            self._voiced_run += 1
+            if self._active or self._voiced_run >= self.attack_chunks:
+                self._active = True
+                self._hangover_left = self.hangover_chunks
+        else:
+            self._voiced_run = 0
+            if self._active:
+                if self._hangover_left > 0:
+                    self._hangover_left -= 1
+                else:
+                    self._active = False
+
+        return self._active
+
+    def reset(self):
+        super().reset()
+        self._voiced_run = 0
+        self._hangover_left = 0
+        self._active = False
+
+
+VAD_MODES: Dict[str, Type[VoiceActivityDetector]] = {
+    VoiceActivityDetector.mode: VoiceActivityDetector,
+    ZeroCrossingVAD.mode: ZeroCrossingVAD,
+    HangoverVAD.mode: HangoverVAD,
+}
+
+
+def create_vad(mode: Optional[str] = None, **kwargs) -> VoiceActivityDetector:
+    """Build a detector by mode name ('energy', 'zcr', 'hangover')."""
+    mode = (mode or DEFAULT_VAD_MODE).lower()
+    if mode not in VAD_MODES:
+        print(f"[VAD] [WARN] Unknown VAD mode '{mode}', falling back to '{DEFAULT_VAD_MODE}'")
+        mode = DEFAULT_VAD_MODE
+    return VAD_MODES[mode](**kwargs)
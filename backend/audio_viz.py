@@ -0,0 +1,127 @@
+# File: audio_viz.py - Purpose: This file handles Audio Viz functionality.
+"""
+Audio visualization feed for the frontend.
+
+The visualizer only needs a handful of 0-255 bar heights, but the original
+`audio_data` event sent every 24 kHz PCM chunk as `list(data_bytes)`: a JSON
+array of ints roughly 10x the size of the audio itself, serialized on the
+event loop. AudioVisualizer turns PCM into a compact payload instead.
+
+Modes:
+- levels: log-spaced FFT band levels (NumPy), throttled to `rate_hz`
+- peaks:  peak envelope across the latest window, throttled to `rate_hz`
+- binary: raw PCM bytes as a binary Socket.IO attachment (no JSON)
+- raw:    legacy list(data_bytes) payload
+All binary payloads are `bytes`, delivered to the browser as an ArrayBuffer.
+"""
+
+import time
+from typing import Optional
+
+import numpy as np
+
+VIZ_MODES = ("levels", "peaks", "binary", "raw")
+DEFAULT_VIZ_MODE = "levels"
+DEFAULT_VIZ_RATE_HZ = 30
+DEFAULT_VIZ_BANDS = 64
+
+
+class AudioVisualizer:
+    """
+    Args:
+        mode: One of VIZ_MODES.
+        rate_hz: Max payloads per second for 'levels' and 'peaks'.
+        bands: Number of bars produced by 'levels' and 'peaks'.
+        sample_rate: PCM sample rate (Gemini output is 24 kHz).
+        window: Samples analysed per payload.
+        floor_db: Level mapped to 0 (0 dBFS maps to 255).
+    """
+
+    def __init__(self, mode: str = DEFAULT_VIZ_MODE, rate_hz: float = DEFAULT_VIZ_RATE_HZ,
+                 bands: int = DEFAULT_VIZ_BANDS, sample_rate: int = 24000, window: int = 1024,
+                 floor_db: float = -60.0):
+        if mode not in VIZ_MODES:
+            print(f"[VIZ] [WARN] Unknown visualization mode '{mode}', using '{DEFAULT_VIZ_MODE}'")
+            mode = DEFAULT_VIZ_MODE
+        self.mode = mode
+        self.interval = 1.0 / rate_hz if rate_hz and rate_hz > 0 else 0.0
+        self.bands = bands
+        self.sample_rate = sample_rate
+        self.window = window
+        self.floor_db = floor_db
+
+        self._tail = b""
+        self._last_emit = None
+
+        # Precomputed FFT helpers
+        self._hann = np.hanning(window).astype(np.float32)
+        # Full-scale sine through a Hann window peaks at ~ amplitude * N / 4
+        self._ref = 32768.0 * window / 4.0
+        n_bins = window // 2 + 1
+        # Log-spaced band start bins from ~60 Hz to Nyquist, each band at least one bin wide
+        low_bin = max(1, int(60.0 * window / sample_rate))
+        starts = np.round(np.geomspace(low_bin, n_bins - 1, bands)).astype(int)
+        for i in range(1, bands):
+            starts[i] = max(starts[i], starts[i - 1] + 1)
+        self._band_starts = np.minimum(starts, n_bins - 1)
+
+        # Counters
+        self.chunks_in = 0
+        self.payloads_out = 0
+
+    def process(self, data: bytes, now: Optional[float] = None) -> Optional[dict]:
+        """Consume one PCM chunk. Returns a payload to emit, or None if throttled."""
+        self.chunks_in += 1
+
+        if self.mode == "raw":
+            self.payloads_out += 1
+            return {"data": list(data)}
+        if self.mode == "binary":
+            self.payloads_out += 1
+            return {"data": bytes(data), "format": "binary"}
+
+        # Keep only the latest analysis window
+        window_bytes = self.window * 2
+        self._tail = (self._tail + data)[-window_bytes:]
+
+        now = time.monotonic() if now is None else now
+        if self._last_emit is not None and now - self._last_emit < self.interval:
+            return None
+        self._last_emit = now
+
+        samples = np.frombuffer(self._tail, dtype=np.int16, count=len(self._tail) // 2)
+        if self.mode == "levels":
+            values = self.band_levels(samples)
+        else:
+            values = self.peak_envelope(samples)
+
+        self.payloads_out += 1
+        return {"data": values.tobytes(), "format": self.mode}
+
+    def band_levels(self, samples: np.ndarray) -> np.ndarray:
+        """Per-band FFT magnitude mapped to uint8 on a dB scale."""
+        if samples.size < self.window:
+            padded = np.zeros(self.window, dtype=np.float32)
+            padded[self.window - samples.size:] = samples
+        else:
+            padded = samples[-self.window:].astype(np.float32)
+
+        spectrum = np.abs(np.fft.rfft(padded * self._hann))
+        # Max per band via reduceat over contiguous bin ranges
+        band_mag = np.maximum.reduceat(spectrum, self._band_starts)[:self.bands]
+        db = 20.0 * np.log10(band_mag / self._ref + 1e-12)
+        scaled = (db - self.floor_db) / -self.floor_db * 255.0
+        return np.clip(scaled, 0, 255).astype(np.uint8)
+
+    def peak_envelope(self, samples: np.ndarray) -> np.ndarray:
+        """Max |sample| per segment of the window, linear 0-255."""
+        if samples.size == 0:
+            return np.zeros(self.bands, dtype=np.uint8)
+        usable = samples.size - samples.size % self.bands
+        if usable == 0:
+            segments = np.abs(samples.astype(np.int32))[None, :]
+            peaks = np.repeat(segments.max(axis=1), self.bands)
+        else:
+            segments = np.abs(samples[-usable:].astype(np.int32)).reshape(self.bands, -1)
+            peaks = segments.max(axis=1)
+        return np.clip(peaks * 255 // 32768, 0, 255).astype(np.uint8)
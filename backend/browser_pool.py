@@ -0,0 +1,225 @@
+# File: browser_pool.py - Purpose: This file handles Browser Pool functionality.
+"""
+Long-lived Chromium with a pool of pre-warmed contexts for WebAgent.
+
+Every WebAgent.run_task used to start Playwright, launch Chromium, create a
+context and load the start page before the model saw its first screenshot.
+BrowserPool keeps one browser running with `size` contexts, each with a page
+already on the start URL. A task checks a slot out, and on return its context
+is closed and a fresh one is opened and parked in the background. Clearing a
+used context in place would miss storage of other origins (IndexedDB, Cache
+Storage, service workers), while new_context costs milliseconds on a warm
+browser, so nothing from one task reaches the next.
+
+A slot is health-checked at checkout and replaced if its page stopped
+responding. If a fresh context cannot be opened, an empty placeholder goes
+back on the queue instead, and the next checkout opens the context itself
+(raising to that caller if it still fails), so a passing failure never
+shrinks the pool. If Chromium itself dies, the browser is relaunched. Separate slots
+are separate contexts, so tasks can run concurrently without sharing cookies.
+"""
+
+import asyncio
+import contextlib
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+DEFAULT_POOL_SIZE = 2
+HEALTH_CHECK_TIMEOUT = 2.0
+DEFAULT_START_URL = "https://www.google.com"
+DEFAULT_VIEWPORT = {"width": 1440, "height": 900}
+DEFAULT_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+
+@dataclass(eq=False)
+class BrowserSlot:
+    context: object
+    page: object
+    created: float = field(default_factory=time.monotonic)
+
+
+class BrowserPool:
+    """
+    Args:
+        size: Number of pre-warmed contexts (= max concurrent tasks).
+        start_url: Page each slot is parked on between tasks.
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, start_url: str = DEFAULT_START_URL,
+                 headless: bool = True, viewport: Optional[dict] = None, user_agent: str = DEFAULT_USER_AGENT):
+        self.size = max(1, size)
+        self.start_url = start_url
+        self.headless = headless
+        self.viewport = viewport or DEFAULT_VIEWPORT
+        self.user_agent = user_agent
+
+        self._playwright = None
+        self.browser = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._slots: List[BrowserSlot] = []
+        self._start_lock = asyncio.Lock()
+        self._background: set = set()
+
+        # Counters
+        self.checkouts = 0
+        self.cold_starts = 0
+        self.recycled = 0
+        self.health_failures = 0
+        self.renew_failures = 0
+        self.last_checkout_ms = 0.0
+        self._checkout_ms_total = 0.0
+
+    @property
+    def started(self) -> bool:
+        return self.browser is not None
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        """Launches Chromium and fills the pool. Safe to call repeatedly."""
+        async with self._start_lock:
+            if self.started and self.browser.is_connected():
+                return
+            from playwright.async_api import async_playwright
+
+            start = time.perf_counter()
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self.browser = await self._playwright.chromium.launch(headless=self.headless)
+            self.cold_starts += 1
+            self._idle = asyncio.Queue()
+            self._slots = []
+            slots = await asyncio.gather(*(self._new_slot() for _ in range(self.size)))
+            for slot in slots:
+                self._slots.append(slot)
+                self._idle.put_nowait(slot)
+            print(f"[BrowserPool] Chromium ready with {self.size} context(s) in {time.perf_counter() - start:.2f}s")
+
+    async def _new_slot(self) -> BrowserSlot:
+        context = await self.browser.new_context(viewport=self.viewport, user_agent=self.user_agent)
+        page = await context.new_page()
+        await self._park(page)
+        return BrowserSlot(context=context, page=page)
+
+    async def _park(self, page):
+        if not self.start_url:
+            return
+        try:
+            await page.goto(self.start_url)
+        except Exception as e:
+            # Offline or slow start page: the task can still navigate itself
+            print(f"[BrowserPool] [WARN] Could not load start page: {e}")
+
+    async def close(self):
+        for task in list(self._background):
+            task.cancel()
+        if self.browser is not None:
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+        self.browser = None
+        self._playwright = None
+        self._slots = []
+        self._idle = None
+
+    # --- Checkout / return ---
+
+    @contextlib.asynccontextmanager
+    async def checkout(self):
+        """`async with pool.checkout() as slot:` yields a healthy BrowserSlot parked on start_url."""
+        start = time.perf_counter()
+        if not self.started or not self.browser.is_connected():
+            if self.started:
+                print("[BrowserPool] [WARN] Chromium disconnected, relaunching.")
+            await self.start()
+
+        slot = await self._idle.get()
+        try:
+            if slot is None:
+                # Placeholder left by a failed renewal: open the context now
+                slot = await self._new_slot()
+                self._slots.append(slot)
+            elif not await self._healthy(slot):
+                self.health_failures += 1
+                slot = await self._replace(slot)
+        except Exception:
+            self._lose(slot)
+            raise
+
+        elapsed = (time.perf_counter() - start) * 1000.0
+        self.checkouts += 1
+        self.last_checkout_ms = elapsed
+        self._checkout_ms_total += elapsed
+        try:
+            yield slot
+        finally:
+            # Renew off the caller's path; a fresh slot joins the queue when parked
+            task = asyncio.create_task(self._release(slot))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    async def _healthy(self, slot: BrowserSlot) -> bool:
+        try:
+            if slot.page.is_closed():
+                return False
+            await asyncio.wait_for(slot.page.evaluate("1"), HEALTH_CHECK_TIMEOUT)
+            return True
+        except Exception:
+            return False
+
+    async def _replace(self, slot: BrowserSlot) -> BrowserSlot:
+        try:
+            await slot.context.close()
+        except Exception:
+            pass
+        fresh = await self._new_slot()
+        if slot in self._slots:
+            self._slots[self._slots.index(slot)] = fresh
+        else:
+            self._slots.append(fresh)
+        return fresh
+
+    def _lose(self, slot: Optional[BrowserSlot]):
+        """Drops a slot whose context could not be (re)opened and queues a placeholder in its place."""
+        if slot is not None and slot in self._slots:
+            self._slots.remove(slot)
+        self.renew_failures += 1
+        if self._idle is not None:
+            self._idle.put_nowait(None)
+
+    async def _release(self, slot: BrowserSlot):
+        """Closes the used context (every origin's storage, tabs, permissions) and queues a fresh slot."""
+        idle = self._idle
+        if not self.started or not self.browser.is_connected():
+            return  # a relaunch builds new slots
+        try:
+            slot = await self._replace(slot)
+        except Exception as e:
+            print(f"[BrowserPool] [WARN] Could not open a fresh context, next checkout retries: {e}")
+            if idle is self._idle:
+                self._lose(slot)
+            return
+        self.recycled += 1
+        if idle is not None and idle is self._idle:
+            idle.put_nowait(slot)
+
+    def stats(self) -> dict:
+        return {
+            "contexts": len(self._slots),
+            "idle": self._idle.qsize() if self._idle else 0,
+            "checkouts": self.checkouts,
+            "cold_starts": self.cold_starts,
+            "recycled": self.recycled,
+            "health_failures": self.health_failures,
+            "renew_failures": self.renew_failures,
+            "last_checkout_ms": round(self.last_checkout_ms, 2),
+            "avg_checkout_ms": round(self._checkout_ms_total / self.checkouts, 2) if self.checkouts else None,
+        }
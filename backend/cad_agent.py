@@ -2,6 +2,7 @@
 import os
 import json
 import asyncio
+import time
 from datetime import datetime
 from google import genai
 from google.genai import types
@@ -9,15 +10,41 @@ from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
+from cad_worker import CadWorkerPool
+from cad_cache import CadResultCache
+from code_stream import CodeBlockStream, validate_cad_script
+from cad_transport import encode_cad_file, DEFAULT_CAD_TRANSPORT, DEFAULT_PREVIEW_MAX_TRIANGLES
+
+# Shared by every project: <repo root>/cad_cache
+DEFAULT_CAD_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cad_cache")
+
+# Temperatures for speculative candidates are spread evenly over this range
+DEFAULT_TEMPERATURE_RANGE = (0.6, 1.2)
+
 load_dotenv()
 
 class CadAgent:
-    def __init__(self, on_thought=None, on_status=None):
+    def __init__(self, on_thought=None, on_status=None, use_worker_pool=True, cad_cache=None,
+                 transport=DEFAULT_CAD_TRANSPORT, preview_max_triangles=DEFAULT_PREVIEW_MAX_TRIANGLES,
+                 candidates=1, temperature_range=DEFAULT_TEMPERATURE_RANGE):
         self.client = genai.Client(http_options={"api_version": "v1beta"}, api_key=os.getenv("GEMINI_API_KEY"))
         # Using Gemini 2.5 Pro for thinking/streaming support
         self.model = "gemini-3-pro-preview"
         self.on_thought = on_thought  # Callback for streaming thoughts 
         self.on_status = on_status  # Callback for retry status info
+        # Speculative generation: >1 runs that many independent candidates at once
+        self.candidates = max(1, int(candidates or 1))
+        self.temperature_range = tuple(temperature_range)
+        # Warm build123d workers (one per candidate); started lazily (or early via warm_up())
+        self.worker_pool = CadWorkerPool(size=self.candidates) if use_worker_pool else None
+        # Script hash -> STL; pass cad_cache=False to disable
+        if cad_cache is None:
+            cad_cache = CadResultCache(DEFAULT_CAD_CACHE_DIR)
+        self.cad_cache = cad_cache or None
+        # cad_data encoding: mesh | stl | base64, decimated above preview_max_triangles (0 = never)
+        self.transport = transport
+        self.preview_max_triangles = preview_max_triangles
+        self.rejected_scripts = 0  # failed static validation, never executed
         
         self.system_instruction = """
 You are a Python-based 3D CAD Engineer using the `build123d` library.
@@ -61,12 +88,280 @@ export_stl(result_part, 'output.stl')
 ```
 """
 
-    async def generate_prototype(self, prompt: str, output_dir: Optional[str] = None):
+    def warm_up(self):
+        """Starts the worker pool so build123d is imported before the first request."""
+        if self.worker_pool:
+            try:
+                self.worker_pool.start()
+            except Exception as e:
+                print(f"[CadAgent DEBUG] [WARN] Could not start worker pool: {e}")
+                self.worker_pool = None
+
+    async def close(self):
+        if self.worker_pool:
+            await self.worker_pool.close()
+        if self.cad_cache:
+            await asyncio.to_thread(self.cad_cache.flush)
+
+    async def _execute_script(self, script_path: str):
+        """
+        Runs a generated script and returns (returncode, stdout, stderr).
+        Uses a warm worker when available, else a fresh interpreter.
+        """
+        if self.worker_pool:
+            try:
+                result = await self.worker_pool.run_script(script_path)
+                print(f"[CadAgent DEBUG] [EXEC] {'Warm' if result.warm else 'Cold'} worker finished in {result.duration:.2f}s")
+                return result.returncode, result.stdout, result.stderr
+            except Exception as e:
+                print(f"[CadAgent DEBUG] [WARN] Worker pool failed ({e}), falling back to subprocess.")
+
+        import subprocess
+        import sys
+
+        # Use asyncio.to_thread for Windows compatibility (asyncio.create_subprocess_exec
+        # throws NotImplementedError on Windows with certain event loop policies)
+        try:
+            proc = await asyncio.to_thread(
+                subprocess.run,
+                [sys.executable, script_path],
+                capture_output=True,
+                text=True
+            )
+            return proc.returncode, proc.stdout, proc.stderr
+        except Exception as e:
+            print(f"[CadAgent DEBUG] [ERR] Subprocess run failed: {e}")
+            return 1, "", str(e)
+
+    async def _request_code(self, contents: str, temperature: float = 1.0, forward_thoughts: bool = True):
+        """
+        Streams one Gemini response (thoughts go to on_thought) and returns the script
+        as soon as its ```python block closes, without waiting for the rest of the reply.
+        """
+        block = CodeBlockStream()
+        stream = await self.client.aio.models.generate_content_stream(
+            model=self.model,
+            contents=contents,
+            config=types.GenerateContentConfig(
+                system_instruction=self.system_instruction,
+                temperature=temperature,
+                thinking_config=types.ThinkingConfig(include_thoughts=True)
+            )
+        )
+        try:
+            async for chunk in stream:
+                if chunk.candidates and chunk.candidates[0].content and chunk.candidates[0].content.parts:
+                    for part in chunk.candidates[0].content.parts:
+                        if not part.text:
+                            continue
+                        elif part.thought:
+                            # Stream thought to callback
+                            if self.on_thought and forward_thoughts:
+                                self.on_thought(part.text)
+                        elif block.feed(part.text) is not None:
+                            print(f"[CadAgent DEBUG] [STREAM] Code block closed after {len(block.text)} chars, not waiting for the rest.")
+                            return block.code
+        finally:
+            # Stop the remaining (explanatory) part of the reply
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                try:
+                    await aclose()
+                except Exception:
+                    pass
+
+        raw_content = block.text
+        if not raw_content:
+            print("[CadAgent DEBUG] [ERR] Empty response from model.")
+            return None
+
+        code = block.finish()
+        if code:
+            print("[CadAgent DEBUG] [WARN] Code block was not closed; using the partial block.")
+            return code
+        # Fallback: assume entire text is code if no blocks, or fail
+        print("[CadAgent DEBUG] [WARN] No ```python block found. Trying heuristic...")
+        if "import build123d" in raw_content:
+            return raw_content
+        print("[CadAgent DEBUG] [ERR] Could not extract python code.")
+        return None
+
+    async def _execute_cached(self, code: str, script_path: str, output_stl: str, prompt: str):
+        """
+        Like _execute_script, but rejects scripts that fail static validation and
+        skips execution when the normalized script is already in the CAD cache.
+        Returns (returncode, stdout, stderr, cached).
+        """
+        # Fail fast on code that cannot work - no process, straight to the repair prompt
+        error = validate_cad_script(code)
+        if error:
+            self.rejected_scripts += 1
+            print(f"[CadAgent DEBUG] [LINT] Rejected without running: {error.splitlines()[-1]}")
+            return 1, "", error, False
+
+        key = self.cad_cache.key_for(code) if self.cad_cache else None
+        # Hardlink/copy and index writes stay off the event loop
+        if key and await asyncio.to_thread(self.cad_cache.materialize, key, output_stl):
+            print(f"[CadAgent DEBUG] [CACHE] Hit {key[:12]}, skipping execution.")
+            return 0, "", "", True
+
+        returncode, stdout, stderr = await self._execute_script(script_path)
+        if returncode == 0 and key and os.path.exists(output_stl):
+            await asyncio.to_thread(self.cad_cache.put, key, output_stl, prompt=prompt[:200])
+        return returncode, stdout, stderr, False
+
+    def _candidate_temperatures(self, count: int) -> List[float]:
+        low, high = self.temperature_range
+        if count == 1:
+            return [round((low + high) / 2, 3)]
+        step = (high - low) / (count - 1)
+        return [round(low + i * step, 3) for i in range(count)]
+
+    async def _run_candidate(self, index: int, count: int, temperature: float, prompt: str,
+                             initial_prompt: str, work_dir: str, timestamp: str, max_retries: int):
+        """
+        One independent generate -> execute -> repair chain for speculative mode.
+        Returns (code, output_stl, cached) on success, None if every attempt failed.
+        """
+        script_path = os.path.join(work_dir, f"candidate_{index}.py")
+        output_stl = os.path.join(work_dir, f"output_{timestamp}_c{index}.stl")
+        safe_output_path = output_stl.replace("\\", "\\\\")
+        current_prompt = initial_prompt
+
+        def status(state, attempt, error=None):
+            if self.on_status:
+                self.on_status({
+                    "status": state,
+                    "attempt": attempt,
+                    "max_attempts": max_retries,
+                    "error": error,
+                    "candidate": index + 1,
+                    "candidates": count,
+                    "temperature": temperature
+                })
+
+        for attempt in range(1, max_retries + 1):
+            status("generating" if attempt == 1 else "retrying", attempt)
+            # Only the first candidate streams its thoughts, so the panel stays readable
+            code = await self._request_code(current_prompt, temperature=temperature, forward_thoughts=(index == 0))
+            if code is None:
+                status("candidate_failed", attempt, "No code in response")
+                return None
+
+            with open(script_path, "w") as f:
+                f.write(code.replace("output.stl", safe_output_path))
+
+            status("executing", attempt)
+            returncode, stdout, stderr, cached = await self._execute_cached(code, script_path, output_stl, prompt)
+            if returncode == 0 and os.path.exists(output_stl):
+                return code, output_stl, cached
+
+            if returncode != 0:
+                error_lines = stderr.strip().split('\n')
+                short_error = error_lines[-1][:100] if error_lines else "Unknown error"
+                print(f"[CadAgent DEBUG] [ERR] Candidate {index + 1} attempt {attempt} failed: {short_error}")
+                current_prompt = f"""
+The Python script you generated failed to execute with the following error:
+{stderr}
+
+Please fix the code to resolve this error. Return the full corrected script. 
+Ensure you still export to 'output.stl'.
+Original request: {prompt}
+"""
+            else:
+                short_error = "output.stl was not generated"
+                current_prompt = f"The script executed successfully but 'output.stl' was not found. Ensure you call `export_stl(result_part, 'output.stl')` at the end."
+            status("retrying" if attempt < max_retries else "candidate_failed", attempt, short_error)
+
+        return None
+
+    async def _generate_speculative(self, prompt: str, initial_prompt: str, work_dir: str,
+                                    timestamp: str, count: int, max_retries: int):
+        """
+        Runs `count` candidates concurrently at different temperatures. Each is
+        executed as soon as its code arrives; the first valid STL wins and the
+        remaining candidates (model streams and running scripts) are cancelled.
+        """
+        temperatures = self._candidate_temperatures(count)
+        print(f"[CadAgent DEBUG] [SPEC] {count} candidates at temperatures {temperatures}")
+        start = time.perf_counter()
+
+        tasks = {
+            asyncio.create_task(self._run_candidate(i, count, t, prompt, initial_prompt, work_dir, timestamp, max_retries)): i
+            for i, t in enumerate(temperatures)
+        }
+        winner = None
+        pending = set(tasks)
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    if task.exception() is not None:
+                        print(f"[CadAgent DEBUG] [ERR] Candidate {tasks[task] + 1} crashed: {task.exception()}")
+                        continue
+                    if task.result() and winner is None:
+                        winner = (tasks[task], task.result())
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        # Keep only the winner's STL; candidate scripts are scratch files
+        for i in range(count):
+            for path in (os.path.join(work_dir, f"candidate_{i}.py"),
+                         os.path.join(work_dir, f"output_{timestamp}_c{i}.stl")):
+                if winner and path == winner[1][1]:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+        if winner is None:
+            print("[CadAgent DEBUG] [ERR] All candidates failed.")
+            if self.on_status:
+                self.on_status({
+                    "status": "failed",
+                    "attempt": max_retries,
+                    "max_attempts": max_retries,
+                    "error": "All generation candidates failed",
+                    "candidates": count
+                })
+            return None
+
+        index, (code, output_stl, cached) = winner
+        elapsed = time.perf_counter() - start
+        print(f"[CadAgent DEBUG] [SPEC] Candidate {index + 1}/{count} won after {elapsed:.1f}s, cancelled {len(pending)}")
+        if self.on_status:
+            self.on_status({
+                "status": "candidate_succeeded",
+                "candidate": index + 1,
+                "candidates": count,
+                "temperature": temperatures[index],
+                "elapsed": round(elapsed, 2),
+                "cancelled": len(pending)
+            })
+
+        # The winner becomes current_design.py so iterate_prototype builds on it
+        with open(os.path.join(work_dir, "current_design.py"), "w") as f:
+            f.write(code.replace("output.stl", output_stl.replace("\\", "\\\\")))
+
+        payload = await asyncio.to_thread(encode_cad_file, output_stl, self.transport, self.preview_max_triangles)
+        payload["file_path"] = output_stl
+        payload["cached"] = cached
+        payload["candidate"] = index + 1
+        return payload
+
+    async def generate_prototype(self, prompt: str, output_dir: Optional[str] = None, candidates: Optional[int] = None):
         """
         Generates 3D geometry by asking Gemini for a script, then running it LOCALLY.
         Args:
             prompt: User's description of the model to generate.
             output_dir: Directory to save the script and STL. If None, uses temp dir.
+            candidates: Concurrent speculative candidates (defaults to self.candidates; 1 = sequential).
         """
         print(f"[CadAgent DEBUG] [START] Generation started for: '{prompt}'")
         
@@ -86,6 +381,10 @@ export_stl(result_part, 'output.stl')
 
             max_retries = 3
             current_prompt = f"You are a build123d expert. Write a generic python script to create a 3D model of: {prompt}. Ensure you export to 'output.stl'. Unscaled."
+
+            candidates = self.candidates if candidates is None else max(1, candidates)
+            if candidates > 1:
+                return await self._generate_speculative(prompt, current_prompt, work_dir, timestamp, candidates, max_retries)
             
             for attempt in range(max_retries):
                 print(f"[CadAgent DEBUG] Attempt {attempt + 1}/{max_retries}")
@@ -100,47 +399,10 @@ export_stl(result_part, 'output.stl')
                     }
                     self.on_status(status_info)
                 
-                # 1. Ask Gemini for the code with streaming and thinking
-                raw_content = ""
-                stream = await self.client.aio.models.generate_content_stream(
-                    model=self.model,
-                    contents=current_prompt,
-                    config=types.GenerateContentConfig(
-                        system_instruction=self.system_instruction,
-                        temperature=1.0,
-                        thinking_config=types.ThinkingConfig(include_thoughts=True)
-                    )
-                )
-                async for chunk in stream:
-                    if chunk.candidates and chunk.candidates[0].content and chunk.candidates[0].content.parts:
-                        for part in chunk.candidates[0].content.parts:
-                            if not part.text:
-                                continue
-                            elif part.thought:
-                                # Stream thought to callback
-                                if self.on_thought:
-                                    self.on_thought(part.text)
-                            else:
-                                # Accumulate answer text
-                                raw_content += part.text
-                
-                if not raw_content:
-                    print("[CadAgent DEBUG] [ERR] Empty response from model.")
+                # 1-2. Ask Gemini for the code (streaming thoughts) and extract the code block
+                code = await self._request_code(current_prompt)
+                if code is None:
                     return None
-
-                # 2. Extract Code Block
-                import re
-                code_match = re.search(r'```python(.*?)```', raw_content, re.DOTALL)
-                if code_match:
-                    code = code_match.group(1).strip()
-                else:
-                    # Fallback: assume entire text is code if no blocks, or fail
-                    print("[CadAgent DEBUG] [WARN] No ```python block found. Trying heuristic...")
-                    if "import build123d" in raw_content:
-                        code = raw_content
-                    else:
-                        print("[CadAgent DEBUG] [ERR] Could not extract python code.")
-                        return None
                 
                 # 3. Save to Local File in cad_outputs folder
                 # Fix for Windows paths in python strings: escape backslashes
@@ -153,26 +415,10 @@ export_stl(result_part, 'output.stl')
                     
                 print(f"[CadAgent DEBUG] [EXEC] Running local script: {script_path}")
                 
-                # 4. Execute Locally
-                import subprocess
-                import sys
-                
-                # Use the current Python interpreter (unified environment with build123d + mediapipe)
-                try:
-                    proc = await asyncio.to_thread(
-                        subprocess.run,
-                        [sys.executable, script_path],
-                        capture_output=True,
-                        text=True
-                    )
-                    stdout, stderr = proc.stdout, proc.stderr
-                except Exception as e:
-                     print(f"[CadAgent DEBUG] [ERR] Subprocess run failed: {e}")
-                     proc = type('obj', (object,), {'returncode': 1})
-                     stdout = ""
-                     stderr = str(e)
+                # 4. Execute Locally (or reuse a cached STL for the same script)
+                returncode, stdout, stderr, cached = await self._execute_cached(code, script_path, output_stl, prompt)
                 
-                if proc.returncode != 0:
+                if returncode != 0:
                     error_msg = stderr
                     # Extract a concise error message for display
                     error_lines = error_msg.strip().split('\n')
@@ -204,17 +450,11 @@ Original request: {prompt}
                 # 5. Read Output
                 if os.path.exists(output_stl):
                     print(f"[CadAgent DEBUG] [file] '{output_stl}' found.")
-                    with open(output_stl, "rb") as f:
-                        stl_data = f.read()
-                        
-                    import base64
-                    b64_stl = base64.b64encode(stl_data).decode('utf-8')
-                    
-                    return {
-                        "format": "stl",
-                        "data": b64_stl,
-                        "file_path": output_stl
-                    }
+                    # Encode off the event loop; large meshes take a while
+                    payload = await asyncio.to_thread(encode_cad_file, output_stl, self.transport, self.preview_max_triangles)
+                    payload["file_path"] = output_stl
+                    payload["cached"] = cached
+                    return payload
                 else:
                      print(f"[CadAgent DEBUG] [ERR] '{output_stl}' was not generated.")
                      # If script ran but no output, treat as failure and retry?
@@ -316,47 +556,10 @@ Ensure you still export to 'output.stl'.
                     }
                     self.on_status(status_info)
                 
-                # 1. Ask Gemini for the code with streaming and thinking
-                raw_content = ""
-                stream = await self.client.aio.models.generate_content_stream(
-                    model=self.model,
-                    contents=current_prompt,
-                    config=types.GenerateContentConfig(
-                        system_instruction=self.system_instruction,
-                        temperature=1.0,
-                        thinking_config=types.ThinkingConfig(include_thoughts=True)
-                    )
-                )
-                async for chunk in stream:
-                    if chunk.candidates and chunk.candidates[0].content and chunk.candidates[0].content.parts:
-                        for part in chunk.candidates[0].content.parts:
-                            if not part.text:
-                                continue
-                            elif part.thought:
-                                # Stream thought to callback
-                                if self.on_thought:
-                                    self.on_thought(part.text)
-                            else:
-                                # Accumulate answer text
-                                raw_content += part.text
-                
-                if not raw_content:
-                    print("[CadAgent DEBUG] [ERR] Empty response from model.")
+                # 1-2. Ask Gemini for the code (streaming thoughts) and extract the code block
+                code = await self._request_code(current_prompt)
+                if code is None:
                     return None
-
-                # 2. Extract Code Block
-                import re
-                code_match = re.search(r'```python(.*?)```', raw_content, re.DOTALL)
-                if code_match:
-                    code = code_match.group(1).strip()
-                else:
-                    # Fallback: assume entire text is code if no blocks, or fail
-                    print("[CadAgent DEBUG] [WARN] No ```python block found. Trying heuristic...")
-                    if "import build123d" in raw_content:
-                        code = raw_content
-                    else:
-                        print("[CadAgent DEBUG] [ERR] Could not extract python code.")
-                        return None
                 
                 # 3. Save to Local File in cad_outputs folder
                 # Overwrite the script so the next iteration builds on this one
@@ -371,27 +574,10 @@ Ensure you still export to 'output.stl'.
                     
                 print(f"[CadAgent DEBUG] [EXEC] Running local script: {script_path}")
                 
-                # 4. Execute Locally
-                import subprocess
-                import sys
-                
-                # Use asyncio.to_thread for Windows compatibility (asyncio.create_subprocess_exec
-                # throws NotImplementedError on Windows with certain event loop policies)
-                try:
-                    proc = await asyncio.to_thread(
-                        subprocess.run,
-                        [sys.executable, script_path],
-                        capture_output=True,
-                        text=True
-                    )
-                    stdout, stderr = proc.stdout, proc.stderr
-                except Exception as e:
-                    print(f"[CadAgent DEBUG] [ERR] Subprocess run failed: {e}")
-                    proc = type('obj', (object,), {'returncode': 1})()
-                    stdout = ""
-                    stderr = str(e)
+                # 4. Execute Locally (or reuse a cached STL for the same script)
+                returncode, stdout, stderr, cached = await self._execute_cached(code, script_path, output_stl, prompt)
                 
-                if proc.returncode != 0:
+                if returncode != 0:
                     error_msg = stderr
                     print(f"[CadAgent DEBUG] [ERR] Script Execution Failed:\n{error_msg}")
                     
@@ -410,17 +596,11 @@ Ensure you still export to 'output.stl'.
                 # 5. Read Output
                 if os.path.exists(output_stl):
                     print(f"[CadAgent DEBUG] [file] '{output_stl}' found.")
-                    with open(output_stl, "rb") as f:
-                        stl_data = f.read()
-                        
-                    import base64
-                    b64_stl = base64.b64encode(stl_data).decode('utf-8')
-                    
-                    return {
-                        "format": "stl",
-                        "data": b64_stl,
-                        "file_path": output_stl
-                    }
+                    # Encode off the event loop; large meshes take a while
+                    payload = await asyncio.to_thread(encode_cad_file, output_stl, self.transport, self.preview_max_triangles)
+                    payload["file_path"] = output_stl
+                    payload["cached"] = cached
+                    return payload
                 else:
                      print(f"[CadAgent DEBUG] [ERR] '{output_stl}' was not generated.")
                      current_prompt = f"The script executed successfully but '{output_stl}' was not found. Ensure you call `export_stl(result_part, 'output.stl')` at the end."
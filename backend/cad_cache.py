@@ -0,0 +1,227 @@
+# File: cad_cache.py - Purpose: This file handles Cad Cache functionality.
+"""
+Content-addressed cache of CAD results, shared by all projects.
+
+The model often returns the same build123d script twice (retries, iterations
+that change nothing, the same prompt in another project). CadResultCache keys
+each STL by the hash of the normalized script - comments, blank lines and
+trailing whitespace removed, output path left as the 'output.stl' placeholder,
+build123d version mixed in - so a repeat skips execution entirely.
+
+Entries live in <root>/<key[:2]>/<key>.stl with an index.json holding size,
+timestamps and metadata. put() and evictions write the index at once; a hit
+only updates recency in memory, saved at most every `save_interval` seconds
+and by flush(). Eviction is LRU by total bytes. Results are handed out
+as hardlinks (copy fallback across filesystems), so STL files must be treated
+as write-once: every run writes a new timestamped output file.
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import threading
+import time
+import tokenize
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_CACHE_BYTES = 512 * 1024 * 1024
+CACHE_FORMAT = "1"
+INDEX_FILE = "index.json"
+DEFAULT_INDEX_SAVE_INTERVAL = 30.0
+
+
+def _build123d_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("build123d")
+    except Exception:
+        return "unknown"
+
+
+def normalize_script(code: str) -> str:
+    """Drops comments, blank lines and trailing whitespace; keeps everything that can change the geometry."""
+    try:
+        tokens = [
+            tok for tok in tokenize.generate_tokens(io.StringIO(code).readline)
+            if tok.type != tokenize.COMMENT
+        ]
+        code = tokenize.untokenize(tokens)
+    except (tokenize.TokenError, IndentationError, SyntaxError, ValueError):
+        pass  # Not valid Python - fall back to whitespace-only normalization
+    lines = [line.rstrip() for line in code.replace("\r\n", "\n").split("\n")]
+    return "\n".join(line for line in lines if line.strip())
+
+
+def link_or_copy(source: str, dest: str) -> bool:
+    """Hardlinks source to dest, copying when links are not possible. Returns True if linked."""
+    if os.path.exists(dest):
+        os.remove(dest)
+    try:
+        os.link(source, dest)
+        return True
+    except OSError:
+        shutil.copy2(source, dest)
+        return False
+
+
+class CadResultCache:
+    """
+    Args:
+        root: Cache directory (shared across projects).
+        max_bytes: Total STL bytes kept before least-recently-used entries are evicted.
+        save_interval: Minimum seconds between index writes caused by cache hits.
+    """
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_CACHE_BYTES,
+                 save_interval: float = DEFAULT_INDEX_SAVE_INTERVAL):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.save_interval = save_interval
+        self._dirty = False
+        self._last_save = 0.0
+        self._salt = f"{CACHE_FORMAT}:{_build123d_version()}"
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()  # oldest first
+        self.total_bytes = 0
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._load_index()
+
+    def key_for(self, code: str) -> str:
+        digest = hashlib.sha256(self._salt.encode("utf-8") + b"\0")
+        digest.update(normalize_script(code).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.stl"
+
+    # --- Index persistence ---
+
+    def _load_index(self):
+        try:
+            with open(self.root / INDEX_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for key, meta in sorted(data.get("entries", {}).items(), key=lambda kv: kv[1].get("last_used", 0)):
+            if self._path(key).exists():
+                self._entries[key] = meta
+                self.total_bytes += meta.get("size", 0)
+
+    def _save_index(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / (INDEX_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"format": CACHE_FORMAT, "entries": self._entries}, f)
+        os.replace(tmp, self.root / INDEX_FILE)
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def flush(self):
+        """Writes recency updates from cache hits that are not on disk yet."""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    # --- Lookup / store ---
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached STL path for key (marking it recently used), or None."""
+        with self._lock:
+            meta = self._entries.get(key)
+            path = self._path(key)
+            if meta is None or not path.exists():
+                if meta is not None:
+                    self._drop(key)
+                    self._save_index()
+                self.misses += 1
+                return None
+            meta["last_used"] = time.time()
+            meta["hits"] = meta.get("hits", 0) + 1
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # Recency only: batch index writes instead of rewriting it on every hit
+            self._dirty = True
+            if time.monotonic() - self._last_save >= self.save_interval:
+                self._save_index()
+            return str(path)
+
+    def materialize(self, key: str, dest: str) -> bool:
+        """Places the cached STL for key at dest. False on a miss."""
+        path = self.get(key)
+        if path is None:
+            return False
+        try:
+            link_or_copy(path, dest)
+        except OSError as e:
+            print(f"[CadCache] [WARN] Could not materialize {key[:12]}: {e}")
+            return False
+        return True
+
+    def put(self, key: str, stl_path: str, **metadata) -> Optional[str]:
+        """Stores a freshly generated STL under key and evicts down to max_bytes."""
+        try:
+            size = os.path.getsize(stl_path)
+        except OSError:
+            return None
+        if size > self.max_bytes:
+            return None
+
+        with self._lock:
+            path = self._path(key)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                link_or_copy(stl_path, str(path))
+            except OSError as e:
+                print(f"[CadCache] [WARN] Could not store {key[:12]}: {e}")
+                return None
+
+            if key in self._entries:
+                self.total_bytes -= self._entries[key].get("size", 0)
+            now = time.time()
+            self._entries[key] = {"size": size, "created": now, "last_used": now, "hits": 0, **metadata}
+            self._entries.move_to_end(key)
+            self.total_bytes += size
+            self._evict()
+            self._save_index()
+            return str(path)
+
+    def _drop(self, key: str):
+        meta = self._entries.pop(key, None)
+        if meta is None:
+            return
+        self.total_bytes -= meta.get("size", 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+            self._save_index()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
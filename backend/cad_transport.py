@@ -0,0 +1,202 @@
+# File: cad_transport.py - Purpose: This file handles Cad Transport functionality.
+"""
+Encoding of STL files for the `cad_data` Socket.IO event.
+
+The original payload was `{format: 'stl', data: <base64 STL>}`: 33% larger
+than the file and encoded on the event loop. This module offers:
+
+- "mesh":   indexed-vertex buffers (float32 xyz + uint32 triangle indices) with
+            duplicate vertices merged; roughly 3x smaller than binary STL.
+- "stl":    binary STL bytes (ASCII input is converted).
+- "base64": the legacy payload.
+
+Bytes values are sent by python-socketio as binary attachments. Optional
+vertex-clustering decimation caps the preview's triangle count. Call
+`encode_cad_file` through asyncio.to_thread for big models.
+"""
+
+import base64
+import os
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+CAD_TRANSPORTS = ("mesh", "stl", "base64")
+DEFAULT_CAD_TRANSPORT = "mesh"
+DEFAULT_PREVIEW_MAX_TRIANGLES = 200_000
+
+_STL_RECORD = np.dtype([
+    ("normal", "<f4", (3,)),
+    ("vertices", "<f4", (3, 3)),
+    ("attr", "<u2"),
+])
+
+
+# --- STL parsing / writing ---
+
+def parse_stl(data: bytes) -> np.ndarray:
+    """Returns triangles as a float32 array of shape (T, 3, 3). Accepts binary or ASCII STL."""
+    if len(data) >= 84:
+        count = int(np.frombuffer(data, dtype="<u4", count=1, offset=80)[0])
+        if len(data) == 84 + count * _STL_RECORD.itemsize:
+            records = np.frombuffer(data, dtype=_STL_RECORD, count=count, offset=84)
+            return records["vertices"].astype(np.float32, copy=True)
+
+    if data.lstrip()[:5].lower() != b"solid":
+        raise ValueError("Not a valid STL file")
+    coords = [line.split()[1:4] for line in data.splitlines() if line.lstrip().startswith(b"vertex")]
+    if len(coords) % 3:
+        raise ValueError("Truncated ASCII STL")
+    return np.array(coords, dtype=np.float32).reshape(-1, 3, 3)
+
+
+def write_binary_stl(triangles: np.ndarray) -> bytes:
+    records = np.zeros(len(triangles), dtype=_STL_RECORD)
+    records["vertices"] = triangles
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    records["normal"] = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+    header = b"Jarvis CAD preview".ljust(80, b" ")
+    return header + np.uint32(len(triangles)).tobytes() + records.tobytes()
+
+
+# --- Mesh processing ---
+
+def index_mesh(triangles: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Merges identical vertices. Returns (vertices (V, 3) float32, indices (T, 3) uint32)."""
+    flat = np.ascontiguousarray(triangles.reshape(-1, 3), dtype=np.float32)
+    # Sort on the raw 32-bit patterns (exact match, much faster than np.unique(axis=0))
+    bits = flat.view(np.int32)
+    order = np.lexsort((bits[:, 2], bits[:, 1], bits[:, 0]))
+    ordered = bits[order]
+    is_new = np.empty(len(order), dtype=bool)
+    is_new[:1] = True
+    is_new[1:] = np.any(ordered[1:] != ordered[:-1], axis=1)
+    group = np.cumsum(is_new) - 1
+    inverse = np.empty(len(order), dtype=np.uint32)
+    inverse[order] = group
+    return flat[order[is_new]], inverse.reshape(-1, 3)
+
+
+def decimate(vertices: np.ndarray, indices: np.ndarray, max_triangles: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vertex-clustering level of detail: snaps vertices to a grid, merges each cell
+    into its centroid and drops collapsed triangles. The grid is coarsened until
+    the result fits max_triangles.
+    """
+    if max_triangles <= 0 or len(indices) <= max_triangles:
+        return vertices, indices
+
+    lo = vertices.min(axis=0)
+    extent = float(np.max(vertices.max(axis=0) - lo)) or 1.0
+    # A closed surface with n cells per axis has on the order of 4*n^2 triangles
+    resolution = max(2, int(np.sqrt(max_triangles / 4.0)) * 2)
+
+    while True:
+        cells = np.floor((vertices - lo) / extent * (resolution - 1e-6)).astype(np.int64)
+        cell_ids = (cells[:, 0] * resolution + cells[:, 1]) * resolution + cells[:, 2]
+        unique_cells, cluster = np.unique(cell_ids, return_inverse=True)
+
+        tris = cluster[indices]
+        keep = (tris[:, 0] != tris[:, 1]) & (tris[:, 1] != tris[:, 2]) & (tris[:, 0] != tris[:, 2])
+        tris = tris[keep]
+        # Drop triangles that collapsed onto the same three clusters (same winding)
+        rolled = np.where((tris[:, 0] < tris[:, 1]) & (tris[:, 0] < tris[:, 2]), 0,
+                          np.where(tris[:, 1] < tris[:, 2], 1, 2))
+        rows = np.arange(len(tris))
+        canonical = np.stack([tris[rows, (rolled + k) % 3] for k in range(3)], axis=1)
+        if len(unique_cells) < (1 << 21):
+            packed = (canonical[:, 0] << 42) | (canonical[:, 1] << 21) | canonical[:, 2]
+            _, first = np.unique(packed, return_index=True)
+            tris = canonical[np.sort(first)]
+        else:
+            tris = np.unique(canonical, axis=0)
+
+        if len(tris) <= max_triangles or resolution <= 2:
+            break
+        resolution = max(2, int(resolution * 0.75))
+
+    counts = np.bincount(cluster, minlength=len(unique_cells)).astype(np.float64)
+    centroids = np.zeros((len(unique_cells), 3), dtype=np.float64)
+    for axis in range(3):
+        centroids[:, axis] = np.bincount(cluster, weights=vertices[:, axis], minlength=len(unique_cells)) / counts
+
+    # Compact away clusters no triangle uses
+    used, remap = np.unique(tris, return_inverse=True)
+    return centroids[used].astype(np.float32), remap.reshape(-1, 3).astype(np.uint32)
+
+
+# --- Payloads ---
+
+def encode_cad_payload(stl_data: bytes, transport: str = DEFAULT_CAD_TRANSPORT,
+                       max_triangles: Optional[int] = DEFAULT_PREVIEW_MAX_TRIANGLES) -> dict:
+    """
+    Builds a `cad_data` payload from raw STL bytes. Adds a "stats" dict with the
+    payload size, encode time and triangle counts.
+    """
+    start = time.perf_counter()
+    if transport not in CAD_TRANSPORTS:
+        print(f"[CadTransport] [WARN] Unknown transport '{transport}', using {DEFAULT_CAD_TRANSPORT}")
+        transport = DEFAULT_CAD_TRANSPORT
+
+    stats = {"transport": transport, "source_bytes": len(stl_data)}
+
+    if transport == "base64" and not max_triangles:
+        payload = {"format": "stl", "data": base64.b64encode(stl_data).decode("utf-8")}
+        stats["bytes"] = len(payload["data"])
+    else:
+        triangles = parse_stl(stl_data)
+        stats["source_triangles"] = len(triangles)
+        decimated = bool(max_triangles) and len(triangles) > max_triangles
+
+        if transport == "mesh" or decimated:
+            vertices, indices = index_mesh(triangles)
+            if decimated:
+                vertices, indices = decimate(vertices, indices, max_triangles)
+                triangles = vertices[indices]
+        stats["triangles"] = len(triangles)
+        stats["decimated"] = decimated
+
+        if transport == "mesh":
+            payload = {
+                "format": "mesh",
+                "vertices": vertices.astype("<f4").tobytes(),
+                "indices": indices.astype("<u4").tobytes(),
+                "vertex_count": len(vertices),
+                "triangle_count": len(indices),
+            }
+            stats["vertices"] = len(vertices)
+            stats["bytes"] = len(payload["vertices"]) + len(payload["indices"])
+        else:
+            stl_bytes = write_binary_stl(triangles) if decimated or not _is_binary_stl(stl_data) else stl_data
+            if transport == "stl":
+                payload = {"format": "stl", "encoding": "binary", "data": stl_bytes}
+                stats["bytes"] = len(stl_bytes)
+            else:
+                payload = {"format": "stl", "data": base64.b64encode(stl_bytes).decode("utf-8")}
+                stats["bytes"] = len(payload["data"])
+
+    stats["encode_ms"] = round((time.perf_counter() - start) * 1000.0, 2)
+    payload["stats"] = stats
+    return payload
+
+
+def encode_cad_file(path: str, transport: str = DEFAULT_CAD_TRANSPORT,
+                    max_triangles: Optional[int] = DEFAULT_PREVIEW_MAX_TRIANGLES) -> dict:
+    with open(path, "rb") as f:
+        stl_data = f.read()
+    payload = encode_cad_payload(stl_data, transport, max_triangles)
+    payload["filename"] = os.path.basename(path)
+    stats = payload["stats"]
+    print(f"[CadTransport] {payload['filename']}: {stats['bytes']} bytes via {stats['transport']} "
+          f"in {stats['encode_ms']} ms"
+          + (f" ({stats['source_triangles']} -> {stats['triangles']} triangles)" if stats.get("decimated") else ""))
+    return payload
+
+
+def _is_binary_stl(data: bytes) -> bool:
+    if len(data) < 84:
+        return False
+    count = int(np.frombuffer(data, dtype="<u4", count=1, offset=80)[0])
+    return len(data) == 84 + count * _STL_RECORD.itemsize
@@ -0,0 +1,361 @@
+# File: cad_worker.py - Purpose: This file handles Cad Worker functionality.
+"""
+Pre-warmed worker processes for running generated build123d scripts.
+
+CadAgent used to run every attempt with `subprocess.run([sys.executable, script])`,
+paying interpreter start-up plus `import build123d` / OCP (seconds) each time,
+up to three times per request. CadWorkerPool keeps long-lived worker processes
+that import build123d once and then exec each submitted script in a fresh
+namespace.
+
+Workers are plain `python cad_worker.py` subprocesses talking JSON lines over
+stdin/stdout (no multiprocessing, so server.py is never re-imported in the
+child and it behaves the same on Windows). Each job has a timeout (the worker
+is killed and replaced), workers run under an address-space cap where the OS
+supports it, and are recycled after `max_jobs_per_worker` jobs.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+import traceback
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+DEFAULT_PRELOAD = ("build123d", "numpy")
+DEFAULT_JOB_TIMEOUT = 120.0
+DEFAULT_MEMORY_LIMIT_MB = 4096
+DEFAULT_MAX_JOBS_PER_WORKER = 25
+WORKER_START_TIMEOUT = 120.0  # importing OCP can be slow on a cold disk
+
+
+@dataclass
+class ScriptResult:
+    returncode: int
+    stdout: str = ""
+    stderr: str = ""
+    duration: float = 0.0
+    warm: bool = False      # ran in an already-warm worker
+    timed_out: bool = False
+
+
+class _Worker:
+    """One worker subprocess. Blocking methods run in a thread via asyncio.to_thread."""
+
+    def __init__(self, preload: Sequence[str], memory_limit_mb: Optional[int]):
+        cmd = [sys.executable, "-u", os.path.abspath(__file__), "--worker",
+               "--preload", ",".join(preload)]
+        if memory_limit_mb:
+            cmd += ["--memory-mb", str(memory_limit_mb)]
+        self.proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        self.jobs = 0
+        self.ready = False
+        self.preload_errors: List[str] = []
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def _read_message(self) -> Optional[dict]:
+        line = self.proc.stdout.readline()
+        if not line:
+            return None
+        return json.loads(line)
+
+    def wait_ready(self) -> bool:
+        if self.ready:
+            return True
+        message = self._read_message()
+        if not message or not message.get("ready"):
+            return False
+        self.preload_errors = message.get("errors", [])
+        self.ready = True
+        return True
+
+    def run(self, script_path: str, cwd: str) -> Optional[dict]:
+        """Sends one job and waits for its result. None if the worker died."""
+        try:
+            self.proc.stdin.write(json.dumps({"script": script_path, "cwd": cwd}) + "\n")
+            self.proc.stdin.flush()
+            result = self._read_message()
+        except (OSError, ValueError):
+            return None
+        self.jobs += 1
+        return result
+
+    def kill(self):
+        if self.alive:
+            self.proc.kill()
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+        for stream in (self.proc.stdin, self.proc.stdout):
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def shutdown(self):
+        """Asks the worker to exit cleanly, killing it if it does not."""
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=2)
+        except Exception:
+            pass
+        self.kill()
+
+
+class CadWorkerPool:
+    """
+    Args:
+        size: Number of worker processes.
+        preload: Modules each worker imports before accepting jobs.
+        job_timeout: Default seconds a script may run before its worker is killed.
+        memory_limit_mb: Address-space cap per worker (RLIMIT_AS; ignored where unsupported).
+        max_jobs_per_worker: Recycle a worker after this many jobs.
+    """
+
+    def __init__(self, size: int = 1, preload: Sequence[str] = DEFAULT_PRELOAD,
+                 job_timeout: float = DEFAULT_JOB_TIMEOUT,
+                 memory_limit_mb: Optional[int] = DEFAULT_MEMORY_LIMIT_MB,
+                 max_jobs_per_worker: int = DEFAULT_MAX_JOBS_PER_WORKER):
+        self.size = max(1, size)
+        self.preload = tuple(preload)
+        self.job_timeout = job_timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_jobs_per_worker = max(1, max_jobs_per_worker)
+
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: List[_Worker] = []
+
+        # Counters
+        self.jobs_run = 0
+        self.warm_jobs = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self.recycled = 0
+        self.cancelled = 0
+
+    @property
+    def started(self) -> bool:
+        return self._idle is not None
+
+    def start(self):
+        """Spawns the workers. They import `preload` in the background."""
+        if self.started:
+            return
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            self._add_worker()
+        print(f"[CadWorkerPool] Started {self.size} worker(s), preloading: {', '.join(self.preload) or 'nothing'}")
+
+    def _add_worker(self):
+        worker = _Worker(self.preload, self.memory_limit_mb)
+        self._workers.append(worker)
+        self._idle.put_nowait(worker)
+
+    def _replace(self, worker: _Worker):
+        worker.kill()
+        if worker in self._workers:
+            self._workers.remove(worker)
+        self._add_worker()
+
+    async def run_script(self, script_path: str, cwd: Optional[str] = None,
+                         timeout: Optional[float] = None) -> ScriptResult:
+        """Runs a script file in a warm worker. Never raises for script failures."""
+        self.start()
+        cwd = cwd or os.getcwd()
+        timeout = self.job_timeout if timeout is None else timeout
+
+        worker = await self._idle.get()
+        start = time.perf_counter()
+        try:
+            ready = await asyncio.wait_for(asyncio.to_thread(worker.wait_ready), WORKER_START_TIMEOUT)
+            if not ready:
+                raise RuntimeError("worker exited during start-up")
+            warm = worker.jobs > 0 or time.perf_counter() - start < 0.05
+
+            try:
+                result = await asyncio.wait_for(asyncio.to_thread(worker.run, script_path, cwd), timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                self._replace(worker)
+                worker = None
+                return ScriptResult(returncode=-9, stderr=f"TimeoutError: script exceeded {timeout:.0f}s and was terminated",
+                                    duration=time.perf_counter() - start, warm=warm, timed_out=True)
+
+            if result is None:
+                # Worker died mid-job (segfault in OCP, hard memory cap, ...)
+                self.crashes += 1
+                code = worker.proc.poll()
+                self._replace(worker)
+                worker = None
+                return ScriptResult(returncode=code if code else 1,
+                                    stderr=f"Worker process crashed while running the script (exit code {code})",
+                                    duration=time.perf_counter() - start, warm=warm)
+
+            if result.get("exiting"):
+                worker.jobs = self.max_jobs_per_worker  # recycle in finally
+            self.jobs_run += 1
+            if warm:
+                self.warm_jobs += 1
+            return ScriptResult(returncode=result.get("returncode", 1), stdout=result.get("stdout", ""),
+                                stderr=result.get("stderr", ""), duration=time.perf_counter() - start, warm=warm)
+        except asyncio.CancelledError:
+            # Caller gave up (e.g. a losing speculative candidate): stop the script as well
+            if worker is not None:
+                self._replace(worker)
+                worker = None
+            self.cancelled += 1
+            raise
+        except (asyncio.TimeoutError, RuntimeError, OSError) as e:
+            self.crashes += 1
+            if worker is not None:
+                self._replace(worker)
+                worker = None
+            return ScriptResult(returncode=1, stderr=f"CAD worker unavailable: {e}",
+                                duration=time.perf_counter() - start)
+        finally:
+            if worker is not None:
+                if worker.jobs >= self.max_jobs_per_worker or not worker.alive:
+                    self.recycled += 1
+                    self._replace(worker)
+                else:
+                    self._idle.put_nowait(worker)
+
+    async def close(self):
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            await asyncio.to_thread(worker.shutdown)
+        self._idle = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._workers),
+            "jobs_run": self.jobs_run,
+            "warm_jobs": self.warm_jobs,
+            "timeouts": self.timeouts,
+            "crashes": self.crashes,
+            "recycled": self.recycled,
+            "cancelled": self.cancelled,
+        }
+
+
+# --- Worker process side ---
+
+def _apply_memory_limit(memory_mb: int):
+    try:
+        import resource
+    except ImportError:
+        return  # Windows
+    limit = memory_mb * 1024 * 1024
+    try:
+        soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ValueError, OSError):
+        pass
+
+
+def _execute(script_path: str, cwd: str) -> dict:
+    """Runs one script in a fresh __main__ namespace, capturing its output."""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    returncode = 0
+    memory_error = False
+    previous_cwd = os.getcwd()
+    previous_argv = sys.argv
+    try:
+        with open(script_path, "r", encoding="utf-8") as f:
+            source = f.read()
+        code = compile(source, script_path, "exec")
+        namespace = {"__name__": "__main__", "__file__": script_path, "__builtins__": __builtins__}
+        os.chdir(cwd)
+        sys.argv = [script_path]
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            exec(code, namespace)
+    except SystemExit as e:
+        if e.code is None:
+            returncode = 0
+        elif isinstance(e.code, int):
+            returncode = e.code
+        else:
+            stderr.write(f"{e.code}\n")
+            returncode = 1
+    except BaseException as e:
+        # Drop this frame so the traceback looks like `python script.py`
+        tb = e.__traceback__.tb_next if e.__traceback__ is not None else None
+        stderr.write("Traceback (most recent call last):\n" if tb else "")
+        stderr.write("".join(traceback.format_tb(tb)) if tb else "")
+        stderr.write("".join(traceback.format_exception_only(type(e), e)))
+        returncode = 1
+        if isinstance(e, MemoryError):
+            memory_error = True
+            stderr.write("Worker hit its memory limit.\n")
+    finally:
+        sys.argv = previous_argv
+        try:
+            os.chdir(previous_cwd)
+        except OSError:
+            pass
+    return {"returncode": returncode, "stdout": stdout.getvalue(), "stderr": stderr.getvalue(),
+            "memory_error": memory_error}
+
+
+def worker_main(preload: Sequence[str], memory_mb: Optional[int]):
+    # Keep the protocol channel private; anything else printed to fd 1
+    # (C extensions, stray prints) goes to devnull instead of corrupting it.
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8", buffering=1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+
+    if memory_mb:
+        _apply_memory_limit(memory_mb)
+
+    errors = []
+    for module in preload:
+        if not module:
+            continue
+        try:
+            __import__(module)
+        except Exception as e:
+            errors.append(f"{module}: {e}")
+    protocol.write(json.dumps({"ready": True, "errors": errors}) + "\n")
+
+    for line in sys.stdin:
+        try:
+            job = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        result = _execute(job["script"], job.get("cwd") or os.getcwd())
+        # After a MemoryError the heap may be exhausted or fragmented - ask to be replaced
+        result["exiting"] = result.pop("memory_error", False)
+        protocol.write(json.dumps(result) + "\n")
+        if result["exiting"]:
+            break
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="build123d worker process")
+    parser.add_argument("--worker", action="store_true")
+    parser.add_argument("--preload", default="")
+    parser.add_argument("--memory-mb", type=int, default=None)
+    args = parser.parse_args()
+    if args.worker:
+        worker_main([m for m in args.preload.split(",") if m], args.memory_mb)
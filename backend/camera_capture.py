@@ -0,0 +1,184 @@
+# File: camera_capture.py - Purpose: This file handles Camera Capture functionality.
+"""
+On-demand camera capture for AudioLoop (video_mode="camera").
+
+The old pipeline grabbed a full-resolution frame every second, converted
+BGR->RGB, built a PIL image, thumbnailed, JPEG-encoded through BytesIO and
+base64-encoded it, whether or not anything was listening. CameraCapture
+instead:
+- asks the driver for a small resolution at the source (and a 1-frame buffer)
+- reads into preallocated arrays and resizes into a preallocated buffer
+- encodes straight from BGR with cv2.imencode at a tuned JPEG quality
+- skips frames whose 32x32 grayscale signature barely differs from the last
+  frame sent (perceptual diff), since the model has already seen them
+- picks the OS capture backend instead of hardcoding CAP_AVFOUNDATION
+"""
+
+import sys
+from typing import Optional
+
+import cv2
+import numpy as np
+
+DEFAULT_CAMERA_WIDTH = 640
+DEFAULT_CAMERA_HEIGHT = 480
+DEFAULT_JPEG_QUALITY = 80
+DEFAULT_DIFF_THRESHOLD = 4.0  # mean abs grayscale difference (0-255) on the signature
+SIGNATURE_SIZE = 32
+
+
+def default_camera_backend() -> int:
+    """Native capture API for this OS (AVFoundation, DirectShow, V4L2), else CAP_ANY."""
+    if sys.platform == "darwin":
+        return getattr(cv2, "CAP_AVFOUNDATION", cv2.CAP_ANY)
+    if sys.platform.startswith("win"):
+        return getattr(cv2, "CAP_DSHOW", cv2.CAP_ANY)
+    if sys.platform.startswith("linux"):
+        return getattr(cv2, "CAP_V4L2", cv2.CAP_ANY)
+    return cv2.CAP_ANY
+
+
+class CameraCapture:
+    """
+    Args:
+        device: Camera index passed to cv2.VideoCapture.
+        width, height: Resolution requested from the driver.
+        max_size: Longest edge of the encoded frame (matches the old 1024 px thumbnail).
+        jpeg_quality: cv2.IMWRITE_JPEG_QUALITY.
+        diff_threshold: Frames closer than this to the last sent frame are skipped (0 disables).
+        backend: cv2.CAP_* API; defaults to default_camera_backend().
+        cap: An already-open capture object (anything with read(image)/release()).
+    """
+
+    def __init__(self, device: int = 0, width: int = DEFAULT_CAMERA_WIDTH, height: int = DEFAULT_CAMERA_HEIGHT,
+                 max_size: int = 1024, jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+                 diff_threshold: float = DEFAULT_DIFF_THRESHOLD, backend: Optional[int] = None, cap=None):
+        self.device = device
+        self.width = width
+        self.height = height
+        self.max_size = max_size
+        self.diff_threshold = diff_threshold
+        self.backend = default_camera_backend() if backend is None else backend
+        self.cap = cap
+        self._encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), int(jpeg_quality)]
+
+        # Preallocated buffers, (re)sized on the first frame of a given shape
+        self._frame: Optional[np.ndarray] = None
+        self._resized: Optional[np.ndarray] = None
+        self._gray: Optional[np.ndarray] = None
+        self._signature = np.empty((SIGNATURE_SIZE, SIGNATURE_SIZE), dtype=np.uint8)
+        self._last_signature: Optional[np.ndarray] = None
+
+        # Counters
+        self.frames_read = 0
+        self.frames_encoded = 0
+        self.frames_skipped = 0
+        self.read_failures = 0
+        self.consecutive_failures = 0
+        self.bytes_encoded = 0
+
+    # --- Lifecycle ---
+
+    def open(self) -> bool:
+        """Opens the device with the native backend, falling back to CAP_ANY."""
+        if self.cap is not None:
+            return True
+        cap = cv2.VideoCapture(self.device, self.backend)
+        if not cap.isOpened() and self.backend != cv2.CAP_ANY:
+            print(f"[CAMERA] [WARN] Backend {self.backend} failed, retrying with CAP_ANY")
+            cap.release()
+            cap = cv2.VideoCapture(self.device, cv2.CAP_ANY)
+        if not cap.isOpened():
+            print(f"[CAMERA] [ERR] Could not open camera {self.device}")
+            cap.release()
+            return False
+
+        # Ask the driver for a small frame and a shallow buffer so reads are fresh
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.cap = cap
+        return True
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def reset(self):
+        """Forget the last sent frame so the next capture is always sent (e.g. new session)."""
+        self._last_signature = None
+
+    # --- Capture ---
+
+    def read_jpeg(self, force: bool = False) -> Optional[bytes]:
+        """
+        Reads one frame and returns it JPEG-encoded.
+        Returns None if the read failed or the frame is unchanged (unless force=True).
+        """
+        if self.cap is None:
+            return None
+
+        ok, frame = self.cap.read(self._frame)
+        if not ok or frame is None:
+            self.read_failures += 1
+            self.consecutive_failures += 1
+            return None
+        self.consecutive_failures = 0
+        self._frame = frame
+        self.frames_read += 1
+
+        frame = self._fit(frame)
+
+        if self._is_unchanged(frame) and not force:
+            self.frames_skipped += 1
+            return None
+
+        ok, encoded = cv2.imencode(".jpg", frame, self._encode_params)
+        if not ok:
+            self.read_failures += 1
+            return None
+        # Only advance the reference once the frame is actually going out
+        self._last_signature = self._signature.copy()
+        data = encoded.tobytes()
+        self.frames_encoded += 1
+        self.bytes_encoded += len(data)
+        return data
+
+    def _fit(self, frame: np.ndarray) -> np.ndarray:
+        """Downscales into a reused buffer if the driver ignored the requested size."""
+        h, w = frame.shape[:2]
+        longest = max(h, w)
+        if longest <= self.max_size:
+            return frame
+        scale = self.max_size / float(longest)
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        if self._resized is None or self._resized.shape[1::-1] != size:
+            self._resized = np.empty((size[1], size[0]) + frame.shape[2:], dtype=frame.dtype)
+        cv2.resize(frame, size, dst=self._resized, interpolation=cv2.INTER_AREA)
+        return self._resized
+
+    def _is_unchanged(self, frame: np.ndarray) -> bool:
+        """Perceptual diff: mean abs difference of a tiny grayscale thumbnail."""
+        if frame.ndim == 3:
+            if self._gray is None or self._gray.shape != frame.shape[:2]:
+                self._gray = np.empty(frame.shape[:2], dtype=np.uint8)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+            gray = self._gray
+        else:
+            gray = frame
+        cv2.resize(gray, (SIGNATURE_SIZE, SIGNATURE_SIZE), dst=self._signature, interpolation=cv2.INTER_AREA)
+
+        if self._last_signature is None or self.diff_threshold <= 0:
+            return False
+        diff = cv2.absdiff(self._signature, self._last_signature)
+        return float(diff.mean()) < self.diff_threshold
+
+    def stats(self) -> dict:
+        return {
+            "frames_read": self.frames_read,
+            "frames_encoded": self.frames_encoded,
+            "frames_skipped": self.frames_skipped,
+            "read_failures": self.read_failures,
+            "avg_jpeg_bytes": self.bytes_encoded // self.frames_encoded if self.frames_encoded else 0,
+        }
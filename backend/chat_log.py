@@ -0,0 +1,405 @@
+# File: chat_log.py - Purpose: This file handles Chat Log functionality.
+"""
+Chat history helpers for ProjectManager.
+
+`chat_history.jsonl` grows forever in long-lived projects. Reconnects only
+need the last few messages, so instead of `readlines()` on the whole file
+read_tail_lines() seeks to EOF and reads backwards in blocks until it has
+enough lines. ChatTailCache keeps the most recent entries per log file in
+memory; log_chat appends to it so repeated reconnects don't touch disk.
+
+Writes go through ChatLogWriter, a background thread that batches appends,
+fsyncs on an interval and rotates the active file into gzip segments
+(`chat_history.jsonl.1.gz`, `.2.gz`, ... newest has the highest number).
+read_history_tail() continues into those segments when the active file is short.
+"""
+
+import atexit
+import gzip
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Union
+
+TAIL_BLOCK_SIZE = 64 * 1024
+TAIL_CACHE_SIZE = 50  # entries kept in memory per history file
+
+DEFAULT_WRITER_QUEUE = 1000
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_BATCH_INTERVAL = 0.2   # seconds to wait for more entries before writing
+DEFAULT_FSYNC_INTERVAL = 2.0   # seconds between fsyncs of a dirty file (0 = every batch)
+DEFAULT_ROTATE_BYTES = 16 * 1024 * 1024
+
+
+def read_tail_lines(path: Union[str, Path], count: int, block_size: int = TAIL_BLOCK_SIZE) -> List[str]:
+    """Returns the last `count` non-empty lines of a file, reading backwards from EOF."""
+    if count <= 0:
+        return []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        blocks = []
+        newlines = 0
+        # count + 1 newlines guarantees `count` complete lines (the file usually ends with "\n")
+        while pos > 0 and newlines <= count:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            block = f.read(step)
+            blocks.append(block)
+            newlines += block.count(b"\n")
+
+    data = b"".join(reversed(blocks))
+    lines = data.split(b"\n")
+    if pos > 0:
+        lines = lines[1:]  # first line may start mid-record
+    lines = [line for line in lines if line.strip()]
+    return [line.decode("utf-8", errors="replace") for line in lines[-count:]]
+
+
+def rotated_segments(path: Union[str, Path]) -> List[Path]:
+    """Gzip segments rolled from `path`, oldest first."""
+    path = Path(path)
+    pattern = re.compile(re.escape(path.name) + r"\.(\d+)\.gz$")
+    segments = []
+    if path.parent.exists():
+        for candidate in path.parent.iterdir():
+            match = pattern.match(candidate.name)
+            if match:
+                segments.append((int(match.group(1)), candidate))
+    return [p for _, p in sorted(segments)]
+
+
+def read_history_tail(path: Union[str, Path], count: int, block_size: int = TAIL_BLOCK_SIZE) -> List[str]:
+    """read_tail_lines() over the active file, continuing into rotated gzip segments."""
+    path = Path(path)
+    lines = read_tail_lines(path, count, block_size) if path.exists() else []
+    if len(lines) >= count:
+        return lines
+    for segment in reversed(rotated_segments(path)):
+        try:
+            with gzip.open(segment, "rt", encoding="utf-8", errors="replace") as f:
+                older = deque((line.rstrip("\n") for line in f if line.strip()), maxlen=count - len(lines))
+        except (OSError, EOFError) as e:
+            print(f"[ChatLog] [WARN] Skipping unreadable segment {segment.name}: {e}")
+            continue
+        lines = list(older) + lines
+        if len(lines) >= count:
+            break
+    return lines
+
+
+def parse_entries(lines: List[str]) -> List[dict]:
+    """Parses JSONL lines, skipping malformed ones."""
+    entries = []
+    for line in lines:
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return entries
+
+
+class ChatTailCache:
+    """
+    Last TAIL_CACHE_SIZE entries per history file, tagged with the file size
+    they correspond to. A cached tail is only served if the file on disk still
+    has that size, so external edits fall back to a fresh tail read.
+    """
+
+    def __init__(self, size: int = TAIL_CACHE_SIZE):
+        self.size = size
+        self._tails: Dict[str, Deque[dict]] = {}
+        self._file_sizes: Dict[str, int] = {}
+        self._complete: Dict[str, bool] = {}  # True if the tail holds the whole history
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: Path, limit: int, file_size: int) -> Optional[List[dict]]:
+        key = str(path)
+        with self._lock:
+            tail = self._tails.get(key)
+            if tail is None or self._file_sizes.get(key) != file_size:
+                self.misses += 1
+                return None
+            if limit > len(tail) and not self._complete.get(key):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return list(tail)[-limit:] if limit > 0 else []
+
+    def load(self, path: Path, entries: List[dict], file_size: int, complete: bool):
+        key = str(path)
+        with self._lock:
+            self._tails[key] = deque(entries[-self.size:], maxlen=self.size)
+            self._file_sizes[key] = file_size
+            self._complete[key] = complete and len(entries) <= self.size
+
+    def append(self, path: Path, entries: List[dict], old_size: int, new_size: int):
+        """Records a write. Drops the cached tail if it was not in sync with old_size."""
+        key = str(path)
+        with self._lock:
+            tail = self._tails.get(key)
+            if tail is None:
+                return
+            if self._file_sizes.get(key) != old_size:
+                self._drop(key)
+                return
+            if len(tail) + len(entries) > tail.maxlen:
+                self._complete[key] = False
+            tail.extend(entries)
+            self._file_sizes[key] = new_size
+
+    def rebase(self, path: Path, new_size: int):
+        """The file was rotated: same entries, new on-disk size."""
+        key = str(path)
+        with self._lock:
+            if key in self._tails:
+                self._file_sizes[key] = new_size
+
+    def invalidate(self, path: Path):
+        with self._lock:
+            self._drop(str(path))
+
+    def _drop(self, key: str):
+        self._tails.pop(key, None)
+        self._file_sizes.pop(key, None)
+        self._complete.pop(key, None)
+
+
+class _FlushRequest:
+    __slots__ = ("done", "fsync")
+
+    def __init__(self, fsync: bool):
+        self.done = threading.Event()
+        self.fsync = fsync
+
+
+class ChatLogWriter:
+    """
+    Background appender for chat history files.
+
+    write() only enqueues; a daemon thread groups queued lines per file, appends
+    each group with one open/write, fsyncs dirty files every `fsync_interval`
+    seconds and rotates files past `rotate_bytes` into gzip segments.
+
+    Args:
+        max_queue: Bound on queued lines. write() blocks (backpressure) when full.
+        batch_size: Max lines written per batch.
+        batch_interval: How long to wait for more lines before writing a batch.
+        fsync_interval: Seconds between fsyncs of a dirty file (0 = every batch).
+        rotate_bytes: Roll the active file once it grows past this size (0 disables).
+        on_written: Called as on_written(path, entries, old_size, new_size) after each append.
+        on_rotated: Called as on_rotated(path, new_size) after a rotation.
+    """
+
+    def __init__(self, max_queue: int = DEFAULT_WRITER_QUEUE, batch_size: int = DEFAULT_BATCH_SIZE,
+                 batch_interval: float = DEFAULT_BATCH_INTERVAL, fsync_interval: float = DEFAULT_FSYNC_INTERVAL,
+                 rotate_bytes: int = DEFAULT_ROTATE_BYTES,
+                 on_written: Optional[Callable[[Path, List[dict], int, int], None]] = None,
+                 on_rotated: Optional[Callable[[Path, int], None]] = None):
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.fsync_interval = fsync_interval
+        self.rotate_bytes = rotate_bytes
+        self.on_written = on_written
+        self.on_rotated = on_rotated
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._atexit_registered = False
+        self._dirty: Dict[Path, float] = {}  # path -> time of the first unsynced write
+
+        # Counters
+        self.lines_written = 0
+        self.batches = 0
+        self.fsyncs = 0
+        self.rotations = 0
+        self.backpressure_waits = 0
+        self.write_errors = 0
+
+    # --- Producer side ---
+
+    def write(self, path: Union[str, Path], entry: dict):
+        """Queues one JSONL entry for `path`."""
+        self._ensure_started()
+        item = (Path(path), entry)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.backpressure_waits += 1
+            self._queue.put(item)
+
+    def flush(self, fsync: bool = True, wait: bool = True, timeout: Optional[float] = 5.0) -> bool:
+        """
+        Writes everything queued so far (and fsyncs if asked).
+        With wait=False the flush is scheduled and this returns immediately.
+        Returns False if waiting timed out.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        request = _FlushRequest(fsync)
+        self._queue.put(request)
+        if not wait:
+            return True
+        return request.done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Flushes, fsyncs and stops the writer thread. A later write() starts it again."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="jarvis-chat-log", daemon=True)
+                self._thread.start()
+                if not self._atexit_registered:
+                    # Daemon threads die with the interpreter; drain the queue first
+                    atexit.register(self.close)
+                    self._atexit_registered = True
+
+    # --- Writer thread ---
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.fsync_interval or self.batch_interval)
+            except queue.Empty:
+                self._sync_due()
+                continue
+
+            batch = []
+            flushes = []
+            stop = False
+            deadline = time.monotonic() + self.batch_interval
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, _FlushRequest):
+                    flushes.append(item)
+                else:
+                    batch.append(item)
+                # A flush request or stop ends the batch immediately
+                if stop or flushes or len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write_batch(batch)
+            if flushes or stop:
+                if stop or any(f.fsync for f in flushes):
+                    self._sync_all()
+                for request in flushes:
+                    request.done.set()
+            else:
+                self._sync_due()
+            if stop:
+                return
+
+    def _write_batch(self, batch):
+        groups: Dict[Path, List[dict]] = {}
+        for path, entry in batch:
+            groups.setdefault(path, []).append(entry)
+
+        for path, entries in groups.items():
+            data = "".join(json.dumps(entry) + "\n" for entry in entries).encode("utf-8")
+            try:
+                with open(path, "ab") as f:
+                    old_size = f.tell()
+                    f.write(data)
+                    f.flush()
+                    new_size = f.tell()
+                    if self.fsync_interval <= 0:
+                        os.fsync(f.fileno())
+                        self.fsyncs += 1
+                    else:
+                        self._dirty.setdefault(path, time.monotonic())
+            except OSError as e:
+                # Project folder removed (e.g. temp cleared) or disk error - entries are lost
+                self.write_errors += 1
+                print(f"[ChatLog] [ERR] Failed to write {path}: {e}")
+                continue
+
+            self.lines_written += len(entries)
+            if self.on_written:
+                self.on_written(path, entries, old_size, new_size)
+
+            if self.rotate_bytes and new_size >= self.rotate_bytes:
+                self._rotate(path)
+        self.batches += 1
+
+    def _sync_due(self):
+        now = time.monotonic()
+        for path, since in list(self._dirty.items()):
+            if now - since >= self.fsync_interval:
+                self._fsync(path)
+
+    def _sync_all(self):
+        for path in list(self._dirty):
+            self._fsync(path)
+
+    def _fsync(self, path: Path):
+        self._dirty.pop(path, None)
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+            self.fsyncs += 1
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def _rotate(self, path: Path):
+        """Moves the active file to the next numbered segment and gzips it."""
+        self._fsync(path)
+        segments = rotated_segments(path)
+        next_index = 1
+        if segments:
+            next_index = int(segments[-1].name.rsplit(".", 2)[-2]) + 1
+        rolled = path.with_name(f"{path.name}.{next_index}")
+        try:
+            os.replace(path, rolled)
+            with open(rolled, "rb") as src, gzip.open(f"{rolled}.gz.tmp", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(f"{rolled}.gz.tmp", f"{rolled}.gz")
+            os.remove(rolled)
+        except OSError as e:
+            print(f"[ChatLog] [ERR] Failed to rotate {path.name}: {e}")
+            return
+        self.rotations += 1
+        if self.on_rotated:
+            self.on_rotated(path, 0)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "lines_written": self.lines_written,
+            "batches": self.batches,
+            "fsyncs": self.fsyncs,
+            "rotations": self.rotations,
+            "backpressure_waits": self.backpressure_waits,
+            "write_errors": self.write_errors,
+        }
@@ -0,0 +1,93 @@
+# File: code_stream.py - Purpose: This file handles Code Stream functionality.
+"""
+Incremental extraction and static checks for generated build123d scripts.
+
+CadAgent used to collect the whole streamed reply, regex out the ```python
+block, and only learn about a syntax error after spawning a process.
+CodeBlockStream finds the block while chunks arrive and reports it the moment
+the closing fence streams in, so the script can run before the model has
+finished its trailing explanation. validate_cad_script rejects obviously broken
+code (syntax errors, no `result_part`, no `export_stl`) so it goes straight to
+the repair prompt.
+"""
+
+import ast
+from typing import Optional
+
+OPEN_FENCE = "```python"
+CLOSE_FENCE = "```"
+
+
+class CodeBlockStream:
+    """Feeds streamed answer text; `feed` returns the code once the first ```python block closes."""
+
+    def __init__(self):
+        self.text = ""
+        self.code: Optional[str] = None
+        self._start: Optional[int] = None   # index just past the opening fence
+        self._scan = 0                      # where the next fence search resumes
+
+    @property
+    def closed(self) -> bool:
+        return self.code is not None
+
+    def feed(self, chunk: str) -> Optional[str]:
+        if self.code is not None:
+            return None
+        self.text += chunk
+
+        if self._start is None:
+            i = self.text.find(OPEN_FENCE, self._scan)
+            if i < 0:
+                # A fence may be split across chunks: rescan the tail next time
+                self._scan = max(0, len(self.text) - len(OPEN_FENCE) + 1)
+                return None
+            self._start = self._scan = i + len(OPEN_FENCE)
+
+        j = self.text.find(CLOSE_FENCE, self._scan)
+        if j < 0:
+            self._scan = max(self._start, len(self.text) - len(CLOSE_FENCE) + 1)
+            return None
+        self.code = self.text[self._start:j].strip()
+        return self.code
+
+    def finish(self) -> Optional[str]:
+        """Best effort once the stream ended without a closed block."""
+        if self.code is not None:
+            return self.code
+        if self._start is not None:
+            # Unterminated block (reply cut off): use what we have
+            return self.text[self._start:].strip() or None
+        return None
+
+
+def validate_cad_script(code: str) -> Optional[str]:
+    """
+    Static checks that need no build123d. Returns an error message in
+    traceback style (fed to the repair prompt), or None if the script looks runnable.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        line = (e.text or "").rstrip()
+        return (f'  File "current_design.py", line {e.lineno}\n    {line.strip()}\n'
+                f"SyntaxError: {e.msg}")
+
+    binds_result = False
+    exports = False
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id == "result_part" and isinstance(node.ctx, ast.Store):
+            binds_result = True
+        elif isinstance(node, ast.alias) and (node.asname or node.name) == "result_part":
+            binds_result = True
+        elif isinstance(node, ast.Call):
+            func = node.func
+            name = func.id if isinstance(func, ast.Name) else func.attr if isinstance(func, ast.Attribute) else None
+            if name == "export_stl":
+                exports = True
+
+    if not binds_result:
+        return "ValidationError: the script never assigns the final object to `result_part`."
+    if not exports:
+        return "ValidationError: the script never calls `export_stl(result_part, 'output.stl')`."
+    return None
@@ -0,0 +1,84 @@
+# File: frame_buffer.py - Purpose: This file handles Frame Buffer functionality.
+"""
+Latest-frame holder for camera input.
+
+Clients push 10-30 JPEG frames a second, but AudioLoop only sends one frame
+per utterance (when VAD detects speech, or alongside typed input). LatestFrame
+keeps a reference to the newest raw frame and base64-encodes it only when a
+frame is actually taken for sending; every overwritten frame costs nothing
+beyond the reference swap.
+"""
+
+import base64
+from typing import Optional, Union
+
+FrameData = Union[bytes, bytearray, memoryview, str]
+
+
+class LatestFrame:
+    """
+    Args:
+        mime_type: MIME type reported in the payload sent to the model.
+    """
+
+    def __init__(self, mime_type: str = "image/jpeg"):
+        self.mime_type = mime_type
+        self._frame: Optional[FrameData] = None
+        self._payload: Optional[dict] = None  # cached encoding of _frame
+        self._used = False
+
+        # Counters
+        self.frames_received = 0
+        self.frames_used = 0      # distinct frames sent to the model
+        self.frames_dropped = 0   # frames replaced before they were ever sent
+        self.encodes = 0
+
+    def store(self, frame_data: Optional[FrameData]):
+        """Replaces the latest frame. Cheap: no copy, no encoding."""
+        if frame_data is None:
+            return
+        if self._frame is not None and not self._used:
+            self.frames_dropped += 1
+        self.frames_received += 1
+        self._frame = frame_data
+        self._payload = None
+        self._used = False
+
+    def clear(self):
+        self._frame = None
+        self._payload = None
+        self._used = False
+
+    @property
+    def has_frame(self) -> bool:
+        return self._frame is not None
+
+    def payload(self) -> Optional[dict]:
+        """The latest frame as a Live API media payload, encoded on first access."""
+        if self._frame is None:
+            return None
+        if self._payload is None:
+            frame = self._frame
+            if isinstance(frame, str):
+                b64_data = frame  # already base64 from the client
+            else:
+                b64_data = base64.b64encode(frame).decode("utf-8")
+                self.encodes += 1
+            self._payload = {"mime_type": self.mime_type, "data": b64_data}
+        return self._payload
+
+    def take(self) -> Optional[dict]:
+        """Returns the payload for sending and counts the frame as used."""
+        payload = self.payload()
+        if payload is not None and not self._used:
+            self._used = True
+            self.frames_used += 1
+        return payload
+
+    def stats(self) -> dict:
+        return {
+            "frames_received": self.frames_received,
+            "frames_used": self.frames_used,
+            "frames_dropped": self.frames_dropped,
+            "encodes": self.encodes,
+        }
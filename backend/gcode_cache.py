@@ -0,0 +1,327 @@
+# File: gcode_cache.py - Purpose: This file handles Gcode Cache functionality.
+"""
+Cache of sliced G-code, so re-printing an unchanged STL skips the slicer.
+
+Slicing takes from seconds to minutes and print_stl used to re-run it on
+every request. GcodeCache keys each G-code file by:
+
+- the STL content hash
+- the resolved machine/process/filament (and legacy) profile paths plus the
+  content hash of each, and of every parent profile reached through
+  `inherits` (OrcaSlicer system profiles build on files such as
+  fdm_creality_common.json, and Orca updates system/ without a new binary)
+- the slicer binary (path, size and mtime, which change on every upgrade)
+
+Entries live in <root>/<key[:2]>/<key>.gcode with an index.json, like
+CadResultCache. Eviction is LRU by bytes. A project (keyed by its full path)
+pins the G-code it printed until unpin_project(), which PrinterAgent calls
+when the user switches away from it; pins of project folders that no longer
+exist are dropped on load. Pinned entries are evicted only once pinned bytes
+alone exceed `max_pinned_bytes`, so the cache stays bounded either way. Files
+are handed out as hardlinks (copy fallback), so callers must replace G-code
+files rather than rewrite them in place.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from cad_cache import link_or_copy
+
+DEFAULT_GCODE_CACHE_BYTES = 2 * 1024 * 1024 * 1024
+CACHE_FORMAT = "1"
+INDEX_FILE = "index.json"
+HASH_CHUNK = 1024 * 1024
+MAX_INHERIT_DEPTH = 16
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def slicer_fingerprint(slicer_path: str) -> str:
+    """Identifies the installed slicer build without running it."""
+    try:
+        st = os.stat(slicer_path)
+        return f"{os.path.abspath(slicer_path)}:{st.st_size}:{int(st.st_mtime)}"
+    except OSError:
+        return slicer_path or "unknown"
+
+
+def _find_parent(profile_path: str, parent: str) -> Optional[str]:
+    """Parent profile file: same folder first, then the other kind folders of the same vendor."""
+    folder = os.path.dirname(profile_path)
+    candidate = os.path.join(folder, parent + ".json")
+    if os.path.isfile(candidate):
+        return candidate
+    vendor_dir = os.path.dirname(folder)
+    try:
+        siblings = sorted(os.listdir(vendor_dir))
+    except OSError:
+        return None
+    for sibling in siblings:
+        candidate = os.path.join(vendor_dir, sibling, parent + ".json")
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def inherits_chain(profile_path: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    [(name, path), ...] from the profile up through its `inherits` parents.
+    path is None for a parent that cannot be found (its name still goes into the key).
+    Non-JSON profiles (legacy .ini) are a chain of one.
+    """
+    chain = [(os.path.basename(profile_path), profile_path)]
+    seen = {os.path.abspath(profile_path)}
+    current = profile_path
+    while len(chain) < MAX_INHERIT_DEPTH:
+        try:
+            with open(current, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            break
+        parent = data.get("inherits") if isinstance(data, dict) else None
+        if not parent or not isinstance(parent, str):
+            break
+        parent_path = _find_parent(current, parent)
+        if parent_path is None:
+            print(f"[GcodeCache] [WARN] Parent profile '{parent}' of {os.path.basename(current)} not found")
+            chain.append((parent, None))
+            break
+        if os.path.abspath(parent_path) in seen:
+            break
+        seen.add(os.path.abspath(parent_path))
+        chain.append((parent, parent_path))
+        current = parent_path
+    return chain
+
+
+class GcodeCache:
+    """
+    Args:
+        root: Cache directory (shared across projects).
+        max_bytes: Total unpinned G-code bytes kept before least-recently-used entries are evicted.
+        max_pinned_bytes: Cap on pinned bytes (default max_bytes / 2); beyond it the
+            least-recently-used pinned entries are evicted too.
+    """
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_GCODE_CACHE_BYTES,
+                 max_pinned_bytes: Optional[int] = None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_pinned_bytes = max_bytes // 2 if max_pinned_bytes is None else max_pinned_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()  # oldest first
+        self._hashes: Dict[Tuple[str, int, int], str] = {}      # (path, size, mtime_ns) -> sha256
+        self.total_bytes = 0
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._load_index()
+
+    # --- Keys ---
+
+    def _hash(self, path: str) -> str:
+        """Content hash, memoized while the file's size and mtime are unchanged."""
+        st = os.stat(path)
+        stamp = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        digest = self._hashes.get(stamp)
+        if digest is None:
+            digest = file_sha256(path)
+            self._hashes[stamp] = digest
+        return digest
+
+    def key_for(self, stl_path: str, profile_paths: Iterable[Optional[str]], slicer_path: str) -> str:
+        digest = hashlib.sha256(f"{CACHE_FORMAT}:{slicer_fingerprint(slicer_path)}".encode("utf-8"))
+        digest.update(b"\0stl:" + self._hash(stl_path).encode("ascii"))
+        for path in profile_paths:
+            if not path:
+                continue
+            # Path and content of the profile and each parent: editing a shared base profile changes the key
+            for name, chain_path in inherits_chain(path):
+                if chain_path is None:
+                    digest.update(f"\0missing-parent:{name}".encode("utf-8"))
+                else:
+                    digest.update(f"\0profile:{os.path.abspath(chain_path)}:{self._hash(chain_path)}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.gcode"
+
+    # --- Index persistence ---
+
+    def _load_index(self):
+        try:
+            with open(self.root / INDEX_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for key, meta in sorted(data.get("entries", {}).items(), key=lambda kv: kv[1].get("last_used", 0)):
+            if self._path(key).exists():
+                # Projects deleted (or pinned by name before pins used full paths) release their pins
+                meta["pins"] = [p for p in meta.get("pins", []) if os.path.isabs(p) and os.path.isdir(p)]
+                self._entries[key] = meta
+                self.total_bytes += meta.get("size", 0)
+
+    def _save_index(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / (INDEX_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"format": CACHE_FORMAT, "entries": self._entries}, f)
+        os.replace(tmp, self.root / INDEX_FILE)
+
+    # --- Lookup / store ---
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached G-code path for key (marking it recently used), or None."""
+        with self._lock:
+            meta = self._entries.get(key)
+            path = self._path(key)
+            if meta is None or not path.exists():
+                if meta is not None:
+                    self._drop(key)
+                    self._save_index()
+                self.misses += 1
+                return None
+            meta["last_used"] = time.time()
+            meta["hits"] = meta.get("hits", 0) + 1
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self._save_index()
+            return str(path)
+
+    def materialize(self, key: str, dest: str) -> bool:
+        """Places the cached G-code for key at dest. False on a miss."""
+        path = self.get(key)
+        if path is None:
+            return False
+        try:
+            link_or_copy(path, dest)
+        except OSError as e:
+            print(f"[GcodeCache] [WARN] Could not materialize {key[:12]}: {e}")
+            return False
+        return True
+
+    def put(self, key: str, gcode_path: str, project: Optional[str] = None, **metadata) -> Optional[str]:
+        """Stores freshly sliced G-code under key (pinned to project, if given) and evicts down to max_bytes."""
+        try:
+            size = os.path.getsize(gcode_path)
+        except OSError:
+            return None
+        if size > self.max_bytes:
+            return None
+
+        with self._lock:
+            path = self._path(key)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                link_or_copy(gcode_path, str(path))
+            except OSError as e:
+                print(f"[GcodeCache] [WARN] Could not store {key[:12]}: {e}")
+                return None
+
+            previous = self._entries.get(key)
+            if previous is not None:
+                self.total_bytes -= previous.get("size", 0)
+            pins = set(previous.get("pins", [])) if previous else set()
+            if project:
+                pins.add(project)
+            now = time.time()
+            self._entries[key] = {"size": size, "created": now, "last_used": now, "hits": 0,
+                                  "pins": sorted(pins), **metadata}
+            self._entries.move_to_end(key)
+            self.total_bytes += size
+            self._evict()
+            self._save_index()
+            return str(path)
+
+    # --- Pinning ---
+
+    def pin(self, key: str, project: str) -> bool:
+        """Pins an existing entry to project (the project's full path)."""
+        with self._lock:
+            meta = self._entries.get(key)
+            if meta is None:
+                return False
+            if project not in meta.setdefault("pins", []):
+                meta["pins"] = sorted(meta["pins"] + [project])
+                self._evict()
+                self._save_index()
+            return True
+
+    def unpin_project(self, project: str) -> int:
+        """Releases every entry pinned by project; returns how many. Evicts if now over budget."""
+        released = 0
+        with self._lock:
+            for meta in self._entries.values():
+                if project in meta.get("pins", []):
+                    meta["pins"].remove(project)
+                    released += 1
+            if released:
+                self._evict()
+                self._save_index()
+        return released
+
+    # --- Eviction ---
+
+    def _drop(self, key: str):
+        meta = self._entries.pop(key, None)
+        if meta is None:
+            return
+        self.total_bytes -= meta.get("size", 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Drops least-recently-used entries until unpinned bytes fit max_bytes and pinned bytes max_pinned_bytes."""
+        unpinned = sum(m.get("size", 0) for m in self._entries.values() if not m.get("pins"))
+        pinned = self.total_bytes - unpinned
+        for key in list(self._entries):
+            if unpinned <= self.max_bytes and pinned <= self.max_pinned_bytes:
+                break
+            meta = self._entries[key]
+            size = meta.get("size", 0)
+            if meta.get("pins"):
+                if pinned <= self.max_pinned_bytes:
+                    continue
+                pinned -= size
+            else:
+                if unpinned <= self.max_bytes:
+                    continue
+                unpinned -= size
+            self._drop(key)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+            self._save_index()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "pinned": sum(1 for m in self._entries.values() if m.get("pins")),
+            "pinned_bytes": sum(m.get("size", 0) for m in self._entries.values() if m.get("pins")),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "max_pinned_bytes": self.max_pinned_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -1,18 +1,12 @@
 # File: jarvis.py - Purpose: This file handles Jarvis functionality.
 import asyncio
-import base64
-import io
 import os
 import sys
 import traceback
 from dotenv import load_dotenv
-import cv2
 import pyaudio
-import PIL.Image
 import mss
 import argparse
-import math
-import struct
 import time
 
 from google import genai
@@ -24,12 +18,23 @@ if sys.version_info < (3, 11, 0):
     asyncio.ExceptionGroup = exceptiongroup.ExceptionGroup
 
 from tools import tools_list
+from audio_vad import create_vad
+from audio_capture import AudioRingBuffer, AudioCaptureThread
+from audio_playback import PlaybackEngine, DEFAULT_JITTER_MS
+from frame_buffer import LatestFrame
+from camera_capture import CameraCapture
 
 FORMAT = pyaudio.paInt16
 CHANNELS = 1
 SEND_SAMPLE_RATE = 16000
 RECEIVE_SAMPLE_RATE = 24000
 CHUNK_SIZE = 1024
+MIC_RING_CHUNKS = 64 # ~4s of mic audio buffered between capture thread and sender
+CAMERA_MAX_READ_FAILURES = 10
+VAD_SILENCE_DURATION = 0.5 # Seconds of silence to consider "done speaking"
+
+# Queued on out_queue by the capture thread signal; send_realtime drains the mic ring
+_MIC_READY = object()
 
 MODEL = "models/gemini-2.5-flash-native-audio-preview-12-2025"
 DEFAULT_MODE = "camera"
@@ -206,13 +211,17 @@ config = types.LiveConnectConfig(
 
 pya = pyaudio.PyAudio()
 
-from cad_agent import CadAgent
+from cad_agent import CadAgent, DEFAULT_TEMPERATURE_RANGE
+from cad_transport import DEFAULT_CAD_TRANSPORT, DEFAULT_PREVIEW_MAX_TRIANGLES
 from web_agent import WebAgent
+from browser_pool import DEFAULT_POOL_SIZE
+from web_scheduler import WebTaskScheduler, PRIORITY_NORMAL
 from kasa_agent import KasaAgent
 from printer_agent import PrinterAgent
+from slicer_runner import DEFAULT_SLICE_TIMEOUT
 
 class AudioLoop:
-    def __init__(self, video_mode=DEFAULT_MODE, on_audio_data=None, on_video_frame=None, on_cad_data=None, on_web_data=None, on_transcription=None, on_tool_confirmation=None, on_cad_status=None, on_cad_thought=None, on_project_update=None, on_device_update=None, on_error=None, input_device_index=None, input_device_name=None, output_device_index=None, kasa_agent=None):
+    def __init__(self, video_mode=DEFAULT_MODE, on_audio_data=None, on_video_frame=None, on_cad_data=None, on_web_data=None, on_transcription=None, on_tool_confirmation=None, on_cad_status=None, on_cad_thought=None, on_project_update=None, on_device_update=None, on_error=None, input_device_index=None, input_device_name=None, output_device_index=None, kasa_agent=None, vad_mode=None, playback_jitter_ms=DEFAULT_JITTER_MS, cad_transport=DEFAULT_CAD_TRANSPORT, cad_preview_max_triangles=DEFAULT_PREVIEW_MAX_TRIANGLES, cad_candidates=1, cad_temperature_range=DEFAULT_TEMPERATURE_RANGE, browser_pool_size=DEFAULT_POOL_SIZE, slice_timeout=DEFAULT_SLICE_TIMEOUT):
         self.video_mode = video_mode
         self.on_audio_data = on_audio_data
         self.on_video_frame = on_video_frame
@@ -254,10 +263,15 @@ class AudioLoop:
             if self.on_cad_status:
                 self.on_cad_status(status_info)
         
-        self.cad_agent = CadAgent(on_thought=handle_cad_thought, on_status=handle_cad_status)
-        self.web_agent = WebAgent()
+        self.cad_agent = CadAgent(on_thought=handle_cad_thought, on_status=handle_cad_status,
+                                  transport=cad_transport, preview_max_triangles=cad_preview_max_triangles,
+                                  candidates=cad_candidates, temperature_range=cad_temperature_range)
+        self.web_agent = WebAgent(pool_size=browser_pool_size)
+        # Concurrent web tasks, one pooled page each, progress tagged by task id
+        self.web_scheduler = WebTaskScheduler(self.web_agent, max_concurrent=browser_pool_size,
+                                              on_update=self.handle_web_task_update)
         self.kasa_agent = kasa_agent if kasa_agent else KasaAgent()
-        self.printer_agent = PrinterAgent()
+        self.printer_agent = PrinterAgent(slice_timeout=slice_timeout)
 
         self.send_text_task = None
         self.stop_event = asyncio.Event()
@@ -267,11 +281,23 @@ class AudioLoop:
         self.permissions = {} # Default Empty (Will treat unset as True)
         self._pending_confirmations = {}
 
-        # Video buffering state
-        self._latest_image_payload = None
+        # Video buffering state: raw latest frame, base64-encoded only when sent
+        self._frames = LatestFrame()
+        self._camera = None
+        self._frame_request = asyncio.Event()
         # VAD State
         self._is_speaking = False
         self._silence_start_time = None
+        self.vad = create_vad(vad_mode)
+
+        # Mic capture thread state
+        self._mic_ring = None
+        self._capture_thread = None
+        self._mic_signal_pending = False
+
+        # Speaker playback engine (writer thread + jitter buffer)
+        self.playback_jitter_ms = playback_jitter_ms
+        self._playback = None
         
         # Initialize ProjectManager
         from project_manager import ProjectManager
@@ -281,6 +307,8 @@ class AudioLoop:
         # If jarvis.py is in backend/, project root is one up
         project_root = os.path.dirname(current_dir)
         self.project_manager = ProjectManager(project_root)
+        # G-code pinned by a project is released once the user moves to another one
+        self.project_manager.on_switch = lambda old_path, new_path: self.printer_agent.release_project(str(old_path))
         
         # Sync Initial Project State
         if self.on_project_update:
@@ -294,6 +322,8 @@ class AudioLoop:
         if self.chat_buffer["sender"] and self.chat_buffer["text"].strip():
             self.project_manager.log_chat(self.chat_buffer["sender"], self.chat_buffer["text"])
             self.chat_buffer = {"sender": None, "text": ""}
+        # Push the turn to disk now instead of waiting for the next batch (non-blocking)
+        self.project_manager.flush_chat_log(wait=False)
         # Reset transcription tracking for new turn
         self._last_input_transcription = ""
         self._last_output_transcription = ""
@@ -306,7 +336,10 @@ class AudioLoop:
         self.paused = paused
 
     def stop(self):
+        # Called from socket handlers on the event loop: only schedule the flush here,
+        # run() joins the chat writer off the loop once it exits
         self.stop_event.set()
+        self.flush_chat()
         
     def resolve_tool_confirmation(self, request_id, confirmed):
         print(f"[JARVIS DEBUG] [RESOLVE] resolve_tool_confirmation called. ID: {request_id}, Confirmed: {confirmed}")
@@ -327,27 +360,111 @@ class AudioLoop:
             while not self.audio_in_queue.empty():
                 self.audio_in_queue.get_nowait()
                 count += 1
+            if self._playback:
+                dropped = self._playback.flush()
+                if dropped:
+                    print(f"[JARVIS DEBUG] [AUDIO] Flushed {dropped} buffered bytes from playback engine.")
             if count > 0:
                 print(f"[JARVIS DEBUG] [AUDIO] Cleared {count} chunks from playback queue due to interruption.")
         except Exception as e:
             print(f"[JARVIS DEBUG] [ERR] Failed to clear audio queue: {e}")
 
+    def store_frame(self, frame_data):
+        # Keep a reference to the latest frame; encoding is deferred until VAD sends one.
+        # Synchronous so the socket handler can call it inline without a task per frame.
+        self._frames.store(frame_data)
+
     async def send_frame(self, frame_data):
-        # Update the latest frame payload
-        if isinstance(frame_data, bytes):
-            b64_data = base64.b64encode(frame_data).decode('utf-8')
-        else:
-            b64_data = frame_data 
+        self.store_frame(frame_data)
+
+    @property
+    def _latest_image_payload(self):
+        # Encoded lazily from the latest raw frame
+        return self._frames.payload()
 
-        # Store as the designated "next frame to send"
-        self._latest_image_payload = {"mime_type": "image/jpeg", "data": b64_data}
-        # No event signal needed - listen_audio pulls it
+    def use_latest_frame(self):
+        """Returns the latest frame payload for sending to the model and counts it as used."""
+        return self._frames.take()
 
     async def send_realtime(self):
         while True:
             msg = await self.out_queue.get()
+            if msg is _MIC_READY:
+                self._mic_signal_pending = False
+                await self._send_mic_batch()
+                continue
             await self.session.send(input=msg, end_of_turn=False)
 
+    def _on_mic_data(self):
+        """Runs on the event loop (call_soon_threadsafe) after the capture thread writes a chunk."""
+        if self._mic_signal_pending or not self.out_queue:
+            return
+        try:
+            self.out_queue.put_nowait(_MIC_READY)
+            self._mic_signal_pending = True
+        except asyncio.QueueFull:
+            pass # The next captured chunk will signal again
+
+    async def _send_mic_batch(self):
+        """Drains every buffered mic chunk, runs VAD on each and sends the audio as one message."""
+        if not self._mic_ring:
+            return
+        chunks = self._mic_ring.read_batch()
+        if not chunks:
+            return
+
+        send_frame = False
+        for chunk in chunks:
+            if self._update_vad(chunk):
+                send_frame = True
+
+        # 1. Send Audio
+        await self.session.send(input={"data": b"".join(chunks), "mime_type": "audio/pcm"}, end_of_turn=False)
+
+        # 2. Send ONE frame at the start of an utterance
+        if send_frame and self._camera is not None:
+            # Local camera: capture and encode on demand (see get_frames)
+            self._frame_request.set()
+        elif send_frame:
+            frame_payload = self.use_latest_frame()
+            if frame_payload:
+                await self.session.send(input=frame_payload, end_of_turn=False)
+            else:
+                print(f"[JARVIS DEBUG] [VAD] No video frame available to send.")
+
+    def _update_vad(self, data):
+        """Advances the speech state machine. Returns True when a new utterance starts."""
+        # NumPy detector on the raw buffer (see audio_vad.py)
+        if self.vad.is_speech(data):
+            # Speech Detected
+            self._silence_start_time = None
+
+            if not self._is_speaking:
+                # NEW Speech Utterance Started
+                self._is_speaking = True
+                print(f"[JARVIS DEBUG] [VAD] Speech Detected (RMS: {self.vad.last_rms}). Sending Video Frame.")
+                return True
+        else:
+            # Silence
+            if self._is_speaking:
+                if self._silence_start_time is None:
+                    self._silence_start_time = time.time()
+
+                elif time.time() - self._silence_start_time > VAD_SILENCE_DURATION:
+                    # Silence confirmed, reset state
+                    print(f"[JARVIS DEBUG] [VAD] Silence detected. Resetting speech state.")
+                    self._is_speaking = False
+                    self._silence_start_time = None
+        return False
+
+    def get_audio_stats(self):
+        """Capture and playback counters (overflows, underruns, latency) for diagnostics."""
+        return {
+            "capture": self._capture_thread.stats() if self._capture_thread else {},
+            "playback": self._playback.stats() if self._playback else {},
+            "frames": self._frames.stats(),
+        }
+
     async def listen_audio(self):
         mic_info = pya.get_default_input_device_info()
 
@@ -411,63 +528,27 @@ class AudioLoop:
         else:
             kwargs = {}
         
-        # VAD Constants
-        VAD_THRESHOLD = 800 # Adj based on mic sensitivity (800 is conservative for 16-bit)
-        SILENCE_DURATION = 0.5 # Seconds of silence to consider "done speaking"
-        
-        while True:
-            if self.paused:
-                await asyncio.sleep(0.1)
-                continue
-
-            try:
-                data = await asyncio.to_thread(self.audio_stream.read, CHUNK_SIZE, **kwargs)
-                
-                # 1. Send Audio
-                if self.out_queue:
-                    await self.out_queue.put({"data": data, "mime_type": "audio/pcm"})
-                
-                # 2. VAD Logic for Video
-                # rms = audioop.rms(data, 2)
-                # Replacement for audioop.rms(data, 2)
-                count = len(data) // 2
-                if count > 0:
-                    shorts = struct.unpack(f"<{count}h", data)
-                    sum_squares = sum(s**2 for s in shorts)
-                    rms = int(math.sqrt(sum_squares / count))
-                else:
-                    rms = 0
-                
-                if rms > VAD_THRESHOLD:
-                    # Speech Detected
-                    self._silence_start_time = None
-                    
-                    if not self._is_speaking:
-                        # NEW Speech Utterance Started
-                        self._is_speaking = True
-                        print(f"[JARVIS DEBUG] [VAD] Speech Detected (RMS: {rms}). Sending Video Frame.")
-                        
-                        # Send ONE frame
-                        if self._latest_image_payload and self.out_queue:
-                            await self.out_queue.put(self._latest_image_payload)
-                        else:
-                            print(f"[JARVIS DEBUG] [VAD] No video frame available to send.")
-                            
-                else:
-                    # Silence
-                    if self._is_speaking:
-                        if self._silence_start_time is None:
-                            self._silence_start_time = time.time()
-                        
-                        elif time.time() - self._silence_start_time > SILENCE_DURATION:
-                            # Silence confirmed, reset state
-                            print(f"[JARVIS DEBUG] [VAD] Silence detected. Resetting speech state.")
-                            self._is_speaking = False
-                            self._silence_start_time = None
+        # Dedicated capture thread feeding a preallocated ring buffer;
+        # send_realtime drains it in batches (see audio_capture.py)
+        self.vad.reset()
+        self._mic_ring = AudioRingBuffer(CHUNK_SIZE * CHANNELS * pya.get_sample_size(FORMAT), capacity=MIC_RING_CHUNKS)
+        self._capture_thread = AudioCaptureThread(
+            self.audio_stream,
+            self._mic_ring,
+            chunk_size=CHUNK_SIZE,
+            sample_rate=SEND_SAMPLE_RATE,
+            loop=asyncio.get_running_loop(),
+            on_data=self._on_mic_data,
+            is_paused=lambda: self.paused,
+            read_kwargs=kwargs,
+        )
+        self._capture_thread.start()
 
-            except Exception as e:
-                print(f"Error reading audio: {e}")
-                await asyncio.sleep(0.1)
+        try:
+            await self.stop_event.wait()
+        finally:
+            self._capture_thread.stop()
+            print(f"[JARVIS DEBUG] [AUDIO] Capture stopped. Stats: {self._capture_thread.stats()}")
 
     async def handle_cad_request(self, prompt):
         print(f"[JARVIS DEBUG] [CAD] Background Task Started: handle_cad_request('{prompt}')")
@@ -500,7 +581,7 @@ class AudioLoop:
         
         if cad_data:
             print(f"[JARVIS DEBUG] [OK] CadAgent returned data successfully.")
-            print(f"[JARVIS DEBUG] [INFO] Data Check: {len(cad_data.get('vertices', []))} vertices, {len(cad_data.get('edges', []))} edges.")
+            print(f"[JARVIS DEBUG] [INFO] Data Check: {cad_data.get('stats')}")
             
             if self.on_cad_data:
                 print(f"[JARVIS DEBUG] [SEND] Dispatching data to frontend callback...")
@@ -621,16 +702,24 @@ class AudioLoop:
         except Exception as e:
              print(f"[JARVIS DEBUG] [ERR] Failed to send fs result: {e}")
 
-    async def handle_web_agent_request(self, prompt):
+    def handle_web_task_update(self, task, image_b64, log_text):
+        if self.on_web_data:
+            self.on_web_data(task.update(image_b64, log_text))
+
+    async def handle_web_agent_request(self, prompt, priority=PRIORITY_NORMAL):
         print(f"[JARVIS DEBUG] [WEB] Web Agent Task: '{prompt}'")
-        
-        async def update_frontend(image_b64, log_text):
-            if self.on_web_data:
-                 self.on_web_data({"image": image_b64, "log": log_text})
-                 
-        # Run the web agent and wait for it to return
-        result = await self.web_agent.run_task(prompt, update_callback=update_frontend)
-        print(f"[JARVIS DEBUG] [WEB] Web Agent Task Returned: {result}")
+
+        # Queue the task; it runs when a browser slot frees up
+        task = self.web_scheduler.submit(prompt, priority=priority)
+        try:
+            result = await self.web_scheduler.wait(task.id)
+        except asyncio.CancelledError:
+            if task.state != "cancelled":
+                raise
+            result = "The task was cancelled."
+        except Exception as e:
+            result = f"The task failed: {e}"
+        print(f"[JARVIS DEBUG] [WEB] Web Agent Task {task.id} Returned: {result}")
         
         # Send the final result back to the main model
         try:
@@ -1133,38 +1222,59 @@ class AudioLoop:
             output=True,
             output_device_index=self.output_device_index,
         )
-        while True:
-            bytestream = await self.audio_in_queue.get()
-            if self.on_audio_data:
-                self.on_audio_data(bytestream)
-            await asyncio.to_thread(stream.write, bytestream)
+        # Dedicated writer thread with a jitter buffer (see audio_playback.py)
+        self._playback = PlaybackEngine(
+            stream,
+            sample_rate=RECEIVE_SAMPLE_RATE,
+            sample_width=pya.get_sample_size(FORMAT),
+            channels=CHANNELS,
+            jitter_ms=self.playback_jitter_ms,
+        )
+        self._playback.start()
+        try:
+            while True:
+                bytestream = await self.audio_in_queue.get()
+                if self.on_audio_data:
+                    self.on_audio_data(bytestream)
+                self._playback.feed(bytestream)
+        finally:
+            self._playback.stop()
+            print(f"[JARVIS DEBUG] [AUDIO] Playback stopped. Stats: {self._playback.stats()}")
+            try:
+                stream.close()
+            except Exception:
+                pass
 
     async def get_frames(self):
-        cap = await asyncio.to_thread(cv2.VideoCapture, 0, cv2.CAP_AVFOUNDATION)
-        while True:
-            if self.paused:
-                await asyncio.sleep(0.1)
-                continue
-            frame = await asyncio.to_thread(self._get_frame, cap)
-            if frame is None:
-                break
-            await asyncio.sleep(1.0)
-            if self.out_queue:
-                await self.out_queue.put(frame)
-        cap.release()
-
-    def _get_frame(self, cap):
-        ret, frame = cap.read()
-        if not ret:
-            return None
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        img = PIL.Image.fromarray(frame_rgb)
-        img.thumbnail([1024, 1024])
-        image_io = io.BytesIO()
-        img.save(image_io, format="jpeg")
-        image_io.seek(0)
-        image_bytes = image_io.read()
-        return {"mime_type": "image/jpeg", "data": base64.b64encode(image_bytes).decode()}
+        # Camera frames are captured on demand: _send_mic_batch sets _frame_request
+        # when VAD detects a new utterance, instead of encoding a frame every second.
+        camera = CameraCapture()
+        if not await asyncio.to_thread(camera.open):
+            return
+        self._camera = camera
+        self._frame_request.clear()
+        try:
+            while not self.stop_event.is_set():
+                await self._frame_request.wait()
+                self._frame_request.clear()
+                if self.paused:
+                    continue
+
+                jpeg = await asyncio.to_thread(camera.read_jpeg)
+                if jpeg is None:
+                    if camera.consecutive_failures > CAMERA_MAX_READ_FAILURES:
+                        print(f"[JARVIS DEBUG] [CAMERA] Too many read failures, stopping camera.")
+                        break
+                    continue  # Unchanged since the last frame sent
+
+                self._frames.store(jpeg)
+                frame_payload = self.use_latest_frame()
+                if self.out_queue and frame_payload:
+                    await self.out_queue.put(frame_payload)
+        finally:
+            self._camera = None
+            print(f"[JARVIS DEBUG] [CAMERA] Stopped. Stats: {camera.stats()}")
+            await asyncio.to_thread(camera.release)
 
     async def _get_screen(self):
         pass 
@@ -1174,6 +1284,10 @@ class AudioLoop:
     async def run(self, start_message=None):
         retry_delay = 1
         is_reconnect = False
+
+        # Spawn the build123d workers and Chromium now so the first CAD/web request is warm
+        self.cad_agent.warm_up()
+        self.web_agent.warm_up()
         
         while not self.stop_event.is_set():
             try:
@@ -1186,6 +1300,7 @@ class AudioLoop:
 
                     self.audio_in_queue = asyncio.Queue()
                     self.out_queue = asyncio.Queue(maxsize=10)
+                    self._mic_signal_pending = False
 
                     tg.create_task(self.send_realtime())
                     tg.create_task(self.listen_audio())
@@ -1213,7 +1328,8 @@ class AudioLoop:
                         print(f"[JARVIS DEBUG] [RECONNECT] Connection restored.")
                         # Restore Context
                         print(f"[JARVIS DEBUG] [RECONNECT] Fetching recent chat history to restore context...")
-                        history = self.project_manager.get_recent_chat_history(limit=10)
+                        # Flushes the chat writer and may read from disk - keep it off the event loop
+                        history = await asyncio.to_thread(self.project_manager.get_recent_chat_history, limit=10)
                         
                         context_msg = "System Notification: Connection was lost and just re-established. Here is the recent chat history to help you resume seamlessly:\n\n"
                         for entry in history:
@@ -1266,6 +1382,17 @@ class AudioLoop:
                     except: 
                         pass
 
+        # Drain and stop the chat writer without blocking the loop
+        await asyncio.to_thread(self.project_manager.close)
+
+        # Release the long-lived CAD workers, browser and printer connections
+        await self.web_scheduler.close()
+        for agent in (self.cad_agent, self.web_agent, self.printer_agent):
+            try:
+                await agent.close()
+            except Exception as e:
+                print(f"[JARVIS DEBUG] [WARN] Failed to close {type(agent).__name__}: {e}")
+
 def get_input_devices():
     p = pyaudio.PyAudio()
     info = p.get_host_api_info_by_index(0)
@@ -9,16 +9,41 @@ Supported Printer Types:
 """
 
 import asyncio
+import concurrent.futures
 import os
 import subprocess
 import json
 import platform
-from typing import Dict, List, Optional, Any
+import time
+from typing import Callable, Dict, List, Optional, Any, Iterable, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 
 import aiohttp
-from zeroconf import Zeroconf, ServiceBrowser, ServiceListener
+from zeroconf import Zeroconf, ServiceBrowser, ServiceInfo, ServiceListener
+
+from printer_cache import PrinterIdentityCache
+from profile_catalog import ProfileCatalog
+from gcode_cache import GcodeCache
+from slicer_runner import DEFAULT_SLICE_TIMEOUT, SlicerProcess, SlicerResult
+
+# HTTP connection pool shared by every printer call (keep-alive, bounded per host)
+DEFAULT_CONNECTION_LIMIT = 64
+DEFAULT_LIMIT_PER_HOST = 4
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 30
+PROBE_TIMEOUT = aiohttp.ClientTimeout(total=2.0, connect=1.0)
+STATUS_TIMEOUT = aiohttp.ClientTimeout(total=5.0, connect=2.0)
+# Uploads may be large over slow Wi-Fi: no total cap, but a stalled socket fails
+UPLOAD_TIMEOUT = aiohttp.ClientTimeout(total=None, connect=5.0, sock_read=120.0)
+# Hosts probed at the same time during discovery
+DEFAULT_PROBE_CONCURRENCY = 8
+# Services resolved at the same time off the zeroconf thread
+RESOLVE_WORKERS = 4
+# Detected printer identities, stored next to the printer profiles
+IDENTITY_CACHE_FILE = "printer_identities.json"
+# Shared by every project: <repo root>/gcode_cache
+DEFAULT_GCODE_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gcode_cache")
 
 
 class PrinterType(Enum):
@@ -37,6 +62,7 @@ class Printer:
     printer_type: PrinterType
     api_key: Optional[str] = None
     camera_url: Optional[str] = None
+    firmware: Optional[str] = None
     
     def to_dict(self) -> dict:
         d = asdict(self)
@@ -59,14 +85,50 @@ class PrintStatus:
         return asdict(self)
 
 
+@dataclass
+class SliceOutcome:
+    """Result of one run_slice() call."""
+    gcode_path: Optional[str] = None
+    result: Optional[SlicerResult] = None   # None if the slicer never ran (cache hit or early failure)
+    cached: bool = False
+    error: Optional[str] = None             # why no G-code was produced
+
+    @property
+    def cancelled(self) -> bool:
+        return bool(self.result and self.result.cancelled)
+
+
 class PrinterDiscoveryListener(ServiceListener):
     """mDNS listener for printer discovery."""
     
-    def __init__(self):
+    def __init__(self, on_found: Optional[Callable[[Printer], None]] = None):
         self.printers: List[Printer] = []
+        # Called from a zeroconf or resolver thread as each service resolves
+        self.on_found = on_found
+        # get_service_info blocks for up to 3 s; never run it on the zeroconf thread
+        self._resolver = concurrent.futures.ThreadPoolExecutor(max_workers=RESOLVE_WORKERS,
+                                                               thread_name_prefix="mdns-resolve")
     
     def add_service(self, zc: Zeroconf, type_: str, name: str) -> None:
-        info = zc.get_service_info(type_, name)
+        info = ServiceInfo(type_, name)
+        if info.load_from_cache(zc):
+            # Already answered in the same mDNS response: no network round trip
+            self._add(info, type_, name)
+        else:
+            self._resolver.submit(self._resolve, zc, type_, name)
+
+    def _resolve(self, zc: Zeroconf, type_: str, name: str) -> None:
+        try:
+            info = zc.get_service_info(type_, name)
+        except Exception:
+            return  # zeroconf closed while resolving
+        if info:
+            self._add(info, type_, name)
+
+    def close(self) -> None:
+        self._resolver.shutdown(wait=False, cancel_futures=True)
+
+    def _add(self, info: ServiceInfo, type_: str, name: str) -> None:
         if info:
             host = info.parsed_addresses()[0] if info.parsed_addresses() else None
             # Fallback to server name if address parsing fails
@@ -90,6 +152,8 @@ class PrinterDiscoveryListener(ServiceListener):
                 )
                 self.printers.append(printer)
                 print(f"[PRINTER] Discovered: {printer.name} at {printer.host}:{printer.port} ({printer.printer_type.value})")
+                if self.on_found:
+                    self.on_found(printer)
 
     def remove_service(self, zc: Zeroconf, type_: str, name: str) -> None:
         pass
@@ -103,19 +167,103 @@ class PrinterAgent:
     Handles 3D printer discovery, profile management, slicing, and print job submission.
     """
     
-    def __init__(self, profiles_dir: str = "printer_profiles"):
+    def __init__(self, profiles_dir: str = "printer_profiles",
+                 connection_limit: int = DEFAULT_CONNECTION_LIMIT,
+                 limit_per_host: int = DEFAULT_LIMIT_PER_HOST,
+                 identity_cache=None,
+                 slice_timeout: Optional[float] = DEFAULT_SLICE_TIMEOUT,
+                 gcode_cache=None):
         self.printers: Dict[str, Printer] = {}  # host -> Printer
         self.profiles_dir = profiles_dir
         self._zeroconf: Optional[Zeroconf] = None
         self._error_tracker = set() # Track hosts with errors to prevent log spam
+
+        # One keep-alive session for all printer HTTP calls (created on first use)
+        self.connection_limit = connection_limit
+        self.limit_per_host = limit_per_host
+        self.status_timeout = STATUS_TIMEOUT  # default for every request without its own timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop = None
+        self._http = {"requests": 0, "connections_created": 0, "connections_reused": 0,
+                      "status_polls": 0, "status_ms_total": 0.0, "last_status_ms": 0.0}
+        
+        # Running slicer processes by output path; cancel_slicing() stops them
+        self.slice_timeout = slice_timeout
+        self._slices: Dict[str, SlicerProcess] = {}
+
+        # Sliced G-code by STL/profile/slicer hash; pass gcode_cache=False to disable
+        if gcode_cache is None:
+            gcode_cache = GcodeCache(DEFAULT_GCODE_CACHE_DIR)
+        self.gcode_cache: Optional[GcodeCache] = gcode_cache or None
         
         # Detect slicer path and profiles directory
         self.slicer_path = self._detect_slicer_path()
         self._orca_profiles_dir = self._detect_orca_profiles_dir()
+        self._profile_catalog: Optional[ProfileCatalog] = None
         
         # Ensure profiles directory exists
         os.makedirs(profiles_dir, exist_ok=True)
+
+        # Detected type / camera / firmware per printer; pass identity_cache=False to disable
+        if identity_cache is None:
+            identity_cache = PrinterIdentityCache(os.path.join(profiles_dir, IDENTITY_CACHE_FILE))
+        self.identity_cache: Optional[PrinterIdentityCache] = identity_cache or None
+        self._identity = {"probed": 0, "revalidated": 0, "stale": 0}
     
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Returns the shared session, creating it (again) if closed or bound to another loop."""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._session_loop is loop:
+            return self._session
+        if self._session is not None and not self._session.closed:
+            try:
+                await self._session.close()
+            except Exception:
+                pass
+
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            self._http["requests"] += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            self._http["connections_created"] += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self._http["connections_reused"] += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+
+        connector = aiohttp.TCPConnector(limit=self.connection_limit, limit_per_host=self.limit_per_host,
+                                         ttl_dns_cache=DNS_CACHE_TTL, keepalive_timeout=KEEPALIVE_TIMEOUT)
+        self._session = aiohttp.ClientSession(connector=connector, timeout=self.status_timeout,
+                                              trace_configs=[trace])
+        self._session_loop = loop
+        return self._session
+
+    async def close(self):
+        """Closes pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    def http_stats(self) -> dict:
+        connector = self._session.connector if self._session is not None and not self._session.closed else None
+        open_connections = sum(len(v) for v in connector._conns.values()) if connector is not None else 0
+        polls = self._http["status_polls"]
+        return {
+            "requests": self._http["requests"],
+            "connections_created": self._http["connections_created"],
+            "connections_reused": self._http["connections_reused"],
+            "idle_connections": open_connections,
+            "status_polls": polls,
+            "last_status_ms": round(self._http["last_status_ms"], 2),
+            "avg_status_ms": round(self._http["status_ms_total"] / polls, 2) if polls else None,
+        }
+
     def _detect_orca_profiles_dir(self) -> Optional[str]:
         """Detect OrcaSlicer profiles directory."""
         system = platform.system()
@@ -133,167 +281,44 @@ class PrinterAgent:
         
         return None
     
+    @property
+    def profile_catalog(self) -> Optional[ProfileCatalog]:
+        """Index of the OrcaSlicer system profiles, built on first use."""
+        if self._profile_catalog is None and self._orca_profiles_dir:
+            system_dir = os.path.join(self._orca_profiles_dir, "system")
+            if os.path.isdir(system_dir):
+                self._profile_catalog = ProfileCatalog(system_dir)
+        return self._profile_catalog
+
     def get_available_profiles(self) -> Dict[str, List[str]]:
         """
         Get all available OrcaSlicer profiles from the system folder.
         Returns dict with 'machines', 'processes', 'filaments' lists.
         """
-        profiles = {"machines": [], "processes": [], "filaments": []}
-        
-        if not self._orca_profiles_dir:
-            return profiles
-        
-        system_dir = os.path.join(self._orca_profiles_dir, "system")
-        if not os.path.isdir(system_dir):
-            return profiles
-        
-        # Scan all vendor folders (Creality, Custom, etc.)
-        for vendor in os.listdir(system_dir):
-            vendor_path = os.path.join(system_dir, vendor)
-            if not os.path.isdir(vendor_path):
-                continue
-            
-            # Machine profiles
-            machine_dir = os.path.join(vendor_path, "machine")
-            if os.path.isdir(machine_dir):
-                for f in os.listdir(machine_dir):
-                    if f.endswith(".json"):
-                        profiles["machines"].append(f"system/{vendor}/machine/{f}")
-            
-            # Process profiles
-            process_dir = os.path.join(vendor_path, "process")
-            if os.path.isdir(process_dir):
-                for f in os.listdir(process_dir):
-                    if f.endswith(".json"):
-                        profiles["processes"].append(f"system/{vendor}/process/{f}")
-            
-            # Filament profiles
-            filament_dir = os.path.join(vendor_path, "filament")
-            if os.path.isdir(filament_dir):
-                for f in os.listdir(filament_dir):
-                    if f.endswith(".json"):
-                        profiles["filaments"].append(f"system/{vendor}/filament/{f}")
-        
-        return profiles
+        catalog = self.profile_catalog
+        if catalog is None:
+            return {"machines": [], "processes": [], "filaments": []}
+        return catalog.available()
     
     def _find_matching_profile(self, printer_name: str, profile_type: str) -> Optional[str]:
         """
         Find a matching profile for a printer by name.
         profile_type: 'machine', 'process', or 'filament'
         """
-        if not self._orca_profiles_dir:
-            return None
-        
-        # Normalize printer name for matching
-        # e.g., "Creality K1" -> search for "k1"
-        search_terms = printer_name.lower().split()
-        
-        # Common brand keywords to identify vendor folder
-        vendor_map = {
-            "creality": "Creality",
-            "ender": "Creality",
-            "cr-": "Creality",
-            "k1": "Creality",
-        }
-        
-        # Try to identify vendor
-        vendor = None
-        for term in search_terms:
-            for key, val in vendor_map.items():
-                if key in term:
-                    vendor = val
-                    break
-            if vendor:
-                break
-        
-        if not vendor:
-            vendor = "Creality"  # Default fallback
-        
-        system_dir = os.path.join(self._orca_profiles_dir, "system", vendor)
-        if not os.path.isdir(system_dir):
-            print(f"[PRINTER] Vendor folder not found: {vendor}")
-            return None
-        
-        target_dir = os.path.join(system_dir, profile_type)
-        if not os.path.isdir(target_dir):
+        catalog = self.profile_catalog
+        if catalog is None:
             return None
-        
-        # Score-based matching
-        best_match = None
-        best_score = 0
-        
-        for filename in os.listdir(target_dir):
-            if not filename.endswith(".json"):
-                continue
-            
-            name_lower = filename.lower()
-            score = 0
-            
-            # Score based on matching search terms
-            for term in search_terms:
-                if term in name_lower:
-                    score += 10
-                    # Bonus for exact model match at word boundary
-                    # e.g., "k1 " or "k1." matches but "k1c" should score lower
-                    if profile_type == "machine":
-                        # Check if there's a character after the term that extends it (like C in K1C)
-                        idx = name_lower.find(term)
-                        if idx >= 0:
-                            after_idx = idx + len(term)
-                            if after_idx < len(name_lower):
-                                next_char = name_lower[after_idx]
-                                if next_char.isalpha():
-                                    # This is a variant like K1C - penalize it
-                                    score -= 8
-                                elif next_char in ' .(-':
-                                    # Direct match followed by delimiter - bonus
-                                    score += 5
-            
-            # Bonus for "0.4 nozzle" (most common)
-            if "0.4" in name_lower:
-                score += 2
-            
-            # Bonus for "standard" or "optimal" process profiles
-            if profile_type == "process":
-                if "standard" in name_lower:
-                    score += 5
-                elif "optimal" in name_lower:
-                    score += 3
-            
-            # Bonus for generic PLA filament (non-silk preferred for general use)
-            if profile_type == "filament":
-                if "pla" in name_lower and "generic" in name_lower:
-                    score += 5
-                    # Penalize specialty variants
-                    if "-cf" in name_lower or "-gf" in name_lower:
-                        score -= 5  # Carbon fiber / glass fiber variants
-                    if "silk" in name_lower or "matte" in name_lower:
-                        score -= 2  # Specialty finishes
-                    if "high speed" in name_lower:
-                        score -= 1  # Less common
-                    # Plain PLA gets a bonus
-                    if "@k1" in name_lower and "-" not in name_lower.split("pla")[-1].split("@")[0]:
-                        score += 3  # Plain PLA for K1
-            
-            if score > best_score:
-                best_score = score
-                best_match = os.path.join(target_dir, filename)
-        
-        if best_match:
-            print(f"[PRINTER] Matched {profile_type} profile: {os.path.basename(best_match)} (score: {best_score})")
-        
-        return best_match
+        return catalog.find(printer_name, profile_type)
     
     def get_profiles_for_printer(self, printer_name: str) -> Dict[str, Optional[str]]:
         """
         Auto-detect suitable profiles for a given printer name.
-        Returns dict with 'machine', 'process', 'filament' paths.
+        Returns dict with 'machine', 'process', 'filament' paths (memoized per printer name).
         """
-        return {
-            "machine": self._find_matching_profile(printer_name, "machine"),
-            "process": self._find_matching_profile(printer_name, "process"),
-            "filament": self._find_matching_profile(printer_name, "filament"),
-        }
+        catalog = self.profile_catalog
+        if catalog is None:
+            return {"machine": None, "process": None, "filament": None}
+        return catalog.profiles_for(printer_name)
     
     def _detect_slicer_path(self) -> Optional[str]:
         """Detect OrcaSlicer or PrusaSlicer installation path."""
@@ -350,15 +375,82 @@ class PrinterAgent:
         print("[PRINTER] Warning: No Slicer (Orca/Prusa) found. Slicing will fail.")
         return None
 
-    async def discover_printers(self, timeout: float = 5.0) -> List[Dict]:
+    async def discover_printers(self, timeout: float = 5.0, on_printer: Optional[Callable] = None,
+                                expected: Optional[Iterable[str]] = None,
+                                probe_concurrency: int = DEFAULT_PROBE_CONCURRENCY) -> List[Dict]:
         """
         Discovers 3D printers on the local network via mDNS.
         Returns list of discovered printers.
+
+        Services are probed as they resolve (up to `probe_concurrency` hosts at
+        once) and `on_printer(printer_dict)` is called for each identified
+        printer. Discovery ends after `timeout`, or as soon as every host in
+        `expected` (default: already known printers) has been found and probed.
+        Printers in the identity cache are revalidated with a single request
+        instead of being probed again.
         """
         print(f"[PRINTER] Starting printer discovery (timeout: {timeout}s)...")
-        
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        found: asyncio.Queue = asyncio.Queue()
+        expected = set(expected if expected is not None else self.printers.keys())
+        semaphore = asyncio.Semaphore(max(1, probe_concurrency))
+        seen: Dict[str, Printer] = {}
+        probes: List[asyncio.Task] = []
+
+        listener = PrinterDiscoveryListener(on_found=lambda p: loop.call_soon_threadsafe(found.put_nowait, p))
+        stop_browsing = self._browse(listener)
+
+        async def identify(printer: Printer):
+            async with semaphore:
+                if not await self._revalidate_identity(printer):
+                    await self._probe_identity(printer)
+            self.printers[printer.host] = printer
+            if on_printer:
+                try:
+                    result = on_printer(printer.to_dict())
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception as e:
+                    print(f"[PRINTER] [WARN] Discovery callback failed: {e}")
+
+        def complete() -> bool:
+            return bool(expected) and expected <= seen.keys() and all(t.done() for t in probes)
+
+        try:
+            deadline = loop.time() + timeout
+            while not complete():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    # Wake up for new services, or shortly after to re-check probe completion
+                    printer = await asyncio.wait_for(found.get(), min(remaining, 0.1 if probes else remaining))
+                except asyncio.TimeoutError:
+                    continue
+                previous = seen.get(printer.host)
+                # Avoid duplicates if we found same host on multiple services; keep the typed entry
+                if previous is not None and (previous.printer_type != PrinterType.UNKNOWN
+                                             or printer.printer_type == PrinterType.UNKNOWN):
+                    continue
+                seen[printer.host] = printer
+                probes.append(asyncio.create_task(identify(printer)))
+        finally:
+            # Cleanup
+            await asyncio.to_thread(stop_browsing)
+
+        if probes:
+            await asyncio.gather(*probes, return_exceptions=True)
+        if self.identity_cache:
+            self.identity_cache.save()
+        early = " (all known printers found)" if complete() else ""
+        print(f"[PRINTER] Discovery complete in {time.perf_counter() - start:.1f}s{early}. "
+              f"Found {len(self.printers)} printers.")
+        return [p.to_dict() for p in self.printers.values()]
+
+    def _browse(self, listener: PrinterDiscoveryListener) -> Callable[[], None]:
+        """Starts mDNS browsing; returns a blocking function that stops it."""
         self._zeroconf = Zeroconf()
-        listener = PrinterDiscoveryListener()
         
         # Browse for common 3D printer services
         services = [
@@ -372,96 +464,180 @@ class PrinterAgent:
         for service in services:
             browser = ServiceBrowser(self._zeroconf, service, listener)
             browsers.append(browser)
-        
-        # Wait for discovery
-        await asyncio.sleep(timeout)
-        
-        # Cleanup
-        self._zeroconf.close()
-        
+
+        zeroconf = self._zeroconf
+
+        def stop():
+            zeroconf.close()
+            listener.close()
+        return stop
+
+    async def _probe_identity(self, printer: Printer):
+        """Full identification: type (if not advertised), firmware and camera. Updates the identity cache."""
+        self._identity["probed"] += 1
         # PROBE UNKNOWN PRINTERS
         # Many printers show up as _http._tcp with generic names
-        # We try to identify them by hitting known endpoints
-        for printer in listener.printers:
-            if printer.printer_type == PrinterType.UNKNOWN:
-                print(f"[PRINTER] Probing unknown printer: {printer.host}...")
-                ptype = await self._probe_printer_type(printer.host, printer.port)
-                if ptype != PrinterType.UNKNOWN:
-                    printer.printer_type = ptype
-                    print(f"[PRINTER] Identified {printer.name} as {ptype.value}")
-        
+        if printer.printer_type == PrinterType.UNKNOWN:
+            print(f"[PRINTER] Probing unknown printer: {printer.host}...")
+            ptype, printer.firmware = await self._identify_printer(printer.host, printer.port)
+            if ptype != PrinterType.UNKNOWN:
+                printer.printer_type = ptype
+                print(f"[PRINTER] Identified {printer.name} as {ptype.value}")
+        else:
+            printer.firmware = await self._probe_firmware(printer)
         # PROBE CAMERAS
-        for printer in listener.printers:
-            if not printer.camera_url:
-                # Try discovery
-                cam_url = await self._probe_camera(printer.host, printer.port)
-                if cam_url:
-                    printer.camera_url = cam_url
-        
-        # Store discovered printers
-        for printer in listener.printers:
-            # Avoid duplicates if we found same host on multiple services
-            self.printers[printer.host] = printer
-        
-        print(f"[PRINTER] Discovery complete. Found {len(self.printers)} printers.")
-        return [p.to_dict() for p in self.printers.values()]
+        if not printer.camera_url:
+            printer.camera_url = await self._probe_camera(printer.host, printer.port)
+        if self.identity_cache:
+            self.identity_cache.put(printer.to_dict())
+
+    async def _revalidate_identity(self, printer: Printer) -> bool:
+        """Applies a cached identity if one request confirms it still holds. False means probe again."""
+        if not self.identity_cache:
+            return False
+        cached = self.identity_cache.get(printer.host, printer.port, printer.name)
+        if cached is None:
+            return False
+        ptype = PrinterType(cached["printer_type"]) if cached.get("printer_type") in [e.value for e in PrinterType] else PrinterType.UNKNOWN
+        # The advertised service type overrides a stale cached type
+        if printer.printer_type not in (PrinterType.UNKNOWN, ptype):
+            self._identity["stale"] += 1
+            return False
+        printer.printer_type = ptype
+        firmware = await self._probe_firmware(printer)
+        if firmware is None:
+            print(f"[PRINTER] Cached identity for {printer.name} no longer valid, probing")
+            self._identity["stale"] += 1
+            self.identity_cache.invalidate(printer.host, printer.port, printer.name)
+            printer.printer_type = PrinterType.UNKNOWN
+            return False
+        printer.firmware = firmware or cached.get("firmware")
+        printer.camera_url = printer.camera_url or cached.get("camera_url")
+        self._identity["revalidated"] += 1
+        self.identity_cache.put(printer.to_dict())
+        return True
+
+    async def _probe_firmware(self, printer: Printer) -> Optional[str]:
+        """One request to the printer's identity endpoint; returns its firmware description, or None."""
+        session = await self._get_session()
+        if printer.printer_type == PrinterType.MOONRAKER:
+            return await self._probe_moonraker(session, printer.host, printer.port)
+        if printer.printer_type in (PrinterType.OCTOPRINT, PrinterType.PRUSALINK):
+            return await self._probe_octoprint(session, printer.host, printer.port)
+        # Not a known printer API: a cached negative result is kept as long as the host answers
+        try:
+            async with session.head(f"http://{printer.host}:{printer.port}/", timeout=PROBE_TIMEOUT):
+                return ""
+        except Exception:
+            return None
+
+    def restore_cached_printers(self) -> List[Dict]:
+        """
+        Adds every identity verified within the cache TTL, without network access.
+        Printers already known (e.g. from settings) only get missing camera/firmware filled in.
+        """
+        if not self.identity_cache:
+            return []
+        restored = []
+        for entry in self.identity_cache.restore():
+            if entry.get("printer_type") in (None, PrinterType.UNKNOWN.value):
+                continue  # cached only to skip re-probing non-printers
+            existing = self.printers.get(entry["host"])
+            if existing is not None:
+                existing.camera_url = existing.camera_url or entry.get("camera_url")
+                existing.firmware = existing.firmware or entry.get("firmware")
+                continue
+            printer = self.add_printer_manually(entry["name"], entry["host"], port=entry["port"],
+                                                printer_type=entry["printer_type"],
+                                                camera_url=entry.get("camera_url"))
+            printer.firmware = entry.get("firmware")
+            restored.append(printer.to_dict())
+        print(f"[PRINTER] Restored {len(restored)} printers from identity cache")
+        return restored
+
+    def identity_stats(self) -> dict:
+        stats = dict(self._identity)
+        if self.identity_cache:
+            stats["cache"] = self.identity_cache.stats()
+        return stats
 
     async def _probe_printer_type(self, host: str, port: int) -> PrinterType:
-        """Probe a host to check if it's running Moonraker or OctoPrint."""
+        """Probe a host to check if it's running Moonraker or OctoPrint (both checked at once)."""
+        ptype, _ = await self._identify_printer(host, port)
+        return ptype
+
+    async def _identify_printer(self, host: str, port: int) -> Tuple[PrinterType, Optional[str]]:
+        """Returns (printer type, firmware description) for a host."""
         print(f"[PRINTER DEBUG] Probing http://{host}:{port}...")
         try:
-            # Short timeout to avoid hangs on unreachable ports
-            timeout = aiohttp.ClientTimeout(total=2.0, connect=1.0)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                # Check Moonraker (Creality K1, Klipper)
-                # /printer/info is a standard Moonraker public endpoint
-                try:
-                    url = f"http://{host}:{port}/printer/info"
-                    async with session.get(url) as resp:
-                        print(f"[PRINTER DEBUG] {url} -> {resp.status}")
-                        if resp.status == 200:
-                            data = await resp.json()
-                            if "result" in data or "hostname" in data:
-                                print(f"[PRINTER DEBUG] Found MOONRAKER at {host}:{port}")
-                                return PrinterType.MOONRAKER
-                except asyncio.TimeoutError:
-                    print(f"[PRINTER DEBUG] Timeout probing {host}:{port}")
-                except Exception as e:
-                    print(f"[PRINTER DEBUG] Error probing {host}:{port}: {e}")
-
-                # Check OctoPrint
-                # /api/version usually requires key, but returns 401 or 200
-                try:
-                     url = f"http://{host}:{port}/api/version"
-                     async with session.get(url) as resp:
-                         print(f"[PRINTER DEBUG] {url} -> {resp.status}")
-                         # 200 (if public), 403 (needs key) - both mean it IS OctoPrint
-                         if resp.status in (200, 403, 401):
-                             print(f"[PRINTER DEBUG] Found OCTOPRINT at {host}:{port}")
-                             return PrinterType.OCTOPRINT
-                except asyncio.TimeoutError:
-                     pass
-                except Exception:
-                     pass
+            session = await self._get_session()
+            moonraker = asyncio.create_task(self._probe_moonraker(session, host, port))
+            octoprint = asyncio.create_task(self._probe_octoprint(session, host, port))
+            try:
+                # Moonraker also serves an OctoPrint-compatible /api/version, so it wins ties
+                firmware = await moonraker
+                if firmware:
+                    return PrinterType.MOONRAKER, firmware
+                firmware = await octoprint
+                if firmware:
+                    return PrinterType.OCTOPRINT, firmware
+            finally:
+                octoprint.cancel()
                      
-                # Fallback: Check root for identification
-                try:
-                    url = f"http://{host}:{port}/"
-                    async with session.get(url) as resp:
-                        content = await resp.text()
-                        print(f"[PRINTER DEBUG] Root {url} -> {resp.status}")
-                        if "<title>" in content:
-                            title = content.split("<title>")[1].split("</title>")[0]
-                            print(f"[PRINTER DEBUG] Page Title: {title}")
-                        if "Server" in resp.headers:
-                            print(f"[PRINTER DEBUG] Server Header: {resp.headers['Server']}")
-                except:
-                    pass
+            # Fallback: Check root for identification
+            try:
+                url = f"http://{host}:{port}/"
+                async with session.get(url, timeout=PROBE_TIMEOUT) as resp:
+                    content = await resp.text()
+                    print(f"[PRINTER DEBUG] Root {url} -> {resp.status}")
+                    if "<title>" in content:
+                        title = content.split("<title>")[1].split("</title>")[0]
+                        print(f"[PRINTER DEBUG] Page Title: {title}")
+                    if "Server" in resp.headers:
+                        print(f"[PRINTER DEBUG] Server Header: {resp.headers['Server']}")
+            except:
+                pass
                     
         except Exception as e:
             print(f"[PRINTER] Probe error for {host}:{port}: {e}")
         
-        return PrinterType.UNKNOWN
+        return PrinterType.UNKNOWN, None
+
+    async def _probe_moonraker(self, session: aiohttp.ClientSession, host: str, port: int) -> Optional[str]:
+        # Check Moonraker (Creality K1, Klipper); returns the Klipper version description
+        # /printer/info is a standard Moonraker public endpoint
+        try:
+            url = f"http://{host}:{port}/printer/info"
+            # Short timeout to avoid hangs on unreachable ports
+            async with session.get(url, timeout=PROBE_TIMEOUT) as resp:
+                print(f"[PRINTER DEBUG] {url} -> {resp.status}")
+                if resp.status == 200:
+                    data = await resp.json()
+                    if "result" in data or "hostname" in data:
+                        print(f"[PRINTER DEBUG] Found MOONRAKER at {host}:{port}")
+                        version = (data.get("result") or {}).get("software_version")
+                        return f"Klipper {version}" if version else "Klipper"
+        except asyncio.TimeoutError:
+            print(f"[PRINTER DEBUG] Timeout probing {host}:{port}")
+        except Exception as e:
+            print(f"[PRINTER DEBUG] Error probing {host}:{port}: {e}")
+        return None
+
+    async def _probe_octoprint(self, session: aiohttp.ClientSession, host: str, port: int) -> Optional[str]:
+        # Check OctoPrint; returns the server version text when public
+        # /api/version usually requires key, but returns 401 or 200
+        try:
+            url = f"http://{host}:{port}/api/version"
+            async with session.get(url, timeout=PROBE_TIMEOUT) as resp:
+                print(f"[PRINTER DEBUG] {url} -> {resp.status}")
+                # 200 (if public), 403 (needs key) - both mean it IS OctoPrint
+                if resp.status in (200, 403, 401):
+                    print(f"[PRINTER DEBUG] Found OCTOPRINT at {host}:{port}")
+                    data = await resp.json(content_type=None) if resp.status == 200 else {}
+                    return (data or {}).get("text") or "OctoPrint"
+        except Exception:
+            pass
+        return None
 
     async def _probe_camera(self, host: str, port: int) -> Optional[str]:
         """Probe for common camera stream URLs."""
@@ -474,26 +650,33 @@ class PrinterAgent:
             ":8080/?action=stream",        # mjpg-streamer standalone port
         ]
         
-        timeout = aiohttp.ClientTimeout(total=2.0, connect=1.0)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            for path in paths:
-                try:
-                    target = path if path.startswith(":") else f":{port}{path}"
-                    # Handle raw port case
-                    if target.startswith(":"):
-                        url = f"http://{host}{target}"
-                    else:
-                        url = f"http://{host}{target}"
-                        
-                    async with session.get(url) as resp:
-                        if resp.status == 200:
-                            # Verify content type is a stream
-                            ctype = resp.headers.get("Content-Type", "")
-                            if "multipart/x-mixed-replace" in ctype or "image" in ctype:
-                                print(f"[PRINTER] Found Camera: {url}")
-                                return url
-                except:
-                    continue
+        session = await self._get_session()
+
+        async def check(url: str) -> Optional[str]:
+            try:
+                async with session.get(url, timeout=PROBE_TIMEOUT) as resp:
+                    if resp.status == 200:
+                        # Verify content type is a stream
+                        ctype = resp.headers.get("Content-Type", "")
+                        if "multipart/x-mixed-replace" in ctype or "image" in ctype:
+                            return url
+            except Exception:
+                pass
+            return None
+
+        # Handle raw port case
+        urls = [f"http://{host}{path if path.startswith(':') else f':{port}{path}'}" for path in paths]
+        # All paths at once; the first stream found wins and the rest are cancelled
+        checks = [asyncio.create_task(check(url)) for url in urls]
+        try:
+            for next_done in asyncio.as_completed(checks):
+                url = await next_done
+                if url:
+                    print(f"[PRINTER] Found Camera: {url}")
+                    return url
+        finally:
+            for task in checks:
+                task.cancel()
         return None
     
     def add_printer_manually(self, name: str, host: str, port: int = 80, 
@@ -560,27 +743,46 @@ class PrinterAgent:
                         root_path: Optional[str] = None,
                         printer_name: Optional[str] = None) -> Optional[str]:
         """
+        Slice an STL file to G-code. Same arguments as run_slice().
+
+        Returns:
+            Path to generated G-code file, or None on failure, timeout or
+            cancel_slicing() (run_slice() also says which).
+        """
+        outcome = await self.run_slice(stl_path, output_path=output_path, profile_path=profile_path,
+                                       progress_callback=progress_callback, root_path=root_path,
+                                       printer_name=printer_name)
+        return outcome.gcode_path
+
+    async def run_slice(self, stl_path: str, output_path: Optional[str] = None,
+                        profile_path: Optional[str] = None,
+                        progress_callback: Optional[Any] = None,
+                        root_path: Optional[str] = None,
+                        printer_name: Optional[str] = None) -> SliceOutcome:
+        """
         Slice an STL file to G-code using OrcaSlicer/PrusaSlicer CLI.
         
         Args:
             stl_path: Path to input STL file
             output_path: Optional output G-code path (default: same dir as STL)
             profile_path: Optional path to .ini profile file (legacy)
+            progress_callback: Optional async callback(percent, message)
             root_path: Optional root directory to resolve relative paths
             printer_name: Optional printer name for auto-detecting profiles
         
         Returns:
-            Path to generated G-code file, or None on failure
+            SliceOutcome for this call: the G-code path (None on failure), the
+            SlicerResult if the slicer ran, and whether the G-code came from the cache.
         """
         if not self.slicer_path:
             print("[PRINTER] Error: Slicer not found")
-            return None
+            return SliceOutcome(error="Slicer not found.")
         
         # Robust path resolution
         resolved_path = self._resolve_file_path(stl_path, root_path)
         if not resolved_path:
             print(f"[PRINTER] Error: STL file not found: {stl_path} (root: {root_path})")
-            return None
+            return SliceOutcome(error=f"STL file not found: {stl_path}")
         stl_path = resolved_path
         
         # Default output path - save to project's gcode folder if root_path is provided
@@ -664,6 +866,28 @@ class PrinterAgent:
                 cmd.insert(1, "--load")
                 cmd.insert(2, profile_path)
         
+        # G-code cache: same STL, profiles (by content) and slicer build -> skip slicing
+        # Pins are keyed on the full project path: different projects may share a folder name
+        project = os.path.abspath(root_path) if root_path else None
+        cache_key = None
+        if self.gcode_cache:
+            profile_files = []
+            if is_orca and profiles:
+                profile_files = [profiles.get(kind) for kind in ("machine", "process", "filament")]
+            if profile_path and os.path.exists(profile_path):
+                profile_files.append(profile_path)
+            try:
+                cache_key = await asyncio.to_thread(self.gcode_cache.key_for, stl_path, profile_files, self.slicer_path)
+            except OSError as e:
+                print(f"[PRINTER] [WARN] G-code cache key failed: {e}")
+            if cache_key and await asyncio.to_thread(self.gcode_cache.materialize, cache_key, output_path):
+                if project:
+                    await asyncio.to_thread(self.gcode_cache.pin, cache_key, project)
+                print(f"[PRINTER] G-code cache hit ({cache_key[:12]}), skipped slicing: {output_path}")
+                if progress_callback:
+                    await progress_callback(100, "Loaded from G-code cache")
+                return SliceOutcome(gcode_path=output_path, cached=True)
+        
         print(f"[PRINTER] Slicing: {stl_path}")
         print(f"[PRINTER] Command: {' '.join(cmd)}")
         
@@ -672,35 +896,25 @@ class PrinterAgent:
             if progress_callback:
                 await progress_callback(5, "Starting slicer...")
             
-            # Use asyncio.to_thread for Windows compatibility (asyncio.create_subprocess_exec
-            # throws NotImplementedError on Windows with certain event loop policies)
-            import subprocess
-            
-            if progress_callback:
-                await progress_callback(10, "Running slicer...")
+            # Output may be a hardlink to a cache entry: never let the slicer write into it
+            if os.path.exists(output_path) and os.stat(output_path).st_nlink > 1:
+                os.remove(output_path)
             
+            # Streams output and reports the slicer's own progress (mapped to 10-90%)
+            job = SlicerProcess(cmd, progress_callback=progress_callback, timeout=self.slice_timeout)
+            self._slices[output_path] = job
             try:
-                result = await asyncio.to_thread(
-                    subprocess.run,
-                    cmd,
-                    capture_output=True,
-                    text=True
-                )
-                
-                # Log slicer output for debugging
-                if result.stdout:
-                    for line in result.stdout.strip().split('\n'):
-                        if line:
-                            print(f"[SLICER OUTPUT] {line}")
-                
-                if progress_callback:
-                    await progress_callback(90, "Finalizing...")
-                
-            except Exception as e:
+                result = await job.run()
+            except OSError as e:
                 print(f"[PRINTER] Subprocess run failed: {e}")
-                return None
+                return SliceOutcome(error=f"Could not start slicer: {e}")
+            finally:
+                self._slices.pop(output_path, None)
             
-            if result.returncode == 0:
+            if result.ok:
+                if progress_callback:
+                    await progress_callback(95, "Finalizing...")
+
                 # Handle OrcaSlicer output naming
                 # OrcaSlicer outputs as "plate_1.gcode", "plate_2.gcode" etc.
                 if is_orca:
@@ -727,20 +941,40 @@ class PrinterAgent:
                     elif not os.path.exists(output_path):
                         print(f"[PRINTER] Warning: Expected G-code not found in {output_dir}")
 
-                print(f"[PRINTER] Slicing complete: {output_path}")
+                print(f"[PRINTER] Slicing complete in {result.duration:.1f}s: {output_path}")
+                if cache_key:
+                    await asyncio.to_thread(self.gcode_cache.put, cache_key, output_path, project=project,
+                                            stl=os.path.basename(stl_path), printer=printer_name,
+                                            slice_s=round(result.duration, 1))
                 if progress_callback:
                     await progress_callback(100, "Slicing Complete")
-                return output_path
+                return SliceOutcome(gcode_path=output_path, result=result)
             else:
-                print(f"[PRINTER] Slicing failed: {result.stderr}")
-                return None
+                print(f"[PRINTER] Slicing failed: {result.error}")
+                if progress_callback:
+                    await progress_callback(100, result.error.splitlines()[-1])
+                message = result.error if (result.cancelled or result.timed_out) else "Slicing failed check logs."
+                return SliceOutcome(result=result, error=message)
                 
-        except subprocess.TimeoutExpired:
-            print("[PRINTER] Slicing timeout (5 min exceeded)")
-            return None
         except Exception as e:
             print(f"[PRINTER] Slicing error: {e}")
-            return None
+            return SliceOutcome(error=f"Slicing error: {e}")
+
+    def release_project(self, root_path: str) -> int:
+        """Unpins the cached G-code of a project the user left or deleted. Returns how many entries."""
+        if not self.gcode_cache or not root_path:
+            return 0
+        released = self.gcode_cache.unpin_project(os.path.abspath(root_path))
+        if released:
+            print(f"[PRINTER] Released {released} cached G-code file(s) of {os.path.basename(root_path)}")
+        return released
+
+    def cancel_slicing(self, output_path: Optional[str] = None) -> int:
+        """Cancels the running slice for output_path (all slices if None). Returns how many were cancelled."""
+        jobs = [job for path, job in self._slices.items() if output_path in (None, path)]
+        for job in jobs:
+            job.cancel()
+        return len(jobs)
     
     async def upload_gcode(self, target: str, gcode_path: str, 
                            start_print: bool = False) -> bool:
@@ -783,20 +1017,20 @@ class PrinterAgent:
         filename = os.path.basename(gcode_path)
         
         try:
-            async with aiohttp.ClientSession() as session:
-                with open(gcode_path, 'rb') as f:
-                    data = aiohttp.FormData()
-                    data.add_field('file', f, filename=filename)
-                    if start_print:
-                        data.add_field('print', 'true')
+            session = await self._get_session()
+            with open(gcode_path, 'rb') as f:
+                data = aiohttp.FormData()
+                data.add_field('file', f, filename=filename)
+                if start_print:
+                    data.add_field('print', 'true')
                     
-                    async with session.post(url, data=data, headers=headers) as resp:
-                        if resp.status in (200, 201, 202, 204):
-                            print(f"[PRINTER] Uploaded {filename} to OctoPrint at {printer.host}")
-                            return True
-                        else:
-                            print(f"[PRINTER] OctoPrint upload failed ({resp.status})")
-                            return False
+                async with session.post(url, data=data, headers=headers, timeout=UPLOAD_TIMEOUT) as resp:
+                    if resp.status in (200, 201, 202, 204):
+                        print(f"[PRINTER] Uploaded {filename} to OctoPrint at {printer.host}")
+                        return True
+                    else:
+                        print(f"[PRINTER] OctoPrint upload failed ({resp.status})")
+                        return False
         except Exception as e:
             print(f"[PRINTER] OctoPrint upload error: {e}")
             return False
@@ -809,30 +1043,30 @@ class PrinterAgent:
         filename = os.path.basename(gcode_path)
         
         try:
-            async with aiohttp.ClientSession() as session:
-                with open(gcode_path, 'rb') as f:
-                    data = aiohttp.FormData()
-                    data.add_field('file', f, filename=filename)
-                    # Explicitly set root if needed, but default is usually fine?
+            session = await self._get_session()
+            with open(gcode_path, 'rb') as f:
+                data = aiohttp.FormData()
+                data.add_field('file', f, filename=filename)
+                # Explicitly set root if needed, but default is usually fine?
                     
-                    async with session.post(url, data=data) as resp:
-                        if resp.status in (200, 201):
-                            print(f"[PRINTER] Uploaded {filename} to Moonraker at {printer.host}")
+                async with session.post(url, data=data, timeout=UPLOAD_TIMEOUT) as resp:
+                    if resp.status in (200, 201):
+                        print(f"[PRINTER] Uploaded {filename} to Moonraker at {printer.host}")
                             
-                            if start_print:
-                                # Trigger print
-                                print_url = f"http://{printer.host}:{printer.port}/printer/print/start"
-                                data_print = {"filename": filename}
-                                async with session.post(print_url, json=data_print) as resp_print:
-                                    if resp_print.status == 200:
-                                        print(f"[PRINTER] Started print on Moonraker")
-                                        return True
-                                    else:
-                                        print(f"[PRINTER] Moonraker start print failed ({resp_print.status})")
-                                        return False
-                            return True
-                        else:
-                            print(f"[PRINTER] Moonraker upload failed ({resp.status}). Trying OctoPrint compatibility layer...")
+                        if start_print:
+                            # Trigger print
+                            print_url = f"http://{printer.host}:{printer.port}/printer/print/start"
+                            data_print = {"filename": filename}
+                            async with session.post(print_url, json=data_print) as resp_print:
+                                if resp_print.status == 200:
+                                    print(f"[PRINTER] Started print on Moonraker")
+                                    return True
+                                else:
+                                    print(f"[PRINTER] Moonraker start print failed ({resp_print.status})")
+                                    return False
+                        return True
+                    else:
+                        print(f"[PRINTER] Moonraker upload failed ({resp.status}). Trying OctoPrint compatibility layer...")
 
             # Fallback to OctoPrint API (as Moonraker usually supports it and Creality K1 definitely does)
             return await self._upload_octoprint(printer, gcode_path, start_print)
@@ -852,12 +1086,18 @@ class PrinterAgent:
         if not printer:
             return None
             
+        start = time.perf_counter()
         if printer.printer_type == PrinterType.OCTOPRINT:
-            return await self._status_octoprint(printer)
+            status = await self._status_octoprint(printer)
         elif printer.printer_type == PrinterType.MOONRAKER:
-            return await self._status_moonraker(printer)
+            status = await self._status_moonraker(printer)
         else:
             return None
+        elapsed = (time.perf_counter() - start) * 1000.0
+        self._http["status_polls"] += 1
+        self._http["status_ms_total"] += elapsed
+        self._http["last_status_ms"] = elapsed
+        return status
             
     async def _status_octoprint(self, printer: Printer) -> Optional[PrintStatus]:
         """Get status from OctoPrint."""
@@ -868,46 +1108,24 @@ class PrinterAgent:
             headers["X-Api-Key"] = printer.api_key
         
         try:
-            async with aiohttp.ClientSession() as session:
-                # Fetch Job Status
-                job_data = {}
-                async with session.get(job_url, headers=headers) as resp:
-                    if resp.status == 200:
-                        job_data = await resp.json()
+            session = await self._get_session()
+            # Fetch Job Status
+            job_data = {}
+            async with session.get(job_url, headers=headers) as resp:
+                if resp.status == 200:
+                    job_data = await resp.json()
                 
-                # Fetch Printer Status (Temps)
-                temps = {}
-                async with session.get(printer_url, headers=headers) as resp:
-                    if resp.status == 200:
-                        printer_data = await resp.json()
-                        # OctoPrint structure: temperature -> tool0, bed
-                        temp_data = printer_data.get("temperature", {})
-                        if "tool0" in temp_data:
-                            temps["hotend"] = {
-                                "current": temp_data["tool0"].get("actual", 0),
-                                "target": temp_data["tool0"].get("target", 0)
-                            }
-                        if "bed" in temp_data:
-                            temps["bed"] = {
-                                "current": temp_data["bed"].get("actual", 0),
-                                "target": temp_data["bed"].get("target", 0)
-                            }
-
-                if job_data:
-                    progress = job_data.get("progress", {})
-                    job = job_data.get("job", {})
-                    
-                    return PrintStatus(
-                        printer=printer.name,
-                        state=job_data.get("state", "unknown").lower(),
-                        progress_percent=progress.get("completion") or 0,
-                        time_remaining=self._format_time(progress.get("printTimeLeft")),
-                        time_elapsed=self._format_time(progress.get("printTime")),
-                        filename=job.get("file", {}).get("name"),
-                        temperatures=temps
-                    )
-                else:
-                    return None
+            # Fetch Printer Status (Temps)
+            temp_data = {}
+            async with session.get(printer_url, headers=headers) as resp:
+                if resp.status == 200:
+                    printer_data = await resp.json()
+                    temp_data = printer_data.get("temperature", {})
+
+            if job_data:
+                return self.octoprint_print_status(printer, job_data, temp_data)
+            else:
+                return None
 
         except Exception as e:
             print(f"[PRINTER] OctoPrint status error: {e}")
@@ -918,42 +1136,19 @@ class PrinterAgent:
         url = f"http://{printer.host}:{printer.port}/printer/objects/query?print_stats&display_status&heater_bed&extruder"
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as resp:
-                    if resp.status == 200:
-                        # Clear error state on success
-                        self._error_tracker.discard(printer.host)
-                        
-                        data = await resp.json()
-                        status = data.get("result", {}).get("status", {})
-                        stats = status.get("print_stats", {})
-                        display = status.get("display_status", {})
-                        extruder = status.get("extruder", {})
-                        bed = status.get("heater_bed", {})
+            session = await self._get_session()
+            async with session.get(url) as resp:
+                if resp.status == 200:
+                    # Clear error state on success
+                    self._error_tracker.discard(printer.host)
                         
-                        return PrintStatus(
-                            printer=printer.name,
-                            state=stats.get("state", "unknown"),
-                            progress_percent=(display.get("progress") or 0) * 100,
-                            time_remaining=None,  # Moonraker doesn't provide this directly
-                            time_elapsed=self._format_time(stats.get("print_duration")),
-                            filename=stats.get("filename"),
-                            temperatures={
-                                "hotend": {
-                                    "current": extruder.get("temperature", 0),
-                                    "target": extruder.get("target", 0)
-                                },
-                                "bed": {
-                                    "current": bed.get("temperature", 0),
-                                    "target": bed.get("target", 0)
-                                }
-                            }
-                        )
-                    else:
-                         if printer.host not in self._error_tracker:
-                            print(f"[PRINTER] Moonraker status failed ({resp.status})")
-                            self._error_tracker.add(printer.host)
-                         return None
+                    data = await resp.json()
+                    return self.moonraker_print_status(printer, data.get("result", {}).get("status", {}))
+                else:
+                     if printer.host not in self._error_tracker:
+                        print(f"[PRINTER] Moonraker status failed ({resp.status})")
+                        self._error_tracker.add(printer.host)
+                     return None
         except Exception as e:
             msg = str(e)
             if printer.host not in self._error_tracker:
@@ -973,6 +1168,66 @@ class PrinterAgent:
                 temperatures={}
             )
 
+    def octoprint_print_status(self, printer: Printer, job_data: dict, temp_data: dict) -> PrintStatus:
+        """
+        Builds a PrintStatus from OctoPrint job data (/api/job or a push "current"
+        message) and a temperature dict with tool0 / bed entries.
+        """
+        temps = {}
+        # OctoPrint structure: temperature -> tool0, bed
+        if "tool0" in temp_data:
+            temps["hotend"] = {
+                "current": temp_data["tool0"].get("actual", 0),
+                "target": temp_data["tool0"].get("target", 0)
+            }
+        if "bed" in temp_data:
+            temps["bed"] = {
+                "current": temp_data["bed"].get("actual", 0),
+                "target": temp_data["bed"].get("target", 0)
+            }
+
+        progress = job_data.get("progress") or {}
+        job = job_data.get("job") or {}
+        state = job_data.get("state", "unknown")
+        if isinstance(state, dict):
+            state = state.get("text", "unknown")  # push messages carry {"text": ..., "flags": ...}
+
+        return PrintStatus(
+            printer=printer.name,
+            state=(state or "unknown").lower(),
+            progress_percent=progress.get("completion") or 0,
+            time_remaining=self._format_time(progress.get("printTimeLeft")),
+            time_elapsed=self._format_time(progress.get("printTime")),
+            filename=(job.get("file") or {}).get("name"),
+            temperatures=temps
+        )
+
+    def moonraker_print_status(self, printer: Printer, status: dict) -> PrintStatus:
+        """Builds a PrintStatus from Moonraker printer objects (query result or subscription cache)."""
+        stats = status.get("print_stats", {})
+        display = status.get("display_status", {})
+        extruder = status.get("extruder", {})
+        bed = status.get("heater_bed", {})
+
+        return PrintStatus(
+            printer=printer.name,
+            state=stats.get("state", "unknown"),
+            progress_percent=(display.get("progress") or 0) * 100,
+            time_remaining=None,  # Moonraker doesn't provide this directly
+            time_elapsed=self._format_time(stats.get("print_duration")),
+            filename=stats.get("filename"),
+            temperatures={
+                "hotend": {
+                    "current": extruder.get("temperature", 0),
+                    "target": extruder.get("target", 0)
+                },
+                "bed": {
+                    "current": bed.get("temperature", 0),
+                    "target": bed.get("target", 0)
+                }
+            }
+        )
+
     def _format_time(self, seconds: Optional[float]) -> Optional[str]:
         if seconds is None:
             return None
@@ -983,7 +1238,8 @@ class PrinterAgent:
 
     async def print_stl(self, stl_path: str, printer_name: str, 
                         profile_path: Optional[str] = None, 
-                        root_path: Optional[str] = None) -> Dict[str, str]:
+                        root_path: Optional[str] = None,
+                        progress_callback: Optional[Any] = None) -> Dict[str, str]:
         """
         Orchestrate the full printing workflow: Slice -> Upload -> Print.
         """
@@ -996,23 +1252,30 @@ class PrinterAgent:
 
         # 2. Slice STL
         # Use printer name to auto-detect profiles if not provided
-        gcode_path = await self.slice_stl(
+        outcome = await self.run_slice(
             stl_path, 
             profile_path=profile_path,
             root_path=root_path,
-            printer_name=printer.name 
+            printer_name=printer.name,
+            progress_callback=progress_callback
         )
+        gcode_path = outcome.gcode_path
         
         if not gcode_path:
-            return {"status": "error", "message": "Slicing failed check logs."}
+            if outcome.cancelled:
+                return {"status": "cancelled", "message": "Slicing cancelled."}
+            return {"status": "error", "message": outcome.error or "Slicing failed check logs."}
 
         # 3. Upload & Start Print
+        cached = outcome.cached
         success = await self.upload_gcode(printer_name, gcode_path, start_print=True)
         
         if success:
-            return {"status": "success", "message": f"Printing {os.path.basename(stl_path)} on {printer.name}"}
+            source = " (G-code from cache)" if cached else ""
+            return {"status": "success", "message": f"Printing {os.path.basename(stl_path)} on {printer.name}{source}",
+                    "cached": cached}
         else:
-            return {"status": "error", "message": "Failed to upload/start print job."}
+            return {"status": "error", "message": "Failed to upload/start print job.", "cached": cached}
 
 
 # Standalone test
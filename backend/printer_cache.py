@@ -0,0 +1,117 @@
+# File: printer_cache.py - Purpose: This file handles Printer Cache functionality.
+"""
+On-disk cache of printer identities, so discovery does not re-probe known printers.
+
+Identifying a printer takes several HTTP probes: Moonraker and OctoPrint API
+checks, a root page fallback and up to five camera stream paths. The answers
+rarely change. PrinterIdentityCache stores the detected type, camera URL and
+firmware for each (host, port, mDNS name) with a verification timestamp.
+
+Within `ttl`, discovery only revalidates an entry with one request to the
+printer's identity endpoint. Expired entries are probed again from scratch.
+The same fresh entries let startup restore the printer list before any
+network traffic. API keys are never written to the cache.
+"""
+
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+DEFAULT_IDENTITY_TTL = 7 * 24 * 3600
+CACHE_FORMAT = "1"
+
+IDENTITY_FIELDS = ("name", "host", "port", "printer_type", "camera_url", "firmware")
+
+
+class PrinterIdentityCache:
+    """
+    Args:
+        path: JSON file holding the identities (written atomically).
+        ttl: Seconds an identity is trusted after its last verification.
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_IDENTITY_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._entries: Dict[str, dict] = {}
+        self._dirty = False
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+        self._load()
+
+    @staticmethod
+    def key_for(host: str, port: int, name: str) -> str:
+        return f"{host}:{port}/{name}"
+
+    # --- Persistence ---
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("format") != CACHE_FORMAT:
+            return
+        self._entries = {key: entry for key, entry in data.get("printers", {}).items()
+                         if isinstance(entry, dict) and "host" in entry}
+
+    def save(self):
+        """Writes pending changes to disk (no-op when nothing changed)."""
+        if not self._dirty:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"format": CACHE_FORMAT, "printers": self._entries}, f, indent=2)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    # --- Lookup / store ---
+
+    def _fresh(self, entry: dict, now: float) -> bool:
+        return now - entry.get("verified", 0) < self.ttl
+
+    def get(self, host: str, port: int, name: str) -> Optional[dict]:
+        """Returns the cached identity if it was verified within the TTL, else None."""
+        entry = self._entries.get(self.key_for(host, port, name))
+        if entry is None:
+            self.misses += 1
+            return None
+        if not self._fresh(entry, time.time()):
+            self.expired += 1
+            return None
+        self.hits += 1
+        return dict(entry)
+
+    def put(self, printer: dict):
+        """Stores a printer dict (Printer.to_dict()) as verified now."""
+        entry = {field: printer.get(field) for field in IDENTITY_FIELDS}
+        entry["verified"] = time.time()
+        self._entries[self.key_for(printer["host"], printer["port"], printer["name"])] = entry
+        self._dirty = True
+
+    def invalidate(self, host: str, port: int, name: str):
+        if self._entries.pop(self.key_for(host, port, name), None) is not None:
+            self._dirty = True
+
+    def restore(self) -> List[dict]:
+        """All identities still within the TTL, most recently verified first."""
+        now = time.time()
+        fresh = [dict(e) for e in self._entries.values() if self._fresh(e, now)]
+        return sorted(fresh, key=lambda e: e.get("verified", 0), reverse=True)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+        }
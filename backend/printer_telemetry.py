@@ -0,0 +1,270 @@
+# File: printer_telemetry.py - Purpose: This file handles Printer Telemetry functionality.
+"""
+Push-based printer status for the frontend's `print_status_update` events.
+
+monitor_printers_loop used to poll every printer every 2 seconds (one request
+for Moonraker, two for OctoPrint) and emit every result, changed or not.
+PrinterTelemetry keeps one push subscription per printer instead:
+
+- Moonraker: JSON-RPC websocket (`/websocket`), `printer.objects.subscribe`,
+  then `notify_status_update` deltas merged into a cached object tree.
+- OctoPrint: the SockJS raw websocket (`/sockjs/websocket`), authenticated
+  with a passive `/api/login` when an API key is set; "current"/"history"
+  messages carry state, progress and temperatures.
+
+The latest status per printer lives in `states`; `on_update` only fires when
+the (rounded) status changes. A dropped or refused subscription falls back to
+PrinterAgent polling and reconnects with exponential backoff. Printers without
+a push API (PrusaLink) are polled.
+"""
+
+import asyncio
+import inspect
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+import aiohttp
+
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_BACKOFF_INITIAL = 1.0
+DEFAULT_BACKOFF_MAX = 30.0
+HEARTBEAT = 20.0                  # websocket ping interval; detects dead links
+OCTOPRINT_THROTTLE = 2            # push rate: one "current" message per 2 x 0.5 s
+
+MOONRAKER_OBJECTS = {
+    "print_stats": ["state", "filename", "print_duration"],
+    "display_status": ["progress"],
+    "extruder": ["temperature", "target"],
+    "heater_bed": ["temperature", "target"],
+}
+
+
+@dataclass
+class _Feed:
+    """Per-printer subscription bookkeeping."""
+    host: str
+    mode: str = "connecting"      # connecting | push | polling
+    task: Optional[asyncio.Task] = None
+    raw: dict = field(default_factory=dict)   # Moonraker object cache
+    failures: int = 0
+    messages: int = 0
+    reconnects: int = 0
+    last_error: Optional[str] = None
+    last_message: Optional[float] = None
+
+
+class PrinterTelemetry:
+    """
+    Args:
+        agent: PrinterAgent providing printers, the HTTP session and status parsing.
+        on_update: Called with a PrintStatus dict whenever a printer's status changes (may be async).
+        poll_interval: Seconds between polls while a printer has no live subscription.
+        backoff_initial / backoff_max: Reconnect delay bounds (doubles per failure, with jitter).
+    """
+
+    def __init__(self, agent, on_update: Optional[Callable] = None,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 backoff_initial: float = DEFAULT_BACKOFF_INITIAL,
+                 backoff_max: float = DEFAULT_BACKOFF_MAX):
+        self.agent = agent
+        self.on_update = on_update
+        self.poll_interval = poll_interval
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+
+        self.states: Dict[str, dict] = {}     # host -> last emitted status
+        self._feeds: Dict[str, _Feed] = {}
+
+        # Counters
+        self.emitted = 0
+        self.suppressed = 0
+        self.polls = 0
+
+    # --- Lifecycle ---
+
+    def sync(self):
+        """Starts a feed for every known printer and stops feeds for removed ones."""
+        printers = self.agent.printers
+        for host in list(self._feeds):
+            if host not in printers:
+                feed = self._feeds.pop(host)
+                feed.task.cancel()
+                self.states.pop(host, None)
+        for host, printer in printers.items():
+            if host in self._feeds or printer.printer_type.value == "unknown":
+                continue
+            feed = _Feed(host=host)
+            feed.task = asyncio.create_task(self._run_feed(feed))
+            self._feeds[host] = feed
+
+    async def close(self):
+        feeds, self._feeds = list(self._feeds.values()), {}
+        for feed in feeds:
+            feed.task.cancel()
+        await asyncio.gather(*(feed.task for feed in feeds), return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "emitted": self.emitted,
+            "suppressed": self.suppressed,
+            "polls": self.polls,
+            "printers": {
+                host: {"mode": f.mode, "messages": f.messages, "reconnects": f.reconnects,
+                       "last_error": f.last_error}
+                for host, f in self._feeds.items()
+            },
+        }
+
+    # --- Feed loop ---
+
+    async def _run_feed(self, feed: _Feed):
+        while True:
+            printer = self.agent.printers.get(feed.host)
+            if printer is None:
+                return
+            subscribe = {"moonraker": self._subscribe_moonraker,
+                         "octoprint": self._subscribe_octoprint}.get(printer.printer_type.value)
+            if subscribe is not None:
+                feed.mode = "connecting"
+                try:
+                    await subscribe(printer, feed)
+                    feed.last_error = "subscription closed"
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    feed.last_error = f"{type(e).__name__}: {e}"
+                if feed.failures == 0 or feed.mode == "push":
+                    print(f"[TELEMETRY] {printer.name}: push unavailable ({feed.last_error}), polling")
+                feed.failures += 1
+                feed.reconnects += 1
+
+            # Poll until the backoff expires, then try to subscribe again
+            feed.mode = "polling"
+            delay = min(self.backoff_max, self.backoff_initial * (2 ** max(0, feed.failures - 1)))
+            deadline = time.monotonic() + delay * random.uniform(0.8, 1.2)
+            while subscribe is None or time.monotonic() < deadline:
+                await self._poll(printer)
+                await asyncio.sleep(self.poll_interval)
+
+    async def _poll(self, printer):
+        self.polls += 1
+        try:
+            status = await self.agent.get_print_status(printer.host)
+        except Exception as e:
+            print(f"[TELEMETRY] [WARN] Poll failed for {printer.name}: {e}")
+            return
+        if status is not None:
+            await self._publish(printer.host, status.to_dict())
+
+    def _connected(self, feed: _Feed):
+        if feed.mode != "push":
+            print(f"[TELEMETRY] Subscribed to {feed.host}")
+        feed.mode = "push"
+        feed.failures = 0
+
+    # --- Moonraker ---
+
+    async def _subscribe_moonraker(self, printer, feed: _Feed):
+        session = await self.agent._get_session()
+        url = f"ws://{printer.host}:{printer.port}/websocket"
+        async with session.ws_connect(url, heartbeat=HEARTBEAT) as ws:
+            await ws.send_json({"jsonrpc": "2.0", "method": "printer.objects.subscribe",
+                                "params": {"objects": MOONRAKER_OBJECTS}, "id": 1})
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    if msg.type == aiohttp.WSMsgType.ERROR:
+                        raise ConnectionError(str(ws.exception()))
+                    continue
+                data = json.loads(msg.data)
+                if data.get("id") == 1:
+                    if "error" in data:
+                        raise ConnectionError(data["error"].get("message", "subscribe failed"))
+                    # Full snapshot of the subscribed objects
+                    feed.raw = data.get("result", {}).get("status", {})
+                    self._connected(feed)
+                elif data.get("method") == "notify_status_update" and feed.mode == "push":
+                    delta = (data.get("params") or [{}])[0]
+                    for name, values in delta.items():
+                        feed.raw.setdefault(name, {}).update(values)
+                elif data.get("method") == "notify_klippy_disconnected":
+                    raise ConnectionError("klippy disconnected")
+                else:
+                    continue
+                feed.messages += 1
+                feed.last_message = time.time()
+                status = self.agent.moonraker_print_status(printer, feed.raw)
+                await self._publish(feed.host, status.to_dict())
+
+    # --- OctoPrint ---
+
+    async def _subscribe_octoprint(self, printer, feed: _Feed):
+        session = await self.agent._get_session()
+        base = f"http://{printer.host}:{printer.port}"
+        auth = None
+        if printer.api_key:
+            async with session.post(f"{base}/api/login", json={"passive": True},
+                                    headers={"X-Api-Key": printer.api_key}) as resp:
+                if resp.status != 200:
+                    raise ConnectionError(f"login failed ({resp.status})")
+                login = await resp.json()
+                auth = f"{login.get('name')}:{login.get('session')}"
+
+        url = f"ws://{printer.host}:{printer.port}/sockjs/websocket"
+        async with session.ws_connect(url, heartbeat=HEARTBEAT) as ws:
+            if auth:
+                await ws.send_json({"auth": auth})
+            await ws.send_json({"throttle": OCTOPRINT_THROTTLE})
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    if msg.type == aiohttp.WSMsgType.ERROR:
+                        raise ConnectionError(str(ws.exception()))
+                    continue
+                data = json.loads(msg.data)
+                if "connected" in data:
+                    self._connected(feed)
+                    continue
+                current = data.get("current") or data.get("history")
+                if current is None:
+                    continue  # event, slicingProgress, plugin messages, ...
+                if feed.mode != "push":
+                    self._connected(feed)
+                feed.messages += 1
+                feed.last_message = time.time()
+                temps = current.get("temps") or []
+                # Only update temperatures when the message carries a sample
+                temp_data = temps[-1] if temps else feed.raw.get("temps", {})
+                feed.raw["temps"] = temp_data
+                status = self.agent.octoprint_print_status(printer, current, temp_data)
+                await self._publish(feed.host, status.to_dict())
+
+    # --- State cache ---
+
+    async def _publish(self, host: str, status: dict):
+        """Caches the status and calls on_update only if it differs from the last one."""
+        if _fingerprint(self.states.get(host)) == _fingerprint(status):
+            self.suppressed += 1
+            return
+        self.states[host] = status
+        self.emitted += 1
+        if self.on_update is None:
+            return
+        try:
+            result = self.on_update(status)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            print(f"[TELEMETRY] [WARN] Update callback failed: {e}")
+
+
+def _fingerprint(status: Optional[dict]):
+    """Status with noise removed: temperatures to 0.1 degree, progress to 0.1 %."""
+    if status is None:
+        return None
+    temps = {name: (round(t.get("current") or 0, 1), round(t.get("target") or 0, 1))
+             for name, t in (status.get("temperatures") or {}).items()}
+    return (status.get("printer"), status.get("state"), round(status.get("progress_percent") or 0, 1),
+            status.get("time_remaining"), status.get("time_elapsed"), status.get("filename"),
+            tuple(sorted(temps.items())))
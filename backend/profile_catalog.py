@@ -0,0 +1,326 @@
+# File: profile_catalog.py - Purpose: This file handles Profile Catalog functionality.
+"""
+Indexed catalog of OrcaSlicer system profiles for PrinterAgent.
+
+OrcaSlicer ships thousands of machine/process/filament JSON files under
+<config>/system/<Vendor>/<kind>/. PrinterAgent used to list those folders on
+every get_slicer_profiles call, and to list and score a whole vendor folder
+three times per slice. ProfileCatalog scans the tree once and keeps:
+
+- every profile in directory order, per vendor and kind
+- a token index (name tokens such as "k1", "0.4", "pla", "standard" -> files)
+- a vendor map: folder names, brand aliases and model tokens that appear in
+  exactly one vendor's machine profiles ("k1" -> Creality, "mk4" -> Prusa)
+- memoized get_profiles_for_printer results per printer name
+
+Directory mtimes are re-checked at most every `check_interval` seconds; any
+change (profile added or removed, vendor installed) rebuilds the catalog.
+Matching uses the same scores as the original per-file scan, but only scores
+files sharing a token with the printer name.
+"""
+
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+PROFILE_KINDS = ("machine", "process", "filament")
+DEFAULT_CHECK_INTERVAL = 5.0
+DEFAULT_VENDOR = "Creality"
+
+# Brand aliases matched as substrings of printer name words (only for installed vendors)
+VENDOR_ALIASES = {
+    "creality": "Creality",
+    "ender": "Creality",
+    "cr-": "Creality",
+    "k1": "Creality",
+    "bambu": "BBL",
+    "prusa": "Prusa",
+    "voron": "Voron",
+    "elegoo": "Elegoo",
+    "neptune": "Elegoo",
+    "anycubic": "Anycubic",
+    "kobra": "Anycubic",
+    "qidi": "Qidi",
+    "sovol": "Sovol",
+    "flashforge": "Flashforge",
+    "artillery": "Artillery",
+    "sidewinder": "Artillery",
+}
+
+# Name tokens that say nothing about the printer model
+GENERIC_TOKENS = {"nozzle", "0.2", "0.25", "0.4", "0.6", "0.8", ".json", "mm", "fdmprinter",
+                  "common", "base", "template", "max", "plus", "pro", "mini", "s", "v2", "v3"}
+
+_TOKEN_RE = re.compile(r"[a-z0-9.]+")
+
+
+def tokenize(name: str) -> List[str]:
+    return _TOKEN_RE.findall(name.lower())
+
+
+def static_bonus(name_lower: str, kind: str) -> int:
+    """Part of a profile's score that does not depend on the printer name."""
+    score = 0
+    # Bonus for "0.4 nozzle" (most common)
+    if "0.4" in name_lower:
+        score += 2
+
+    # Bonus for "standard" or "optimal" process profiles
+    if kind == "process":
+        if "standard" in name_lower:
+            score += 5
+        elif "optimal" in name_lower:
+            score += 3
+
+    # Bonus for generic PLA filament (non-silk preferred for general use)
+    if kind == "filament":
+        if "pla" in name_lower and "generic" in name_lower:
+            score += 5
+            # Penalize specialty variants
+            if "-cf" in name_lower or "-gf" in name_lower:
+                score -= 5  # Carbon fiber / glass fiber variants
+            if "silk" in name_lower or "matte" in name_lower:
+                score -= 2  # Specialty finishes
+            if "high speed" in name_lower:
+                score -= 1  # Less common
+            # Plain PLA gets a bonus
+            if "@k1" in name_lower and "-" not in name_lower.split("pla")[-1].split("@")[0]:
+                score += 3  # Plain PLA for K1
+    return score
+
+
+def term_score(name_lower: str, search_terms: List[str], kind: str) -> int:
+    """Part of a profile's score from the printer name words it contains (never negative)."""
+    score = 0
+    for term in search_terms:
+        if term in name_lower:
+            score += 10
+            # Bonus for exact model match at word boundary
+            # e.g., "k1 " or "k1." matches but "k1c" should score lower
+            if kind == "machine":
+                # Check if there's a character after the term that extends it (like C in K1C)
+                idx = name_lower.find(term)
+                after_idx = idx + len(term)
+                if after_idx < len(name_lower):
+                    next_char = name_lower[after_idx]
+                    if next_char.isalpha():
+                        # This is a variant like K1C - penalize it
+                        score -= 8
+                    elif next_char in ' .(-':
+                        # Direct match followed by delimiter - bonus
+                        score += 5
+    return score
+
+
+@dataclass
+class Profile:
+    vendor: str
+    kind: str
+    filename: str
+    path: str            # absolute path passed to the slicer
+    order: int           # position in directory listing (ties keep the first file)
+    bonus: int           # static_bonus, precomputed
+
+    @property
+    def relpath(self) -> str:
+        return f"system/{self.vendor}/{self.kind}/{self.filename}"
+
+
+class _Shelf:
+    """Profiles of one vendor and kind, with their token index."""
+
+    def __init__(self, profiles: List[Profile]):
+        self.profiles = profiles
+        self.index: Dict[str, List[int]] = {}
+        for i, profile in enumerate(profiles):
+            for token in set(tokenize(profile.filename)):
+                self.index.setdefault(token, []).append(i)
+        # Best file when no printer name word matches at all
+        self.best_static = max(profiles, key=lambda p: (p.bonus, -p.order)) if profiles else None
+
+    def candidates(self, terms: List[str]) -> List[Profile]:
+        """Profiles containing any term. Terms spanning token boundaries fall back to a scan."""
+        if any(_TOKEN_RE.fullmatch(term) is None for term in terms):
+            return [p for p in self.profiles if any(t in p.filename.lower() for t in terms)]
+        hits = set()
+        for term in terms:
+            for token, ids in self.index.items():
+                if term in token:
+                    hits.update(ids)
+        return [self.profiles[i] for i in hits]
+
+
+class ProfileCatalog:
+    """
+    Args:
+        system_dir: OrcaSlicer `system` profile directory.
+        check_interval: Minimum seconds between directory mtime checks.
+    """
+
+    def __init__(self, system_dir: str, check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self.system_dir = system_dir
+        self.check_interval = check_interval
+        self._shelves: Dict[Tuple[str, str], _Shelf] = {}
+        self._available: Dict[str, List[str]] = {}
+        self._vendors: Dict[str, str] = {}        # lowercase folder name -> folder name
+        self._model_vendor: Dict[str, str] = {}   # model token -> vendor
+        self._mtimes: Dict[str, float] = {}
+        self._memo: Dict[str, Dict[str, Optional[str]]] = {}
+        self._last_check = 0.0
+
+        # Counters
+        self.builds = 0
+        self.memo_hits = 0
+        self.build_ms = 0.0
+
+        self._build()
+
+    # --- Building ---
+
+    def _watched_dirs(self) -> List[str]:
+        dirs = [self.system_dir]
+        for vendor in self._vendors.values():
+            vendor_path = os.path.join(self.system_dir, vendor)
+            dirs.append(vendor_path)
+            dirs.extend(os.path.join(vendor_path, kind) for kind in PROFILE_KINDS)
+        return dirs
+
+    def _snapshot_mtimes(self) -> Dict[str, float]:
+        mtimes = {}
+        for path in self._watched_dirs():
+            try:
+                mtimes[path] = os.stat(path).st_mtime
+            except OSError:
+                mtimes[path] = -1.0
+        return mtimes
+
+    def _build(self):
+        start = time.perf_counter()
+        shelves: Dict[Tuple[str, str], _Shelf] = {}
+        vendors: Dict[str, str] = {}
+        try:
+            vendor_names = os.listdir(self.system_dir)
+        except OSError:
+            vendor_names = []
+        for vendor in vendor_names:
+            vendor_path = os.path.join(self.system_dir, vendor)
+            if not os.path.isdir(vendor_path):
+                continue
+            vendors[vendor.lower()] = vendor
+            for kind in PROFILE_KINDS:
+                kind_dir = os.path.join(vendor_path, kind)
+                try:
+                    names = [f for f in os.listdir(kind_dir) if f.endswith(".json")]
+                except OSError:
+                    continue
+                shelves[(vendor, kind)] = _Shelf([
+                    Profile(vendor, kind, f, os.path.join(kind_dir, f), i, static_bonus(f.lower(), kind))
+                    for i, f in enumerate(names)
+                ])
+
+        # Model tokens that appear in exactly one vendor's machine profiles
+        owners: Dict[str, set] = {}
+        for (vendor, kind), shelf in shelves.items():
+            if kind != "machine":
+                continue
+            for token in shelf.index:
+                if token not in GENERIC_TOKENS and not token.replace(".", "").isdigit():
+                    owners.setdefault(token, set()).add(vendor)
+
+        self._shelves = shelves
+        self._vendors = vendors
+        keys = {"machine": "machines", "process": "processes", "filament": "filaments"}
+        self._available = {key: [] for key in keys.values()}
+        for (vendor, kind), shelf in shelves.items():
+            self._available[keys[kind]].extend(p.relpath for p in shelf.profiles)
+        self._model_vendor = {token: next(iter(v)) for token, v in owners.items() if len(v) == 1}
+        self._memo = {}
+        self._mtimes = self._snapshot_mtimes()
+        self._last_check = time.monotonic()
+        self.builds += 1
+        self.build_ms = (time.perf_counter() - start) * 1000
+        count = sum(len(s.profiles) for s in shelves.values())
+        print(f"[PROFILES] Indexed {count} profiles from {len(vendors)} vendors in {self.build_ms:.1f} ms")
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rebuilds if any watched directory changed. Returns True when rebuilt."""
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return False
+        self._last_check = now
+        if not force and self._snapshot_mtimes() == self._mtimes:
+            return False
+        self._build()
+        return True
+
+    # --- Queries ---
+
+    def available(self) -> Dict[str, List[str]]:
+        """Same shape as PrinterAgent.get_available_profiles: 'machines', 'processes', 'filaments'."""
+        self.refresh()
+        return {key: list(paths) for key, paths in self._available.items()}
+
+    def vendor_for(self, printer_name: str) -> Optional[str]:
+        """Vendor folder for a printer name: folder name, brand alias, then unique model token."""
+        installed = self._vendors
+        for term in printer_name.lower().split():
+            if term in installed:
+                return installed[term]
+            for key, vendor in VENDOR_ALIASES.items():
+                if key in term and vendor.lower() in installed:
+                    return installed[vendor.lower()]
+            for token in tokenize(term):
+                if token in self._model_vendor:
+                    return self._model_vendor[token]
+        return installed.get(DEFAULT_VENDOR.lower())
+
+    def find(self, printer_name: str, kind: str) -> Optional[str]:
+        """Best profile path of `kind` for the printer, or None."""
+        self.refresh()
+        vendor = self.vendor_for(printer_name)
+        if vendor is None:
+            print(f"[PROFILES] No vendor folder for printer: {printer_name}")
+            return None
+        shelf = self._shelves.get((vendor, kind))
+        if not shelf:
+            return None
+
+        search_terms = printer_name.lower().split()
+        best, best_key = None, (0, 0)
+        candidates = shelf.candidates(search_terms)
+        if shelf.best_static is not None:
+            candidates.append(shelf.best_static)
+        for profile in candidates:
+            score = profile.bonus + term_score(profile.filename.lower(), search_terms, kind)
+            key = (score, -profile.order)
+            if score > 0 and key > best_key:
+                best, best_key = profile, key
+        if best is None:
+            return None
+        print(f"[PROFILES] Matched {kind} profile: {best.filename} (score: {best_key[0]})")
+        return best.path
+
+    def profiles_for(self, printer_name: str) -> Dict[str, Optional[str]]:
+        """Machine/process/filament paths for a printer name, memoized until the catalog changes."""
+        self.refresh()
+        key = printer_name.lower()
+        cached = self._memo.get(key)
+        if cached is not None:
+            self.memo_hits += 1
+            return dict(cached)
+        result = {kind: self.find(printer_name, kind) for kind in PROFILE_KINDS}
+        self._memo[key] = result
+        return dict(result)
+
+    def stats(self) -> dict:
+        return {
+            "profiles": sum(len(s.profiles) for s in self._shelves.values()),
+            "vendors": len(self._vendors),
+            "model_tokens": len(self._model_vendor),
+            "builds": self.builds,
+            "build_ms": round(self.build_ms, 1),
+            "memoized_printers": len(self._memo),
+            "memo_hits": self.memo_hits,
+        }
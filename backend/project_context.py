@@ -0,0 +1,213 @@
+# File: project_context.py - Purpose: This file handles Project Context functionality.
+"""
+Cached, incremental project context for ProjectManager.get_project_context.
+
+The old builder walked the project and re-read every small text file on each
+call, chat_history.jsonl included, and pasted all of it into the prompt.
+ProjectContextIndex remembers (mtime, size, sha1, text) per file: files whose
+mtime and size are unchanged are served from memory, touched-but-identical
+files are recognised by hash, and only new or edited files are decoded again.
+The output is capped to a token budget, filling it with the most recently
+modified files first.
+"""
+
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_CONTEXT_TOKENS = 8000
+CHARS_PER_TOKEN = 4          # rough estimate, good enough for budgeting
+MAX_LISTED_FILES = 200
+
+TEXT_EXTENSIONS = {'.txt', '.py', '.js', '.jsx', '.ts', '.tsx', '.json', '.md', '.html', '.css', '.jsonl'}
+# Chat history is already replayed via get_recent_chat_history; never inline it
+EXCLUDED_CONTENT = {"chat_history.jsonl"}
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@dataclass
+class FileEntry:
+    rel_path: str
+    mtime_ns: int
+    size: int
+    digest: Optional[str] = None   # sha1 of the content, only for files we read
+    text: Optional[str] = None
+    error: Optional[str] = None
+
+
+class ProjectContextIndex:
+    """Per-project file index reused across get_project_context calls."""
+
+    def __init__(self):
+        self._projects: Dict[str, Dict[str, FileEntry]] = {}
+
+        # Counters (cumulative and last build)
+        self.hits = 0
+        self.misses = 0
+        self.last_build_ms = 0.0
+        self.last_hits = 0
+        self.last_misses = 0
+        self.last_tokens = 0
+
+    def invalidate(self, project_path: Optional[Path] = None):
+        if project_path is None:
+            self._projects.clear()
+        else:
+            self._projects.pop(str(project_path), None)
+
+    # --- Index maintenance ---
+
+    def refresh(self, project_path: Path, max_file_size: int) -> List[FileEntry]:
+        """Stats every file and re-reads only the ones that changed."""
+        key = str(project_path)
+        previous = self._projects.get(key, {})
+        current: Dict[str, FileEntry] = {}
+
+        for full_path in self._walk(project_path):
+            rel_path = os.path.relpath(full_path, project_path)
+            try:
+                st = os.stat(full_path)
+            except OSError:
+                continue
+
+            cached = previous.get(rel_path)
+            if cached is not None and cached.mtime_ns == st.st_mtime_ns and cached.size == st.st_size:
+                current[rel_path] = cached
+                if self._wants_content(rel_path, st.st_size, max_file_size):
+                    self._count(hit=True)
+                continue
+
+            entry = FileEntry(rel_path, st.st_mtime_ns, st.st_size)
+            if self._wants_content(rel_path, st.st_size, max_file_size):
+                self._load(entry, full_path, cached)
+            current[rel_path] = entry
+
+        self._projects[key] = current
+        return list(current.values())
+
+    @staticmethod
+    def _walk(root: Path):
+        stack = [str(root)]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for item in it:
+                        if item.is_dir(follow_symlinks=False):
+                            stack.append(item.path)
+                        elif item.is_file():
+                            yield item.path
+            except OSError:
+                continue
+
+    @staticmethod
+    def _wants_content(rel_path: str, size: int, max_file_size: int) -> bool:
+        name = os.path.basename(rel_path)
+        ext = os.path.splitext(rel_path)[1].lower()
+        return ext in TEXT_EXTENSIONS and name not in EXCLUDED_CONTENT and size <= max_file_size
+
+    def _load(self, entry: FileEntry, full_path: str, cached: Optional[FileEntry]):
+        try:
+            with open(full_path, "rb") as f:
+                raw = f.read()
+        except OSError as e:
+            entry.error = str(e)
+            self._count(hit=False)
+            return
+
+        entry.digest = hashlib.sha1(raw).hexdigest()
+        if cached is not None and cached.digest == entry.digest and cached.text is not None:
+            # Touched (mtime changed) but identical content: reuse the decoded text
+            entry.text = cached.text
+            self._count(hit=True)
+            return
+        entry.text = raw.decode("utf-8", errors="ignore")
+        self._count(hit=False)
+
+    def _count(self, hit: bool):
+        if hit:
+            self.hits += 1
+            self.last_hits += 1
+        else:
+            self.misses += 1
+            self.last_misses += 1
+
+    # --- Rendering ---
+
+    def build(self, project_path: Path, project_name: str, max_file_size: int = 10000,
+              token_budget: int = DEFAULT_CONTEXT_TOKENS) -> str:
+        """Renders the project context, newest files first, within token_budget."""
+        start = time.perf_counter()
+        self.last_hits = 0
+        self.last_misses = 0
+
+        entries = self.refresh(project_path, max_file_size)
+        entries.sort(key=lambda e: e.mtime_ns, reverse=True)
+
+        context_lines = [f"=== Project Context: '{project_name}' ==="]
+        context_lines.append(f"Project directory: {project_path}")
+        context_lines.append("")
+
+        if not entries:
+            context_lines.append("(No files in project yet)")
+        else:
+            context_lines.append(f"Files ({len(entries)} total, most recently modified first):")
+            for entry in entries[:MAX_LISTED_FILES]:
+                context_lines.append(f"  - {entry.rel_path}")
+            if len(entries) > MAX_LISTED_FILES:
+                context_lines.append(f"  ... and {len(entries) - MAX_LISTED_FILES} more")
+
+        context_lines.append("")
+        used = estimate_tokens("\n".join(context_lines))
+
+        omitted = []
+        for entry in entries:
+            ext = os.path.splitext(entry.rel_path)[1].lower()
+            if ext not in TEXT_EXTENSIONS or os.path.basename(entry.rel_path) in EXCLUDED_CONTENT:
+                continue
+            if entry.error:
+                context_lines.append(f"--- {entry.rel_path} (error reading: {entry.error}) ---")
+                continue
+            if entry.text is None:
+                context_lines.append(f"--- {entry.rel_path} (too large: {entry.size} bytes, skipped) ---")
+                continue
+
+            block = f"--- {entry.rel_path} ---\n{entry.text}\n"
+            cost = estimate_tokens(block)
+            if used + cost > token_budget:
+                omitted.append(entry.rel_path)
+                continue
+            context_lines.append(f"--- {entry.rel_path} ---")
+            context_lines.append(entry.text)
+            context_lines.append("")
+            used += cost
+
+        if omitted:
+            context_lines.append(f"({len(omitted)} older file(s) omitted to fit the context budget: "
+                                 f"{', '.join(omitted[:20])}{' ...' if len(omitted) > 20 else ''})")
+
+        context = "\n".join(context_lines)
+        self.last_tokens = estimate_tokens(context)
+        self.last_build_ms = (time.perf_counter() - start) * 1000.0
+        return context
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        last_total = self.last_hits + self.last_misses
+        return {
+            "hit_rate": round(self.hit_rate, 3),
+            "last_hit_rate": round(self.last_hits / last_total, 3) if last_total else None,
+            "last_build_ms": round(self.last_build_ms, 2),
+            "last_tokens": self.last_tokens,
+            "indexed_projects": len(self._projects),
+        }
@@ -1,15 +1,24 @@
 # File: project_manager.py - Purpose: This file handles Project Manager functionality.
 import os
-import json
 import shutil
 import time
 from pathlib import Path
 
+from project_context import ProjectContextIndex, DEFAULT_CONTEXT_TOKENS
+from cad_cache import link_or_copy
+from chat_log import ChatLogWriter, ChatTailCache, read_history_tail, parse_entries, TAIL_CACHE_SIZE
+
 class ProjectManager:
     def __init__(self, workspace_root: str):
         self.workspace_root = Path(workspace_root)
         self.projects_dir = self.workspace_root / "projects"
         self.current_project = "temp"
+        # Called as on_switch(old_path, new_path) when the active project changes
+        self.on_switch = None
+        self._context_index = ProjectContextIndex()
+        self._chat_tail = ChatTailCache()
+        # Appends happen on a background thread; the tail cache follows each write
+        self._chat_writer = ChatLogWriter(on_written=self._chat_tail.append, on_rotated=self._chat_tail.rebase)
         
         # Ensure projects root exists
         if not self.projects_dir.exists():
@@ -44,8 +53,14 @@ class ProjectManager:
         project_path = self.projects_dir / safe_name
         
         if project_path.exists():
+            previous = self.get_current_project_path()
             self.current_project = safe_name
             print(f"[ProjectManager] Switched to project: {safe_name}")
+            if self.on_switch and previous != project_path:
+                try:
+                    self.on_switch(previous, project_path)
+                except Exception as e:
+                    print(f"[ProjectManager] [WARN] Project switch callback failed: {e}")
             return True, f"Switched to project '{safe_name}'."
         return False, f"Project '{safe_name}' does not exist."
 
@@ -64,11 +79,23 @@ class ProjectManager:
             "sender": sender,
             "text": text
         }
-        with open(log_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry) + "\n")
+        # Queued for the background writer - no file I/O on the caller's thread
+        self._chat_writer.write(log_file, entry)
+
+    def flush_chat_log(self, wait: bool = True, fsync: bool = True):
+        """Forces queued chat entries to disk. With wait=False the flush is only scheduled."""
+        return self._chat_writer.flush(fsync=fsync, wait=wait)
+
+    def close(self):
+        """Flushes and stops the chat log writer (call on shutdown). Blocks while the
+        writer drains, so async callers should run it through asyncio.to_thread."""
+        self._chat_writer.close()
 
     def save_cad_artifact(self, source_path: str, prompt: str):
-        """Copies a generated CAD file to the project's 'cad' folder."""
+        """
+        Saves a generated CAD file to the project's 'cad' folder.
+        Hardlinks when possible (CAD results are shared with the CAD cache), else copies.
+        """
         if not os.path.exists(source_path):
             print(f"[ProjectManager] [ERR] Source file not found: {source_path}")
             return None
@@ -82,86 +109,51 @@ class ProjectManager:
         dest_path = self.get_current_project_path() / "cad" / filename
         
         try:
-            shutil.copy2(source_path, dest_path)
-            print(f"[ProjectManager] Saved CAD artifact to: {dest_path}")
+            linked = link_or_copy(source_path, str(dest_path))
+            print(f"[ProjectManager] Saved CAD artifact to: {dest_path}{' (hardlink)' if linked else ''}")
             return str(dest_path)
         except Exception as e:
             print(f"[ProjectManager] [ERR] Failed to save artifact: {e}")
             return None
 
-    def get_project_context(self, max_file_size: int = 10000) -> str:
+    def get_project_context(self, max_file_size: int = 10000, token_budget: int = DEFAULT_CONTEXT_TOKENS) -> str:
         """
         Gathers context about the current project for the AI.
-        Lists all files and reads text file contents (up to max_file_size bytes).
+        Lists all files and includes text file contents (up to max_file_size bytes each),
+        most recently modified first, within roughly token_budget tokens.
+        Unchanged files are served from the cached index.
         """
         project_path = self.get_current_project_path()
         if not project_path.exists():
             return f"Project '{self.current_project}' does not exist."
 
-        context_lines = [f"=== Project Context: '{self.current_project}' ==="]
-        context_lines.append(f"Project directory: {project_path}")
-        context_lines.append("")
-
-        # List all files recursively
-        all_files = []
-        for root, dirs, files in os.walk(project_path):
-            for f in files:
-                rel_path = os.path.relpath(os.path.join(root, f), project_path)
-                all_files.append(rel_path)
-
-        if not all_files:
-            context_lines.append("(No files in project yet)")
-        else:
-            context_lines.append(f"Files ({len(all_files)} total):")
-            for f in all_files:
-                context_lines.append(f"  - {f}")
-
-        context_lines.append("")
-
-        # Read text files (skip binary and large files)
-        text_extensions = {'.txt', '.py', '.js', '.jsx', '.ts', '.tsx', '.json', '.md', '.html', '.css', '.jsonl'}
-        for rel_path in all_files:
-            ext = os.path.splitext(rel_path)[1].lower()
-            if ext not in text_extensions:
-                continue
-
-            full_path = project_path / rel_path
-            try:
-                file_size = full_path.stat().st_size
-                if file_size > max_file_size:
-                    context_lines.append(f"--- {rel_path} (too large: {file_size} bytes, skipped) ---")
-                    continue
-
-                with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                context_lines.append(f"--- {rel_path} ---")
-                context_lines.append(content)
-                context_lines.append("")
-            except Exception as e:
-                context_lines.append(f"--- {rel_path} (error reading: {e}) ---")
-
-        return "\n".join(context_lines)
+        context = self._context_index.build(project_path, self.current_project,
+                                            max_file_size=max_file_size, token_budget=token_budget)
+        stats = self._context_index.stats()
+        print(f"[ProjectManager] Context built in {stats['last_build_ms']} ms "
+              f"(~{stats['last_tokens']} tokens, cache hit rate {stats['last_hit_rate']})")
+        return context
 
     def get_recent_chat_history(self, limit: int = 10):
-        """Returns the last 'limit' chat messages from history."""
+        """Returns the last 'limit' chat messages from history.
+        Waits for queued writes to reach disk, so async callers should use asyncio.to_thread."""
         log_file = self.get_current_project_path() / "chat_history.jsonl"
-        if not log_file.exists():
-            return []
-            
+
         try:
-            with open(log_file, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-                
-            # Parse last N lines
-            history = []
-            for line in lines[-limit:]:
-                try:
-                    entry = json.loads(line)
-                    history.append(entry)
-                except json.JSONDecodeError:
-                    continue
-            return history
+            # Make sure queued entries are on disk before comparing sizes
+            self._chat_writer.flush(fsync=False)
+            file_size = log_file.stat().st_size if log_file.exists() else 0
+            cached = self._chat_tail.get(log_file, limit, file_size)
+            if cached is not None:
+                return cached
+
+            # Seek from EOF instead of reading the whole (possibly huge) file,
+            # continuing into rotated .gz segments if the active file is short
+            want = max(limit, TAIL_CACHE_SIZE)
+            lines = read_history_tail(log_file, want)
+            entries = parse_entries(lines)
+            self._chat_tail.load(log_file, entries, file_size, complete=len(lines) < want)
+            return entries[-limit:] if limit > 0 else []
         except Exception as e:
             print(f"[ProjectManager] [ERR] Failed to read chat history: {e}")
             return []
-
@@ -0,0 +1,256 @@
+# File: screenshot_manager.py - Purpose: This file handles Screenshot Manager functionality.
+"""
+Screenshot capture, settling and history budgeting for the WebAgent loop.
+
+Each WebAgent turn used to sleep a fixed second after every action, take a
+1440x900 PNG, keep it in `chat_history` for the rest of the task (so every
+request re-sent every earlier screenshot) and base64-encode it a second time
+for the frontend. This module:
+
+- waits for the page to settle (DOM quiet + network idle, capped) instead of
+  sleeping, so fast pages return in a few hundred ms;
+- keeps the last `keep_full` screenshots at full fidelity, shrinks older ones
+  to `thumbnail_width` and drops images beyond `max_images` for a text note;
+- captures once per turn: the same bytes object backs every history part and
+  the base64 string for the frontend is computed at most once.
+
+ScreenshotManager also records seconds and image tokens per turn.
+"""
+
+import base64
+import io
+import math
+import time
+from typing import List, Optional
+
+from google.genai import types
+
+DEFAULT_KEEP_FULL = 3
+DEFAULT_THUMBNAIL_WIDTH = 480
+DEFAULT_MAX_IMAGES = 8
+DEFAULT_SETTLE_TIMEOUT = 3.0
+DEFAULT_DOM_QUIET_MS = 250
+DROPPED_NOTE = "[Earlier screenshot omitted to save context]"
+
+# Gemini bills an image as 258 tokens per 768x768 tile (one tile if both sides <= 384)
+TOKENS_PER_TILE = 258
+TILE_SIZE = 768
+
+# Resolves once no DOM mutation happened for quietMs (or after maxMs)
+_DOM_QUIET_JS = """
+([quietMs, maxMs]) => new Promise(resolve => {
+    const start = performance.now();
+    let timer = null, cap = null;
+    const observer = new MutationObserver(() => { clearTimeout(timer); timer = setTimeout(done, quietMs); });
+    function done() { observer.disconnect(); clearTimeout(timer); clearTimeout(cap); resolve(performance.now() - start); }
+    observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    timer = setTimeout(done, quietMs);
+    cap = setTimeout(done, maxMs);
+})
+"""
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    if width <= 0 or height <= 0:
+        return 0
+    if width <= TILE_SIZE // 2 and height <= TILE_SIZE // 2:
+        return TOKENS_PER_TILE
+    return math.ceil(width / TILE_SIZE) * math.ceil(height / TILE_SIZE) * TOKENS_PER_TILE
+
+
+def png_size(png: bytes) -> tuple:
+    """Width and height from the IHDR chunk (no decode)."""
+    if len(png) < 24 or png[:8] != b"\x89PNG\r\n\x1a\n":
+        return 0, 0
+    return int.from_bytes(png[16:20], "big"), int.from_bytes(png[20:24], "big")
+
+
+def downscale_png(png: bytes, width: int) -> bytes:
+    """Returns a PNG scaled down to `width` (aspect kept). Unchanged if already narrower."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(png)) as image:
+        if image.width <= width:
+            return png
+        height = max(1, round(image.height * width / image.width))
+        small = image.convert("RGB").resize((width, height), Image.BILINEAR)
+    out = io.BytesIO()
+    small.save(out, format="PNG", optimize=False, compress_level=6)
+    return out.getvalue()
+
+
+class Screenshot:
+    """One captured frame and the history parts that carry it."""
+
+    def __init__(self, png: bytes, url: str = ""):
+        self.png = png
+        self.url = url
+        self.width, self.height = png_size(png)
+        self.fidelity = "full"      # full | thumbnail | dropped
+        self._b64: Optional[str] = None
+        self._blobs: list = []       # Blob / FunctionResponseBlob objects sharing `data`
+        self._parts: list = []       # Part objects (initial screenshot)
+        self._responses: list = []   # FunctionResponse objects
+
+    @property
+    def b64(self) -> str:
+        """Base64 of the full-fidelity PNG for the frontend, encoded once."""
+        if self._b64 is None:
+            self._b64 = base64.b64encode(self.png).decode("utf-8")
+        return self._b64
+
+    @property
+    def tokens(self) -> int:
+        """Image tokens this frame currently costs in the history (all copies)."""
+        if self.fidelity == "dropped":
+            return 0
+        copies = len(self._blobs) or 1
+        return estimate_image_tokens(self.width, self.height) * copies
+
+    def as_part(self) -> types.Part:
+        part = types.Part.from_bytes(data=self.png, mime_type="image/png")
+        self._parts.append(part)
+        self._blobs.append(part.inline_data)
+        return part
+
+    def as_function_response(self, call_id, name: str, response: dict) -> types.FunctionResponse:
+        blob = types.FunctionResponseBlob(mime_type="image/png", data=self.png)
+        function_response = types.FunctionResponse(
+            name=name,
+            id=call_id,  # critical for matching request-response
+            response=response,
+            parts=[types.FunctionResponsePart(inline_data=blob)],
+        )
+        self._responses.append(function_response)
+        self._blobs.append(blob)
+        return function_response
+
+    def downscale(self, width: int):
+        if self.fidelity != "full" or self.width <= width:
+            return
+        small = downscale_png(self.png, width)
+        for blob in self._blobs:
+            blob.data = small
+        self.width, self.height = png_size(small)
+        self.fidelity = "thumbnail"
+
+    def drop(self):
+        if self.fidelity == "dropped":
+            return
+        for part in self._parts:
+            part.inline_data = None
+            part.text = DROPPED_NOTE
+        for function_response in self._responses:
+            function_response.parts = None
+        self._blobs = []
+        self.fidelity = "dropped"
+
+
+class ScreenshotManager:
+    """
+    Args:
+        keep_full: Most recent screenshots kept at full resolution.
+        thumbnail_width: Width older screenshots are shrunk to.
+        max_images: Screenshots kept in the history at all; older ones become a text note.
+        settle_timeout: Upper bound in seconds for waiting on a page after an action.
+        dom_quiet_ms: How long the DOM must stay unchanged to count as settled.
+    """
+
+    def __init__(self, keep_full: int = DEFAULT_KEEP_FULL, thumbnail_width: int = DEFAULT_THUMBNAIL_WIDTH,
+                 max_images: int = DEFAULT_MAX_IMAGES, settle_timeout: float = DEFAULT_SETTLE_TIMEOUT,
+                 dom_quiet_ms: int = DEFAULT_DOM_QUIET_MS):
+        self.keep_full = max(1, keep_full)
+        self.thumbnail_width = thumbnail_width
+        self.max_images = max(self.keep_full, max_images)
+        self.settle_timeout = settle_timeout
+        self.dom_quiet_ms = dom_quiet_ms
+
+        self.shots: List[Screenshot] = []
+        self.turns: List[dict] = []
+        self._turn_start: Optional[float] = None
+
+        # Counters
+        self.captures = 0
+        self.settle_seconds = 0.0
+        self.capture_seconds = 0.0
+
+    # --- Page ---
+
+    async def settle(self, page) -> float:
+        """Waits until the page stops changing (bounded by settle_timeout). Returns seconds waited."""
+        start = time.perf_counter()
+        deadline = start + self.settle_timeout
+
+        def remaining_ms() -> float:
+            return max(0.0, (deadline - time.perf_counter()) * 1000.0)
+
+        while remaining_ms() > 0:
+            try:
+                await page.evaluate(_DOM_QUIET_JS, [self.dom_quiet_ms, remaining_ms()])
+                break
+            except Exception:
+                # Navigation destroyed the execution context: wait for the new document
+                try:
+                    await page.wait_for_load_state("domcontentloaded", timeout=remaining_ms() or 1)
+                except Exception:
+                    break
+        if remaining_ms() > 0:
+            try:
+                await page.wait_for_load_state("networkidle", timeout=remaining_ms())
+            except Exception:
+                pass  # long-polling pages never go idle; the DOM is quiet, move on
+
+        elapsed = time.perf_counter() - start
+        self.settle_seconds += elapsed
+        return elapsed
+
+    async def capture(self, page) -> Screenshot:
+        start = time.perf_counter()
+        shot = Screenshot(await page.screenshot(type="png"), page.url)
+        self.capture_seconds += time.perf_counter() - start
+        self.captures += 1
+        self.shots.append(shot)
+        return shot
+
+    # --- History budget ---
+
+    def compact(self):
+        """Shrinks or drops all but the newest screenshots. Call before each model request."""
+        for age, shot in enumerate(reversed(self.shots)):
+            if age < self.keep_full:
+                continue
+            if age < self.max_images:
+                shot.downscale(self.thumbnail_width)
+            else:
+                shot.drop()
+
+    def image_tokens(self) -> int:
+        return sum(shot.tokens for shot in self.shots)
+
+    # --- Per-turn accounting ---
+
+    def start_turn(self):
+        self._turn_start = time.perf_counter()
+
+    def end_turn(self, prompt_tokens: Optional[int] = None):
+        """Records the turn's duration, the history's image tokens and the model's reported prompt size."""
+        if self._turn_start is None:
+            return
+        self.turns.append({
+            "seconds": round(time.perf_counter() - self._turn_start, 3),
+            "image_tokens": self.image_tokens(),
+            "prompt_tokens": prompt_tokens,
+        })
+        self._turn_start = None
+
+    def stats(self) -> dict:
+        turns = len(self.turns)
+        return {
+            "turns": turns,
+            "captures": self.captures,
+            "avg_turn_seconds": round(sum(t["seconds"] for t in self.turns) / turns, 3) if turns else None,
+            "avg_image_tokens": round(sum(t["image_tokens"] for t in self.turns) / turns) if turns else None,
+            "settle_seconds": round(self.settle_seconds, 3),
+            "capture_seconds": round(self.capture_seconds, 3),
+            "history": {f: sum(1 for s in self.shots if s.fidelity == f) for f in ("full", "thumbnail", "dropped")},
+        }
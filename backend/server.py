@@ -26,12 +26,20 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 import jarvis
 from authenticator import FaceAuthenticator
 from kasa_agent import KasaAgent
+from audio_viz import AudioVisualizer
+from socket_emitter import SocketEmitter
+from cad_transport import encode_cad_file, DEFAULT_CAD_TRANSPORT, DEFAULT_PREVIEW_MAX_TRIANGLES
+from printer_telemetry import PrinterTelemetry
+from web_scheduler import update_events
 
 # Create a Socket.IO server
 sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
 app = FastAPI()
 app_socketio = socketio.ASGIApp(sio, app)
 
+# Ordered, bounded delivery for high-rate AudioLoop callbacks
+emitter = SocketEmitter(sio)
+
 import signal
 
 # --- SHUTDOWN HANDLER ---
@@ -42,6 +50,8 @@ def signal_handler(sig, frame):
         try:
             print("[SERVER] Stopping Audio Loop...")
             audio_loop.stop() 
+            # os._exit skips atexit, so drain the chat writer here
+            audio_loop.project_manager.close()
         except:
             pass
     # Force kill
@@ -72,7 +82,17 @@ DEFAULT_SETTINGS = {
     },
     "printers": [], # List of {host, port, name, type}
     "kasa_devices": [], # List of {ip, alias, model}
-    "camera_flipped": False # Invert cursor horizontal direction
+    "camera_flipped": False, # Invert cursor horizontal direction
+    "vad_mode": "energy", # Voice activity detector: energy | zcr | hangover
+    "playback_jitter_ms": 80, # Audio buffered before playback starts (higher = fewer clicks, more latency)
+    "audio_viz_mode": "levels", # Visualizer feed: levels | peaks | binary | raw (legacy JSON list)
+    "audio_viz_rate_hz": 30, # Max visualizer updates per second for levels/peaks
+    "cad_transport": "mesh", # cad_data encoding: mesh (indexed binary) | stl (binary STL) | base64 (legacy)
+    "cad_preview_max_triangles": 200000, # Decimate CAD previews above this many triangles (0 = never)
+    "cad_candidates": 1, # Concurrent speculative CAD generations; first valid model wins (1 = sequential retries)
+    "cad_temperature_range": [0.6, 1.2], # Temperatures spread across speculative candidates
+    "browser_pool_size": 2, # Pre-warmed browser contexts kept for the web agent (= concurrent web tasks)
+    "slice_timeout_s": 300 # Slicer process tree is killed after this many seconds
 }
 
 SETTINGS = DEFAULT_SETTINGS.copy()
@@ -209,32 +229,40 @@ async def start_audio(sid, data=None):
 
 
     # Callback to send audio data to frontend
+    # Downsampled to compact binary bar levels instead of a JSON list of every PCM byte
+    visualizer = AudioVisualizer(
+        mode=SETTINGS.get("audio_viz_mode", "levels"),
+        rate_hz=SETTINGS.get("audio_viz_rate_hz", 30)
+    )
+
     def on_audio_data(data_bytes):
-        # We need to schedule this on the event loop
-        # This is high frequency, so we might want to downsample or batch if it's too much
-        asyncio.create_task(sio.emit('audio_data', {'data': list(data_bytes)}))
+        payload = visualizer.process(data_bytes)
+        if payload is not None:
+            emitter.emit('audio_data', payload)
 
     # Callback to send CAL data to frontend
     def on_cad_data(data):
-        info = f"{len(data.get('vertices', []))} vertices" if 'vertices' in data else f"{len(data.get('data', ''))} bytes (STL)"
-        print(f"Sending CAD data to frontend: {info}")
-        asyncio.create_task(sio.emit('cad_data', data))
+        stats = data.get('stats', {})
+        print(f"Sending CAD data to frontend: {stats.get('bytes')} bytes ({stats.get('transport')}, encoded in {stats.get('encode_ms')} ms)")
+        emitter.emit('cad_data', data)
 
     # Callback to send Browser data to frontend
     def on_web_data(data):
-        print(f"Sending Browser data to frontend: {len(data.get('log', ''))} chars logs")
-        asyncio.create_task(sio.emit('browser_frame', data))
+        print(f"Sending Browser data to frontend: task {data.get('task_id')} ({data.get('state')}), {len(data.get('log') or '')} chars logs")
+        # State and logs in order on 'web_task_update'; only the image is latest-wins on 'browser_frame'
+        for event, payload in update_events(data):
+            emitter.emit(event, payload)
         
     # Callback to send Transcription data to frontend
     def on_transcription(data):
         # data = {"sender": "User"|"JARVIS", "text": "..."}
-        asyncio.create_task(sio.emit('transcription', data))
+        emitter.emit('transcription', data)
 
     # Callback to send Confirmation Request to frontend
     def on_tool_confirmation(data):
         # data = {"id": "uuid", "tool": "tool_name", "args": {...}}
         print(f"Requesting confirmation for tool: {data.get('tool')}")
-        asyncio.create_task(sio.emit('tool_confirmation_request', data))
+        emitter.emit('tool_confirmation_request', data)
 
     # Callback to send CAD status to frontend
     def on_cad_status(status):
@@ -243,31 +271,31 @@ async def start_audio(sid, data=None):
         # - a dict with {status, attempt, max_attempts, error} (from CadAgent)
         if isinstance(status, dict):
             print(f"Sending CAD Status: {status.get('status')} (attempt {status.get('attempt')}/{status.get('max_attempts')})")
-            asyncio.create_task(sio.emit('cad_status', status))
+            emitter.emit('cad_status', status)
         else:
             # Legacy: simple string
             print(f"Sending CAD Status: {status}")
-            asyncio.create_task(sio.emit('cad_status', {'status': status}))
+            emitter.emit('cad_status', {'status': status})
 
     # Callback to send CAD thoughts to frontend (streaming)
     def on_cad_thought(thought_text):
-        asyncio.create_task(sio.emit('cad_thought', {'text': thought_text}))
+        emitter.emit('cad_thought', {'text': thought_text})
 
     # Callback to send Project Update to frontend
     def on_project_update(project_name):
         print(f"Sending Project Update: {project_name}")
-        asyncio.create_task(sio.emit('project_update', {'project': project_name}))
+        emitter.emit('project_update', {'project': project_name})
 
     # Callback to send Device Update to frontend
     def on_device_update(devices):
         # devices is a list of dicts
         print(f"Sending Kasa Device Update: {len(devices)} devices")
-        asyncio.create_task(sio.emit('kasa_devices', devices))
+        emitter.emit('kasa_devices', devices)
 
     # Callback to send Error to frontend
     def on_error(msg):
         print(f"Sending Error to frontend: {msg}")
-        asyncio.create_task(sio.emit('error', {'msg': msg}))
+        emitter.emit('error', {'msg': msg})
 
     # Initialize JARVIS
     try:
@@ -287,7 +315,15 @@ async def start_audio(sid, data=None):
 
             input_device_index=device_index,
             input_device_name=device_name,
-            kasa_agent=kasa_agent
+            kasa_agent=kasa_agent,
+            vad_mode=SETTINGS.get("vad_mode"),
+            playback_jitter_ms=SETTINGS.get("playback_jitter_ms", 80),
+            cad_transport=SETTINGS.get("cad_transport", DEFAULT_CAD_TRANSPORT),
+            cad_preview_max_triangles=SETTINGS.get("cad_preview_max_triangles", DEFAULT_PREVIEW_MAX_TRIANGLES),
+            cad_candidates=SETTINGS.get("cad_candidates", 1),
+            cad_temperature_range=SETTINGS.get("cad_temperature_range", [0.6, 1.2]),
+            browser_pool_size=SETTINGS.get("browser_pool_size", 2),
+            slice_timeout=SETTINGS.get("slice_timeout_s", 300)
         )
         print("AudioLoop initialized successfully.")
 
@@ -329,6 +365,12 @@ async def start_audio(sid, data=None):
                     printer_type=p.get("type", "moonraker"),
                     camera_url=p.get("camera_url")
                 )
+
+        # Restore previously identified printers from disk (no probing), so the
+        # printer list is complete before the first discovery cycle
+        if audio_loop.printer_agent:
+            audio_loop.printer_agent.restore_cached_printers()
+            await sio.emit('printer_list', [p.to_dict() for p in audio_loop.printer_agent.printers.values()])
         
         # Start Printer Monitor
         asyncio.create_task(monitor_printers_loop())
@@ -342,36 +384,27 @@ async def start_audio(sid, data=None):
 
 
 async def monitor_printers_loop():
-    """Background task to query printer status periodically."""
+    """Background task keeping push subscriptions (polling as fallback) for every known printer."""
     print("[SERVER] Starting Printer Monitor Loop")
-    while audio_loop and audio_loop.printer_agent:
-        try:
-            agent = audio_loop.printer_agent
-            if not agent.printers:
-                await asyncio.sleep(5)
-                continue
-                
-            tasks = []
-            for host, printer in agent.printers.items():
-                if printer.printer_type.value != "unknown":
-                    tasks.append(agent.get_print_status(host))
-            
-            if tasks:
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                for res in results:
-                    if isinstance(res, Exception):
-                        pass # Ignore errors for now
-                    elif res:
-                        # res is PrintStatus object
-                        await sio.emit('print_status_update', res.to_dict())
-                        
-        except asyncio.CancelledError:
-            print("[SERVER] Printer Monitor Cancelled")
-            break
-        except Exception as e:
-            print(f"[SERVER] Monitor Loop Error: {e}")
-            
-        await asyncio.sleep(2) # Update every 2 seconds for responsiveness
+    agent = audio_loop.printer_agent if audio_loop else None
+    if agent is None:
+        return
+
+    async def emit_status(status):
+        # Only called when a printer's status actually changed
+        await sio.emit('print_status_update', status)
+
+    telemetry = PrinterTelemetry(agent, on_update=emit_status)
+    try:
+        while audio_loop and audio_loop.printer_agent is agent:
+            # Picks up printers added by discovery or add_printer
+            telemetry.sync()
+            await asyncio.sleep(5)
+    except asyncio.CancelledError:
+        print("[SERVER] Printer Monitor Cancelled")
+    finally:
+        await telemetry.close()
+        print(f"[SERVER] Printer Monitor stopped: {telemetry.stats()['emitted']} updates emitted")
 
 @sio.event
 async def stop_audio(sid):
@@ -436,6 +469,10 @@ async def shutdown(sid, data=None):
     if authenticator:
         print("[SERVER] Stopping Authenticator...")
         authenticator.stop()
+
+    # Deliver anything still queued for the frontend
+    await emitter.stop()
+    print(f"[SERVER] Emitter stats: {emitter.stats()}")
     
     print("[SERVER] Graceful shutdown complete. Terminating process...")
     
@@ -464,11 +501,12 @@ async def user_input(sid, data):
             
         # Use the same 'send' method that worked for audio, as 'send_realtime_input' and 'send_client_content' seem unstable in this env
         # INJECT VIDEO FRAME IF AVAILABLE (VAD-style logic for Text Input)
-        if audio_loop and audio_loop._latest_image_payload:
+        frame_payload = audio_loop.use_latest_frame() if audio_loop else None
+        if frame_payload:
             print(f"[SERVER DEBUG] Piggybacking video frame with text input.")
             try:
                 # Send frame first
-                await audio_loop.session.send(input=audio_loop._latest_image_payload, end_of_turn=False)
+                await audio_loop.session.send(input=frame_payload, end_of_turn=False)
             except Exception as e:
                 print(f"[SERVER DEBUG] Failed to send piggyback frame: {e}")
                 
@@ -486,9 +524,8 @@ async def video_frame(sid, data):
     # data should contain 'image' which is binary (blob) or base64 encoded
     image_data = data.get('image')
     if image_data and audio_loop:
-        # We don't await this because we don't want to block the socket handler
-        # But send_frame is async, so we create a task
-        asyncio.create_task(audio_loop.send_frame(image_data))
+        # Inline reference swap - the frame is only encoded if VAD sends it
+        audio_loop.store_frame(image_data)
 
 @sio.event
 async def save_memory(sid, data):
@@ -609,7 +646,7 @@ async def iterate_cad(sid, data):
         result = await audio_loop.cad_agent.iterate_prototype(prompt, output_dir=cad_output_dir)
         
         if result:
-            info = f"{len(result.get('data', ''))} bytes (STL)"
+            info = f"{result.get('stats', {}).get('bytes')} bytes ({result.get('format')})"
             print(f"Sending updated CAD data: {info}")
             await sio.emit('cad_data', result)
             # Save to Project
@@ -645,7 +682,7 @@ async def generate_cad(sid, data):
         result = await audio_loop.cad_agent.generate_prototype(prompt, output_dir=cad_output_dir)
         
         if result:
-            info = f"{len(result.get('data', ''))} bytes (STL)"
+            info = f"{result.get('stats', {}).get('bytes')} bytes ({result.get('format')})"
             print(f"Sending newly generated CAD data: {info}")
             await sio.emit('cad_data', result)
 
@@ -666,7 +703,7 @@ async def generate_cad(sid, data):
 
 @sio.event
 async def prompt_web_agent(sid, data):
-    # data: { prompt: "find xyz" }
+    # data: { prompt: "find xyz", priority?: int }
     prompt = data.get('prompt')
     print(f"Received web agent prompt: '{prompt}'")
     
@@ -675,26 +712,34 @@ async def prompt_web_agent(sid, data):
         return
 
     try:
-        await sio.emit('status', {'msg': 'Web Agent running...'})
-        
-        # We assume web_agent has a run method or similar.
-        # This might block the loop if not strictly async or offloaded.
-        # Ideally web_agent.run is async.
-        # And it should emit 'browser_snap' and logs automatically via hooks if setup.
-        
-        # We might need to launch this as a task if it's long running?
-        # asyncio.create_task(audio_loop.web_agent.run(prompt))
-        # But we want to catch errors here.
-        
-        # Based on typical agent design, run() is the entry point.
-        await audio_loop.web_agent.run(prompt)
-        
-        await sio.emit('status', {'msg': 'Web Agent finished'})
-        
+        # Queued on the scheduler; progress arrives as 'web_task_update' / 'browser_frame' events tagged with task_id
+        task = audio_loop.web_scheduler.submit(prompt, priority=int(data.get('priority', 0)))
+        await sio.emit('status', {'msg': f'Web Agent task {task.id} queued', 'task_id': task.id})
+        result = await audio_loop.web_scheduler.wait(task.id)
+        await sio.emit('status', {'msg': 'Web Agent finished', 'task_id': task.id, 'result': result})
+    except asyncio.CancelledError:
+        await sio.emit('status', {'msg': 'Web Agent task cancelled'})
     except Exception as e:
         print(f"Error running Web Agent: {e}")
         await sio.emit('error', {'msg': f"Web Agent Error: {str(e)}"})
 
+@sio.event
+async def cancel_web_task(sid, data):
+    # data: { task_id: "..." }
+    if not audio_loop:
+        return
+    task_id = data.get('task_id')
+    cancelled = audio_loop.web_scheduler.cancel(task_id)
+    print(f"Cancel web task {task_id}: {'ok' if cancelled else 'not running'}")
+    await sio.emit('web_tasks', audio_loop.web_scheduler.list())
+
+@sio.event
+async def list_web_tasks(sid):
+    if not audio_loop:
+        await sio.emit('web_tasks', [], room=sid)
+        return
+    await sio.emit('web_tasks', audio_loop.web_scheduler.list(), room=sid)
+
 @sio.event
 async def discover_printers(sid):
     print("Received discover_printers request")
@@ -722,7 +767,13 @@ async def discover_printers(sid):
             return
         
     try:
-        printers = await audio_loop.printer_agent.discover_printers()
+        agent = audio_loop.printer_agent
+
+        async def on_printer(printer):
+            # Progressive results: re-send the growing list as each printer is identified
+            await sio.emit('printer_list', [p.to_dict() for p in agent.printers.values()])
+
+        printers = await agent.discover_printers(on_printer=on_printer)
         await sio.emit('printer_list', printers)
         await sio.emit('status', {'msg': f"Found {len(printers)} printers"})
     except Exception as e:
@@ -838,18 +889,13 @@ async def print_stl(sid, data):
         if resolved_stl and os.path.exists(resolved_stl):
             # Open the STL in the CAD module for preview
             try:
-                import base64
-                with open(resolved_stl, 'rb') as f:
-                    stl_data = f.read()
-                stl_b64 = base64.b64encode(stl_data).decode('utf-8')
-                stl_filename = os.path.basename(resolved_stl)
-                
-                print(f"[SERVER] Opening STL in CAD module: {stl_filename}")
-                await sio.emit('cad_data', {
-                    'format': 'stl',
-                    'data': stl_b64,
-                    'filename': stl_filename
-                })
+                payload = await asyncio.to_thread(
+                    encode_cad_file, resolved_stl,
+                    SETTINGS.get("cad_transport", DEFAULT_CAD_TRANSPORT),
+                    SETTINGS.get("cad_preview_max_triangles", DEFAULT_PREVIEW_MAX_TRIANGLES)
+                )
+                print(f"[SERVER] Opening STL in CAD module: {payload['filename']}")
+                await sio.emit('cad_data', payload)
             except Exception as e:
                 print(f"[SERVER] Warning: Could not preview STL: {e}")
         
@@ -878,6 +924,16 @@ async def print_stl(sid, data):
         print(f"Error printing STL: {e}")
         await sio.emit('error', {'msg': f"Print Failed: {str(e)}"})
 
+@sio.event
+async def cancel_slicing(sid, data=None):
+    """Stops the running slice (kills the slicer process tree); print_stl then reports 'cancelled'."""
+    if not audio_loop or not audio_loop.printer_agent:
+        return
+    cancelled = audio_loop.printer_agent.cancel_slicing()
+    print(f"[SERVER] Cancelled {cancelled} slicing job(s)")
+    if cancelled:
+        await sio.emit('slicing_progress', {'printer': (data or {}).get('printer'), 'percent': 100, 'message': 'Cancelled'})
+
 @sio.event
 async def get_slicer_profiles(sid):
     """Get available OrcaSlicer profiles for manual selection."""
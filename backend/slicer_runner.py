@@ -0,0 +1,277 @@
+# File: slicer_runner.py - Purpose: This file handles Slicer Runner functionality.
+"""
+Async runner for the OrcaSlicer / PrusaSlicer command line.
+
+slice_stl used to run the slicer through `asyncio.to_thread(subprocess.run,
+capture_output=True)`: one thread held for the whole slice, all output buffered
+in memory, no timeout, and progress faked as 5/10/90/100. SlicerProcess
+instead:
+
+- streams stdout and stderr line by line (only the last lines are kept, for
+  error messages)
+- parses the slicers' status lines into real percentages
+  (PrusaSlicer: "30 => Generating perimeters"; OrcaSlicer logs
+  "... slicing status: 30%, Generating perimeters" style messages)
+- kills the whole process tree on timeout or cancel(), so helper processes
+  spawned by the slicer do not outlive it
+
+Where asyncio subprocesses are unavailable (Windows selector event loops), it
+falls back to Popen with reader threads; progress and cancellation still work.
+"""
+
+import asyncio
+import inspect
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+DEFAULT_SLICE_TIMEOUT = 300.0
+TERMINATE_GRACE = 2.0      # seconds between SIGTERM and SIGKILL
+OUTPUT_TAIL_LINES = 200
+
+_TIMEOUT = object()
+_CANCELLED = object()
+
+# PrusaSlicer CLI: "<percent> => <message>"
+_PRUSA_RE = re.compile(r"^\s*(\d{1,3})\s*=>\s*(.*)$")
+# OrcaSlicer / BambuStudio CLI logs: "... status: 30%, message" / "... progress 30 - message"
+_ORCA_RE = re.compile(r"(?:status|progress|percent)\D{0,20}?(\d{1,3})(?:\.\d+)?\s*%?\s*[,:\-]?\s*(.*)$", re.I)
+
+
+def parse_progress(line: str) -> Optional[Tuple[int, str]]:
+    """Returns (percent, message) for a slicer status line, or None."""
+    match = _PRUSA_RE.match(line) or _ORCA_RE.search(line)
+    if not match:
+        return None
+    percent = int(match.group(1))
+    if percent > 100:
+        return None
+    return percent, match.group(2).strip()
+
+
+@dataclass
+class SlicerResult:
+    returncode: Optional[int]
+    duration: float
+    cancelled: bool = False
+    timed_out: bool = False
+    output: List[str] = field(default_factory=list)   # last lines of stdout + stderr
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.cancelled and not self.timed_out
+
+    @property
+    def error(self) -> str:
+        if self.cancelled:
+            return "Slicing cancelled"
+        if self.timed_out:
+            return f"Slicing timed out after {self.duration:.0f}s"
+        return "\n".join(self.output[-20:]) or f"Slicer exited with code {self.returncode}"
+
+
+class SlicerProcess:
+    """
+    Args:
+        cmd: Slicer command line.
+        progress_callback: Called as progress_callback(percent, message) (may be async).
+            Slicer percentages are mapped onto `progress_range`.
+        timeout: Seconds before the process tree is killed (None = no limit).
+        progress_range: (start, end) percentages reported for slicer 0..100 %.
+    """
+
+    def __init__(self, cmd: List[str], progress_callback: Optional[Callable] = None,
+                 timeout: Optional[float] = DEFAULT_SLICE_TIMEOUT,
+                 progress_range: Tuple[int, int] = (10, 90)):
+        self.cmd = cmd
+        self.progress_callback = progress_callback
+        self.timeout = timeout
+        self.progress_range = progress_range
+        self.percent = progress_range[0]
+        self._reported = -1
+        self.pid: Optional[int] = None
+        self._tail = deque(maxlen=OUTPUT_TAIL_LINES)
+        self._cancel = asyncio.Event()
+        self._cancelled = False
+
+    def cancel(self):
+        """Stops the slice; run() kills the process tree and returns a cancelled result."""
+        self._cancelled = True
+        self._cancel.set()
+
+    async def run(self) -> SlicerResult:
+        start = time.perf_counter()
+        lines: asyncio.Queue = asyncio.Queue()
+        try:
+            proc, readers = await self._start_async(lines)
+        except NotImplementedError:
+            proc, readers = self._start_threaded(lines)
+        self.pid = proc.pid
+
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        timed_out = False
+        returncode = None
+        cancel_wait = asyncio.ensure_future(self._cancel.wait())
+        try:
+            open_streams = 2
+            while open_streams and not self._cancelled:
+                line = await self._next(lines, cancel_wait, deadline)
+                if line is _TIMEOUT:
+                    timed_out = True
+                    break
+                if line is None:
+                    open_streams -= 1
+                elif line is not _CANCELLED:
+                    await self._handle_line(line)
+            if not (self._cancelled or timed_out):
+                # Output closed; the process should be exiting
+                exit_wait = asyncio.ensure_future(self._wait(proc))
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                await asyncio.wait([exit_wait, cancel_wait], timeout=remaining,
+                                   return_when=asyncio.FIRST_COMPLETED)
+                if exit_wait.done():
+                    returncode = exit_wait.result()
+                else:
+                    exit_wait.cancel()
+                    timed_out = not self._cancelled
+        except asyncio.CancelledError:
+            self._cancelled = True
+            raise
+        finally:
+            cancel_wait.cancel()
+            if self._cancelled or timed_out:
+                kill_process_tree(proc)
+            if returncode is None:
+                returncode = await self._wait(proc)
+            for reader in readers:
+                if isinstance(reader, asyncio.Task):
+                    reader.cancel()
+
+        duration = time.perf_counter() - start
+        if timed_out:
+            print(f"[SLICER] Timeout after {duration:.0f}s, killed process tree {self.pid}")
+        elif self._cancelled:
+            print(f"[SLICER] Cancelled, killed process tree {self.pid}")
+        return SlicerResult(returncode=returncode, duration=duration, cancelled=self._cancelled,
+                            timed_out=timed_out, output=list(self._tail))
+
+    async def _next(self, lines: asyncio.Queue, cancel_wait: asyncio.Future, deadline: Optional[float]):
+        """Next output line, None at end of a stream, or _TIMEOUT / _CANCELLED."""
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            return _TIMEOUT
+        if not lines.empty():
+            return lines.get_nowait()
+        get = asyncio.ensure_future(lines.get())
+        done, _ = await asyncio.wait([get, cancel_wait], timeout=remaining,
+                                     return_when=asyncio.FIRST_COMPLETED)
+        if get in done:
+            return get.result()
+        get.cancel()
+        return _CANCELLED if cancel_wait in done else _TIMEOUT
+
+    # --- Output handling ---
+
+    async def _handle_line(self, line: str):
+        line = line.rstrip()
+        if not line:
+            return
+        self._tail.append(line)
+        print(f"[SLICER OUTPUT] {line}")
+        parsed = parse_progress(line)
+        if parsed is None or self.progress_callback is None:
+            return
+        percent, message = parsed
+        low, high = self.progress_range
+        mapped = low + (high - low) * percent // 100
+        if mapped <= self._reported:
+            return  # only report forward progress
+        self.percent = self._reported = mapped
+        try:
+            result = self.progress_callback(mapped, message or "Slicing...")
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            print(f"[SLICER] [WARN] Progress callback failed: {e}")
+
+    # --- Process start / wait ---
+
+    def _popen_kwargs(self) -> dict:
+        # Own process group / session so the whole tree can be killed
+        if sys.platform == "win32":
+            return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+        return {"start_new_session": True}
+
+    async def _start_async(self, lines: asyncio.Queue):
+        proc = await asyncio.create_subprocess_exec(
+            *self.cmd, stdin=subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+            **self._popen_kwargs())
+
+        async def pump(stream):
+            try:
+                while True:
+                    raw = await stream.readline()
+                    if not raw:
+                        break
+                    await lines.put(raw.decode("utf-8", errors="replace"))
+            finally:
+                lines.put_nowait(None)
+
+        readers = [asyncio.create_task(pump(proc.stdout)), asyncio.create_task(pump(proc.stderr))]
+        return proc, readers
+
+    def _start_threaded(self, lines: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        proc = subprocess.Popen(self.cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, **self._popen_kwargs())
+
+        def pump(stream):
+            try:
+                for raw in iter(stream.readline, b""):
+                    loop.call_soon_threadsafe(lines.put_nowait, raw.decode("utf-8", errors="replace"))
+            finally:
+                loop.call_soon_threadsafe(lines.put_nowait, None)
+
+        readers = [threading.Thread(target=pump, args=(s,), daemon=True) for s in (proc.stdout, proc.stderr)]
+        for reader in readers:
+            reader.start()
+        return proc, readers
+
+    async def _wait(self, proc) -> Optional[int]:
+        if isinstance(proc, subprocess.Popen):
+            return await asyncio.to_thread(proc.wait)
+        return await proc.wait()
+
+
+def kill_process_tree(proc, grace: float = TERMINATE_GRACE):
+    """Terminates the slicer and everything it spawned (SIGKILL after `grace` seconds)."""
+    if sys.platform == "win32":
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return
+    # start_new_session made the slicer a process group leader: pgid == pid,
+    # which still addresses its children after the slicer itself has exited
+    pgid = proc.pid
+    try:
+        os.killpg(pgid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+
+    def escalate():
+        try:
+            os.killpg(pgid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    # Children that ignore SIGTERM are killed after the grace period
+    timer = threading.Timer(grace, escalate)
+    timer.daemon = True
+    timer.start()
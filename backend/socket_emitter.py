@@ -0,0 +1,199 @@
+# File: socket_emitter.py - Purpose: This file handles Socket Emitter functionality.
+"""
+Bounded, coalescing Socket.IO emitter.
+
+The AudioLoop callbacks in server.start_audio used to do a fire-and-forget
+`asyncio.create_task(sio.emit(...))` per event. When the model streams fast
+that creates an unbounded number of tasks with no ordering guarantee.
+SocketEmitter queues events instead and a single sender task delivers them
+in order. Each event type has a bounded queue and a drop policy:
+
+- latest: only the newest pending payload is kept (audio levels, browser screenshots;
+  web task state and logs go on the FIFO `web_task_update` instead)
+- append: consecutive text payloads are merged into one (transcription, cad_thought)
+- fifo:   delivered in order; when the per-event bound is hit the oldest is dropped
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+LATEST = "latest"
+APPEND = "append"
+FIFO = "fifo"
+
+DEFAULT_MAX_QUEUE = 64
+
+DEFAULT_POLICIES = {
+    "audio_data": LATEST,
+    "browser_frame": LATEST,
+    "web_task_update": FIFO,
+    "transcription": APPEND,
+    "cad_thought": APPEND,
+}
+
+
+class _Entry:
+    __slots__ = ("event", "data", "enqueued_at", "dropped")
+
+    def __init__(self, event: str, data: Any):
+        self.event = event
+        self.data = data
+        self.enqueued_at = time.monotonic()
+        self.dropped = False
+
+
+def _merge_text(old: Any, new: Any) -> Optional[dict]:
+    """Merges two {'text': ...} payloads if everything except the text matches."""
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return None
+    if "text" not in old or "text" not in new or old.keys() != new.keys():
+        return None
+    if any(old[k] != new[k] for k in old if k != "text"):
+        return None
+    merged = dict(old)
+    merged["text"] = old["text"] + new["text"]
+    return merged
+
+
+class SocketEmitter:
+    """
+    Args:
+        sio: The socketio.AsyncServer to emit on.
+        policies: Event name -> LATEST / APPEND / FIFO. Unlisted events use FIFO.
+        max_queue: Per-event bound on pending FIFO / APPEND entries.
+    """
+
+    def __init__(self, sio, policies: Optional[Dict[str, str]] = None, max_queue: int = DEFAULT_MAX_QUEUE):
+        self.sio = sio
+        self.policies = dict(DEFAULT_POLICIES)
+        if policies:
+            self.policies.update(policies)
+        self.max_queue = max_queue
+
+        self._order: Deque[_Entry] = deque()             # global send order
+        self._pending: Dict[str, Deque[_Entry]] = {}     # per-event view of the same entries
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._send_lock = asyncio.Lock()  # keeps flush() and the sender task from interleaving
+
+        # Metrics
+        self.enqueued: Dict[str, int] = {}
+        self.sent: Dict[str, int] = {}
+        self.dropped: Dict[str, int] = {}
+        self.coalesced: Dict[str, int] = {}
+        self.emit_errors = 0
+        self._latency_total_ms = 0.0
+        self.max_latency_ms = 0.0
+
+    # --- Producer side ---
+
+    def emit(self, event: str, data: Any = None):
+        """Queue an event. Non-blocking; must be called from the event loop thread."""
+        self._ensure_started()
+        self.enqueued[event] = self.enqueued.get(event, 0) + 1
+
+        pending = self._pending.setdefault(event, deque())
+        policy = self.policies.get(event, FIFO)
+
+        if pending:
+            last = pending[-1]
+            if policy == LATEST:
+                last.data = data
+                self._count(self.coalesced, event)
+                return
+            if policy == APPEND:
+                merged = _merge_text(last.data, data)
+                if merged is not None:
+                    last.data = merged
+                    self._count(self.coalesced, event)
+                    return
+
+        if len(pending) >= self.max_queue:
+            oldest = pending.popleft()
+            oldest.dropped = True
+            self._count(self.dropped, event)
+
+        entry = _Entry(event, data)
+        pending.append(entry)
+        self._order.append(entry)
+        self._wakeup.set()
+
+    @staticmethod
+    def _count(counter: Dict[str, int], event: str):
+        counter[event] = counter.get(event, 0) + 1
+
+    # --- Sender task ---
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            if self._order:
+                self._wakeup.set()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self._drain()
+
+    async def _drain(self):
+        async with self._send_lock:
+            await self._drain_locked()
+
+    async def _drain_locked(self):
+        while self._order:
+            entry = self._order.popleft()
+            if entry.dropped:
+                continue
+            pending = self._pending.get(entry.event)
+            if pending and pending[0] is entry:
+                pending.popleft()
+
+            try:
+                await self.sio.emit(entry.event, entry.data)
+            except Exception as e:
+                self.emit_errors += 1
+                print(f"[EMITTER] [ERR] Failed to emit '{entry.event}': {e}")
+                continue
+
+            latency_ms = (time.monotonic() - entry.enqueued_at) * 1000.0
+            self._latency_total_ms += latency_ms
+            self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+            self._count(self.sent, entry.event)
+
+    async def flush(self):
+        """Sends everything still queued."""
+        await self._drain()
+
+    async def stop(self):
+        """Flushes pending events and stops the sender task."""
+        await self._drain()
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    # --- Metrics ---
+
+    @property
+    def queued(self) -> int:
+        return sum(len(p) for p in self._pending.values())
+
+    def stats(self) -> dict:
+        total_sent = sum(self.sent.values())
+        return {
+            "queued": self.queued,
+            "enqueued": dict(self.enqueued),
+            "sent": dict(self.sent),
+            "dropped": dict(self.dropped),
+            "coalesced": dict(self.coalesced),
+            "emit_errors": self.emit_errors,
+            "avg_latency_ms": round(self._latency_total_ms / total_sent, 2) if total_sent else None,
+            "max_latency_ms": round(self.max_latency_ms, 2),
+        }
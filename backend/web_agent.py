@@ -2,12 +2,13 @@
 import os
 import time
 import asyncio
-import base64
 from dotenv import load_dotenv
-from playwright.async_api import async_playwright
 from google import genai
 from google.genai import types
 
+from browser_pool import BrowserPool, DEFAULT_POOL_SIZE
+from screenshot_manager import ScreenshotManager, DEFAULT_KEEP_FULL, DEFAULT_MAX_IMAGES
+
 # 1. Load API Key
 load_dotenv()
 API_KEY = os.getenv("GEMINI_API_KEY")
@@ -22,11 +23,50 @@ SCREEN_HEIGHT = 900
 MODEL_ID = "gemini-2.5-computer-use-preview-10-2025"
 
 class WebAgent:
-    def __init__(self):
+    def __init__(self, pool: BrowserPool = None, pool_size: int = DEFAULT_POOL_SIZE,
+                 keep_full_screenshots: int = DEFAULT_KEEP_FULL, max_screenshots: int = DEFAULT_MAX_IMAGES):
         self.client = genai.Client(api_key=API_KEY)
+        # Long-lived Chromium with pre-warmed contexts, shared by all tasks
+        self.pool = pool or BrowserPool(
+            size=pool_size,
+            viewport={"width": SCREEN_WIDTH, "height": SCREEN_HEIGHT}
+        )
+        # Fallback page for direct execute_function_calls use; run_task keeps its
+        # page local so concurrent tasks never share one
         self.browser = None
         self.context = None
         self.page = None
+        self.last_start_latency_ms = None
+        # History budget per task: newest screenshots full size, older ones shrunk, oldest dropped
+        self.keep_full_screenshots = keep_full_screenshots
+        self.max_screenshots = max_screenshots
+        self.last_screenshot_stats = None
+        # Held so the loop keeps the task alive and close() can stop it
+        self._warm_task = None
+
+    def new_screenshot_manager(self) -> ScreenshotManager:
+        return ScreenshotManager(keep_full=self.keep_full_screenshots, max_images=self.max_screenshots)
+
+    def warm_up(self):
+        """Launches the browser pool in the background so the first task starts warm."""
+        async def _start():
+            try:
+                await self.pool.start()
+            except Exception as e:
+                print(f"[WebAgent] [WARN] Browser pool warm-up failed: {e}")
+        if self._warm_task is None or self._warm_task.done():
+            self._warm_task = asyncio.create_task(_start())
+        return self._warm_task
+
+    async def close(self):
+        if self._warm_task is not None and not self._warm_task.done():
+            self._warm_task.cancel()
+            try:
+                await self._warm_task
+            except asyncio.CancelledError:
+                pass
+        self._warm_task = None
+        await self.pool.close()
 
     def denormalize_x(self, x: int, width: int) -> int:
         return int((x / 1000) * width)
@@ -34,7 +74,9 @@ class WebAgent:
     def denormalize_y(self, y: int, height: int) -> int:
         return int((y / 1000) * height)
 
-    async def execute_function_calls(self, function_calls):
+    async def execute_function_calls(self, function_calls, page=None, screenshots: ScreenshotManager = None):
+        page = page or self.page
+        screenshots = screenshots or self.new_screenshot_manager()
         results = []
         
         for call in function_calls:
@@ -61,13 +103,13 @@ class WebAgent:
                 if fn_name == "open_web_browser":
                     pass 
                 elif fn_name == "navigate":
-                    await self.page.goto(args["url"])
+                    await page.goto(args["url"])
                 elif fn_name == "go_back":
-                    await self.page.go_back()
+                    await page.go_back()
                 elif fn_name == "go_forward":
-                    await self.page.go_forward()
+                    await page.go_forward()
                 elif fn_name == "search":
-                    await self.page.goto("https://www.google.com")
+                    await page.goto("https://www.google.com")
                 elif fn_name == "wait_5_seconds":
                     await asyncio.sleep(5)
 
@@ -75,7 +117,7 @@ class WebAgent:
                 elif fn_name == "click_at":
                     x = self.denormalize_x(args["x"], SCREEN_WIDTH)
                     y = self.denormalize_y(args["y"], SCREEN_HEIGHT)
-                    await self.page.mouse.click(x, y)
+                    await page.mouse.click(x, y)
                     
                 elif fn_name == "type_text_at":
                     x = self.denormalize_x(args["x"], SCREEN_WIDTH)
@@ -84,22 +126,22 @@ class WebAgent:
                     press_enter = args.get("press_enter", False)
                     clear_before = args.get("clear_before_typing", True)
                     
-                    await self.page.mouse.click(x, y)
+                    await page.mouse.click(x, y)
                     if clear_before:
                         # 'Meta+A' for Mac, 'Control+A' for Windows/Linux
                         # Simply using Control+A is usually fine for headless linux/windows envs
-                        await self.page.keyboard.press("Control+A") 
-                        await self.page.keyboard.press("Backspace")
+                        await page.keyboard.press("Control+A") 
+                        await page.keyboard.press("Backspace")
                     
-                    await self.page.keyboard.type(text)
+                    await page.keyboard.type(text)
                     if press_enter:
-                        await self.page.keyboard.press("Enter")
+                        await page.keyboard.press("Enter")
 
                 # --- MOUSE MOVEMENT / HOVER ---
                 elif fn_name == "hover_at":
                     x = self.denormalize_x(args["x"], SCREEN_WIDTH)
                     y = self.denormalize_y(args["y"], SCREEN_HEIGHT)
-                    await self.page.mouse.move(x, y)
+                    await page.mouse.move(x, y)
 
                 elif fn_name == "drag_and_drop":
                     start_x = self.denormalize_x(args["x"], SCREEN_WIDTH)
@@ -107,15 +149,15 @@ class WebAgent:
                     end_x = self.denormalize_x(args["destination_x"], SCREEN_WIDTH)
                     end_y = self.denormalize_y(args["destination_y"], SCREEN_HEIGHT)
                     
-                    await self.page.mouse.move(start_x, start_y)
-                    await self.page.mouse.down()
-                    await self.page.mouse.move(end_x, end_y)
-                    await self.page.mouse.up()
+                    await page.mouse.move(start_x, start_y)
+                    await page.mouse.down()
+                    await page.mouse.move(end_x, end_y)
+                    await page.mouse.up()
 
                 # --- KEYBOARD ---
                 elif fn_name == "key_combination":
                     key_comb = args.get("keys")
-                    await self.page.keyboard.press(key_comb)
+                    await page.keyboard.press(key_comb)
 
                 # --- SCROLLING ---
                 elif fn_name == "scroll_document" or fn_name == "scroll_at":
@@ -126,7 +168,7 @@ class WebAgent:
                     if fn_name == "scroll_at":
                         x = self.denormalize_x(args["x"], SCREEN_WIDTH)
                         y = self.denormalize_y(args["y"], SCREEN_HEIGHT)
-                        await self.page.mouse.move(x, y)
+                        await page.mouse.move(x, y)
 
                     dx, dy = 0, 0
                     if direction == "down": dy = magnitude
@@ -134,13 +176,13 @@ class WebAgent:
                     elif direction == "right": dx = magnitude
                     elif direction == "left": dx = -magnitude
                     
-                    await self.page.mouse.wheel(dx, dy)
+                    await page.mouse.wheel(dx, dy)
 
                 else:
                     print(f"[WARN] Warning: Model requested unimplemented function {fn_name}")
 
-                # Wait a moment for UI to settle
-                await asyncio.sleep(1)
+                # Wait for the UI to settle (DOM quiet + network idle, capped)
+                await screenshots.settle(page)
                 
             except Exception as e:
                 print(f"[ERR] Error executing {fn_name}: {e}")
@@ -154,57 +196,37 @@ class WebAgent:
         
         return results
 
-    async def get_function_responses(self, results):
+    async def get_function_responses(self, results, page=None, screenshots: ScreenshotManager = None):
+        page = page or self.page
+        screenshots = screenshots or self.new_screenshot_manager()
         # UPDATED: Changed "jpeg" to "png" to satisfy Computer Use model requirements
-        screenshot_bytes = await self.page.screenshot(type="png") 
-        current_url = self.page.url
+        # One capture per turn; every response shares the same bytes
+        shot = await screenshots.capture(page)
         
         function_responses = []
         for call_id, name, result in results:
-            response_data = {"url": current_url}
+            response_data = {"url": shot.url}
             response_data.update(result)
-            
-            # Construct the response object
-            # Note: The SDK might change how 'id' is passed. 
-            # If 'types.FunctionResponse' supports 'id', we pass it.
-            # Based on standard Google GenAI SDK usage for function calling:
-            function_responses.append(
-                types.FunctionResponse(
-                    name=name,
-                    id=call_id, # critical for matching request-response
-                    response=response_data,
-                    parts=[types.FunctionResponsePart(
-                        inline_data=types.FunctionResponseBlob(
-                            # UPDATED: Changed "image/jpeg" to "image/png"
-                            mime_type="image/png",
-                            data=screenshot_bytes
-                        )
-                    )]
-                )
-            )
-        return function_responses, screenshot_bytes
+            function_responses.append(shot.as_function_response(call_id, name, response_data))
+        return function_responses, shot
 
-    async def run_task(self, prompt, update_callback=None):
+    async def run_task(self, prompt, update_callback=None, task=None):
         """
         Runs the agent with the given prompt.
         update_callback: async function(screenshot_b64: str, logs: str)
+        task: optional WebTask (web_scheduler) updated with turn, url and screenshot stats.
         Returns the final response from the agent.
         """
         print(f"[START] WebAgent started. Goal: {prompt}")
         final_response = "Agent finished without a final summary."
 
-        async with async_playwright() as p:
-            # Launch browser (Headless=True usually, but for dev we might keep it hidden)
-            # Use headless=True for server deployment
-            self.browser = await p.chromium.launch(headless=True) 
-            self.context = await self.browser.new_context(
-                viewport={"width": SCREEN_WIDTH, "height": SCREEN_HEIGHT},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
-            self.page = await self.context.new_page()
-            
-            # Start at Google
-            await self.page.goto("https://www.google.com")
+        task_start = time.perf_counter()
+        screenshots = self.new_screenshot_manager()
+        # Pre-warmed context already parked on Google; replaced by a fresh one afterwards
+        async with self.pool.checkout() as slot:
+            page = slot.page
+            self.last_start_latency_ms = (time.perf_counter() - task_start) * 1000.0
+            print(f"[START] Browser ready in {self.last_start_latency_ms:.0f} ms ({self.pool.stats()['checkouts']} checkouts)")
 
             config = types.GenerateContentConfig(
                 tools=[types.Tool(
@@ -216,12 +238,11 @@ class WebAgent:
             )
 
             # UPDATED: Capture initial screenshot as PNG
-            initial_screenshot = await self.page.screenshot(type="png")
+            initial_screenshot = await screenshots.capture(page)
             
             # Send initial state
             if update_callback:
-                encoded_image = base64.b64encode(initial_screenshot).decode('utf-8')
-                await update_callback(encoded_image, "Web Agent Initialized")
+                await update_callback(initial_screenshot.b64, "Web Agent Initialized")
 
             chat_history = [
                 types.Content(
@@ -229,7 +250,7 @@ class WebAgent:
                     parts=[
                         types.Part(text=prompt),
                         # UPDATED: Use PNG mime type
-                        types.Part.from_bytes(data=initial_screenshot, mime_type="image/png")
+                        initial_screenshot.as_part()
                     ]
                 )
             ]
@@ -238,6 +259,11 @@ class WebAgent:
             
             for turn in range(MAX_TURNS):
                 print(f"\n--- Turn {turn + 1} ---")
+                if task is not None:
+                    task.turn = turn + 1
+                screenshots.start_turn()
+                # Keep the newest screenshots full size; shrink or drop older ones
+                await asyncio.to_thread(screenshots.compact)
                 
                 try:
                     response = await self.client.aio.models.generate_content(
@@ -255,6 +281,9 @@ class WebAgent:
                     print("[WARN] Model returned no content.")
                     break
                 
+                usage = getattr(response, "usage_metadata", None)
+                prompt_tokens = getattr(usage, "prompt_token_count", None)
+
                 candidate = response.candidates[0]
                 model_content = candidate.content
                 chat_history.append(model_content)
@@ -285,6 +314,7 @@ class WebAgent:
                 function_calls = [part.function_call for part in model_content.parts if part.function_call]
                 
                 if not function_calls:
+                    screenshots.end_turn(prompt_tokens)
                     if not has_tool_use:
                         print("[DONE] Task finished details.")
                         if update_callback: await update_callback(None, "Task Finished")
@@ -294,27 +324,36 @@ class WebAgent:
                         continue
 
                 # Execute Actions
-                results = await self.execute_function_calls(function_calls)
+                results = await self.execute_function_calls(function_calls, page=page, screenshots=screenshots)
                 
                 # Capture new state
                 print("[SNAP] Capturing new state...")
-                function_responses, screenshot_bytes = await self.get_function_responses(results)
+                function_responses, shot = await self.get_function_responses(results, page=page, screenshots=screenshots)
+                if task is not None:
+                    task.url = shot.url
                 
                 # Update frontend
                 if update_callback:
-                    encoded_image = base64.b64encode(screenshot_bytes).decode('utf-8')
                     # Format a log message from the actions taken
                     actions_log = ", ".join([r[1] for r in results])
-                    await update_callback(encoded_image, f"Executed: {actions_log}")
+                    await update_callback(shot.b64, f"Executed: {actions_log}")
 
                 # Send Response Back
                 response_parts = [types.Part(function_response=fr) for fr in function_responses]
                 chat_history.append(types.Content(role="user", parts=response_parts))
+                screenshots.end_turn(prompt_tokens)
 
-            await self.browser.close()
-            print("[CLOSE] Browser closed.")
-            return final_response
+        self.last_screenshot_stats = screenshots.stats()
+        if task is not None:
+            task.screenshot_stats = self.last_screenshot_stats
+        print(f"[CLOSE] Browser context returned to pool. Screenshots: {self.last_screenshot_stats}")
+        return final_response
 
 if __name__ == "__main__":
-    agent = WebAgent()
-    asyncio.run(agent.run_task("Go to google.com and search for 'Gemini API' pricing."))
\ No newline at end of file
+    async def main():
+        agent = WebAgent()
+        try:
+            await agent.run_task("Go to google.com and search for 'Gemini API' pricing.")
+        finally:
+            await agent.close()
+    asyncio.run(main())
\ No newline at end of file
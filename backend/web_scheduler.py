@@ -0,0 +1,251 @@
+# File: web_scheduler.py - Purpose: This file handles Web Scheduler functionality.
+"""
+Priority queue and concurrency limit for WebAgent tasks.
+
+`run_web_agent` tool calls used to start `WebAgent.run_task` directly, so
+parallel calls raced on the agent's shared `page` attribute and nothing
+bounded how many ran at once. WebTaskScheduler queues tasks by priority and
+runs at most `max_concurrent` of them, each on its own pooled page. Every
+task has a WebTask state object; queued or running tasks can be cancelled, and
+progress is reported through `on_update` tagged with the task id. For the UI,
+update_events() sends state changes and log lines in order on
+`web_task_update` and only screenshots on the latest-wins `browser_frame`, so
+one task's frames never replace another task's final state. Finished
+tasks stay listed for the UI, but only the last `keep_finished` of them, so the
+task table does not grow for the whole session.
+"""
+
+import asyncio
+import itertools
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_MAX_CONCURRENT = 2
+DEFAULT_KEEP_FINISHED = 20
+PRIORITY_LOW = -10
+PRIORITY_NORMAL = 0
+PRIORITY_HIGH = 10
+
+TASK_STATES = ("queued", "running", "done", "failed", "cancelled")
+
+# Socket events: ordered task state/log updates, and coalesced screenshots
+TASK_UPDATE_EVENT = "web_task_update"
+FRAME_EVENT = "browser_frame"
+
+
+@dataclass(eq=False)
+class WebTask:
+    prompt: str
+    priority: int = PRIORITY_NORMAL
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+    state: str = "queued"
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    turn: int = 0
+    url: Optional[str] = None
+    result: Optional[str] = None
+    error: Optional[str] = None
+    screenshot_stats: Optional[dict] = None
+    done: asyncio.Future = field(default=None, repr=False)
+    _runner: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def update(self, image_b64: Optional[str], log: Optional[str]) -> dict:
+        """Progress payload for on_update listeners."""
+        return {"task_id": self.id, "state": self.state, "turn": self.turn, "image": image_b64, "log": log}
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "prompt": self.prompt,
+            "priority": self.priority,
+            "state": self.state,
+            "turn": self.turn,
+            "url": self.url,
+            "result": self.result,
+            "error": self.error,
+            "queued_s": round((self.started or time.time()) - self.created, 3),
+            "run_s": round((self.finished or time.time()) - self.started, 3) if self.started else None,
+        }
+
+
+def update_events(update: dict) -> List[Tuple[str, dict]]:
+    """
+    Splits a WebTask.update() payload into socket events: state, turn and log go
+    on TASK_UPDATE_EVENT (FIFO, never coalesced), the image alone on FRAME_EVENT.
+    """
+    events = [(TASK_UPDATE_EVENT, {k: v for k, v in update.items() if k != "image"})]
+    if update.get("image"):
+        events.append((FRAME_EVENT, {"task_id": update.get("task_id"), "image": update["image"]}))
+    return events
+
+
+class WebTaskScheduler:
+    """
+    Args:
+        agent: WebAgent whose run_task executes each task.
+        max_concurrent: Tasks running at the same time (each holds one pooled page).
+        on_update: Called as on_update(task, image_b64, log) for progress and state changes.
+        keep_finished: Finished (done/failed/cancelled) tasks kept for get()/list(); older ones are dropped.
+    """
+
+    def __init__(self, agent, max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+                 on_update: Optional[Callable] = None, keep_finished: int = DEFAULT_KEEP_FINISHED):
+        self.agent = agent
+        self.max_concurrent = max(1, max_concurrent)
+        self.on_update = on_update
+        self.keep_finished = max(0, keep_finished)
+
+        self.tasks: Dict[str, WebTask] = {}
+        self._finished: deque = deque()  # ids of finished tasks, oldest first
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._seq = itertools.count()
+
+        # Counters
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def _start(self):
+        if self._queue is not None:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrent)]
+
+    # --- Public API ---
+
+    def submit(self, prompt: str, priority: int = PRIORITY_NORMAL) -> WebTask:
+        """Queues a task; higher priority runs first, equal priorities in submission order."""
+        self._start()
+        task = WebTask(prompt=prompt, priority=priority)
+        task.done = asyncio.get_running_loop().create_future()
+        self.tasks[task.id] = task
+        self._queue.put_nowait((-priority, next(self._seq), task))
+        print(f"[WebScheduler] Queued task {task.id} (priority {priority}, {self._queue.qsize()} waiting)")
+        self._notify(task, None, "Queued")
+        return task
+
+    async def run(self, prompt: str, priority: int = PRIORITY_NORMAL) -> str:
+        """Submits and waits. Raises CancelledError if the task is cancelled."""
+        return await self.wait(self.submit(prompt, priority).id)
+
+    async def wait(self, task_id: str) -> str:
+        """Result of a task. Raises KeyError once a finished task has been dropped from the table."""
+        task = self.tasks[task_id]
+        # shield: a caller giving up waiting does not cancel the task itself
+        return await asyncio.shield(task.done)
+
+    def cancel(self, task_id: str) -> bool:
+        task = self.tasks.get(task_id)
+        if task is None or task.state not in ("queued", "running"):
+            return False
+        if task.state == "running" and task._runner is not None:
+            task._runner.cancel()  # _execute records the cancellation
+        else:
+            self._finish(task, "cancelled")  # skipped when it reaches the front of the queue
+        return True
+
+    def get(self, task_id: str) -> Optional[WebTask]:
+        return self.tasks.get(task_id)
+
+    def list(self) -> List[dict]:
+        return [task.to_dict() for task in self.tasks.values()]
+
+    async def close(self):
+        for task in list(self.tasks.values()):
+            self.cancel(task.id)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def stats(self) -> dict:
+        states = {state: 0 for state in TASK_STATES}
+        for task in self.tasks.values():
+            states[task.state] += 1
+        return {
+            "max_concurrent": self.max_concurrent,
+            "waiting": self._queue.qsize() if self._queue else 0,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            **states,
+        }
+
+    # --- Internals ---
+
+    async def _worker(self):
+        while True:
+            _, _, task = await self._queue.get()
+            try:
+                if task.state != "queued":
+                    continue  # cancelled while waiting
+                # Separate task so cancel() can stop this one task without killing the worker
+                task._runner = asyncio.create_task(self._execute(task))
+                try:
+                    await asyncio.wait([task._runner])
+                except asyncio.CancelledError:
+                    task._runner.cancel()  # the worker itself is being shut down
+                    raise
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, task: WebTask):
+        if task.state != "queued":
+            return  # cancelled before it started
+        task.state = "running"
+        task.started = time.time()
+        print(f"[WebScheduler] Running task {task.id}: {task.prompt}")
+        self._notify(task, None, "Started")
+
+        async def progress(image_b64, log):
+            self._notify(task, image_b64, log)
+
+        try:
+            result = await self.agent.run_task(task.prompt, update_callback=progress, task=task)
+        except asyncio.CancelledError:
+            self._finish(task, "cancelled")
+            return
+        except Exception as e:
+            print(f"[WebScheduler] [ERR] Task {task.id} failed: {e}")
+            self._finish(task, "failed", error=str(e))
+            return
+        self._finish(task, "done", result=result)
+
+    def _finish(self, task: WebTask, state: str, result: Optional[str] = None, error: Optional[str] = None):
+        task.state = state
+        task.finished = time.time()
+        task.result = result
+        task.error = error
+        if state == "done":
+            self.completed += 1
+            task.done.set_result(result)
+        elif state == "failed":
+            self.failed += 1
+            task.done.set_exception(RuntimeError(error))
+            task.done.exception()  # mark retrieved so an unawaited failure is not logged twice
+        else:
+            self.cancelled += 1
+            task.done.cancel()
+        print(f"[WebScheduler] Task {task.id} {state}")
+        self._notify(task, None, f"Error: {error}" if error else f"Task {state}")
+        self._retire(task)
+
+    def _retire(self, task: WebTask):
+        """Keeps only the last keep_finished finished tasks (waiters hold their own reference)."""
+        self._finished.append(task.id)
+        while len(self._finished) > self.keep_finished:
+            self.tasks.pop(self._finished.popleft(), None)
+
+    def _notify(self, task: WebTask, image_b64: Optional[str], log: str):
+        if not self.on_update:
+            return
+        try:
+            self.on_update(task, image_b64, log)
+        except Exception as e:
+            print(f"[WebScheduler] [WARN] Progress callback failed: {e}")
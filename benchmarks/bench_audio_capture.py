@@ -0,0 +1,150 @@
+# File: bench_audio_capture.py - Purpose: This file handles Bench Audio Capture functionality.
+"""
+Benchmark: mic dropouts under executor load, per-chunk to_thread vs capture thread.
+
+A simulated input device produces one chunk every `chunk_ms` into a small
+hardware buffer (like PortAudio's). If nobody reads in time the buffer
+overflows and audio is lost. The default executor is kept busy with blocking
+jobs (standing in for CAD subprocesses, slicing and file I/O).
+
+Usage:
+    python benchmarks/bench_audio_capture.py
+    python benchmarks/bench_audio_capture.py --seconds 5 --workers 4 --load-jobs 16
+"""
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add backend to path
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from audio_capture import AudioRingBuffer, AudioCaptureThread
+
+
+class SimulatedInputDevice:
+    """Produces chunks on a timer into a bounded device buffer."""
+
+    def __init__(self, chunk_bytes, chunk_ms, device_chunks=4):
+        self.chunk_bytes = chunk_bytes
+        self.chunk_s = chunk_ms / 1000.0
+        self.buffer = collections.deque()
+        self.device_chunks = device_chunks
+        self.cond = threading.Condition()
+        self.produced = 0
+        self.dropped = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+
+    def _produce(self):
+        next_t = time.perf_counter()
+        while self._running:
+            next_t += self.chunk_s
+            time.sleep(max(0.0, next_t - time.perf_counter()))
+            with self.cond:
+                self.produced += 1
+                if len(self.buffer) >= self.device_chunks:
+                    self.dropped += 1  # input overflow
+                else:
+                    self.buffer.append(b"\x00" * self.chunk_bytes)
+                self.cond.notify()
+
+    def read(self, frames, **kwargs):
+        with self.cond:
+            while not self.buffer:
+                self.cond.wait(0.5)
+            return self.buffer.popleft()
+
+    def close(self):
+        self._running = False
+
+
+def blocking_job(duration):
+    time.sleep(duration)
+
+
+async def keep_executor_busy(stop, jobs, duration):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        await asyncio.gather(*[loop.run_in_executor(None, blocking_job, duration) for _ in range(jobs)])
+
+
+async def run_legacy(device, seconds):
+    """Old listen_audio: one asyncio.to_thread hop per chunk."""
+    end = time.perf_counter() + seconds
+    received = 0
+    while time.perf_counter() < end:
+        await asyncio.to_thread(device.read, 1024)
+        received += 1
+    return received
+
+
+async def run_capture_thread(device, seconds, chunk_bytes):
+    """New listen_audio: long-lived thread + ring drained in batches."""
+    loop = asyncio.get_running_loop()
+    ring = AudioRingBuffer(chunk_bytes, capacity=64)
+    ready = asyncio.Event()
+    thread = AudioCaptureThread(device, ring, chunk_size=1024, sample_rate=16000,
+                                loop=loop, on_data=ready.set)
+    thread.start()
+    end = time.perf_counter() + seconds
+    received = 0
+    while time.perf_counter() < end:
+        try:
+            await asyncio.wait_for(ready.wait(), timeout=0.5)
+        except asyncio.TimeoutError:
+            continue
+        ready.clear()
+        received += len(ring.read_batch())
+    thread.stop()
+    return received, thread.stats()
+
+
+async def scenario(name, args):
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(concurrent.futures.ThreadPoolExecutor(max_workers=args.workers))
+    chunk_bytes = 2048
+    device = SimulatedInputDevice(chunk_bytes, args.chunk_ms)
+
+    stop = asyncio.Event()
+    load = asyncio.create_task(keep_executor_busy(stop, args.load_jobs, args.job_seconds))
+
+    stats = {}
+    if name == "legacy":
+        received = await run_legacy(device, args.seconds)
+    else:
+        received, stats = await run_capture_thread(device, args.seconds, chunk_bytes)
+
+    stop.set()
+    device.close()
+    await load
+    return received, device.produced, device.dropped, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mic dropouts under executor load")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--chunk-ms", type=float, default=64.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--load-jobs", type=int, default=8)
+    parser.add_argument("--job-seconds", type=float, default=0.4)
+    args = parser.parse_args()
+
+    print(f"{'='*60}")
+    print(f"Capture benchmark: {args.seconds}s, executor={args.workers} workers, "
+          f"{args.load_jobs} x {args.job_seconds}s blocking jobs")
+    print(f"{'='*60}")
+    for name in ("legacy", "capture_thread"):
+        received, produced, dropped, stats = asyncio.run(scenario(name, args))
+        print(f"  {name:15} produced={produced:4d} received={received:4d} "
+              f"device_overflows={dropped:4d} {stats if stats else ''}")
+
+
+if __name__ == "__main__":
+    main()
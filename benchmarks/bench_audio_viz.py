@@ -0,0 +1,95 @@
+# File: bench_audio_viz.py - Purpose: This file handles Bench Audio Viz functionality.
+"""
+Benchmark: bytes on the wire and CPU per second of model audio for the
+`audio_data` visualizer feed, legacy list(data_bytes) JSON vs AudioVisualizer modes.
+
+Each payload is encoded with python-socketio's packet encoder, so the byte
+counts include the JSON / binary-attachment framing the browser actually receives.
+
+Usage:
+    python benchmarks/bench_audio_viz.py
+    python benchmarks/bench_audio_viz.py --seconds 30 --chunk-ms 40 --rate-hz 30
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from socketio import packet
+
+# Add backend to path
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from audio_viz import AudioVisualizer, VIZ_MODES
+
+SAMPLE_RATE = 24000  # Gemini output rate
+
+
+def make_chunks(seconds: float, chunk_ms: int):
+    """Speech-like tone sweep with noise, split into model-sized chunks."""
+    rng = np.random.default_rng(0)
+    total = int(seconds * SAMPLE_RATE)
+    t = np.arange(total) / SAMPLE_RATE
+    freq = 150 + 100 * np.sin(2 * np.pi * 0.5 * t)
+    signal = 6000 * np.sin(2 * np.pi * np.cumsum(freq) / SAMPLE_RATE) + rng.normal(0, 500, total)
+    pcm = np.clip(signal, -32768, 32767).astype("<i2").tobytes()
+    step = int(SAMPLE_RATE * chunk_ms / 1000) * 2
+    return [pcm[i:i + step] for i in range(0, len(pcm), step)]
+
+
+def encoded_size(payload: dict) -> int:
+    encoded = packet.Packet(packet.EVENT, data=["audio_data", payload]).encode()
+    if isinstance(encoded, list):
+        return sum(len(part) if isinstance(part, bytes) else len(part.encode()) for part in encoded)
+    return len(encoded.encode())
+
+
+def run(mode: str, chunks, chunk_ms: int, rate_hz: float):
+    viz = AudioVisualizer(mode=mode, rate_hz=rate_hz, sample_rate=SAMPLE_RATE)
+    total_bytes = 0
+    emits = 0
+    now = 0.0
+    start = time.process_time()
+    for chunk in chunks:
+        payload = viz.process(chunk, now=now)
+        now += chunk_ms / 1000.0
+        if payload is not None:
+            total_bytes += encoded_size(payload)
+            emits += 1
+    cpu = time.process_time() - start
+    return total_bytes, emits, cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audio visualizer feed size and CPU")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--chunk-ms", type=int, default=40)
+    parser.add_argument("--rate-hz", type=float, default=30.0)
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.seconds, args.chunk_ms)
+
+    print(f"{'='*60}")
+    print(f"Audio viz benchmark: {args.seconds:.0f}s of 24 kHz audio, "
+          f"{args.chunk_ms} ms chunks, {args.rate_hz:.0f} Hz")
+    print(f"{'='*60}")
+
+    baseline = None
+    for mode in ("raw",) + tuple(m for m in VIZ_MODES if m != "raw"):
+        total_bytes, emits, cpu = run(mode, chunks, args.chunk_ms, args.rate_hz)
+        bps = total_bytes / args.seconds
+        cpu_ms = cpu * 1000.0 / args.seconds
+        label = "legacy list() JSON" if mode == "raw" else mode
+        if baseline is None:
+            baseline = bps
+            print(f"  {label:20} {bps / 1024:9.1f} KiB/s  {emits / args.seconds:6.1f} emits/s  "
+                  f"{cpu_ms:7.2f} ms CPU/s")
+        else:
+            print(f"  {label:20} {bps / 1024:9.1f} KiB/s  {emits / args.seconds:6.1f} emits/s  "
+                  f"{cpu_ms:7.2f} ms CPU/s  ({baseline / bps:6.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
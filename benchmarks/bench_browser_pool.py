@@ -0,0 +1,80 @@
+# File: bench_browser_pool.py - Purpose: This file handles Bench Browser Pool functionality.
+"""
+Benchmark: web task start latency (time until the first screenshot can be
+taken), legacy per-task Chromium launch vs a checkout from BrowserPool.
+
+Uses a local data: URL as the start page so the numbers do not depend on the
+network. Requires Playwright's Chromium (`playwright install chromium`).
+
+Usage:
+    python benchmarks/bench_browser_pool.py
+    python benchmarks/bench_browser_pool.py --tasks 10 --start-url https://www.google.com
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from browser_pool import BrowserPool, DEFAULT_USER_AGENT
+
+
+async def legacy_start(start_url: str) -> float:
+    """The original run_task preamble: new Playwright, browser, context, page, start page."""
+    from playwright.async_api import async_playwright
+    start = time.perf_counter()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        context = await browser.new_context(viewport={"width": 1440, "height": 900}, user_agent=DEFAULT_USER_AGENT)
+        page = await context.new_page()
+        await page.goto(start_url)
+        await page.screenshot(type="png")
+        elapsed = time.perf_counter() - start
+        await browser.close()
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Web task start latency")
+    parser.add_argument("--tasks", type=int, default=5)
+    parser.add_argument("--start-url", default="data:text/html,<h1>start</h1>")
+    args = parser.parse_args()
+
+    print(f"{'='*60}")
+    print(f"Browser start latency: {args.tasks} tasks")
+    print(f"{'='*60}")
+
+    try:
+        cold = [await legacy_start(args.start_url) for _ in range(args.tasks)]
+    except Exception as e:
+        print(f"Chromium unavailable ({e.__class__.__name__}); run `playwright install chromium`.")
+        return
+
+    pool = BrowserPool(size=2, start_url=args.start_url)
+    warm_up_start = time.perf_counter()
+    await pool.start()
+    warm_up = time.perf_counter() - warm_up_start
+    warm = []
+    try:
+        for _ in range(args.tasks):
+            start = time.perf_counter()
+            async with pool.checkout() as slot:
+                await slot.page.screenshot(type="png")
+                warm.append(time.perf_counter() - start)
+            await asyncio.sleep(0.2)  # let the background context renewal finish, as between real tasks
+    finally:
+        await pool.close()
+
+    print(f"  {'legacy launch per task':26} median {statistics.median(cold) * 1000:8.1f} ms")
+    print(f"  {'pool warm-up (once)':26}        {warm_up * 1000:8.1f} ms")
+    print(f"  {'pool checkout':26} median {statistics.median(warm) * 1000:8.1f} ms  "
+          f"({statistics.median(cold) / statistics.median(warm):.0f}x faster)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+# File: bench_cad_speculative.py - Purpose: This file handles Bench Cad Speculative functionality.
+"""
+Benchmark: time to first valid CAD model, sequential retries vs speculative
+candidates. Model replies are simulated (random latency, a configurable chance
+that the script fails); scripts really run in the CAD worker pool.
+
+Usage:
+    python benchmarks/bench_cad_speculative.py
+    python benchmarks/bench_cad_speculative.py --trials 20 --fail-rate 0.6 --candidates 2 3 4
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")  # never called; replies are simulated
+
+from cad_agent import CadAgent
+
+EXPORT = "def export_stl(part, path):\n    open(path, 'w').write(part)\n"
+GOOD = EXPORT + "result_part = 'solid bench'\nexport_stl(result_part, 'output.stl')\n"
+BROKEN = EXPORT + "result_part = 'solid'\nraise ValueError('fillet radius too large')\nexport_stl(result_part, 'output.stl')\n"
+
+
+def simulated_model(rng: random.Random, latency: float, fail_rate: float):
+    async def reply(contents, temperature=1.0, forward_thoughts=True):
+        # Thinking models: long-tailed latency
+        await asyncio.sleep(latency * rng.lognormvariate(0, 0.4))
+        return BROKEN if rng.random() < fail_rate else GOOD
+    return reply
+
+
+async def run_mode(candidates: int, args) -> (list, int):
+    agent = CadAgent(cad_cache=False, transport="base64", preview_max_triangles=0, candidates=candidates)
+    agent.worker_pool.preload = ()
+    times, failures = [], 0
+    work_dir = tempfile.mkdtemp(prefix="jarvis_spec_")
+    try:
+        for trial in range(args.trials):
+            agent._request_code = simulated_model(random.Random(trial * 100 + candidates), args.latency, args.fail_rate)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):  # keep agent debug logs out of the report
+                result = await agent.generate_prototype("bench part", output_dir=work_dir)
+            if result is None:
+                failures += 1
+            else:
+                times.append(time.perf_counter() - start)
+    finally:
+        await agent.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return times, failures
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Speculative CAD generation")
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean simulated model latency (s)")
+    parser.add_argument("--fail-rate", type=float, default=0.5, help="Chance a generated script fails")
+    parser.add_argument("--candidates", type=int, nargs="+", default=[3])
+    args = parser.parse_args()
+
+    print(f"{'='*60}")
+    print(f"Speculative CAD benchmark: {args.trials} trials, latency ~{args.latency}s, "
+          f"fail rate {args.fail_rate:.0%}")
+    print(f"{'='*60}")
+
+    for n in [1] + args.candidates:
+        times, failures = await run_mode(n, args)
+        label = "sequential (3 retries)" if n == 1 else f"speculative x{n}"
+        if times:
+            p90 = sorted(times)[max(0, int(len(times) * 0.9) - 1)]
+            print(f"  {label:24} median {statistics.median(times):6.2f}s  p90 {p90:6.2f}s  "
+                  f"failed {failures}/{args.trials}")
+        else:
+            print(f"  {label:24} all {failures} trials failed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+# File: bench_cad_transport.py - Purpose: This file handles Bench Cad Transport functionality.
+"""
+Benchmark: cad_data payload size and encode time per transport (legacy base64,
+binary STL, indexed mesh, and decimated previews) for synthetic STL models.
+
+Usage:
+    python benchmarks/bench_cad_transport.py
+    python benchmarks/bench_cad_transport.py --sizes 50 200 400 --max-triangles 100000
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from cad_transport import encode_cad_payload, write_binary_stl
+
+
+def sphere_stl(n: int) -> bytes:
+    theta = np.linspace(0, np.pi, n)
+    phi = np.linspace(0, 2 * np.pi, 2 * n)
+    t, p = np.meshgrid(theta, phi, indexing="ij")
+    grid = np.stack([np.sin(t) * np.cos(p), np.sin(t) * np.sin(p), np.cos(t)], -1) * 50
+    a, b, c, d = grid[:-1, :-1], grid[1:, :-1], grid[1:, 1:], grid[:-1, 1:]
+    tris = np.concatenate([np.stack([a, b, c], -2).reshape(-1, 3, 3),
+                           np.stack([a, c, d], -2).reshape(-1, 3, 3)])
+    return write_binary_stl(tris.astype(np.float32))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="cad_data encoding")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 400])
+    parser.add_argument("--max-triangles", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        stl = sphere_stl(n)
+        triangles = (len(stl) - 84) // 50
+        print(f"{'='*60}")
+        print(f"Sphere: {triangles:,} triangles, {len(stl) / 1e6:.2f} MB binary STL")
+        print(f"{'='*60}")
+        cases = [("base64 (legacy)", "base64", 0), ("binary stl", "stl", 0), ("indexed mesh", "mesh", 0),
+                 (f"mesh, LOD {args.max_triangles:,}", "mesh", args.max_triangles)]
+        for label, transport, max_tris in cases:
+            stats = encode_cad_payload(stl, transport, max_tris)["stats"]
+            print(f"  {label:22} {stats['bytes'] / 1e6:8.2f} MB  {stats['encode_ms']:8.1f} ms  "
+                  f"{stats.get('triangles', triangles):>9,} triangles")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# File: bench_cad_worker.py - Purpose: This file handles Bench Cad Worker functionality.
+"""
+Benchmark: time to STL for a generated CAD script, cold `subprocess.run`
+(interpreter start + import build123d every attempt) vs a warm CadWorkerPool.
+
+Uses a real build123d box when build123d is installed; otherwise falls back to
+a numpy-only script that writes an ASCII STL so the process overhead can still
+be compared.
+
+Usage:
+    python benchmarks/bench_cad_worker.py
+    python benchmarks/bench_cad_worker.py --runs 5
+"""
+import argparse
+import asyncio
+import importlib.util
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from cad_worker import CadWorkerPool
+
+BUILD123D_SCRIPT = """
+from build123d import *
+
+with BuildPart() as p:
+    Box(20, 20, 10)
+    fillet(p.edges().group_by(Axis.Z)[-1], radius=1)
+
+result_part = p.part
+export_stl(result_part, '{out}')
+"""
+
+NUMPY_SCRIPT = """
+import numpy as np
+
+# Unit cube as 12 triangles
+v = np.array([[0,0,0],[1,0,0],[1,1,0],[0,1,0],[0,0,1],[1,0,1],[1,1,1],[0,1,1]], dtype=float) * 10
+faces = [(0,2,1),(0,3,2),(4,5,6),(4,6,7),(0,1,5),(0,5,4),(1,2,6),(1,6,5),(2,3,7),(2,7,6),(3,0,4),(3,4,7)]
+with open('{out}', 'w') as f:
+    f.write('solid cube\\n')
+    for a, b, c in faces:
+        n = np.cross(v[b] - v[a], v[c] - v[a])
+        f.write('facet normal %f %f %f\\nouter loop\\n' % tuple(n))
+        for i in (a, b, c):
+            f.write('vertex %f %f %f\\n' % tuple(v[i]))
+        f.write('endloop\\nendfacet\\n')
+    f.write('endsolid cube\\n')
+"""
+
+
+def write_script(work_dir: Path, index: int, use_build123d: bool) -> (str, Path):
+    out = work_dir / f"output_{index}.stl"
+    body = (BUILD123D_SCRIPT if use_build123d else NUMPY_SCRIPT).format(out=str(out).replace("\\", "\\\\"))
+    path = work_dir / f"design_{index}.py"
+    path.write_text(body)
+    return str(path), out
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Cold vs warm CAD script execution")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    use_build123d = importlib.util.find_spec("build123d") is not None
+    preload = ("build123d", "numpy") if use_build123d else ("numpy",)
+    work_dir = Path(tempfile.mkdtemp(prefix="jarvis_cad_"))
+
+    print(f"{'='*60}")
+    print(f"CAD worker benchmark: {args.runs} runs, "
+          f"{'build123d box' if use_build123d else 'numpy STL (build123d not installed)'}")
+    print(f"{'='*60}")
+
+    try:
+        cold = []
+        for i in range(args.runs):
+            path, out = write_script(work_dir, i, use_build123d)
+            start = time.perf_counter()
+            proc = subprocess.run([sys.executable, path], capture_output=True, text=True, cwd=work_dir)
+            cold.append(time.perf_counter() - start)
+            assert proc.returncode == 0 and out.exists(), proc.stderr
+
+        pool = CadWorkerPool(preload=preload)
+        start = time.perf_counter()
+        pool.start()
+        first_path, _ = write_script(work_dir, 1000, use_build123d)
+        first = await pool.run_script(first_path, cwd=str(work_dir))
+        spawn_to_first = time.perf_counter() - start
+        assert first.returncode == 0, first.stderr
+
+        warm = []
+        for i in range(args.runs):
+            path, out = write_script(work_dir, 100 + i, use_build123d)
+            result = await pool.run_script(path, cwd=str(work_dir))
+            warm.append(result.duration)
+            assert result.returncode == 0 and out.exists(), result.stderr
+        await pool.close()
+
+        avg_cold = sum(cold) / len(cold)
+        avg_warm = sum(warm) / len(warm)
+        print(f"  {'cold subprocess.run':24} {avg_cold * 1000:9.1f} ms/script")
+        print(f"  {'pool spawn + 1st job':24} {spawn_to_first * 1000:9.1f} ms (paid once, ahead of time)")
+        print(f"  {'warm worker':24} {avg_warm * 1000:9.1f} ms/script  ({avg_cold / avg_warm:5.1f}x faster)")
+        print(f"\nThree retries: cold {3 * avg_cold:.2f}s vs warm {3 * avg_warm:.2f}s")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
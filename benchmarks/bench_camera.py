@@ -0,0 +1,116 @@
+# File: bench_camera.py - Purpose: This file handles Bench Camera functionality.
+"""
+Benchmark: per-frame cost of the old PIL/BytesIO/base64 camera path vs
+CameraCapture (source resolution + cv2.imencode + perceptual diff).
+
+Frames are synthetic (no camera needed); "static" scenes repeat with sensor noise.
+
+Usage:
+    python benchmarks/bench_camera.py
+    python benchmarks/bench_camera.py --frames 200 --width 1920 --height 1080
+"""
+import argparse
+import base64
+import io
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import PIL.Image
+
+# Add backend to path
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from camera_capture import CameraCapture
+
+
+class SyntheticCap:
+    """A mostly static scene with light sensor noise and an occasional cut."""
+
+    def __init__(self, n_frames, width, height, cut_every=25):
+        rng = np.random.default_rng(0)
+        # Each scene: coarse random blocks scaled up, so cuts are visible at thumbnail size
+        self.scenes = [cv2.resize(rng.integers(0, 256, (9, 16, 3), dtype=np.uint8), (width, height),
+                                  interpolation=cv2.INTER_LINEAR)
+                       for _ in range(n_frames // cut_every + 1)]
+        self.noise = rng.integers(-2, 3, (height, width, 3)).astype(np.int16)
+        self.n_frames = n_frames
+        self.cut_every = cut_every
+        self.index = 0
+
+    def read(self, image=None):
+        if self.index >= self.n_frames:
+            return False, None
+        scene = self.scenes[self.index // self.cut_every]
+        noise = self.noise if self.index % 2 else -self.noise
+        frame = np.clip(scene.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+        self.index += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+
+def legacy_get_frame(cap):
+    """The original AudioLoop._get_frame."""
+    ret, frame = cap.read()
+    if not ret:
+        return None
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    img = PIL.Image.fromarray(frame_rgb)
+    img.thumbnail([1024, 1024])
+    image_io = io.BytesIO()
+    img.save(image_io, format="jpeg")
+    image_io.seek(0)
+    image_bytes = image_io.read()
+    return {"mime_type": "image/jpeg", "data": base64.b64encode(image_bytes).decode()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Camera pipeline per-frame cost")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--source-width", type=int, default=640,
+                        help="Resolution the new pipeline requests from the driver")
+    args = parser.parse_args()
+
+    print(f"{'='*60}")
+    print(f"Camera benchmark: {args.frames} frames")
+    print(f"{'='*60}")
+
+    # Legacy: driver delivers full resolution, every frame encoded
+    cap = SyntheticCap(args.frames, args.width, args.height)
+    start = time.perf_counter()
+    sent = 0
+    payload_bytes = 0
+    while True:
+        frame = legacy_get_frame(cap)
+        if frame is None:
+            break
+        sent += 1
+        payload_bytes += len(frame["data"])
+    legacy = (time.perf_counter() - start) / args.frames
+    print(f"  {'legacy PIL @' + str(args.width) + 'p':24} {legacy * 1000:7.2f} ms/frame  "
+          f"{sent} sent  {payload_bytes // max(sent, 1)} b64 bytes/frame")
+
+    # New: driver delivers the requested source resolution
+    source_h = int(args.height * args.source_width / args.width)
+    camera = CameraCapture(cap=SyntheticCap(args.frames, args.source_width, source_h))
+    start = time.perf_counter()
+    sent = 0
+    for _ in range(args.frames):
+        if camera.read_jpeg() is not None:
+            sent += 1
+    new = (time.perf_counter() - start) / args.frames
+    stats = camera.stats()
+    print(f"  {'CameraCapture @' + str(args.source_width) + 'p':24} {new * 1000:7.2f} ms/frame  "
+          f"{sent} sent  {stats['avg_jpeg_bytes']} jpeg bytes/frame  ({legacy / new:4.1f}x faster)")
+    print(f"  skipped as unchanged: {stats['frames_skipped']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# File: bench_chat_history.py - Purpose: This file handles Bench Chat History functionality.
+"""
+Benchmark: fetching the last N chat messages from a large chat_history.jsonl,
+legacy readlines() vs the reverse block reader vs the in-memory tail cache.
+
+Builds a synthetic history (default 1 GB) in a temp directory and removes it after.
+
+Usage:
+    python benchmarks/bench_chat_history.py
+    python benchmarks/bench_chat_history.py --size-mb 200 --limit 10
+"""
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from project_manager import ProjectManager
+
+
+def legacy_recent(log_file: Path, limit: int):
+    """The original ProjectManager.get_recent_chat_history."""
+    with open(log_file, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    history = []
+    for line in lines[-limit:]:
+        try:
+            history.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return history
+
+
+def build_history(log_file: Path, size_mb: int):
+    """Writes ~size_mb of realistic JSONL chat entries."""
+    target = size_mb * 1024 * 1024
+    senders = ("User", "JARVIS")
+    batch = []
+    for i in range(2000):
+        text = f"Message {i}: " + "lorem ipsum dolor sit amet " * (1 + i % 12)
+        batch.append(json.dumps({"timestamp": 1700000000.0 + i, "sender": senders[i % 2], "text": text}) + "\n")
+    block = "".join(batch).encode("utf-8")
+    written = 0
+    with open(log_file, "wb") as f:
+        while written < target:
+            f.write(block)
+            written += len(block)
+    return written
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat history tail read")
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--skip-legacy", action="store_true", help="Skip the full readlines() pass")
+    args = parser.parse_args()
+
+    workspace = Path(tempfile.mkdtemp(prefix="jarvis_bench_"))
+    try:
+        pm = ProjectManager(str(workspace))
+        # The synthetic file starts far past the rotation size; measure reads, not a one-off gzip
+        pm._chat_writer.rotate_bytes = 0
+        log_file = pm.get_current_project_path() / "chat_history.jsonl"
+
+        print(f"{'='*60}")
+        print(f"Chat history benchmark: {args.size_mb} MB, last {args.limit} messages")
+        print(f"{'='*60}")
+
+        build_time, size = timed(lambda: build_history(log_file, args.size_mb))
+        print(f"  built {size / 1024**2:.0f} MB in {build_time:.1f}s")
+
+        if not args.skip_legacy:
+            legacy, expected = timed(lambda: legacy_recent(log_file, args.limit))
+            print(f"  {'legacy readlines()':22} {legacy * 1000:10.2f} ms")
+        else:
+            legacy, expected = None, None
+
+        cold, result = timed(lambda: pm.get_recent_chat_history(limit=args.limit))
+        if expected is not None:
+            assert result == expected, "tail reader disagrees with readlines()"
+        line = f"  {'tail seek (cold)':22} {cold * 1000:10.2f} ms"
+        print(line + (f"  ({legacy / cold:,.0f}x faster)" if legacy else ""))
+
+        warm, _ = timed(lambda: pm.get_recent_chat_history(limit=args.limit), repeat=1000)
+        line = f"  {'tail cache (warm)':22} {warm * 1000:10.4f} ms"
+        print(line + (f"  ({legacy / warm:,.0f}x faster)" if legacy else ""))
+
+        pm.log_chat("User", "one more")
+        after, result = timed(lambda: pm.get_recent_chat_history(limit=args.limit))
+        assert result[-1]["text"] == "one more"
+        print(f"  {'after log_chat':22} {after * 1000:10.4f} ms  (cache hits: {pm._chat_tail.hits})")
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
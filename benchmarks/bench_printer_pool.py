@@ -0,0 +1,136 @@
+# File: bench_printer_pool.py - Purpose: This file handles Bench Printer Pool functionality.
+"""
+Benchmark: status polling of a printer farm, a new aiohttp.ClientSession per
+call (legacy) vs PrinterAgent's shared keep-alive session.
+
+Starts simulated Moonraker (and OctoPrint) servers on localhost and polls all
+of them concurrently, like monitor_printers_loop. Reports TCP connections
+opened and poll latency. Localhost hides DNS and TLS-free LAN round trips, so
+real printers gain more than shown here.
+
+Usage:
+    python benchmarks/bench_printer_pool.py
+    python benchmarks/bench_printer_pool.py --printers 20 --rounds 30
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+
+# Add backend to path
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from printer_agent import PrinterAgent
+
+MOONRAKER_STATUS = {"result": {"status": {
+    "print_stats": {"state": "printing", "filename": "part.gcode", "print_duration": 600},
+    "display_status": {"progress": 0.42},
+    "extruder": {"temperature": 215.0, "target": 215.0},
+    "heater_bed": {"temperature": 60.0, "target": 60.0},
+}}}
+OCTOPRINT_JOB = {"state": "Printing", "job": {"file": {"name": "part.gcode"}},
+                 "progress": {"completion": 42.0, "printTime": 600, "printTimeLeft": 900}}
+OCTOPRINT_PRINTER = {"temperature": {"tool0": {"actual": 215.0, "target": 215.0},
+                                     "bed": {"actual": 60.0, "target": 60.0}}}
+
+
+async def start_printer(kind: str):
+    app = web.Application()
+    if kind == "moonraker":
+        app.router.add_get("/printer/objects/query", lambda r: web.json_response(MOONRAKER_STATUS))
+    else:
+        app.router.add_get("/api/job", lambda r: web.json_response(OCTOPRINT_JOB))
+        app.router.add_get("/api/printer", lambda r: web.json_response(OCTOPRINT_PRINTER))
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+
+def connection_counter():
+    counts = {"created": 0}
+    trace = aiohttp.TraceConfig()
+
+    async def on_create(session, ctx, params):
+        counts["created"] += 1
+
+    trace.on_connection_create_end.append(on_create)
+    return trace, counts
+
+
+async def legacy_status(printer, trace):
+    """The pre-pool pattern: a fresh session (and connection) for every status call."""
+    base = f"http://{printer.host}:{printer.port}"
+    async with aiohttp.ClientSession(trace_configs=[trace]) as session:
+        if printer.printer_type.value == "moonraker":
+            async with session.get(f"{base}/printer/objects/query?print_stats&display_status&heater_bed&extruder") as resp:
+                return await resp.json()
+        async with session.get(f"{base}/api/job") as resp:
+            await resp.json()
+        async with session.get(f"{base}/api/printer") as resp:
+            return await resp.json()
+
+
+async def poll_rounds(poll, printers, rounds: int) -> list:
+    """Runs `rounds` concurrent polls of every printer; returns per-round wall times."""
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        results = await asyncio.gather(*(poll(p) for p in printers), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, Exception)]
+        if errors:
+            raise errors[0]
+        times.append(time.perf_counter() - start)
+    return times
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Printer farm status polling")
+    parser.add_argument("--printers", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'='*60}")
+    print(f"Printer farm polling: {args.printers} simulated printers, {args.rounds} rounds")
+    print(f"{'='*60}")
+
+    runners = []
+    agent = PrinterAgent()
+    for i in range(args.printers):
+        kind = "moonraker" if i % 4 else "octoprint"   # 3:1 Klipper to OctoPrint
+        runner, port = await start_printer(kind)
+        runners.append(runner)
+        agent.add_printer_manually(f"Printer{i:02d}", "127.0.0.1", port=port, printer_type=kind)
+        agent.printers[f"127.0.0.1:{port}"] = agent.printers.pop("127.0.0.1")
+    printers = list(agent.printers.values())
+
+    try:
+        trace, counts = connection_counter()
+        legacy = await poll_rounds(lambda p: legacy_status(p, trace), printers, args.rounds)
+        legacy_connections = counts["created"]
+
+        pooled = await poll_rounds(lambda p: agent.get_print_status(f"{p.host}:{p.port}"), printers, args.rounds)
+        stats = agent.http_stats()
+    finally:
+        await agent.close()
+        for runner in runners:
+            await runner.cleanup()
+
+    print(f"  {'':22} {'connections':>12} {'round median':>14} {'round p90':>11}")
+    for label, times, connections in (("new session per call", legacy, legacy_connections),
+                                      ("shared pooled session", pooled, stats["connections_created"])):
+        p90 = sorted(times)[int(len(times) * 0.9) - 1]
+        print(f"  {label:22} {connections:12d} {statistics.median(times) * 1000:11.1f} ms {p90 * 1000:8.1f} ms")
+    print(f"  Pooled: {stats['requests']} requests, {stats['connections_reused']} reused connections, "
+          f"avg status call {stats['avg_status_ms']} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
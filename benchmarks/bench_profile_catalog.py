@@ -0,0 +1,135 @@
+# File: bench_profile_catalog.py - Purpose: This file handles Bench Profile Catalog functionality.
+"""
+Benchmark: slicer profile lookup, scanning the vendor folders on every call
+(legacy) vs the indexed ProfileCatalog.
+
+Generates a synthetic OrcaSlicer `system` folder roughly the size of a real
+install (many vendors, thousands of JSON files), then times:
+  - get_available_profiles: full folder walk vs catalog listing
+  - get_profiles_for_printer: list + score three folders vs index lookup,
+    and the memoized repeat lookup used on every slice
+
+Usage:
+    python benchmarks/bench_profile_catalog.py
+    python benchmarks/bench_profile_catalog.py --vendors 60 --per-kind 80
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from profile_catalog import ProfileCatalog, PROFILE_KINDS, static_bonus, term_score
+
+PRINTERS = ["Creality K1", "Creality Ender-3 V2", "K1 Max", "Prusa MK4", "Voron 2.4 350"]
+
+
+def make_tree(root: str, vendors: int, per_kind: int) -> int:
+    random.seed(7)
+    names = ["Creality", "Prusa", "Voron"] + [f"Vendor{i:02d}" for i in range(max(0, vendors - 3))]
+    models = {"Creality": ["K1", "K1C", "K1 Max", "Ender-3 V2", "CR-10"], "Prusa": ["MK4", "MINI", "XL"],
+              "Voron": ["2.4 350", "Trident 300", "0.1"]}
+    count = 0
+    for vendor in names:
+        vendor_models = models.get(vendor, [f"M{i}" for i in range(6)])
+        for kind in PROFILE_KINDS:
+            folder = os.path.join(root, vendor, kind)
+            os.makedirs(folder)
+            for i in range(per_kind):
+                model = random.choice(vendor_models)
+                nozzle = random.choice(["0.2", "0.4", "0.6"])
+                if kind == "machine":
+                    name = f"{vendor} {model} ({nozzle} nozzle) {i}.json"
+                elif kind == "process":
+                    quality = random.choice(["Standard", "Optimal", "Draft", "Fine"])
+                    name = f"0.{random.randint(8, 30)}mm {quality} @{vendor} {model} ({nozzle} nozzle) {i}.json"
+                else:
+                    material = random.choice(["PLA", "PLA-CF", "PLA Silk", "PETG", "ABS"])
+                    name = f"{random.choice(['Generic', vendor])} {material} @{model} {i}.json"
+                open(os.path.join(folder, name), "w").close()
+                count += 1
+    return count
+
+
+def legacy_available(system_dir: str) -> int:
+    """The pre-catalog walk done on every get_slicer_profiles call."""
+    count = 0
+    for vendor in os.listdir(system_dir):
+        for kind in PROFILE_KINDS:
+            folder = os.path.join(system_dir, vendor, kind)
+            if os.path.isdir(folder):
+                count += sum(1 for f in os.listdir(folder) if f.endswith(".json"))
+    return count
+
+
+def legacy_profiles_for(catalog: ProfileCatalog, system_dir: str, printer_name: str) -> dict:
+    """List and score the vendor folder once per kind (vendor lookup shared with the catalog)."""
+    terms = printer_name.lower().split()
+    vendor = catalog.vendor_for(printer_name)
+    result = {}
+    for kind in PROFILE_KINDS:
+        folder = os.path.join(system_dir, vendor, kind)
+        best, best_score = None, 0
+        for f in os.listdir(folder):
+            if f.endswith(".json"):
+                name = f.lower()
+                score = static_bonus(name, kind) + term_score(name, terms, kind)
+                if score > best_score:
+                    best, best_score = os.path.join(folder, f), score
+        result[kind] = best
+    return result
+
+
+def timed(fn, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Slicer profile catalog lookup")
+    parser.add_argument("--vendors", type=int, default=50)
+    parser.add_argument("--per-kind", type=int, default=60)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        total = make_tree(root, args.vendors, args.per_kind)
+        print(f"{'='*60}")
+        print(f"Profile lookup: {total} profiles, {args.vendors} vendors")
+        print(f"{'='*60}")
+
+        start = time.perf_counter()
+        catalog = ProfileCatalog(root, check_interval=3600)
+        build = time.perf_counter() - start
+
+        legacy_list = timed(lambda: legacy_available(root), args.repeats)
+        catalog_list = timed(catalog.available, args.repeats)
+
+        legacy_match = timed(lambda: [legacy_profiles_for(catalog, root, p) for p in PRINTERS], args.repeats)
+        indexed_match = timed(lambda: [{k: catalog.find(p, k) for k in PROFILE_KINDS} for p in PRINTERS], args.repeats)
+        memo_match = timed(lambda: [catalog.profiles_for(p) for p in PRINTERS], args.repeats * 50)
+
+        for p in PRINTERS:
+            assert catalog.profiles_for(p) == legacy_profiles_for(catalog, root, p), p
+
+    per = len(PRINTERS)
+    print(f"  Catalog build (once):             {build * 1000:9.2f} ms")
+    print(f"  get_available_profiles  legacy:   {legacy_list * 1000:9.2f} ms   catalog: {catalog_list * 1000:7.2f} ms")
+    print(f"  profiles per printer    legacy:   {legacy_match / per * 1000:9.2f} ms   indexed: {indexed_match / per * 1000:7.2f} ms")
+    print(f"  profiles per printer    memoized: {memo_match / per * 1e6:9.2f} us")
+    print(f"  Results identical to the folder scan for {per} printer names")
+
+
+if __name__ == "__main__":
+    main()
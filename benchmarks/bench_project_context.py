@@ -0,0 +1,104 @@
+# File: bench_project_context.py - Purpose: This file handles Bench Project Context functionality.
+"""
+Benchmark: get_project_context on a large synthetic project, legacy full
+walk + re-read vs the cached ProjectContextIndex (cold, warm, one file edited).
+
+Usage:
+    python benchmarks/bench_project_context.py
+    python benchmarks/bench_project_context.py --files 5000 --budget 8000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from project_context import ProjectContextIndex, estimate_tokens
+
+
+def legacy_context(project_path: Path, project_name: str, max_file_size: int = 10000) -> str:
+    """The original ProjectManager.get_project_context."""
+    context_lines = [f"=== Project Context: '{project_name}' ==="]
+    context_lines.append(f"Project directory: {project_path}")
+    context_lines.append("")
+    all_files = []
+    for root, dirs, files in os.walk(project_path):
+        for f in files:
+            all_files.append(os.path.relpath(os.path.join(root, f), project_path))
+    context_lines.append(f"Files ({len(all_files)} total):")
+    for f in all_files:
+        context_lines.append(f"  - {f}")
+    context_lines.append("")
+    text_extensions = {'.txt', '.py', '.js', '.jsx', '.ts', '.tsx', '.json', '.md', '.html', '.css', '.jsonl'}
+    for rel_path in all_files:
+        if os.path.splitext(rel_path)[1].lower() not in text_extensions:
+            continue
+        full_path = project_path / rel_path
+        if full_path.stat().st_size > max_file_size:
+            context_lines.append(f"--- {rel_path} (too large, skipped) ---")
+            continue
+        with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        context_lines.append(f"--- {rel_path} ---")
+        context_lines.append(content)
+        context_lines.append("")
+    return "\n".join(context_lines)
+
+
+def build_project(root: Path, n_files: int):
+    (root / "cad").mkdir(parents=True)
+    (root / "notes").mkdir()
+    for i in range(n_files):
+        folder = "notes" if i % 3 else "cad"
+        ext = ".md" if folder == "notes" else ".py"
+        (root / folder / f"file_{i:05d}{ext}").write_text(f"# file {i}\n" + "some project text " * (20 + i % 200))
+    with open(root / "chat_history.jsonl", "w") as f:
+        for i in range(200):
+            f.write('{"sender": "User", "text": "message %d"}\n' % i)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000.0, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Project context build time")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--budget", type=int, default=8000)
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="jarvis_ctx_")) / "project"
+    try:
+        build_project(root, args.files)
+        index = ProjectContextIndex()
+
+        print(f"{'='*60}")
+        print(f"Project context benchmark: {args.files} files, budget {args.budget} tokens")
+        print(f"{'='*60}")
+
+        legacy_ms, legacy = timed(lambda: legacy_context(root, "bench"))
+        print(f"  {'legacy walk + read':22} {legacy_ms:9.1f} ms  ~{estimate_tokens(legacy):>9,} tokens")
+
+        for label in ("index (cold)", "index (warm)"):
+            ms, context = timed(lambda: index.build(root, "bench", token_budget=args.budget))
+            print(f"  {label:22} {ms:9.1f} ms  ~{estimate_tokens(context):>9,} tokens  "
+                  f"{index.last_hits} hits / {index.last_misses} misses")
+
+        (root / "notes" / "file_00001.md").write_text("edited")
+        ms, context = timed(lambda: index.build(root, "bench", token_budget=args.budget))
+        print(f"  {'index (1 file edited)':22} {ms:9.1f} ms  ~{estimate_tokens(context):>9,} tokens  "
+              f"{index.last_hits} hits / {index.last_misses} misses")
+    finally:
+        shutil.rmtree(root.parent, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
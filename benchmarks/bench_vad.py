@@ -0,0 +1,88 @@
+# File: bench_vad.py - Purpose: This file handles Bench Vad functionality.
+"""
+Microbenchmark: per-chunk VAD cost, old struct/sum RMS vs NumPy detectors.
+
+Usage:
+    python benchmarks/bench_vad.py
+    python benchmarks/bench_vad.py --chunks 5000 --chunk-size 1024
+"""
+import argparse
+import math
+import struct
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from audio_vad import create_vad, VAD_MODES
+
+
+def legacy_rms(data: bytes) -> int:
+    """The original AudioLoop.listen_audio implementation."""
+    count = len(data) // 2
+    if count > 0:
+        shorts = struct.unpack(f"<{count}h", data)
+        sum_squares = sum(s**2 for s in shorts)
+        return int(math.sqrt(sum_squares / count))
+    return 0
+
+
+def make_chunks(n_chunks: int, chunk_size: int, rate: int = 16000):
+    """Alternating speech-like tone bursts and low noise."""
+    rng = np.random.default_rng(0)
+    chunks = []
+    t = np.arange(chunk_size) / rate
+    for i in range(n_chunks):
+        if (i // 8) % 2 == 0:
+            signal = 4000 * np.sin(2 * np.pi * 220 * t) + rng.normal(0, 300, chunk_size)
+        else:
+            signal = rng.normal(0, 100, chunk_size)
+        chunks.append(np.clip(signal, -32768, 32767).astype("<i2").tobytes())
+    return chunks
+
+
+def bench(fn, chunks) -> float:
+    start = time.perf_counter()
+    for c in chunks:
+        fn(c)
+    return (time.perf_counter() - start) / len(chunks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VAD per-chunk cost")
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks, args.chunk_size)
+
+    # Sanity check: the energy detector must match the legacy RMS
+    vad = create_vad("energy")
+    for c in chunks[:50]:
+        assert abs(vad.rms(c) - legacy_rms(c)) <= 1
+
+    print(f"{'='*60}")
+    print(f"VAD benchmark: {args.chunks} chunks x {args.chunk_size} samples")
+    print(f"{'='*60}")
+
+    legacy = bench(lambda c: legacy_rms(c) > 800, chunks)
+    print(f"  {'legacy (struct+sum)':22} {legacy * 1e6:9.1f} us/chunk")
+
+    for mode in VAD_MODES:
+        detector = create_vad(mode)
+        cost = bench(detector.is_speech, chunks)
+        print(f"  {'numpy ' + mode:22} {cost * 1e6:9.1f} us/chunk  ({legacy / cost:5.1f}x faster)")
+
+    # At 16 kHz / 1024 samples the mic produces ~15.6 chunks per second
+    per_sec = 16000 / args.chunk_size
+    print(f"\nCPU per second of audio: legacy {legacy * per_sec * 1000:.2f} ms, "
+          f"numpy energy {bench(create_vad('energy').is_speech, chunks) * per_sec * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
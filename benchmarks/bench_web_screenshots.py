@@ -0,0 +1,179 @@
+# File: bench_web_screenshots.py - Purpose: This file handles Bench Web Screenshots functionality.
+"""
+Benchmark: WebAgent tokens per turn and seconds per turn, legacy screenshot
+handling vs ScreenshotManager.
+
+Legacy: fixed 1 s sleep after each action, every PNG kept at full size in the
+history, base64 for the frontend on top. Managed: settle on DOM quiet +
+network idle, last K screenshots full size, older ones shrunk or dropped.
+
+The token part always runs (synthetic 1440x900 frames). The timing part
+drives a scripted local site served from this process and needs Playwright's
+Chromium (`playwright install chromium`). No model is called.
+
+Usage:
+    python benchmarks/bench_web_screenshots.py
+    python benchmarks/bench_web_screenshots.py --turns 20 --keep-full 3
+"""
+import argparse
+import asyncio
+import base64
+import io
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add backend to path
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from screenshot_manager import ScreenshotManager, Screenshot, estimate_image_tokens
+
+PAGES = {
+    "/": b"""<html><body style="font:20px sans-serif">
+<h1>Shop</h1><button id="load" onclick="load()">Load results</button><ul id="results"></ul>
+<a id="next" href="/item">Item page</a>
+<script>
+async function load() {
+  const items = await (await fetch('/api/results')).json();
+  document.getElementById('results').innerHTML = items.map(i => '<li>' + i + '</li>').join('');
+}
+</script></body></html>""",
+    "/item": b"""<html><body style="font:20px sans-serif">
+<h1 id="title">Loading...</h1><input id="q" placeholder="search">
+<script>setTimeout(() => document.getElementById('title').textContent = 'Widget 3000', 150);</script>
+</body></html>""",
+}
+
+# (description, coroutine factory taking (page, base_url))
+SCRIPT = [
+    ("navigate /", lambda page, base: page.goto(base + "/")),
+    ("click load", lambda page, base: page.click("#load")),
+    ("scroll", lambda page, base: page.mouse.wheel(0, 400)),
+    ("click item link", lambda page, base: page.click("#next")),
+    ("type search", lambda page, base: page.fill("#q", "widget")),
+    ("go back", lambda page, base: page.go_back()),
+]
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/api/results":
+            time.sleep(0.2)  # slow backend call
+            body, kind = b'["alpha", "beta", "gamma"]', "application/json"
+        else:
+            body, kind = PAGES.get(self.path, b"not found"), "text/html"
+        self.send_response(200 if body != b"not found" else 404)
+        self.send_header("Content-Type", kind)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def synthetic_png(seed: int) -> bytes:
+    """A 1440x900 frame with some texture so PNG sizes are realistic."""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    pixels = np.full((900, 1440, 3), 245, dtype=np.uint8)
+    for _ in range(40):
+        y, x = rng.integers(0, 880), rng.integers(0, 1300)
+        pixels[y:y + 20, x:x + 140] = rng.integers(0, 255, 3)
+    out = io.BytesIO()
+    Image.fromarray(pixels).save(out, format="PNG")
+    return out.getvalue()
+
+
+def token_report(turns: int, keep_full: int, max_images: int):
+    full_tokens = estimate_image_tokens(1440, 900)
+    manager = ScreenshotManager(keep_full=keep_full, max_images=max_images)
+    frames = [synthetic_png(turn) for turn in range(turns)]
+    legacy_total = managed_total = 0
+    compact_seconds = 0.0
+    for turn, png in enumerate(frames):
+        shot = Screenshot(png)
+        manager.shots.append(shot)
+        shot.as_function_response(str(turn), "click_at", {})
+        start = time.perf_counter()
+        manager.compact()
+        compact_seconds += time.perf_counter() - start
+        legacy_total += full_tokens * (turn + 1)
+        managed_total += manager.image_tokens()
+    compact_ms = compact_seconds * 1000.0 / turns
+
+    print(f"  Image tokens sent over {turns} turns (history re-sent each turn):")
+    print(f"    {'legacy (all full)':24} {legacy_total:10,d}  ({legacy_total / turns:,.0f}/turn)")
+    print(f"    {'managed':24} {managed_total:10,d}  ({managed_total / turns:,.0f}/turn, "
+          f"{legacy_total / max(1, managed_total):.1f}x fewer)")
+    print(f"    last turn: legacy {full_tokens * turns:,d} vs managed {manager.image_tokens():,d} tokens; "
+          f"compaction {compact_ms:.1f} ms/turn")
+
+
+async def run_script(page, base: str, turns: int, managed: bool, manager: ScreenshotManager) -> list:
+    durations = []
+    for turn in range(turns):
+        _, action = SCRIPT[turn % len(SCRIPT)]
+        start = time.perf_counter()
+        await action(page, base)
+        if managed:
+            await manager.settle(page)
+            shot = await manager.capture(page)
+            shot.as_function_response(str(turn), "action", {})
+            _ = shot.b64
+            await asyncio.to_thread(manager.compact)
+        else:
+            await asyncio.sleep(1)
+            png = await page.screenshot(type="png")
+            _ = base64.b64encode(png).decode("utf-8")
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+async def timing_report(turns: int, keep_full: int, max_images: int):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        from playwright.async_api import async_playwright
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            page = await browser.new_page(viewport={"width": 1440, "height": 900})
+            legacy = await run_script(page, base, turns, False, None)
+            manager = ScreenshotManager(keep_full=keep_full, max_images=max_images)
+            managed = await run_script(page, base, turns, True, manager)
+            await browser.close()
+    except Exception as e:
+        print(f"  Chromium unavailable ({e.__class__.__name__}); run `playwright install chromium` for timings.")
+        return
+    finally:
+        server.shutdown()
+
+    print(f"  Seconds per turn over the scripted site ({turns} actions):")
+    print(f"    {'legacy sleep(1)':24} median {statistics.median(legacy):6.3f} s  total {sum(legacy):6.2f} s")
+    print(f"    {'managed settle':24} median {statistics.median(managed):6.3f} s  total {sum(managed):6.2f} s  "
+          f"(settle {manager.settle_seconds:.2f} s, capture {manager.capture_seconds:.2f} s)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="WebAgent screenshot pipeline")
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--keep-full", type=int, default=3)
+    parser.add_argument("--max-images", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'='*60}")
+    print(f"WebAgent screenshots: {args.turns} turns, keep {args.keep_full} full, max {args.max_images} images")
+    print(f"{'='*60}")
+    token_report(args.turns, args.keep_full, args.max_images)
+    await timing_report(args.turns, args.keep_full, args.max_images)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -53,7 +53,7 @@ function App() {
     const [cadData, setCadData] = useState(null);
     const [cadThoughts, setCadThoughts] = useState(''); // Streaming AI thoughts
     const [cadRetryInfo, setCadRetryInfo] = useState({ attempt: 1, maxAttempts: 3, error: null }); // Retry status
-    const [browserData, setBrowserData] = useState({ image: null, logs: [] });
+    const [browserData, setBrowserData] = useState({ image: null, logs: [], tasks: {} });
     // showMemoryPrompt removed - memory is now actively saved to project
     const [confirmationRequest, setConfirmationRequest] = useState(null); // { id, tool, args }
     const [kasaDevices, setKasaDevices] = useState([]);
@@ -337,7 +337,11 @@ function App() {
             }
         });
         socket.on('audio_data', (data) => {
-            setAiAudioData(data.data);
+            // Binary feeds arrive as an ArrayBuffer of 0-255 levels
+            const levels = data.data instanceof ArrayBuffer
+                ? Array.from(new Uint8Array(data.data))
+                : data.data;
+            setAiAudioData(levels);
         });
         socket.on('auth_status', (data) => {
             console.log("Auth Status:", data);
@@ -395,7 +399,9 @@ function App() {
                 setCadRetryInfo({
                     attempt: data.attempt,
                     maxAttempts: data.max_attempts || 3,
-                    error: data.error
+                    error: data.error,
+                    candidate: data.candidate,
+                    candidates: data.candidates
                 });
             }
             if (data.status === 'generating' || data.status === 'retrying') {
@@ -422,13 +428,9 @@ function App() {
             // Append streaming thought text
             setCadThoughts(prev => prev + data.text);
         });
-        socket.on('browser_frame', (data) => {
-            setBrowserData(prev => ({
-                image: data.image,
-                logs: [...prev.logs, data.log].filter(l => l).slice(-50) // Keep last 50 logs
-            }));
+        // Auto-show browser window if hidden, clamped to viewport
+        const revealBrowserWindow = () => {
             setShowBrowserWindow(true);
-            // Auto-show browser window if hidden, clamped to viewport
             if (!elementPositions.browser) {
                 const size = { w: 550, h: 380 };
                 const clamped = clampToViewport({ x: window.innerWidth / 2 - 200, y: window.innerHeight / 2 }, size);
@@ -437,6 +439,25 @@ function App() {
                     browser: clamped
                 }));
             }
+        };
+        // Task state and log lines arrive in order; several web tasks may run at once
+        socket.on('web_task_update', (data) => {
+            setBrowserData(prev => ({
+                ...prev,
+                logs: [...prev.logs, data.log && (data.task_id ? `[${data.task_id}] ${data.log}` : data.log)].filter(l => l).slice(-50), // Keep last 50 logs
+                tasks: data.task_id ? {
+                    ...prev.tasks,
+                    [data.task_id]: { state: data.state, turn: data.turn }
+                } : prev.tasks
+            }));
+            revealBrowserWindow();
+        });
+        // Screenshots only; the server keeps just the newest pending frame
+        socket.on('browser_frame', (data) => {
+            if (data.image) {
+                setBrowserData(prev => ({ ...prev, image: data.image }));
+            }
+            revealBrowserWindow();
         });
 
         // Handle streaming transcription
@@ -627,6 +648,7 @@ function App() {
             socket.off('cad_thought');
             socket.off('cad_status');
             socket.off('browser_frame');
+            socket.off('web_task_update');
             socket.off('transcription');
             socket.off('tool_confirmation_request');
             socket.off('kasa_devices');
@@ -1602,6 +1624,7 @@ function App() {
                             <BrowserWindow
                                 imageSrc={browserData.image}
                                 logs={browserData.logs}
+                                tasks={browserData.tasks}
                                 onClose={() => setShowBrowserWindow(false)}
                                 socket={socket}
                             />
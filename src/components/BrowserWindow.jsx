@@ -2,7 +2,7 @@
 import React, { useEffect, useRef } from 'react';
 import { Globe, X } from 'lucide-react';
 
-const BrowserWindow = ({ imageSrc, logs, onClose, socket }) => {
+const BrowserWindow = ({ imageSrc, logs, tasks = {}, onClose, socket }) => {
     const [input, setInput] = React.useState('');
     const logsEndRef = useRef(null);
 
@@ -36,6 +36,26 @@ const BrowserWindow = ({ imageSrc, logs, onClose, socket }) => {
                 </button>
             </div>
 
+            {/* Active Tasks */}
+            {Object.entries(tasks).some(([, t]) => t.state === 'queued' || t.state === 'running') && (
+                <div className="bg-[#181818] border-b border-gray-800 px-2 py-1 flex flex-wrap gap-1 shrink-0">
+                    {Object.entries(tasks)
+                        .filter(([, t]) => t.state === 'queued' || t.state === 'running')
+                        .map(([id, t]) => (
+                            <span key={id} className="flex items-center gap-1 text-[10px] font-mono px-1.5 py-0.5 rounded bg-cyan-500/10 text-cyan-400 border border-cyan-500/20">
+                                {id} · {t.state}{t.state === 'running' && t.turn ? ` · turn ${t.turn}` : ''}
+                                <button
+                                    onClick={() => socket && socket.emit('cancel_web_task', { task_id: id })}
+                                    className="hover:text-red-400"
+                                    title="Cancel task"
+                                >
+                                    <X size={10} />
+                                </button>
+                            </span>
+                        ))}
+                </div>
+            )}
+
             {/* Browser Content */}
             <div className="flex-1 relative bg-black flex items-center justify-center overflow-hidden">
                 {imageSrc ? (
@@ -29,7 +29,7 @@ const LoadingCube = () => {
 };
 
 const CadWindow = ({ data, thoughts, retryInfo = {}, onClose, socket }) => {
-    // data format: { format: "stl", data: "base64..." }
+    // data format: { format: "mesh", vertices: ArrayBuffer, indices: ArrayBuffer } or { format: "stl", data: ArrayBuffer | "base64..." }
     const [isIterating, setIsIterating] = useState(false);
     const [prompt, setPrompt] = useState("");
     const [isSending, setIsSending] = useState(false);
@@ -48,20 +48,42 @@ const CadWindow = ({ data, thoughts, retryInfo = {}, onClose, socket }) => {
     }, [thoughts]);
 
     const geometry = useMemo(() => {
-        if (!data || data.format !== 'stl' || !data.data) return null;
+        if (!data) return null;
 
         try {
-            // Convert Base64 to ArrayBuffer
-            const byteCharacters = atob(data.data);
-            const byteNumbers = new Array(byteCharacters.length);
-            for (let i = 0; i < byteCharacters.length; i++) {
-                byteNumbers[i] = byteCharacters.charCodeAt(i);
+            // Indexed mesh: binary attachments with float32 xyz + uint32 triangle indices
+            if (data.format === 'mesh' && data.vertices && data.indices) {
+                const geom = new THREE.BufferGeometry();
+                geom.setAttribute('position', new THREE.BufferAttribute(new Float32Array(data.vertices), 3));
+                geom.setIndex(new THREE.BufferAttribute(new Uint32Array(data.indices), 1));
+                // Shared vertices would average normals across hard CAD edges; un-index
+                // so every facet gets its own flat normal, like the STL path
+                const flat = geom.toNonIndexed();
+                geom.dispose();
+                flat.computeVertexNormals();
+                flat.center();
+                return flat;
+            }
+
+            if (data.format !== 'stl' || !data.data) return null;
+
+            let buffer;
+            if (typeof data.data === 'string') {
+                // Legacy: Convert Base64 to ArrayBuffer
+                const byteCharacters = atob(data.data);
+                const byteArray = new Uint8Array(byteCharacters.length);
+                for (let i = 0; i < byteCharacters.length; i++) {
+                    byteArray[i] = byteCharacters.charCodeAt(i);
+                }
+                buffer = byteArray.buffer;
+            } else {
+                // Binary STL attachment (ArrayBuffer)
+                buffer = data.data;
             }
-            const byteArray = new Uint8Array(byteNumbers);
 
             // Parse directly using THREE.STLLoader
             const loader = new STLLoader();
-            const geom = loader.parse(byteArray.buffer);
+            const geom = loader.parse(buffer);
             geom.center(); // Optional: Center the geometry
             return geom;
         } catch (e) {
@@ -207,7 +229,7 @@ const CadWindow = ({ data, thoughts, retryInfo = {}, onClose, socket }) => {
                         </h4>
                         {retryInfo.attempt && (
                             <span className={`text-xs font-mono px-2 py-0.5 rounded ${retryInfo.error ? 'bg-yellow-500/20 text-yellow-400' : 'bg-cyan-500/20 text-cyan-400'}`}>
-                                Attempt {retryInfo.attempt}/{retryInfo.maxAttempts || 3}
+                                {retryInfo.candidates > 1 && `Candidate ${retryInfo.candidate}/${retryInfo.candidates} · `}Attempt {retryInfo.attempt}/{retryInfo.maxAttempts || 3}
                             </span>
                         )}
                     </div>
@@ -186,7 +186,16 @@ const PrinterWindow = ({
                             <div className="mb-4 p-3 bg-blue-500/10 border border-blue-500/30 rounded-lg">
                                 <div className="text-[10px] uppercase text-blue-300 font-bold mb-2 tracking-wider flex justify-between">
                                     <span>Preparation Pipeline</span>
-                                    <span>{slicingProgress.percent}%</span>
+                                    <span className="flex items-center gap-2">
+                                        {slicingProgress.percent}%
+                                        <button
+                                            onClick={() => socket.emit('cancel_slicing')}
+                                            className="text-red-300 hover:text-red-200 hover:bg-red-500/20 rounded p-0.5 transition-colors"
+                                            title="Cancel slicing"
+                                        >
+                                            <X size={10} />
+                                        </button>
+                                    </span>
                                 </div>
                                 {/* Pipeline Stages */}
                                 <div className="flex items-center gap-2 mb-2 text-[10px] text-white/40">
@@ -0,0 +1,114 @@
+# File: test_audio_capture.py - Purpose: This file handles Test Audio Capture functionality.
+"""
+Tests for the mic capture thread and ring buffer.
+"""
+import asyncio
+import time
+
+import pytest
+
+from audio_capture import AudioRingBuffer, AudioCaptureThread
+
+
+class FakeStream:
+    """Stands in for a PyAudio input stream: returns numbered chunks in real time."""
+
+    def __init__(self, chunk_bytes, delay=0.005):
+        self.chunk_bytes = chunk_bytes
+        self.delay = delay
+        self.count = 0
+
+    def read(self, frames, **kwargs):
+        time.sleep(self.delay)
+        self.count += 1
+        return bytes([self.count % 256]) * self.chunk_bytes
+
+
+class TestAudioRingBuffer:
+    """Test the SPSC ring buffer."""
+
+    def test_write_and_read_batch(self):
+        """Chunks come back in order."""
+        ring = AudioRingBuffer(chunk_bytes=4, capacity=4)
+        for i in range(3):
+            assert ring.write(bytes([i]) * 4)
+        assert len(ring) == 3
+        assert ring.read_batch() == [b"\x00" * 4, b"\x01" * 4, b"\x02" * 4]
+        assert len(ring) == 0
+
+    def test_overflow_drops_newest(self):
+        """A full ring rejects writes and counts overflows."""
+        ring = AudioRingBuffer(chunk_bytes=2, capacity=2)
+        assert ring.write(b"aa")
+        assert ring.write(b"bb")
+        assert ring.write(b"cc") is False
+        assert ring.overflows == 1
+        assert ring.read_batch() == [b"aa", b"bb"]
+
+    def test_underrun_counted(self):
+        """Draining an empty ring counts an underrun."""
+        ring = AudioRingBuffer(chunk_bytes=2, capacity=2)
+        assert ring.read_batch() == []
+        assert ring.underruns == 1
+
+    def test_wraparound_and_short_chunks(self):
+        """Slots are reused and short chunks keep their length."""
+        ring = AudioRingBuffer(chunk_bytes=4, capacity=2)
+        for i in range(5):
+            ring.write(bytes([i]) * (i % 4 + 1))
+            assert ring.read_batch() == [bytes([i]) * (i % 4 + 1)]
+
+    def test_max_chunks(self):
+        """read_batch honours max_chunks."""
+        ring = AudioRingBuffer(chunk_bytes=1, capacity=8)
+        for i in range(5):
+            ring.write(bytes([i]))
+        assert len(ring.read_batch(max_chunks=2)) == 2
+        assert len(ring) == 3
+
+
+class TestAudioCaptureThread:
+    """Test the capture thread feeding the ring and signalling the loop."""
+
+    async def test_signals_event_loop(self):
+        """Captured chunks land in the ring and wake the loop."""
+        loop = asyncio.get_running_loop()
+        ring = AudioRingBuffer(chunk_bytes=8, capacity=64)
+        signalled = asyncio.Event()
+
+        thread = AudioCaptureThread(FakeStream(8), ring, chunk_size=4, sample_rate=16000,
+                                    loop=loop, on_data=signalled.set)
+        thread.start()
+        try:
+            await asyncio.wait_for(signalled.wait(), timeout=2.0)
+        finally:
+            thread.stop()
+
+        assert not thread.is_alive()
+        chunks = ring.read_batch()
+        assert chunks and all(len(c) == 8 for c in chunks)
+        assert thread.stats()["chunks_captured"] >= 1
+
+    def test_paused_chunks_discarded(self):
+        """While paused the device is still drained but nothing is buffered."""
+        ring = AudioRingBuffer(chunk_bytes=8, capacity=64)
+        thread = AudioCaptureThread(FakeStream(8, delay=0.001), ring, chunk_size=4,
+                                    sample_rate=16000, is_paused=lambda: True)
+        thread.start()
+        time.sleep(0.05)
+        thread.stop()
+        assert len(ring) == 0
+        assert thread.paused_chunks > 0
+
+    def test_read_errors_counted(self):
+        """Stream errors are counted and the thread keeps running."""
+        class BrokenStream:
+            def read(self, frames, **kwargs):
+                raise OSError("Input overflowed")
+
+        ring = AudioRingBuffer(chunk_bytes=8, capacity=4)
+        thread = AudioCaptureThread(BrokenStream(), ring, chunk_size=4, sample_rate=16000)
+        thread.start()
+        time.sleep(0.05)
+        thread.stop()
+        assert thread.read_errors >= 1
@@ -0,0 +1,102 @@
+# File: test_audio_playback.py - Purpose: This file handles Test Audio Playback functionality.
+"""
+Tests for the jitter-buffered playback engine.
+"""
+import threading
+import time
+
+import pytest
+
+from audio_playback import PlaybackEngine
+
+
+class FakeOutputStream:
+    """Stands in for a PyAudio output stream: records writes, blocks for real time."""
+
+    def __init__(self, bytes_per_second):
+        self.bytes_per_second = bytes_per_second
+        self.writes = []
+        self.lock = threading.Lock()
+
+    def write(self, data):
+        time.sleep(len(data) / self.bytes_per_second)
+        with self.lock:
+            self.writes.append(data)
+
+    def get_output_latency(self):
+        return 0.0
+
+
+def wait_until(predicate, timeout=2.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+@pytest.fixture
+def engine():
+    # 8 kHz mono 16-bit: 16 bytes per ms
+    stream = FakeOutputStream(bytes_per_second=16000)
+    eng = PlaybackEngine(stream, sample_rate=8000, jitter_ms=20, period_ms=10)
+    eng.start()
+    yield eng
+    eng.stop()
+
+
+class TestPlaybackEngine:
+    """Test coalescing, flushing and metrics."""
+
+    def test_period_sizes(self, engine):
+        """Period and prebuffer sizes are frame-aligned."""
+        assert engine.period_bytes == 160
+        assert engine.prebuffer_bytes == 320
+
+    def test_coalesces_small_chunks(self, engine):
+        """Many small chunks are written as fixed-size periods."""
+        for _ in range(40):
+            engine.feed(b"\x01" * 30)  # 1200 bytes total
+        assert wait_until(lambda: engine.bytes_written >= 1200)
+        sizes = {len(w) for w in engine.stream.writes}
+        assert sizes == {engine.period_bytes}
+
+    def test_tail_padded_with_silence(self, engine):
+        """A short utterance is played and padded to a full period."""
+        engine.feed(b"\x02" * 100)
+        assert wait_until(lambda: engine.periods_written == 1)
+        write = engine.stream.writes[0]
+        assert write[:100] == b"\x02" * 100
+        assert write[100:] == bytes(60)
+
+    def test_flush_drops_buffer(self, engine):
+        """flush() discards queued audio immediately."""
+        engine.feed(b"\x03" * 16000)  # one second
+        time.sleep(0.05)
+        dropped = engine.flush()
+        assert dropped > 0
+        assert engine.queued_ms == 0
+        assert engine.stats()["flushes"] == 1
+
+    def test_latency_recorded(self, engine):
+        """First-byte-to-audible latency is tracked per burst."""
+        engine.feed(b"\x04" * 640)
+        assert wait_until(lambda: engine.stats()["last_latency_ms"] is not None)
+        assert engine.stats()["last_latency_ms"] >= 0
+
+    def test_underrun_counted(self, engine):
+        """Data arriving after the buffer ran dry mid-burst counts as an underrun."""
+        engine.feed(b"\x05" * 480)
+        assert wait_until(lambda: engine.bytes_written >= 480)
+        time.sleep(0.005)  # shorter than the jitter window
+        engine.feed(b"\x05" * 480)
+        assert wait_until(lambda: engine.bytes_written >= 960)
+        assert engine.underruns >= 1
+
+    def test_stop_joins_thread(self):
+        """stop() ends the writer thread."""
+        eng = PlaybackEngine(FakeOutputStream(16000), sample_rate=8000)
+        eng.start()
+        eng.stop()
+        assert not eng._thread.is_alive()
@@ -0,0 +1,129 @@
+# File: test_audio_vad.py - Purpose: This file handles Test Audio Vad functionality.
+"""
+Tests for the NumPy Voice Activity Detectors.
+"""
+import math
+import struct
+
+import numpy as np
+import pytest
+
+from audio_vad import (
+    VoiceActivityDetector,
+    ZeroCrossingVAD,
+    HangoverVAD,
+    create_vad,
+)
+
+
+def make_chunk(amplitude=0.0, freq=220.0, noise=0.0, size=1024, rate=16000, seed=0):
+    """Build a 16-bit PCM chunk from a sine tone plus optional white noise."""
+    t = np.arange(size) / rate
+    signal = amplitude * np.sin(2 * np.pi * freq * t)
+    if noise:
+        signal = signal + np.random.default_rng(seed).normal(0, noise, size)
+    return np.clip(signal, -32768, 32767).astype("<i2").tobytes()
+
+
+def legacy_rms(data):
+    """Original struct-based RMS from AudioLoop.listen_audio."""
+    count = len(data) // 2
+    shorts = struct.unpack(f"<{count}h", data)
+    return int(math.sqrt(sum(s**2 for s in shorts) / count))
+
+
+class TestEnergyVAD:
+    """Test the default energy detector."""
+
+    def test_rms_matches_legacy(self):
+        """NumPy RMS matches the old struct/sum implementation."""
+        vad = VoiceActivityDetector()
+        for amp in (0, 50, 800, 4000, 30000):
+            chunk = make_chunk(amp, noise=20)
+            assert abs(vad.rms(chunk) - legacy_rms(chunk)) <= 1
+
+    def test_empty_chunk(self):
+        """Empty buffers are silence."""
+        vad = VoiceActivityDetector()
+        assert vad.rms(b"") == 0
+        assert vad.is_speech(b"") is False
+
+    def test_threshold(self):
+        """Loud chunks are speech, quiet ones are not."""
+        vad = VoiceActivityDetector(threshold=800)
+        assert vad.is_speech(make_chunk(4000)) is True
+        assert vad.is_speech(make_chunk(100)) is False
+
+    def test_grows_scratch_buffer(self):
+        """Chunks larger than the preallocated buffer still work."""
+        vad = VoiceActivityDetector(max_samples=16)
+        chunk = make_chunk(4000, size=2048)
+        assert abs(vad.rms(chunk) - legacy_rms(chunk)) <= 1
+
+
+class TestZeroCrossingVAD:
+    """Test the zero-crossing detector."""
+
+    def test_rejects_low_frequency_hum(self):
+        """Loud 50 Hz hum has too few crossings to be speech."""
+        vad = ZeroCrossingVAD()
+        assert vad.is_speech(make_chunk(5000, freq=50)) is False
+
+    def test_rejects_broadband_hiss(self):
+        """Loud white noise crosses zero too often to be speech."""
+        vad = ZeroCrossingVAD()
+        assert vad.is_speech(make_chunk(0, noise=3000)) is False
+
+    def test_accepts_voiced_tone(self):
+        """A loud tone in the voice band is speech."""
+        vad = ZeroCrossingVAD()
+        assert vad.is_speech(make_chunk(5000, freq=300)) is True
+
+
+class TestHangoverVAD:
+    """Test attack/hangover smoothing."""
+
+    def test_attack_and_hangover(self):
+        """Speech needs consecutive loud chunks and is held through short gaps."""
+        vad = HangoverVAD(attack_chunks=2, hangover_chunks=2)
+        loud, quiet = make_chunk(4000), make_chunk(0)
+
+        assert vad.is_speech(loud) is False  # attack not reached
+        assert vad.is_speech(loud) is True
+        assert vad.is_speech(quiet) is True  # hangover 1
+        assert vad.is_speech(quiet) is True  # hangover 2
+        assert vad.is_speech(quiet) is False
+
+    def test_single_click_ignored(self):
+        """An isolated loud chunk does not start speech."""
+        vad = HangoverVAD(attack_chunks=2, hangover_chunks=4)
+        assert vad.is_speech(make_chunk(4000)) is False
+        assert vad.is_speech(make_chunk(0)) is False
+
+    def test_reset(self):
+        """reset() clears smoothing state."""
+        vad = HangoverVAD(attack_chunks=1, hangover_chunks=5)
+        vad.is_speech(make_chunk(4000))
+        vad.reset()
+        assert vad.is_speech(make_chunk(0)) is False
+
+
+class TestCreateVAD:
+    """Test the detector factory."""
+
+    @pytest.mark.parametrize("mode,cls", [
+        ("energy", VoiceActivityDetector),
+        ("zcr", ZeroCrossingVAD),
+        ("hangover", HangoverVAD),
+        (None, VoiceActivityDetector),
+        ("bogus", VoiceActivityDetector),
+    ])
+    def test_modes(self, mode, cls):
+        """Factory maps mode names to detector classes."""
+        assert type(create_vad(mode)) is cls
+
+    def test_kwargs_forwarded(self):
+        """Keyword arguments reach the detector."""
+        vad = create_vad("hangover", threshold=123, hangover_chunks=7)
+        assert vad.threshold == 123
+        assert vad.hangover_chunks == 7
@@ -0,0 +1,78 @@
+# File: test_audio_viz.py - Purpose: This file handles Test Audio Viz functionality.
+"""
+Tests for the audio visualization feed.
+"""
+import numpy as np
+import pytest
+
+from audio_viz import AudioVisualizer
+
+
+def make_tone(freq=1000.0, amplitude=20000, samples=2400, rate=24000):
+    t = np.arange(samples) / rate
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype("<i2").tobytes()
+
+
+class TestModes:
+    """Payload shape for each visualization mode."""
+
+    def test_raw_matches_legacy_payload(self):
+        viz = AudioVisualizer(mode="raw")
+        data = make_tone(samples=16)
+        assert viz.process(data) == {"data": list(data)}
+
+    def test_binary_passes_pcm_bytes(self):
+        viz = AudioVisualizer(mode="binary")
+        data = make_tone(samples=16)
+        payload = viz.process(data)
+        assert payload["data"] == data
+        assert isinstance(payload["data"], bytes)
+
+    def test_levels_are_bytes_of_band_count(self):
+        viz = AudioVisualizer(mode="levels", bands=32)
+        payload = viz.process(make_tone(), now=0.0)
+        assert isinstance(payload["data"], bytes)
+        assert len(payload["data"]) == 32
+
+    def test_unknown_mode_falls_back(self):
+        viz = AudioVisualizer(mode="bogus")
+        assert viz.mode == "levels"
+
+
+class TestLevels:
+    """Band levels track the signal."""
+
+    def test_silence_is_zero(self):
+        viz = AudioVisualizer()
+        levels = np.frombuffer(viz.process(bytes(4800), now=0.0)["data"], dtype=np.uint8)
+        assert levels.max() == 0
+
+    def test_tone_peaks_in_one_band(self):
+        viz = AudioVisualizer()
+        levels = np.frombuffer(viz.process(make_tone(), now=0.0)["data"], dtype=np.uint8)
+        assert levels.max() > 200
+        # Energy is concentrated, not spread across every bar
+        assert np.count_nonzero(levels > 200) <= 4
+
+    def test_higher_tone_peaks_in_higher_band(self):
+        low = np.frombuffer(AudioVisualizer().process(make_tone(300), now=0.0)["data"], dtype=np.uint8)
+        high = np.frombuffer(AudioVisualizer().process(make_tone(5000), now=0.0)["data"], dtype=np.uint8)
+        assert high.argmax() > low.argmax()
+
+    def test_peak_envelope_scales_with_amplitude(self):
+        quiet = AudioVisualizer(mode="peaks").process(make_tone(amplitude=4000), now=0.0)
+        loud = AudioVisualizer(mode="peaks").process(make_tone(amplitude=30000), now=0.0)
+        assert max(loud["data"]) > max(quiet["data"])
+
+
+class TestThrottle:
+    """Emits are rate limited to rate_hz."""
+
+    def test_drops_between_intervals(self):
+        viz = AudioVisualizer(rate_hz=30)
+        chunk = make_tone(samples=480)  # 20 ms
+        emitted = [viz.process(chunk, now=i * 0.02) is not None for i in range(50)]  # 1 s
+        assert sum(emitted) <= 30
+        assert sum(emitted) >= 20
+        assert viz.chunks_in == 50
+        assert viz.payloads_out == sum(emitted)
@@ -0,0 +1,242 @@
+# File: test_browser_pool.py - Purpose: This file handles Test Browser Pool functionality.
+"""
+Tests for the pre-warmed browser pool. Most need Playwright's Chromium (skipped
+otherwise); renewal failures use a stand-in browser.
+"""
+import asyncio
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from browser_pool import BrowserPool
+
+START_URL = "data:text/html,<title>start</title><p>parked</p>"
+
+
+def chromium_available() -> bool:
+    try:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as p:
+            p.chromium.launch(headless=True).close()
+        return True
+    except Exception:
+        return False
+
+
+needs_chromium = pytest.mark.skipif(not chromium_available(), reason="Playwright Chromium not installed")
+
+
+@pytest.fixture
+async def pool():
+    pool = BrowserPool(size=2, start_url=START_URL)
+    await pool.start()
+    yield pool
+    await pool.close()
+
+
+@pytest.fixture
+async def single():
+    """One context, so every checkout gets the renewed slot of the previous task."""
+    pool = BrowserPool(size=1, start_url=START_URL)
+    await pool.start()
+    yield pool
+    await pool.close()
+
+
+@pytest.fixture
+def origin(tmp_path):
+    """A real http origin (IndexedDB is unavailable on data: URLs)."""
+    (tmp_path / "index.html").write_text("<title>origin</title>")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(SimpleHTTPRequestHandler, directory=str(tmp_path)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/index.html"
+    server.shutdown()
+
+
+WRITE_IDB = """() => new Promise((resolve, reject) => {
+    const req = indexedDB.open("task-data", 1);
+    req.onupgradeneeded = () => req.result.createObjectStore("items");
+    req.onsuccess = () => {
+        const tx = req.result.transaction("items", "readwrite");
+        tx.objectStore("items").put("secret", "k");
+        tx.oncomplete = () => { req.result.close(); resolve(true); };
+        tx.onerror = () => reject(tx.error);
+    };
+    req.onerror = () => reject(req.error);
+})"""
+
+LIST_IDB = "async () => (await indexedDB.databases()).map(d => d.name)"
+
+
+async def settle(pool):
+    """Waits for background resets to put slots back."""
+    for _ in range(100):
+        if pool.stats()["idle"] == pool.size:
+            return
+        await asyncio.sleep(0.05)
+
+
+@needs_chromium
+class TestCheckout:
+    """Warm checkout, reset and concurrency."""
+
+    async def test_checkout_is_warm_and_parked(self, pool):
+        async with pool.checkout() as slot:
+            assert await slot.page.title() == "start"
+        assert pool.stats()["cold_starts"] == 1
+        assert pool.stats()["last_checkout_ms"] < 500
+
+    async def test_reset_clears_cookies_and_reparks(self, single):
+        pool = single
+        async with pool.checkout() as slot:
+            await slot.context.add_cookies([{"name": "session", "value": "x", "url": "https://example.com"}])
+            await slot.page.goto("about:blank")
+            first = slot
+        await settle(pool)
+        async with pool.checkout() as slot:
+            assert slot.context is not first.context
+            assert await slot.context.cookies() == []
+            assert await slot.page.title() == "start"
+
+    async def test_reset_clears_indexeddb_of_visited_origins(self, single, origin):
+        pool = single
+        async with pool.checkout() as slot:
+            await slot.page.goto(origin)
+            await slot.page.evaluate(WRITE_IDB)
+            assert "task-data" in await slot.page.evaluate(LIST_IDB)
+        await settle(pool)
+        async with pool.checkout() as slot:
+            await slot.page.goto(origin)
+            assert await slot.page.evaluate(LIST_IDB) == []
+
+    async def test_concurrent_tasks_get_separate_contexts(self, pool):
+        async with pool.checkout() as a, pool.checkout() as b:
+            assert a.context is not b.context
+
+    async def test_every_task_gets_a_fresh_context(self, single):
+        pool = single
+        seen = []
+        for _ in range(3):
+            await settle(pool)
+            async with pool.checkout() as slot:
+                seen.append(slot.context)
+        await settle(pool)
+        assert pool.stats()["recycled"] == 3
+        assert len(set(map(id, seen))) == 3
+        assert all(context not in [s.context for s in pool._slots] for context in seen)
+        assert pool.stats()["contexts"] == 1
+
+
+@needs_chromium
+class TestHealth:
+    """Broken slots and browsers are replaced."""
+
+    async def test_closed_page_is_replaced(self, pool):
+        async with pool.checkout() as slot:
+            await slot.page.close()
+        await settle(pool)
+        async with pool.checkout() as a, pool.checkout() as b:
+            assert not a.page.is_closed() and not b.page.is_closed()
+
+    async def test_relaunch_after_browser_crash(self, pool):
+        await pool.browser.close()
+        async with pool.checkout() as slot:
+            assert await slot.page.title() == "start"
+        assert pool.stats()["cold_starts"] == 2
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    async def evaluate(self, script):
+        return 1
+
+    async def goto(self, url):
+        pass
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+
+    async def new_page(self):
+        page = FakePage()
+        self.pages.append(page)
+        return page
+
+    async def close(self):
+        for page in self.pages:
+            page.closed = True
+
+
+class FlakyBrowser:
+    """Stand-in browser whose new_context fails `failures` times once armed."""
+
+    def __init__(self):
+        self.failures = 0
+        self.contexts = 0
+
+    def is_connected(self):
+        return True
+
+    async def new_context(self, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("Target page, context or browser has been closed")
+        self.contexts += 1
+        return FakeContext()
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+async def flaky():
+    pool = BrowserPool(size=1, start_url=START_URL)
+    pool.browser = FlakyBrowser()
+    pool._idle = asyncio.Queue()
+    slot = await pool._new_slot()
+    pool._slots.append(slot)
+    pool._idle.put_nowait(slot)
+    yield pool
+    await pool.close()
+
+
+class TestRenewalFailure:
+    """A failed context renewal never shrinks the pool for good."""
+
+    async def test_checkout_after_failed_renewal(self, flaky):
+        pool = flaky
+        async with pool.checkout() as slot:
+            first = slot
+            pool.browser.failures = 1  # renewal after this task fails
+        await settle(pool)
+        assert pool.stats()["renew_failures"] == 1 and pool.stats()["contexts"] == 0
+
+        async with pool.checkout() as slot:
+            assert slot is not first and not slot.page.is_closed()
+            assert pool.stats()["contexts"] == 1
+        await settle(pool)
+        assert pool.stats()["contexts"] == 1 and pool.stats()["idle"] == 1
+
+    async def test_checkout_raises_and_keeps_capacity(self, flaky):
+        pool = flaky
+        pool.browser.failures = 2  # renewal and the next checkout's own attempt fail
+        async with pool.checkout():
+            pass
+        await settle(pool)
+        with pytest.raises(RuntimeError):
+            async with pool.checkout():
+                pass
+        # The placeholder is back, so a later checkout opens a context instead of waiting forever
+        async with pool.checkout() as slot:
+            assert not slot.page.is_closed()
+        assert pool.stats()["renew_failures"] == 2
+
@@ -5,6 +5,7 @@ Tests for CAD Generation Agent.
 import pytest
 import asyncio
 import os
+from types import SimpleNamespace
 
 from cad_agent import CadAgent
 
@@ -131,3 +132,102 @@ class TestBuild123dImport:
             print(f"build123d version: {build123d.__version__}")
         except ImportError:
             pytest.skip("build123d not installed")
+
+
+class TestSpeculativeGeneration:
+    """Speculative mode: concurrent candidates, first valid STL wins (model replies are scripted)."""
+
+    # Stand-ins for build123d scripts: same shape (result_part + export_stl), no build123d needed
+    EXPORT = "def export_stl(part, path):\n    open(path, 'w').write(part)\n"
+    SLOW = EXPORT + "import time\ntime.sleep(30)\nresult_part = 'solid slow'\nexport_stl(result_part, 'output.stl')\n"
+    BROKEN = EXPORT + "result_part = 'solid'\nraise ValueError('fillet too large')\nexport_stl(result_part, 'output.stl')\n"
+    GOOD = EXPORT + "result_part = 'solid good'\nexport_stl(result_part, 'output.stl')\n"
+
+    @pytest.fixture
+    async def agent(self, monkeypatch):
+        monkeypatch.setenv("GEMINI_API_KEY", os.getenv("GEMINI_API_KEY") or "test-key")
+        agent = CadAgent(cad_cache=False, transport="base64", preview_max_triangles=0,
+                         candidates=3, temperature_range=(0.6, 1.2))
+        agent.worker_pool.preload = ()
+        replies = {0.6: self.SLOW, 0.9: self.BROKEN, 1.2: self.GOOD}
+
+        async def scripted_reply(contents, temperature=1.0, forward_thoughts=True):
+            await asyncio.sleep(0.1 if temperature != 1.2 else 0.3)
+            return replies[temperature]
+
+        agent._request_code = scripted_reply
+        yield agent
+        await agent.close()
+
+    async def test_first_valid_candidate_wins(self, agent, tmp_path):
+        statuses = []
+        agent.on_status = statuses.append
+
+        start = asyncio.get_running_loop().time()
+        result = await agent.generate_prototype("a cube", output_dir=str(tmp_path))
+        elapsed = asyncio.get_running_loop().time() - start
+
+        assert result is not None and result["candidate"] == 3
+        assert elapsed < 10  # did not wait for the slow candidate
+        assert "good" in (tmp_path / "current_design.py").read_text()
+        assert not list(tmp_path.glob("candidate_*.py"))
+        assert [p.name for p in tmp_path.glob("*.stl")] == [os.path.basename(result["file_path"])]
+        assert agent.worker_pool.stats()["cancelled"] == 1
+
+        won = [s for s in statuses if s["status"] == "candidate_succeeded"]
+        assert won and won[0]["temperature"] == 1.2
+        assert {s.get("candidate") for s in statuses if s["status"] == "generating"} == {1, 2, 3}
+
+    async def test_all_candidates_fail(self, agent, tmp_path):
+        async def always_broken(contents, temperature=1.0, forward_thoughts=True):
+            return self.BROKEN
+
+        agent._request_code = always_broken
+        statuses = []
+        agent.on_status = statuses.append
+        assert await agent.generate_prototype("a cube", output_dir=str(tmp_path)) is None
+        assert statuses[-1]["status"] == "failed"
+        assert not list(tmp_path.glob("candidate_*.py"))
+
+
+class TestStreamingExtraction:
+    """Code is used as soon as its block closes; broken code never reaches a worker."""
+
+    @pytest.fixture
+    async def agent(self, monkeypatch):
+        monkeypatch.setenv("GEMINI_API_KEY", os.getenv("GEMINI_API_KEY") or "test-key")
+        agent = CadAgent(cad_cache=False)
+        agent.worker_pool.preload = ()
+        yield agent
+        await agent.close()
+
+    @staticmethod
+    def fake_client(texts, closed):
+        async def stream():
+            try:
+                for text in texts:
+                    part = SimpleNamespace(text=text, thought=False)
+                    yield SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+                await asyncio.Event().wait()  # the model keeps talking forever
+            finally:
+                closed.append(True)
+
+        async def generate_content_stream(**kwargs):
+            return stream()
+
+        return SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(generate_content_stream=generate_content_stream)))
+
+    async def test_returns_when_block_closes(self, agent):
+        closed = []
+        agent.client = self.fake_client(["Sure:\n```pyt", "hon\nresult_part = 1\n", "```\nNow some explanation"], closed)
+        code = await asyncio.wait_for(agent._request_code("a cube"), timeout=5)
+        assert code == "result_part = 1"
+        assert closed == [True]
+
+    async def test_broken_script_skips_execution(self, agent, tmp_path):
+        script_path = str(tmp_path / "current_design.py")
+        code = "from build123d import *\nwith BuildPart() as p\n    Box(1, 1, 1)\n"
+        returncode, _, stderr, _ = await agent._execute_cached(code, script_path, str(tmp_path / "o.stl"), "cube")
+        assert returncode == 1 and "SyntaxError" in stderr
+        assert agent.rejected_scripts == 1
+        assert agent.worker_pool.stats()["jobs_run"] == 0
@@ -0,0 +1,111 @@
+# File: test_cad_cache.py - Purpose: This file handles Test Cad Cache functionality.
+"""
+Tests for the content-addressed CAD result cache.
+"""
+import os
+
+import pytest
+
+from cad_cache import CadResultCache, normalize_script
+from project_manager import ProjectManager
+
+SCRIPT = """from build123d import *
+# a simple box
+with BuildPart() as p:
+    Box(10, 10, 10)
+
+result_part = p.part
+export_stl(result_part, 'output.stl')
+"""
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CadResultCache(str(tmp_path / "cache"), max_bytes=1000)
+
+
+def stl(tmp_path, name, size=100):
+    path = tmp_path / name
+    path.write_bytes(b"s" * size)
+    return str(path)
+
+
+class TestKeys:
+    """Cosmetic edits map to the same key, geometry edits do not."""
+
+    def test_comments_and_whitespace_ignored(self, cache):
+        noisy = SCRIPT.replace("# a simple box", "# a box, retried").replace("Box(10, 10, 10)", "Box(10, 10, 10)   # cube") + "\n\n"
+        assert cache.key_for(noisy) == cache.key_for(SCRIPT)
+        assert normalize_script(SCRIPT).startswith("from build123d import *\nwith BuildPart()")
+
+    def test_geometry_change_changes_key(self, cache):
+        assert cache.key_for(SCRIPT.replace("Box(10, 10, 10)", "Box(10, 10, 12)")) != cache.key_for(SCRIPT)
+
+    def test_hash_inside_string_is_not_a_comment(self, cache):
+        a = "label = 'part #1'\n"
+        b = "label = 'part #2'\n"
+        assert cache.key_for(a) != cache.key_for(b)
+
+
+class TestStore:
+    """Hits, hardlinks, LRU eviction and persistence."""
+
+    def test_hit_materializes_hardlink(self, cache, tmp_path):
+        key = cache.key_for(SCRIPT)
+        assert cache.materialize(key, str(tmp_path / "miss.stl")) is False
+        source = stl(tmp_path, "output_1.stl")
+        cache.put(key, source, prompt="box")
+
+        dest = tmp_path / "output_2.stl"
+        assert cache.materialize(key, str(dest)) is True
+        assert dest.read_bytes() == b"s" * 100
+        assert os.stat(dest).st_ino == os.stat(source).st_ino
+        assert cache.stats()["hits"] == 1
+
+    def test_lru_eviction_by_bytes(self, cache, tmp_path):
+        for name in ("a", "b", "c"):
+            cache.put(name * 64, stl(tmp_path, f"{name}.stl", size=400), prompt=name)
+        # a+b+c = 1200 bytes > 1000: the oldest goes
+        assert cache.get("a" * 64) is None
+        assert cache.get("b" * 64) is not None   # b is now most recently used
+        cache.put("d" * 64, stl(tmp_path, "d.stl", size=400))
+        assert cache.get("c" * 64) is None
+        assert cache.get("b" * 64) is not None
+        assert cache.stats()["bytes"] == 800
+        assert cache.stats()["evictions"] == 2
+
+    def test_index_survives_restart(self, cache, tmp_path):
+        key = cache.key_for(SCRIPT)
+        cache.put(key, stl(tmp_path, "output.stl"))
+        reopened = CadResultCache(str(cache.root), max_bytes=1000)
+        assert reopened.get(key) is not None
+        assert reopened.stats()["bytes"] == 100
+
+    def test_hit_does_not_rewrite_index(self, cache, tmp_path):
+        key = cache.key_for(SCRIPT)
+        cache.put(key, stl(tmp_path, "output.stl"))
+        index = cache.root / "index.json"
+        before = index.read_bytes()
+        saved_at = cache._entries[key]["last_used"]
+
+        assert cache.get(key) is not None
+        assert cache.get(key) is not None
+        assert index.read_bytes() == before   # recency stays in memory
+
+        cache.flush()
+        reopened = CadResultCache(str(cache.root), max_bytes=1000)
+        assert reopened._entries[key]["last_used"] >= saved_at
+        assert index.read_bytes() != before
+
+
+class TestSaveArtifact:
+    """ProjectManager.save_cad_artifact links instead of copying."""
+
+    def test_artifact_is_hardlinked(self, tmp_path):
+        pm = ProjectManager(str(tmp_path / "workspace"))
+        try:
+            source = stl(tmp_path, "output.stl")
+            saved = pm.save_cad_artifact(source, "a box")
+            assert saved and os.stat(saved).st_ino == os.stat(source).st_ino
+        finally:
+            pm.close()
@@ -0,0 +1,100 @@
+# File: test_cad_transport.py - Purpose: This file handles Test Cad Transport functionality.
+"""
+Tests for cad_data encoding (indexed mesh, binary STL, base64) and preview decimation.
+"""
+import base64
+
+import numpy as np
+import pytest
+
+from cad_transport import (encode_cad_payload, index_mesh, decimate, parse_stl,
+                           write_binary_stl)
+
+
+def sphere(n=40, radius=50.0):
+    """Closed UV sphere as (T, 3, 3) float32 triangles; neighbours share exact vertices."""
+    theta = np.linspace(0, np.pi, n)
+    phi = np.linspace(0, 2 * np.pi, 2 * n)
+    t, p = np.meshgrid(theta, phi, indexing="ij")
+    grid = np.stack([np.sin(t) * np.cos(p), np.sin(t) * np.sin(p), np.cos(t)], -1) * radius
+    a, b, c, d = grid[:-1, :-1], grid[1:, :-1], grid[1:, 1:], grid[:-1, 1:]
+    tris = np.concatenate([np.stack([a, b, c], -2).reshape(-1, 3, 3),
+                           np.stack([a, c, d], -2).reshape(-1, 3, 3)])
+    return tris.astype(np.float32)
+
+
+def ascii_stl(tris):
+    lines = ["solid test"]
+    for tri in tris:
+        lines += ["facet normal 0 0 0", "outer loop"]
+        lines += [f"vertex {x!r} {y!r} {z!r}" for x, y, z in tri.tolist()]
+        lines += ["endloop", "endfacet"]
+    lines.append("endsolid test")
+    return "\n".join(lines).encode()
+
+
+class TestParsing:
+    """STL round trips."""
+
+    def test_binary_round_trip(self):
+        tris = sphere(10)
+        assert np.array_equal(parse_stl(write_binary_stl(tris)), tris)
+
+    def test_ascii_stl(self):
+        tris = sphere(6)
+        assert np.allclose(parse_stl(ascii_stl(tris)), tris)
+
+    def test_rejects_garbage(self):
+        with pytest.raises(ValueError):
+            parse_stl(b"not an stl at all")
+
+
+class TestMesh:
+    """Vertex dedup and decimation."""
+
+    def test_index_mesh_is_lossless(self):
+        tris = sphere(30)
+        vertices, indices = index_mesh(tris)
+        assert np.array_equal(vertices[indices], tris)
+        assert len(vertices) < len(tris)  # shared vertices merged
+
+    def test_decimate_caps_triangles(self):
+        vertices, indices = index_mesh(sphere(150))
+        small_v, small_i = decimate(vertices, indices, 2000)
+        assert 0 < len(small_i) <= 2000
+        assert small_i.max() < len(small_v)
+        # Still roughly the same shape
+        assert np.allclose(np.abs(small_v).max(axis=0), 50.0, atol=5.0)
+
+
+class TestPayloads:
+    """cad_data payloads per transport."""
+
+    def test_mesh_payload_is_compact_binary(self):
+        stl = write_binary_stl(sphere(60))
+        payload = encode_cad_payload(stl, "mesh", max_triangles=0)
+        assert payload["format"] == "mesh"
+        assert isinstance(payload["vertices"], bytes) and isinstance(payload["indices"], bytes)
+        vertices = np.frombuffer(payload["vertices"], "<f4").reshape(-1, 3)
+        indices = np.frombuffer(payload["indices"], "<u4").reshape(-1, 3)
+        assert np.array_equal(vertices[indices], parse_stl(stl))
+        assert payload["stats"]["bytes"] < len(stl) / 2
+        assert payload["stats"]["encode_ms"] >= 0
+
+    def test_binary_stl_passthrough(self):
+        stl = write_binary_stl(sphere(10))
+        payload = encode_cad_payload(stl, "stl", max_triangles=0)
+        assert payload["data"] is stl
+        assert payload["encoding"] == "binary"
+
+    def test_base64_matches_legacy(self):
+        stl = ascii_stl(sphere(5))
+        payload = encode_cad_payload(stl, "base64", max_triangles=0)
+        assert payload["data"] == base64.b64encode(stl).decode("utf-8")
+        assert payload["format"] == "stl"
+
+    def test_preview_decimated_above_limit(self):
+        stl = write_binary_stl(sphere(100))
+        payload = encode_cad_payload(stl, "stl", max_triangles=1000)
+        assert payload["stats"]["decimated"] is True
+        assert len(parse_stl(payload["data"])) <= 1000
@@ -0,0 +1,106 @@
+# File: test_cad_worker.py - Purpose: This file handles Test Cad Worker functionality.
+"""
+Tests for the warm CAD script worker pool (uses plain Python scripts, no build123d needed).
+"""
+import asyncio
+import sys
+
+import pytest
+
+from cad_worker import CadWorkerPool
+
+
+@pytest.fixture
+async def pool():
+    pool = CadWorkerPool(preload=("json",), job_timeout=30)
+    yield pool
+    await pool.close()
+
+
+def script(tmp_path, body, name="design.py"):
+    path = tmp_path / name
+    path.write_text(body)
+    return str(path)
+
+
+class TestExecution:
+    """Scripts run like `python script.py`, but in a warm process."""
+
+    async def test_runs_script_and_writes_output(self, pool, tmp_path):
+        path = script(tmp_path, "print('built')\nopen('output.stl', 'w').write('solid')\n")
+        result = await pool.run_script(path, cwd=str(tmp_path))
+        assert result.returncode == 0
+        assert result.stdout == "built\n"
+        assert (tmp_path / "output.stl").read_text() == "solid"
+
+    async def test_second_job_is_warm(self, pool, tmp_path):
+        path = script(tmp_path, "x = 1\n")
+        await pool.run_script(path, cwd=str(tmp_path))
+        result = await pool.run_script(path, cwd=str(tmp_path))
+        assert result.warm is True
+        assert pool.stats()["warm_jobs"] >= 1
+
+    async def test_fresh_namespace_per_job(self, pool, tmp_path):
+        await pool.run_script(script(tmp_path, "leftover = 42\n"), cwd=str(tmp_path))
+        result = await pool.run_script(script(tmp_path, "print(leftover)\n", "b.py"), cwd=str(tmp_path))
+        assert result.returncode == 1
+        assert "NameError" in result.stderr
+
+    async def test_error_traceback_points_at_script(self, pool, tmp_path):
+        path = script(tmp_path, "a = 1\nraise ValueError('fillet too large')\n")
+        result = await pool.run_script(path, cwd=str(tmp_path))
+        assert result.returncode == 1
+        assert result.stderr.startswith("Traceback (most recent call last):")
+        assert f'File "{path}", line 2' in result.stderr
+        assert result.stderr.strip().endswith("ValueError: fillet too large")
+        assert "cad_worker.py" not in result.stderr
+
+    async def test_sys_exit_code(self, pool, tmp_path):
+        result = await pool.run_script(script(tmp_path, "import sys\nsys.exit(3)\n"), cwd=str(tmp_path))
+        assert result.returncode == 3
+
+
+class TestLimits:
+    """Timeouts, recycling and memory caps."""
+
+    async def test_timeout_kills_and_replaces_worker(self, pool, tmp_path):
+        result = await pool.run_script(script(tmp_path, "while True:\n    pass\n"), cwd=str(tmp_path), timeout=1)
+        assert result.timed_out is True
+        assert result.returncode != 0
+        # Pool keeps working with a fresh worker
+        ok = await pool.run_script(script(tmp_path, "print('ok')\n", "ok.py"), cwd=str(tmp_path))
+        assert ok.stdout == "ok\n"
+        assert pool.stats()["timeouts"] == 1
+
+    async def test_recycle_after_n_jobs(self, tmp_path):
+        pool = CadWorkerPool(preload=(), max_jobs_per_worker=2)
+        try:
+            path = script(tmp_path, "import os\nprint(os.getpid())\n")
+            pids = [(await pool.run_script(path, cwd=str(tmp_path))).stdout for _ in range(4)]
+            assert pids[0] == pids[1]
+            assert pids[1] != pids[2]
+            assert pool.stats()["recycled"] == 2
+        finally:
+            await pool.close()
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="RLIMIT_AS is only enforced on Linux")
+    async def test_memory_cap(self, tmp_path):
+        pool = CadWorkerPool(preload=(), memory_limit_mb=512)
+        try:
+            result = await pool.run_script(script(tmp_path, "blob = bytearray(2 * 1024 ** 3)\n"), cwd=str(tmp_path))
+            assert result.returncode != 0
+            assert "MemoryError" in result.stderr
+            ok = await pool.run_script(script(tmp_path, "print('ok')\n", "ok.py"), cwd=str(tmp_path))
+            assert ok.stdout == "ok\n"
+        finally:
+            await pool.close()
+
+    async def test_cancel_kills_running_script(self, pool, tmp_path):
+        task = asyncio.create_task(pool.run_script(script(tmp_path, "while True:\n    pass\n"), cwd=str(tmp_path)))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert pool.stats()["cancelled"] == 1
+        ok = await pool.run_script(script(tmp_path, "print('ok')\n", "ok.py"), cwd=str(tmp_path), timeout=10)
+        assert ok.stdout == "ok\n"
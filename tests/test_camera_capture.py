@@ -0,0 +1,97 @@
+# File: test_camera_capture.py - Purpose: This file handles Test Camera Capture functionality.
+"""
+Tests for the on-demand camera capture pipeline (no camera required).
+"""
+import sys
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from camera_capture import CameraCapture, default_camera_backend
+
+
+class FakeCap:
+    """Returns queued frames from read(), like cv2.VideoCapture."""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.released = False
+        self.buffers = []
+
+    def read(self, image=None):
+        self.buffers.append(image)
+        if not self.frames:
+            return False, None
+        return True, self.frames.pop(0)
+
+    def release(self):
+        self.released = True
+
+
+def make_frame(value=0, width=640, height=480, seed=None):
+    if seed is not None:
+        return np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+class TestBackend:
+    """Capture backend is picked per OS."""
+
+    def test_linux_uses_v4l2(self, monkeypatch):
+        monkeypatch.setattr(sys, "platform", "linux")
+        assert default_camera_backend() == cv2.CAP_V4L2
+
+    def test_macos_uses_avfoundation(self, monkeypatch):
+        monkeypatch.setattr(sys, "platform", "darwin")
+        assert default_camera_backend() == getattr(cv2, "CAP_AVFOUNDATION", cv2.CAP_ANY)
+
+
+class TestEncoding:
+    """JPEG output and resizing."""
+
+    def test_returns_decodable_jpeg(self):
+        camera = CameraCapture(cap=FakeCap([make_frame(seed=1)]))
+        data = camera.read_jpeg()
+        assert data[:2] == b"\xff\xd8"
+        decoded = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        assert decoded.shape == (480, 640, 3)
+
+    def test_large_frames_are_downscaled(self):
+        camera = CameraCapture(cap=FakeCap([make_frame(seed=1, width=1920, height=1080)]), max_size=1024)
+        decoded = cv2.imdecode(np.frombuffer(camera.read_jpeg(), np.uint8), cv2.IMREAD_COLOR)
+        assert max(decoded.shape[:2]) == 1024
+
+    def test_read_buffer_is_reused(self):
+        first = make_frame(seed=1)
+        cap = FakeCap([first, make_frame(seed=2)])
+        camera = CameraCapture(cap=cap)
+        camera.read_jpeg()
+        camera.read_jpeg()
+        assert cap.buffers[0] is None
+        assert cap.buffers[1] is first
+
+    def test_read_failure(self):
+        camera = CameraCapture(cap=FakeCap([]))
+        assert camera.read_jpeg() is None
+        assert camera.consecutive_failures == 1
+
+
+class TestPerceptualDiff:
+    """Unchanged frames are skipped until the scene changes."""
+
+    def test_skips_unchanged_frame(self):
+        camera = CameraCapture(cap=FakeCap([make_frame(100), make_frame(101), make_frame(200)]))
+        assert camera.read_jpeg() is not None
+        assert camera.read_jpeg() is None       # 1 level brighter: same scene
+        assert camera.read_jpeg() is not None   # real change
+        assert camera.stats()["frames_skipped"] == 1
+        assert camera.stats()["frames_encoded"] == 2
+
+    def test_force_and_reset(self):
+        camera = CameraCapture(cap=FakeCap([make_frame(100)] * 3))
+        camera.read_jpeg()
+        assert camera.read_jpeg(force=True) is not None
+        camera.reset()
+        assert camera.read_jpeg() is not None
@@ -0,0 +1,81 @@
+# File: test_code_stream.py - Purpose: This file handles Test Code Stream functionality.
+"""
+Tests for streaming code-block extraction and static script validation.
+"""
+import re
+
+from code_stream import CodeBlockStream, validate_cad_script
+
+REPLY = """Here is the script:
+
+```python
+from build123d import *
+
+with BuildPart() as p:
+    Box(10, 10, 10)
+
+result_part = p.part
+export_stl(result_part, 'output.stl')
+```
+
+The box is 10mm on each side. ```python
+not_this_one = True
+```
+"""
+
+
+def feed_in_chunks(text, size):
+    stream = CodeBlockStream()
+    for i in range(0, len(text), size):
+        code = stream.feed(text[i:i + size])
+        if code is not None:
+            return code, i + size
+    return stream.finish(), len(text)
+
+
+class TestCodeBlockStream:
+    """Incremental fence detection."""
+
+    def test_matches_regex_for_any_chunking(self):
+        expected = re.search(r'```python(.*?)```', REPLY, re.DOTALL).group(1).strip()
+        for size in (1, 2, 3, 7, 64, len(REPLY)):
+            code, _ = feed_in_chunks(REPLY, size)
+            assert code == expected, size
+
+    def test_reports_block_before_stream_ends(self):
+        _, consumed = feed_in_chunks(REPLY, 4)
+        assert consumed < REPLY.index("The box is") + 4  # within one chunk of the closing fence
+
+    def test_unclosed_block_and_no_block(self):
+        stream = CodeBlockStream()
+        stream.feed("```python\nresult_part = 1\n")
+        assert stream.closed is False
+        assert stream.finish() == "result_part = 1"
+        empty = CodeBlockStream()
+        empty.feed("no code here")
+        assert empty.finish() is None
+
+
+class TestValidation:
+    """Fail-fast checks before spawning a process."""
+
+    def test_valid_script(self):
+        code, _ = feed_in_chunks(REPLY, 16)
+        assert validate_cad_script(code) is None
+
+    def test_syntax_error(self):
+        error = validate_cad_script("with BuildPart() as p\n    Box(1, 1, 1)\n")
+        assert error.splitlines()[-1].startswith("SyntaxError")
+        assert "line 1" in error
+
+    def test_missing_result_part(self):
+        error = validate_cad_script("part = 1\nexport_stl(part, 'output.stl')\n")
+        assert "result_part" in error
+
+    def test_missing_export(self):
+        error = validate_cad_script("result_part = 1\n")
+        assert "export_stl" in error
+
+    def test_result_part_bound_indirectly(self):
+        assert validate_cad_script("for result_part in [1]:\n    pass\nexport_stl(result_part, 'o.stl')\n") is None
+        assert validate_cad_script("with open('x') as result_part:\n    pass\nresult_part.export_stl('o.stl')\n") is None
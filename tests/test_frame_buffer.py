@@ -0,0 +1,63 @@
+# File: test_frame_buffer.py - Purpose: This file handles Test Frame Buffer functionality.
+"""
+Tests for lazy latest-frame handling.
+"""
+import base64
+
+from frame_buffer import LatestFrame
+
+
+class TestLatestFrame:
+    """Frames are stored by reference and encoded only when taken."""
+
+    def test_empty(self):
+        frames = LatestFrame()
+        assert frames.payload() is None
+        assert frames.take() is None
+        assert frames.has_frame is False
+
+    def test_store_does_not_encode(self):
+        frames = LatestFrame()
+        for i in range(30):
+            frames.store(bytes([i]) * 100)
+        assert frames.encodes == 0
+        assert frames.frames_received == 30
+
+    def test_take_encodes_latest_once(self):
+        frames = LatestFrame()
+        frames.store(b"old")
+        frames.store(b"new")
+        payload = frames.take()
+        assert payload == {"mime_type": "image/jpeg", "data": base64.b64encode(b"new").decode()}
+        # Cached for repeated access
+        assert frames.take() is payload
+        assert frames.encodes == 1
+
+    def test_base64_string_passed_through(self):
+        frames = LatestFrame()
+        frames.store("aGVsbG8=")
+        assert frames.payload()["data"] == "aGVsbG8="
+        assert frames.encodes == 0
+
+    def test_memoryview_accepted(self):
+        frames = LatestFrame()
+        frames.store(memoryview(b"abc"))
+        assert frames.payload()["data"] == base64.b64encode(b"abc").decode()
+
+
+class TestCounters:
+    """Used vs dropped accounting."""
+
+    def test_dropped_vs_used(self):
+        frames = LatestFrame()
+        for i in range(10):
+            frames.store(bytes([i]))
+        frames.take()
+        frames.take()  # same frame again is not a second use
+        frames.store(b"x")
+        frames.store(b"y")
+        stats = frames.stats()
+        assert stats["frames_received"] == 12
+        assert stats["frames_used"] == 1
+        # 9 replaced before first take, 1 ("x") replaced unused after
+        assert stats["frames_dropped"] == 10
@@ -0,0 +1,126 @@
+# File: test_gcode_cache.py - Purpose: This file handles Test Gcode Cache functionality.
+"""
+Tests for the sliced G-code cache: keys, LRU eviction and per-project pinning.
+"""
+import os
+
+import pytest
+
+from gcode_cache import GcodeCache, inherits_chain
+
+
+@pytest.fixture
+def files(tmp_path):
+    stl = tmp_path / "part.stl"
+    stl.write_bytes(b"solid part\nendsolid part\n")
+    machine = tmp_path / "machine.json"
+    machine.write_text('{"nozzle_diameter": ["0.4"]}')
+    slicer = tmp_path / "slicer"
+    slicer.write_text("#!/bin/sh\n")
+    return stl, machine, slicer
+
+
+def gcode(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(b"G1 X0\n" * (size // 6))
+    return str(path)
+
+
+class TestKeys:
+    """Keys change with STL content, profile content and slicer build."""
+
+    def test_key_inputs(self, tmp_path, files):
+        stl, machine, slicer = files
+        cache = GcodeCache(str(tmp_path / "cache"))
+        key = cache.key_for(str(stl), [str(machine), None], str(slicer))
+        assert cache.key_for(str(stl), [str(machine)], str(slicer)) == key
+
+        machine.write_text('{"nozzle_diameter": ["0.6"]}')
+        profile_changed = cache.key_for(str(stl), [str(machine)], str(slicer))
+        assert profile_changed != key
+
+        slicer.write_text("#!/bin/sh\n# upgraded\n")
+        assert cache.key_for(str(stl), [str(machine)], str(slicer)) != profile_changed
+
+
+    def test_parent_profiles_are_part_of_the_key(self, tmp_path, files):
+        stl, _, slicer = files
+        vendor = tmp_path / "system" / "Creality"
+        (vendor / "machine").mkdir(parents=True)
+        (vendor / "process").mkdir()
+        base = vendor / "machine" / "fdm_creality_common.json"
+        base.write_text('{"name": "fdm_creality_common", "retraction_length": ["0.8"]}')
+        (vendor / "machine" / "Creality K1 (0.4 nozzle).json").write_text(
+            '{"name": "Creality K1 (0.4 nozzle)", "inherits": "fdm_creality_common"}')
+        leaf = vendor / "machine" / "Creality K1.json"
+        leaf.write_text('{"name": "Creality K1", "inherits": "Creality K1 (0.4 nozzle)"}')
+        process = vendor / "process" / "0.20mm Standard @Creality K1.json"
+        process.write_text('{"inherits": "fdm_creality_common"}')  # parent in a sibling kind folder
+
+        cache = GcodeCache(str(tmp_path / "cache"))
+        key = cache.key_for(str(stl), [str(leaf), str(process)], str(slicer))
+        base.write_text('{"name": "fdm_creality_common", "retraction_length": ["0.5"]}')
+        assert cache.key_for(str(stl), [str(leaf), str(process)], str(slicer)) != key
+        assert [name for name, _ in inherits_chain(str(leaf))] == [
+            "Creality K1.json", "Creality K1 (0.4 nozzle)", "fdm_creality_common"]
+        assert inherits_chain(str(process))[-1] == ("fdm_creality_common", str(base))
+
+    def test_inherits_cycle_and_missing_parent(self, tmp_path, files):
+        stl, _, slicer = files
+        a, b = tmp_path / "a.json", tmp_path / "b.json"
+        a.write_text('{"inherits": "b"}')
+        b.write_text('{"inherits": "a"}')
+        orphan = tmp_path / "orphan.json"
+        orphan.write_text('{"inherits": "not installed"}')
+        assert [name for name, _ in inherits_chain(str(a))] == ["a.json", "b"]
+        assert inherits_chain(str(orphan))[-1] == ("not installed", None)
+        cache = GcodeCache(str(tmp_path / "cache"))
+        key = cache.key_for(str(stl), [str(a), str(orphan)], str(slicer))
+        orphan.write_text('{"inherits": "another base"}')
+        assert cache.key_for(str(stl), [str(a), str(orphan)], str(slicer)) != key
+
+
+class TestEviction:
+    """LRU by bytes, pinned entries survive until their project releases them."""
+
+    def test_lru_skips_pinned(self, tmp_path):
+        cache = GcodeCache(str(tmp_path / "cache"), max_bytes=2500)
+        cache.put("a" * 64, gcode(tmp_path, "a.gcode", 1000), project="bracket")
+        cache.put("b" * 64, gcode(tmp_path, "b.gcode", 1000))
+        cache.put("c" * 64, gcode(tmp_path, "c.gcode", 1000))
+        cache.put("d" * 64, gcode(tmp_path, "d.gcode", 1000))
+        # Unpinned budget 2500: oldest unpinned (b) goes, pinned a stays
+        assert cache.get("a" * 64) and cache.get("b" * 64) is None
+        assert cache.stats()["evictions"] == 1 and cache.stats()["pinned"] == 1
+
+        assert cache.unpin_project("bracket") == 1
+        # a is now unpinned; it was used most recently by get() above, so c goes first
+        assert cache.get("c" * 64) is None and cache.get("a" * 64)
+
+    def test_pinned_bytes_are_capped(self, tmp_path):
+        cache = GcodeCache(str(tmp_path / "cache"), max_bytes=10000, max_pinned_bytes=2500)
+        for name in "abc":
+            cache.put(name * 64, gcode(tmp_path, f"{name}.gcode", 1000), project="/projects/bracket")
+        # Three pinned entries exceed the pinned cap: the least recently used one goes
+        assert cache.get("a" * 64) is None and cache.get("b" * 64) and cache.get("c" * 64)
+        assert cache.stats()["pinned_bytes"] <= 2500 and cache.stats()["evictions"] == 1
+
+    def test_persistence_and_materialize(self, tmp_path):
+        project = tmp_path / "projects" / "p1"
+        project.mkdir(parents=True)
+        cache = GcodeCache(str(tmp_path / "cache"))
+        cache.put("e" * 64, gcode(tmp_path, "e.gcode", 600), project=str(project))
+        reloaded = GcodeCache(str(tmp_path / "cache"))
+        dest = str(tmp_path / "out" / "part.gcode")
+        os.makedirs(os.path.dirname(dest))
+        assert reloaded.materialize("e" * 64, dest)
+        assert os.path.getsize(dest) == 600 and reloaded.stats()["pinned"] == 1
+        assert not reloaded.materialize("f" * 64, dest + ".missing")
+
+    def test_pins_of_deleted_projects_are_dropped_on_load(self, tmp_path):
+        project = tmp_path / "projects" / "gone"
+        project.mkdir(parents=True)
+        cache = GcodeCache(str(tmp_path / "cache"))
+        cache.put("g" * 64, gcode(tmp_path, "g.gcode", 600), project=str(project))
+        project.rmdir()
+        assert GcodeCache(str(tmp_path / "cache")).stats()["pinned"] == 0
@@ -5,10 +5,12 @@ Discovery only - no actual print jobs.
 """
 import pytest
 import asyncio
+import time
 
 # Try to import the agent, skip all tests if dependencies missing
 try:
     from printer_agent import PrinterAgent, PrinterType, Printer
+    from printer_cache import PrinterIdentityCache
     HAS_PRINTER = True
 except ImportError as e:
     HAS_PRINTER = False
@@ -17,6 +19,7 @@ except ImportError as e:
     PrinterAgent = None
     PrinterType = None
     Printer = None
+    PrinterIdentityCache = None
 
 pytestmark = pytest.mark.skipif(not HAS_PRINTER, reason=f"Printer dependencies not installed: {IMPORT_ERROR if not HAS_PRINTER else ''}")
 
@@ -243,3 +246,252 @@ class TestPrinterDataclass:
         assert d['name'] == "Test"
         assert d['host'] == "192.168.1.1"
         assert 'printer_type' in d
+
+
+class FakeMoonraker:
+    """Local Moonraker stand-in answering /printer/objects/query (optionally slowly)."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.requests = 0
+        self.runner = None
+        self.port = None
+
+    async def start(self):
+        from aiohttp import web
+
+        async def query(request):
+            self.requests += 1
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            return web.json_response({"result": {"status": {
+                "print_stats": {"state": "printing", "filename": "part.gcode", "print_duration": 60},
+                "display_status": {"progress": 0.5},
+                "extruder": {"temperature": 210, "target": 210},
+                "heater_bed": {"temperature": 60, "target": 60},
+            }}})
+
+        app = web.Application()
+        app.router.add_get("/printer/objects/query", query)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+class TestHttpConnectionPool:
+    """Status polls share one keep-alive session."""
+
+    async def test_polls_reuse_connections(self):
+        servers = [await FakeMoonraker().start() for _ in range(3)]
+        agent = PrinterAgent()
+        try:
+            for i, server in enumerate(servers):
+                agent.add_printer_manually(f"P{i}", "127.0.0.1", port=server.port, printer_type="moonraker")
+                agent.printers[f"127.0.0.1:{server.port}"] = agent.printers.pop("127.0.0.1")
+            for _ in range(5):
+                statuses = await asyncio.gather(*(agent.get_print_status(f"P{i}") for i in range(3)))
+                assert all(s.state == "printing" and s.progress_percent == 50 for s in statuses)
+            stats = agent.http_stats()
+            assert stats["requests"] == 15
+            assert stats["connections_created"] == 3
+            assert stats["connections_reused"] == 12
+            assert stats["status_polls"] == 15 and stats["avg_status_ms"] is not None
+        finally:
+            await agent.close()
+            for server in servers:
+                await server.stop()
+        assert agent.http_stats()["idle_connections"] == 0
+
+    async def test_status_has_timeout(self):
+        import aiohttp
+        server = await FakeMoonraker(delay=2.0).start()
+        agent = PrinterAgent()
+        agent.status_timeout = aiohttp.ClientTimeout(total=0.2)
+        agent.add_printer_manually("Slow", "127.0.0.1", port=server.port, printer_type="moonraker")
+        try:
+            start = asyncio.get_running_loop().time()
+            status = await agent.get_print_status("Slow")
+            assert asyncio.get_running_loop().time() - start < 1.5
+            assert status.state.startswith("Error")
+        finally:
+            await agent.close()
+            await server.stop()
+
+    async def test_session_recreated_after_close(self):
+        agent = PrinterAgent()
+        first = await agent._get_session()
+        assert await agent._get_session() is first
+        await agent.close()
+        assert first.closed
+        second = await agent._get_session()
+        assert second is not first and not second.closed
+        await agent.close()
+
+
+class FakePrinterHost:
+    """HTTP stand-in on its own loopback address: Moonraker and/or OctoPrint endpoints and a camera."""
+
+    def __init__(self, address, moonraker=True, octoprint=False, delay=0.0, camera_path=None, slow_paths=()):
+        self.address = address
+        self.moonraker = moonraker
+        self.octoprint = octoprint
+        self.delay = delay
+        self.camera_path = camera_path
+        self.slow_paths = slow_paths
+        self.port = None
+        self.requests = []
+
+    async def start(self):
+        from aiohttp import web
+
+        async def handler(request):
+            path = request.path_qs
+            self.requests.append(path)
+            if path in self.slow_paths:
+                await asyncio.sleep(5)
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if request.path == "/printer/info" and self.moonraker:
+                return web.json_response({"result": {"hostname": self.address, "software_version": "v0.12.0"}})
+            if request.path == "/api/version" and (self.octoprint or self.moonraker):
+                return web.json_response({"api": "0.1"})
+            if path == self.camera_path:
+                return web.Response(body=b"--frame", content_type="multipart/x-mixed-replace")
+            return web.Response(status=404)
+
+        app = web.Application()
+        app.router.add_route("GET", "/{tail:.*}", handler)
+        self.runner = web.AppRunner(app, shutdown_timeout=0.1)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.address, 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+def fake_browse(hosts, spacing=0.05):
+    """Replaces mDNS browsing: announces each host as a generic _http._tcp service."""
+    import threading
+
+    def browse(listener):
+        def announce():
+            for i, host in enumerate(hosts):
+                time.sleep(spacing)
+                printer = Printer(name=f"host{i}", host=host.address, port=host.port,
+                                  printer_type=PrinterType.UNKNOWN)
+                listener.printers.append(printer)
+                listener.on_found(printer)
+        threading.Thread(target=announce, daemon=True).start()
+        return lambda: None
+    return browse
+
+
+class TestParallelDiscovery:
+    """Services are probed concurrently as they resolve; discovery ends early when complete."""
+
+    async def test_probes_concurrently_and_finishes_early(self):
+        hosts = [await FakePrinterHost(f"127.0.0.{i + 2}", delay=0.3).start() for i in range(4)]
+        agent = PrinterAgent(identity_cache=False)
+        agent._browse = fake_browse(hosts)
+        reported = []
+        try:
+            start = time.perf_counter()
+            printers = await agent.discover_printers(timeout=10, on_printer=reported.append,
+                                                     expected=[h.address for h in hosts])
+            elapsed = time.perf_counter() - start
+        finally:
+            await agent.close()
+            for host in hosts:
+                await host.stop()
+        assert len(printers) == 4 and len(reported) == 4
+        assert all(p["printer_type"] == "moonraker" for p in printers)
+        # Sequential probing alone would take 4 x 0.3 s; the 10 s timeout is never reached
+        assert elapsed < 1.5
+
+    async def test_moonraker_wins_over_octoprint_compat(self):
+        host = await FakePrinterHost("127.0.0.7", moonraker=True).start()
+        agent = PrinterAgent()
+        try:
+            assert await agent._probe_printer_type(host.address, host.port) == PrinterType.MOONRAKER
+        finally:
+            await agent.close()
+            await host.stop()
+
+    async def test_camera_first_hit(self):
+        host = await FakePrinterHost("127.0.0.8", camera_path="/stream",
+                                     slow_paths=("/webcam/?action=stream",)).start()
+        agent = PrinterAgent()
+        try:
+            start = time.perf_counter()
+            url = await agent._probe_camera(host.address, host.port)
+            elapsed = time.perf_counter() - start
+        finally:
+            await agent.close()
+            await host.stop()
+        assert url == f"http://{host.address}:{host.port}/stream"
+        assert elapsed < 1.0
+
+
+class TestIdentityCache:
+    """Identities persist across agents; known printers are revalidated with one request."""
+
+    def test_ttl_and_persistence(self, tmp_path):
+        path = str(tmp_path / "identities.json")
+        cache = PrinterIdentityCache(path, ttl=60)
+        printer = Printer(name="K1", host="10.0.0.5", port=7125, printer_type=PrinterType.MOONRAKER,
+                          api_key="secret", camera_url="http://10.0.0.5:4408/stream", firmware="Klipper v1")
+        cache.put(printer.to_dict())
+        cache.save()
+
+        reloaded = PrinterIdentityCache(path, ttl=60)
+        entry = reloaded.get("10.0.0.5", 7125, "K1")
+        assert entry["printer_type"] == "moonraker" and entry["firmware"] == "Klipper v1"
+        assert "api_key" not in entry
+        assert reloaded.get("10.0.0.5", 7125, "other") is None
+
+        expired = PrinterIdentityCache(path, ttl=0)
+        assert expired.get("10.0.0.5", 7125, "K1") is None and expired.expired == 1
+        assert expired.restore() == []
+
+    async def test_revalidates_cached_identity(self, tmp_path):
+        host = await FakePrinterHost("127.0.0.9", camera_path="/stream").start()
+        cache_path = str(tmp_path / "identities.json")
+        try:
+            first = PrinterAgent(identity_cache=PrinterIdentityCache(cache_path))
+            first._browse = fake_browse([host], spacing=0)
+            [found] = await first.discover_printers(timeout=5, expected=[host.address])
+            await first.close()
+            assert found["printer_type"] == "moonraker" and found["firmware"] == "Klipper v0.12.0"
+            full_probe = len(host.requests)
+
+            host.requests.clear()
+            second = PrinterAgent(identity_cache=PrinterIdentityCache(cache_path))
+            second._browse = fake_browse([host], spacing=0)
+            [again] = await second.discover_printers(timeout=5, expected=[host.address])
+            await second.close()
+        finally:
+            await host.stop()
+        assert again["camera_url"] == found["camera_url"] == f"http://{host.address}:{host.port}/stream"
+        assert host.requests == ["/printer/info"] and full_probe > 1
+        assert second.identity_stats()["revalidated"] == 1
+
+    def test_restore_without_network(self, tmp_path):
+        cache = PrinterIdentityCache(str(tmp_path / "identities.json"))
+        cache.put(Printer("K1", "10.0.0.5", 7125, PrinterType.MOONRAKER, firmware="Klipper v1").to_dict())
+        cache.put(Printer("nas", "10.0.0.9", 80, PrinterType.UNKNOWN).to_dict())
+        agent = PrinterAgent(identity_cache=cache)
+        agent.add_printer_manually("Saved", "10.0.0.6", port=80, printer_type="octoprint")
+
+        restored = agent.restore_cached_printers()
+        assert [p["host"] for p in restored] == ["10.0.0.5"]
+        assert agent.printers["10.0.0.5"].firmware == "Klipper v1"
+        assert set(agent.printers) == {"10.0.0.5", "10.0.0.6"}  # non-printers are not restored
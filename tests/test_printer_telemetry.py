@@ -0,0 +1,219 @@
+# File: test_printer_telemetry.py - Purpose: This file handles Test Printer Telemetry functionality.
+"""
+Tests for push-based printer telemetry against local Moonraker / OctoPrint stand-ins.
+"""
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+try:
+    from printer_agent import PrinterAgent
+    from printer_telemetry import PrinterTelemetry
+    HAS_PRINTER = True
+except ImportError:
+    HAS_PRINTER = False
+
+pytestmark = pytest.mark.skipif(not HAS_PRINTER, reason="Printer dependencies not installed")
+
+SNAPSHOT = {
+    "print_stats": {"state": "printing", "filename": "part.gcode", "print_duration": 60},
+    "display_status": {"progress": 0.25},
+    "extruder": {"temperature": 210.0, "target": 210.0},
+    "heater_bed": {"temperature": 60.0, "target": 60.0},
+}
+
+
+class FakeMoonraker:
+    """JSON-RPC websocket plus the HTTP query endpoint used when polling."""
+
+    def __init__(self, websocket=True, deltas=(), drop_after_snapshot=False):
+        self.websocket = websocket
+        self.deltas = list(deltas)
+        self.drop_after_snapshot = drop_after_snapshot
+        self.connections = 0
+        self.queries = 0
+
+    async def ws_handler(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        msg = await ws.receive_json()
+        assert msg["method"] == "printer.objects.subscribe"
+        await ws.send_json({"jsonrpc": "2.0", "id": msg["id"],
+                            "result": {"eventtime": 1.0, "status": json.loads(json.dumps(SNAPSHOT))}})
+        if self.drop_after_snapshot and self.connections == 1:
+            await ws.close()
+            return ws
+        for delta in self.deltas:
+            await ws.send_json({"jsonrpc": "2.0", "method": "notify_status_update", "params": [delta, 2.0]})
+        await asyncio.sleep(30)
+        return ws
+
+    async def query(self, request):
+        self.queries += 1
+        return web.json_response({"result": {"status": SNAPSHOT}})
+
+    async def start(self):
+        app = web.Application()
+        if self.websocket:
+            app.router.add_get("/websocket", self.ws_handler)
+        app.router.add_get("/printer/objects/query", self.query)
+        self.runner = web.AppRunner(app, shutdown_timeout=0.1)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+class FakeOctoPrint:
+    """Passive login plus the SockJS raw websocket."""
+
+    def __init__(self, messages=()):
+        self.messages = list(messages)
+        self.received = []
+
+    async def login(self, request):
+        assert request.headers.get("X-Api-Key") == "KEY"
+        return web.json_response({"name": "jarvis", "session": "abc"})
+
+    async def ws_handler(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({"connected": {"version": "1.10"}})
+        self.received.append(await ws.receive_json())
+        self.received.append(await ws.receive_json())
+        for message in self.messages:
+            await ws.send_json(message)
+        await asyncio.sleep(30)
+        return ws
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/api/login", self.login)
+        app.router.add_get("/sockjs/websocket", self.ws_handler)
+        self.runner = web.AppRunner(app, shutdown_timeout=0.1)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+def octoprint_current(completion, tool=200.0):
+    return {"current": {
+        "state": {"text": "Printing", "flags": {"printing": True}},
+        "job": {"file": {"name": "part.gcode"}},
+        "progress": {"completion": completion, "printTime": 100, "printTimeLeft": 300},
+        "temps": [{"time": 1, "tool0": {"actual": tool, "target": 200.0}, "bed": {"actual": 60.0, "target": 60.0}}],
+    }}
+
+
+async def wait_for(condition, timeout=3.0):
+    for _ in range(int(timeout / 0.02)):
+        if condition():
+            return
+        await asyncio.sleep(0.02)
+    raise AssertionError("condition not reached")
+
+
+@pytest.fixture
+async def updates():
+    return []
+
+
+async def run_telemetry(server, printer_type, updates, api_key=None, **kwargs):
+    agent = PrinterAgent()
+    agent.add_printer_manually("P1", "127.0.0.1", port=server.port, printer_type=printer_type, api_key=api_key)
+    telemetry = PrinterTelemetry(agent, on_update=updates.append, **kwargs)
+    telemetry.sync()
+    return agent, telemetry
+
+
+class TestMoonrakerPush:
+    """Snapshot plus deltas over the JSON-RPC websocket, emitted only on change."""
+
+    async def test_subscribe_and_emit_changes(self, updates):
+        server = await FakeMoonraker(deltas=[
+            {"display_status": {"progress": 0.5}},
+            {"extruder": {"temperature": 210.01}},     # below display precision
+            {"display_status": {"progress": 0.5}},     # duplicate
+            {"print_stats": {"state": "complete"}},
+        ]).start()
+        agent, telemetry = await run_telemetry(server, "moonraker", updates)
+        try:
+            await wait_for(lambda: len(updates) == 3)
+            await asyncio.sleep(0.1)
+            assert [u["progress_percent"] for u in updates] == [25.0, 50.0, 50.0]
+            assert updates[-1]["state"] == "complete"
+            assert telemetry.suppressed == 2
+            assert telemetry.stats()["printers"]["127.0.0.1"]["mode"] == "push"
+            assert server.queries == 0
+        finally:
+            await telemetry.close()
+            await agent.close()
+            await server.stop()
+
+    async def test_reconnects_after_drop(self, updates):
+        server = await FakeMoonraker(drop_after_snapshot=True,
+                                     deltas=[{"display_status": {"progress": 0.75}}]).start()
+        agent, telemetry = await run_telemetry(server, "moonraker", updates,
+                                               backoff_initial=0.05, poll_interval=0.02)
+        try:
+            await wait_for(lambda: updates and updates[-1]["progress_percent"] == 75.0)
+            feed = telemetry.stats()["printers"]["127.0.0.1"]
+            assert server.connections == 2 and feed["reconnects"] == 1
+            assert feed["mode"] == "push"
+        finally:
+            await telemetry.close()
+            await agent.close()
+            await server.stop()
+
+
+class TestPollingFallback:
+    """No websocket: status comes from polling, still deduplicated."""
+
+    async def test_falls_back_to_polling(self, updates):
+        server = await FakeMoonraker(websocket=False).start()
+        agent, telemetry = await run_telemetry(server, "moonraker", updates,
+                                               backoff_initial=0.5, poll_interval=0.02)
+        try:
+            await wait_for(lambda: server.queries >= 3)
+            assert telemetry.stats()["printers"]["127.0.0.1"]["mode"] == "polling"
+            assert len(updates) == 1 and updates[0]["progress_percent"] == 25.0
+        finally:
+            await telemetry.close()
+            await agent.close()
+            await server.stop()
+
+
+class TestOctoPrintPush:
+    """Passive login, auth over SockJS, current messages parsed and deduplicated."""
+
+    async def test_subscribe_with_api_key(self, updates):
+        server = await FakeOctoPrint(messages=[
+            octoprint_current(10.0),
+            octoprint_current(10.0),
+            {"event": {"type": "ZChange"}},
+            octoprint_current(20.0, tool=201.0),
+        ]).start()
+        agent, telemetry = await run_telemetry(server, "octoprint", updates, api_key="KEY")
+        try:
+            await wait_for(lambda: len(updates) == 2)
+            assert server.received[0] == {"auth": "jarvis:abc"}
+            assert [u["progress_percent"] for u in updates] == [10.0, 20.0]
+            assert updates[-1]["state"] == "printing"
+            assert updates[-1]["temperatures"]["hotend"] == {"current": 201.0, "target": 200.0}
+            assert telemetry.suppressed == 1
+        finally:
+            await telemetry.close()
+            await agent.close()
+            await server.stop()
@@ -0,0 +1,87 @@
+# File: test_profile_catalog.py - Purpose: This file handles Test Profile Catalog functionality.
+"""
+Tests for the indexed OrcaSlicer profile catalog (synthetic system folder).
+"""
+import os
+
+import pytest
+
+from profile_catalog import ProfileCatalog
+
+TREE = {
+    "Creality": {
+        "machine": ["Creality K1 (0.4 nozzle).json", "Creality K1C (0.4 nozzle).json",
+                    "Creality K1 Max (0.4 nozzle).json", "Creality Ender-3 V2 (0.4 nozzle).json"],
+        "process": ["0.20mm Draft @Creality K1 (0.4 nozzle).json", "0.20mm Standard @Creality K1 (0.4 nozzle).json",
+                    "0.20mm Standard @Creality Ender3V2.json"],
+        "filament": ["Generic PLA-CF @K1-all.json", "Generic PLA @K1-all.json", "Generic PLA Silk @K1-all.json",
+                     "Hyper PETG @K1-all.json"],
+    },
+    "Prusa": {
+        "machine": ["Prusa MK4 (0.4 nozzle).json", "Prusa MINI (0.4 nozzle).json"],
+        "process": ["0.20mm SPEED @MK4.json"],
+        "filament": ["Prusament PLA @MK4.json"],
+    },
+}
+
+
+@pytest.fixture
+def system_dir(tmp_path):
+    for vendor, kinds in TREE.items():
+        for kind, files in kinds.items():
+            folder = tmp_path / "system" / vendor / kind
+            folder.mkdir(parents=True)
+            for name in files:
+                (folder / name).write_text("{}")
+    return str(tmp_path / "system")
+
+
+class TestMatching:
+    """Best profiles per kind, with the original scoring rules."""
+
+    def test_profiles_for_k1(self, system_dir):
+        profiles = ProfileCatalog(system_dir).profiles_for("Creality K1")
+        names = {kind: os.path.basename(path) for kind, path in profiles.items()}
+        assert names == {
+            "machine": "Creality K1 (0.4 nozzle).json",
+            "process": "0.20mm Standard @Creality K1 (0.4 nozzle).json",
+            "filament": "Generic PLA @K1-all.json",
+        }
+
+    def test_vendor_map(self, system_dir):
+        catalog = ProfileCatalog(system_dir)
+        assert catalog.vendor_for("prusa mk4") == "Prusa"       # folder name
+        assert catalog.vendor_for("Ender-3 V2") == "Creality"   # brand alias
+        assert catalog.vendor_for("Original MK4") == "Prusa"    # model token unique to one vendor
+        assert catalog.vendor_for("Unknown thing") == "Creality"  # default fallback
+        assert os.path.basename(catalog.find("Original MK4", "machine")) == "Prusa MK4 (0.4 nozzle).json"
+
+    def test_available_lists_every_profile(self, system_dir):
+        profiles = ProfileCatalog(system_dir).available()
+        assert len(profiles["machines"]) == 6 and len(profiles["filaments"]) == 5
+        assert "system/Prusa/process/0.20mm SPEED @MK4.json" in profiles["processes"]
+
+
+class TestCaching:
+    """Lookups are memoized until a watched directory changes."""
+
+    def test_memoized_until_directory_changes(self, system_dir):
+        catalog = ProfileCatalog(system_dir, check_interval=0)
+        first = catalog.profiles_for("Creality K1")
+        assert catalog.profiles_for("creality k1") == first
+        assert catalog.memo_hits == 1 and catalog.builds == 1
+
+        folder = os.path.join(system_dir, "Creality", "process")
+        os.utime(folder, (1, 1))  # mtime change as seen after adding a profile
+        added = os.path.join(folder, "0.20mm Standard @Creality K1 (0.4 nozzle) v2.json")
+        open(added, "w").close()
+        os.utime(folder, (2, 2))
+        catalog.profiles_for("Creality K1")
+        assert catalog.builds == 2
+        assert added.split(os.sep)[-1] in [p.split("/")[-1] for p in catalog.available()["processes"]]
+
+    def test_check_interval_skips_stat(self, system_dir):
+        catalog = ProfileCatalog(system_dir, check_interval=60)
+        os.makedirs(os.path.join(system_dir, "Voron", "machine"))
+        assert not catalog.refresh()
+        assert catalog.refresh(force=True) and catalog.vendor_for("voron 2.4") == "Voron"
@@ -0,0 +1,202 @@
+# File: test_project_manager.py - Purpose: This file handles Test Project Manager functionality.
+"""
+Tests for ProjectManager chat history and project context handling.
+"""
+import json
+import os
+import time
+
+import pytest
+
+from project_manager import ProjectManager
+from chat_log import ChatLogWriter, read_tail_lines, read_history_tail, rotated_segments
+
+
+@pytest.fixture
+def pm(tmp_path):
+    return ProjectManager(str(tmp_path))
+
+
+def history_file(pm):
+    return pm.get_current_project_path() / "chat_history.jsonl"
+
+
+class TestReadTailLines:
+    """Reverse block reader."""
+
+    def test_matches_readlines_across_block_sizes(self, tmp_path):
+        path = tmp_path / "log.jsonl"
+        lines = [json.dumps({"i": i, "text": "x" * (i % 37)}) for i in range(500)]
+        path.write_text("\n".join(lines) + "\n")
+        for block_size in (7, 64, 1000, 1 << 20):
+            assert read_tail_lines(path, 10, block_size=block_size) == lines[-10:]
+
+    def test_short_file_and_no_trailing_newline(self, tmp_path):
+        path = tmp_path / "log.jsonl"
+        path.write_text("a\nb")
+        assert read_tail_lines(path, 10, block_size=2) == ["a", "b"]
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "log.jsonl"
+        path.write_text("")
+        assert read_tail_lines(path, 5) == []
+
+
+class TestRecentChatHistory:
+    """get_recent_chat_history with the tail cache."""
+
+    def test_returns_last_entries(self, pm):
+        for i in range(30):
+            pm.log_chat("User", f"msg {i}")
+        history = pm.get_recent_chat_history(limit=10)
+        assert [h["text"] for h in history] == [f"msg {i}" for i in range(20, 30)]
+
+    def test_missing_file(self, pm):
+        assert pm.get_recent_chat_history() == []
+
+    def test_log_chat_keeps_cache_in_sync(self, pm):
+        pm.log_chat("User", "first")
+        pm.get_recent_chat_history()          # loads the tail
+        pm.log_chat("JARVIS", "second")
+        history = pm.get_recent_chat_history()
+        assert [h["text"] for h in history] == ["first", "second"]
+        assert pm._chat_tail.hits == 1
+
+    def test_external_write_invalidates_cache(self, pm):
+        pm.log_chat("User", "first")
+        pm.get_recent_chat_history()
+        with open(history_file(pm), "a", encoding="utf-8") as f:
+            f.write(json.dumps({"sender": "User", "text": "external"}) + "\n")
+        assert pm.get_recent_chat_history()[-1]["text"] == "external"
+
+    def test_skips_malformed_lines(self, pm):
+        pm.log_chat("User", "ok")
+        with open(history_file(pm), "a", encoding="utf-8") as f:
+            f.write("{not json\n")
+        assert [h["text"] for h in pm.get_recent_chat_history()] == ["ok"]
+
+    def test_limit_larger_than_cache(self, pm):
+        for i in range(120):
+            pm.log_chat("User", f"msg {i}")
+        pm.get_recent_chat_history(limit=10)
+        history = pm.get_recent_chat_history(limit=100)
+        assert len(history) == 100
+        assert history[0]["text"] == "msg 20"
+
+
+class TestChatLogWriter:
+    """Background batched writer with fsync and rotation."""
+
+    def test_flush_writes_everything_in_order(self, tmp_path):
+        path = tmp_path / "chat_history.jsonl"
+        writer = ChatLogWriter(batch_interval=0.05)
+        for i in range(200):
+            writer.write(path, {"i": i})
+        assert writer.flush(fsync=True)
+        lines = path.read_text().splitlines()
+        assert [json.loads(line)["i"] for line in lines] == list(range(200))
+        stats = writer.stats()
+        assert stats["batches"] < 200
+        assert stats["fsyncs"] >= 1
+        writer.close()
+
+    def test_close_drains_queue(self, tmp_path):
+        path = tmp_path / "chat_history.jsonl"
+        writer = ChatLogWriter(batch_interval=1.0)
+        writer.write(path, {"text": "last words"})
+        writer.close()
+        assert json.loads(path.read_text())["text"] == "last words"
+
+    def test_rotation_is_read_transparently(self, tmp_path):
+        path = tmp_path / "chat_history.jsonl"
+        writer = ChatLogWriter(batch_size=10, batch_interval=0.01, rotate_bytes=200)
+        for i in range(60):
+            writer.write(path, {"i": i})
+        writer.close()
+
+        segments = rotated_segments(path)
+        assert len(segments) >= 2
+        assert all(p.suffix == ".gz" for p in segments)
+        lines = read_history_tail(path, 60)
+        assert [json.loads(line)["i"] for line in lines] == list(range(60))
+
+    def test_project_manager_history_spans_rotation(self, pm):
+        pm._chat_writer.rotate_bytes = 300
+        for i in range(40):
+            pm.log_chat("User", f"msg {i}")
+        history = pm.get_recent_chat_history(limit=25)
+        assert [h["text"] for h in history] == [f"msg {i}" for i in range(15, 40)]
+        pm.close()
+
+
+class TestProjectContext:
+    """Cached, budgeted project context."""
+
+    def write(self, pm, rel_path, text, age=0):
+        path = pm.get_current_project_path() / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+        if age:
+            stamp = time.time() - age
+            os.utime(path, (stamp, stamp))
+        return path
+
+    def test_lists_files_and_contents(self, pm):
+        self.write(pm, "notes.md", "hello notes")
+        self.write(pm, "cad/part.stl", "solid")
+        context = pm.get_project_context()
+        assert "notes.md" in context
+        assert "hello notes" in context
+        assert os.path.join("cad", "part.stl") in context
+
+    def test_chat_history_not_inlined(self, pm):
+        pm.log_chat("User", "secret chatter")
+        pm.flush_chat_log()
+        context = pm.get_project_context()
+        assert "chat_history.jsonl" in context
+        assert "secret chatter" not in context
+
+    def test_unchanged_files_are_cache_hits(self, pm):
+        for i in range(5):
+            self.write(pm, f"file{i}.txt", f"content {i}")
+        pm.get_project_context()
+        assert pm._context_index.last_misses == 5
+        pm.get_project_context()
+        assert pm._context_index.last_hits == 5
+        assert pm._context_index.last_misses == 0
+
+    def test_edited_file_is_reread(self, pm):
+        path = self.write(pm, "a.txt", "old", age=100)
+        pm.get_project_context()
+        path.write_text("new text")
+        assert "new text" in pm.get_project_context()
+        assert pm._context_index.last_misses == 1
+
+    def test_touched_identical_file_hits_by_hash(self, pm):
+        path = self.write(pm, "a.txt", "same", age=100)
+        pm.get_project_context()
+        os.utime(path, None)
+        pm.get_project_context()
+        assert pm._context_index.last_hits == 1
+
+    def test_budget_prefers_recent_files(self, pm):
+        self.write(pm, "old.txt", "OLD " * 400, age=1000)
+        self.write(pm, "new.txt", "NEW " * 400)
+        context = pm.get_project_context(token_budget=600)
+        assert "NEW NEW" in context
+        assert "OLD OLD" not in context
+        assert "omitted to fit the context budget: old.txt" in context
+
+
+class TestProjectSwitch:
+    """on_switch reports the project being left."""
+
+    def test_on_switch_called_with_old_and_new_paths(self, pm):
+        calls = []
+        pm.on_switch = lambda old, new: calls.append((old.name, new.name))
+        pm.create_project("bracket")
+        pm.switch_project("bracket")
+        pm.switch_project("bracket")  # already active
+        pm.switch_project("missing")
+        pm.switch_project("temp")
+        assert calls == [("temp", "bracket"), ("bracket", "temp")]
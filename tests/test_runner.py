@@ -21,6 +21,25 @@ MODULES = {
     "web": "test_web_agent.py",
     "auth": "test_authenticator.py",
     "tools": "test_jarvis_tools.py",
+    "vad": "test_audio_vad.py",
+    "capture": "test_audio_capture.py",
+    "playback": "test_audio_playback.py",
+    "viz": "test_audio_viz.py",
+    "emitter": "test_socket_emitter.py",
+    "frames": "test_frame_buffer.py",
+    "camera": "test_camera_capture.py",
+    "project": "test_project_manager.py",
+    "cadworker": "test_cad_worker.py",
+    "cadcache": "test_cad_cache.py",
+    "cadtransport": "test_cad_transport.py",
+    "codestream": "test_code_stream.py",
+    "browserpool": "test_browser_pool.py",
+    "screenshots": "test_screenshot_manager.py",
+    "webscheduler": "test_web_scheduler.py",
+    "telemetry": "test_printer_telemetry.py",
+    "profiles": "test_profile_catalog.py",
+    "slicer": "test_slicer_runner.py",
+    "gcodecache": "test_gcode_cache.py",
 }
 
 TESTS_DIR = Path(__file__).parent
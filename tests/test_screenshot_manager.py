@@ -0,0 +1,177 @@
+# File: test_screenshot_manager.py - Purpose: This file handles Test Screenshot Manager functionality.
+"""
+Tests for WebAgent screenshot settling, history budgeting and encode-once sharing.
+"""
+import io
+
+import pytest
+from PIL import Image
+from google.genai import types
+
+from screenshot_manager import (
+    DROPPED_NOTE, Screenshot, ScreenshotManager, estimate_image_tokens, png_size,
+)
+
+
+def make_png(width=1440, height=900, color=(30, 60, 90)) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(out, format="PNG")
+    return out.getvalue()
+
+
+class FakePage:
+    """Just enough of a Playwright page for capture() and settle()."""
+
+    def __init__(self, navigations=0):
+        self.url = "http://local.test/"
+        self.navigations = navigations
+        self.load_states = []
+
+    async def screenshot(self, type="png"):
+        return make_png()
+
+    async def evaluate(self, script, arg=None):
+        if self.navigations:
+            self.navigations -= 1
+            raise RuntimeError("Execution context was destroyed, most likely because of a navigation")
+        return 0
+
+    async def wait_for_load_state(self, state, timeout=None):
+        self.load_states.append(state)
+
+
+def add_turn(manager, shot, calls=1):
+    return [shot.as_function_response(f"id{i}", "click_at", {"url": shot.url}) for i in range(calls)]
+
+
+class TestTokens:
+    """Image token estimates and PNG header parsing."""
+
+    def test_estimate(self):
+        assert estimate_image_tokens(300, 200) == 258
+        assert estimate_image_tokens(1440, 900) == 4 * 258
+        assert estimate_image_tokens(480, 300) == 258
+        assert estimate_image_tokens(0, 0) == 0
+
+    def test_png_size(self):
+        assert png_size(make_png(64, 32)) == (64, 32)
+        assert png_size(b"not a png") == (0, 0)
+
+
+class TestHistoryBudget:
+    """Newest screenshots stay full size, older ones shrink, the oldest are dropped."""
+
+    async def test_compact_keeps_last_k_full(self):
+        manager = ScreenshotManager(keep_full=2, thumbnail_width=320, max_images=4)
+        page = FakePage()
+        first = await manager.capture(page)
+        initial_part = first.as_part()
+        responses = []
+        for _ in range(5):
+            responses.append(add_turn(manager, await manager.capture(page)))
+        manager.compact()
+
+        fidelity = [shot.fidelity for shot in manager.shots]
+        assert fidelity == ["dropped", "dropped", "thumbnail", "thumbnail", "full", "full"]
+
+        # The initial Part became a text note, old function responses lost their image
+        assert initial_part.inline_data is None and initial_part.text == DROPPED_NOTE
+        assert responses[0][0].parts is None
+        # Thumbnails are rewritten in place, full frames untouched
+        thumb_blob = responses[1][0].parts[0].inline_data
+        assert png_size(thumb_blob.data) == (320, 200)
+        assert responses[-1][0].parts[0].inline_data.data is manager.shots[-1].png
+
+    async def test_compact_reduces_tokens(self):
+        manager = ScreenshotManager(keep_full=3, max_images=8)
+        page = FakePage()
+        for _ in range(10):
+            add_turn(manager, await manager.capture(page))
+        before = manager.image_tokens()
+        manager.compact()
+        assert before == 10 * 4 * 258
+        assert manager.image_tokens() == 3 * 4 * 258 + 5 * 258
+
+    async def test_compact_is_idempotent(self):
+        manager = ScreenshotManager(keep_full=1, thumbnail_width=200, max_images=3)
+        page = FakePage()
+        for _ in range(4):
+            add_turn(manager, await manager.capture(page))
+        manager.compact()
+        thumb = manager.shots[-2]._blobs[0].data
+        manager.compact()
+        assert manager.shots[-2]._blobs[0].data is thumb
+
+
+class TestEncodeOnce:
+    """One capture per turn shared by the model parts and the frontend."""
+
+    def test_b64_cached_and_bytes_shared(self):
+        shot = Screenshot(make_png(), "http://local.test/")
+        assert shot.b64 is shot.b64
+        responses = [shot.as_function_response(str(i), "click_at", {}) for i in range(3)]
+        assert all(r.parts[0].inline_data.data is shot.png for r in responses)
+        # Three responses carrying the same frame are billed three times
+        assert shot.tokens == 3 * 4 * 258
+
+    def test_function_response_fields(self):
+        shot = Screenshot(make_png(), "http://local.test/")
+        fr = shot.as_function_response("abc", "navigate", {"url": shot.url})
+        assert isinstance(fr, types.FunctionResponse)
+        assert fr.id == "abc" and fr.name == "navigate"
+        assert fr.parts[0].inline_data.mime_type == "image/png"
+
+
+class TestSettle:
+    """Settling replaces the fixed one second sleep."""
+
+    async def test_quiet_page_settles_fast(self):
+        manager = ScreenshotManager()
+        elapsed = await manager.settle(FakePage())
+        assert elapsed < 0.5
+
+    async def test_waits_for_new_document_after_navigation(self):
+        page = FakePage(navigations=1)
+        await ScreenshotManager().settle(page)
+        assert page.load_states[0] == "domcontentloaded"
+        assert "networkidle" in page.load_states
+
+    async def test_turn_accounting(self):
+        manager = ScreenshotManager()
+        add_turn(manager, await manager.capture(FakePage()))
+        manager.start_turn()
+        manager.end_turn(prompt_tokens=1234)
+        stats = manager.stats()
+        assert stats["turns"] == 1 and stats["captures"] == 1
+        assert manager.turns[0]["prompt_tokens"] == 1234
+        assert stats["history"]["full"] == 1
+
+
+def chromium_available() -> bool:
+    try:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as p:
+            p.chromium.launch(headless=True).close()
+        return True
+    except Exception:
+        return False
+
+
+@pytest.mark.skipif(not chromium_available(), reason="Playwright Chromium not installed")
+class TestSettleInBrowser:
+    """Real page: settle waits for late DOM updates but not for a full second."""
+
+    async def test_waits_for_delayed_render(self):
+        from playwright.async_api import async_playwright
+
+        html = ("<body><p id=s>loading</p><script>"
+                "setTimeout(() => document.getElementById('s').textContent = 'ready', 300)"
+                "</script></body>")
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            page = await browser.new_page()
+            await page.goto("data:text/html," + html)
+            elapsed = await ScreenshotManager(dom_quiet_ms=200).settle(page)
+            assert await page.text_content("#s") == "ready"
+            assert elapsed < 1.0
+            await browser.close()
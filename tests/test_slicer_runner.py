@@ -0,0 +1,199 @@
+# File: test_slicer_runner.py - Purpose: This file handles Test Slicer Runner functionality.
+"""
+Tests for the streaming slicer runner, using a fake slicer script that prints
+PrusaSlicer-style progress lines.
+"""
+import asyncio
+import os
+import stat
+import sys
+import time
+
+import pytest
+
+from slicer_runner import SlicerProcess, parse_progress
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="fake slicer uses a POSIX shebang")
+
+FAKE_SLICER = '''#!{python}
+import os, subprocess, sys, time
+args = sys.argv[1:]
+mode = os.environ.get("FAKE_SLICER_MODE", "ok")
+if os.environ.get("FAKE_SLICER_RUNS"):
+    open(os.environ["FAKE_SLICER_RUNS"], "a").write("run\\n")
+if mode == "spawn":
+    # Helper process that must die with the slicer
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    open(os.environ["FAKE_SLICER_CHILD"], "w").write(str(child.pid))
+for percent, message in [(0, "Processing triangulated mesh"), (20, "Generating perimeters"),
+                         (60, "Generating support material"), (90, "Exporting G-code")]:
+    print(f"{{percent}} => {{message}}", flush=True)
+    time.sleep(0.05)
+    if mode in ("hang", "spawn") and percent == 20:
+        time.sleep(60)
+if mode == "fail":
+    print("Objects could not fit on the bed", file=sys.stderr, flush=True)
+    sys.exit(1)
+if "--output" in args:
+    open(args[args.index("--output") + 1], "w").write("G28\\n")
+print("Done", flush=True)
+'''
+
+
+@pytest.fixture
+def fake_slicer(tmp_path):
+    path = tmp_path / "fake-slicer"
+    path.write_text(FAKE_SLICER.format(python=sys.executable))
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+def alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # Reaped by nobody yet counts as dead
+    with open(f"/proc/{pid}/stat") as f:
+        return f.read().split()[2] != "Z"
+
+
+class TestProgressParsing:
+    """PrusaSlicer and OrcaSlicer status lines become percentages."""
+
+    def test_parse_lines(self):
+        assert parse_progress("30 => Generating perimeters") == (30, "Generating perimeters")
+        assert parse_progress("[info] default slicing status: 45%, Generating infill") == (45, "Generating infill")
+        assert parse_progress("[info] update_status: percent 80 - Exporting") == (80, "Exporting")
+        assert parse_progress("Loading model.stl") is None
+        assert parse_progress("250 => bogus") is None
+
+
+class TestSlicerProcess:
+    """Streams output, reports real progress, enforces timeout and cancellation."""
+
+    async def test_streams_progress(self, fake_slicer, tmp_path):
+        updates = []
+        out = str(tmp_path / "part.gcode")
+        job = SlicerProcess([fake_slicer, "--output", out], progress_callback=lambda p, m: updates.append((p, m)))
+        result = await job.run()
+        assert result.ok and os.path.exists(out)
+        assert updates == [(10, "Processing triangulated mesh"), (26, "Generating perimeters"),
+                           (58, "Generating support material"), (82, "Exporting G-code")]
+        assert result.output[-1] == "Done"
+
+    async def test_failure_keeps_stderr(self, fake_slicer, monkeypatch):
+        monkeypatch.setenv("FAKE_SLICER_MODE", "fail")
+        result = await SlicerProcess([fake_slicer]).run()
+        assert not result.ok and result.returncode == 1
+        assert "could not fit" in result.error
+
+    async def test_timeout_kills_process_tree(self, fake_slicer, tmp_path, monkeypatch):
+        child_file = tmp_path / "child.pid"
+        monkeypatch.setenv("FAKE_SLICER_MODE", "spawn")
+        monkeypatch.setenv("FAKE_SLICER_CHILD", str(child_file))
+        start = time.perf_counter()
+        result = await SlicerProcess([fake_slicer], timeout=0.5).run()
+        assert result.timed_out and not result.ok
+        assert time.perf_counter() - start < 3
+        child = int(child_file.read_text())
+        for _ in range(50):
+            if not alive(child):
+                break
+            await asyncio.sleep(0.05)
+        assert not alive(child)
+
+    async def test_cancel(self, fake_slicer, monkeypatch):
+        monkeypatch.setenv("FAKE_SLICER_MODE", "hang")
+        started = asyncio.Event()
+        job = SlicerProcess([fake_slicer], progress_callback=lambda p, m: started.set())
+        run = asyncio.create_task(job.run())
+        await asyncio.wait_for(started.wait(), 5)
+        job.cancel()
+        result = await asyncio.wait_for(run, 5)
+        assert result.cancelled and result.error == "Slicing cancelled"
+
+
+class TestSliceStl:
+    """PrinterAgent.slice_stl drives the runner and forwards progress."""
+
+    async def test_slice_with_progress(self, fake_slicer, tmp_path):
+        from printer_agent import PrinterAgent
+
+        stl = tmp_path / "part.stl"
+        stl.write_text("solid part\nendsolid part\n")
+        agent = PrinterAgent(profiles_dir=str(tmp_path / "profiles"), identity_cache=False, gcode_cache=False)
+        agent.slicer_path = fake_slicer
+        updates = []
+
+        async def progress(percent, message):
+            updates.append(percent)
+
+        outcome = await agent.run_slice(str(stl), progress_callback=progress)
+        gcode = outcome.gcode_path
+        assert gcode == str(tmp_path / "part.gcode") and os.path.exists(gcode)
+        assert updates == [5, 10, 26, 58, 82, 95, 100]
+        assert outcome.result.ok and not outcome.cached and agent.cancel_slicing() == 0
+
+    async def test_cancel_does_not_leak_into_later_failures(self, fake_slicer, tmp_path, monkeypatch):
+        from printer_agent import PrinterAgent, Printer, PrinterType
+
+        stl = tmp_path / "part.stl"
+        stl.write_text("solid part\nendsolid part\n")
+        agent = PrinterAgent(profiles_dir=str(tmp_path / "profiles"), identity_cache=False, gcode_cache=False)
+        agent.slicer_path = fake_slicer
+        agent.printers["10.0.0.5"] = Printer(name="Bench", host="10.0.0.5", port=80,
+                                             printer_type=PrinterType.MOONRAKER)
+        monkeypatch.setenv("FAKE_SLICER_MODE", "hang")
+        started = asyncio.Event()
+
+        async def progress(percent, message):
+            if percent >= 10:
+                started.set()
+
+        run = asyncio.create_task(agent.print_stl(str(stl), "Bench", progress_callback=progress))
+        await asyncio.wait_for(started.wait(), 5)
+        assert agent.cancel_slicing() == 1
+        assert (await asyncio.wait_for(run, 5))["status"] == "cancelled"
+
+        missing = await agent.print_stl(str(tmp_path / "missing.stl"), "Bench")
+        assert missing["status"] == "error" and "not found" in missing["message"]
+        agent.slicer_path = None
+        assert await agent.print_stl(str(stl), "Bench") == {"status": "error", "message": "Slicer not found."}
+
+    async def test_gcode_cache_skips_slicer(self, fake_slicer, tmp_path, monkeypatch):
+        from printer_agent import PrinterAgent
+        from gcode_cache import GcodeCache
+
+        runs = tmp_path / "runs.txt"
+        monkeypatch.setenv("FAKE_SLICER_RUNS", str(runs))
+        project = tmp_path / "projects" / "bracket"
+        project.mkdir(parents=True)
+        (project / "part.stl").write_text("solid part\nendsolid part\n")
+        profile = tmp_path / "pla.ini"
+        profile.write_text("temperature = 210\n")
+        cache = GcodeCache(str(tmp_path / "gcode_cache"))
+        agent = PrinterAgent(profiles_dir=str(tmp_path / "profiles"), identity_cache=False, gcode_cache=cache)
+        agent.slicer_path = fake_slicer
+
+        first = await agent.run_slice("part.stl", profile_path=str(profile), root_path=str(project))
+        assert first.gcode_path and not first.cached
+        updates = []
+
+        async def progress(percent, message):
+            updates.append((percent, message))
+
+        again = await agent.run_slice("part.stl", profile_path=str(profile), root_path=str(project),
+                                      progress_callback=progress)
+        assert again.gcode_path == first.gcode_path and again.cached and again.result is None
+        assert updates == [(100, "Loaded from G-code cache")]
+        assert runs.read_text().count("run") == 1
+
+        profile.write_text("temperature = 215\n")  # changed profile content -> new key
+        changed = await agent.run_slice("part.stl", profile_path=str(profile), root_path=str(project))
+        assert not changed.cached and runs.read_text().count("run") == 2
+        assert cache.stats()["pinned"] == 2
+
+        # Leaving the project releases its pins; a same-named folder elsewhere is a different project
+        assert agent.release_project(str(tmp_path / "other" / "bracket")) == 0
+        assert agent.release_project(str(project)) == 2 and cache.stats()["pinned"] == 0
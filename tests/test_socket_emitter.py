@@ -0,0 +1,112 @@
+# File: test_socket_emitter.py - Purpose: This file handles Test Socket Emitter functionality.
+"""
+Tests for the bounded, coalescing Socket.IO emitter.
+"""
+import asyncio
+
+import pytest
+
+from socket_emitter import SocketEmitter, FIFO, LATEST
+
+
+class FakeSio:
+    """Records emits; optionally blocks until released to simulate a slow client."""
+
+    def __init__(self):
+        self.emitted = []
+        self.gate = None
+
+    async def emit(self, event, data=None):
+        if self.gate is not None:
+            await self.gate.wait()
+        self.emitted.append((event, data))
+
+
+class TestOrdering:
+    """Single sender delivers in enqueue order."""
+
+    async def test_fifo_order_preserved(self):
+        sio = FakeSio()
+        emitter = SocketEmitter(sio)
+        for i in range(10):
+            emitter.emit("cad_status", {"status": i})
+        await emitter.flush()
+        assert [d["status"] for _, d in sio.emitted] == list(range(10))
+
+    async def test_interleaved_events_keep_order(self):
+        sio = FakeSio()
+        emitter = SocketEmitter(sio)
+        emitter.emit("cad_status", {"status": "generating"})
+        emitter.emit("error", {"msg": "x"})
+        emitter.emit("cad_data", {"format": "stl"})
+        await emitter.flush()
+        assert [e for e, _ in sio.emitted] == ["cad_status", "error", "cad_data"]
+
+    async def test_sender_task_delivers_without_flush(self):
+        sio = FakeSio()
+        emitter = SocketEmitter(sio)
+        emitter.emit("project_update", {"project": "a"})
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert sio.emitted == [("project_update", {"project": "a"})]
+        await emitter.stop()
+
+
+class TestPolicies:
+    """Latest-wins, append-coalesce and bounded FIFO drops."""
+
+    async def test_latest_wins_while_client_is_slow(self):
+        sio = FakeSio()
+        sio.gate = asyncio.Event()
+        emitter = SocketEmitter(sio)
+
+        emitter.emit("audio_data", {"data": b"0"})
+        await asyncio.sleep(0)  # sender picks up the first payload and blocks
+        for i in range(1, 50):
+            emitter.emit("audio_data", {"data": str(i).encode()})
+        assert emitter.queued == 1
+
+        sio.gate.set()
+        await emitter.stop()
+        assert [d["data"] for _, d in sio.emitted] == [b"0", b"49"]
+        assert emitter.stats()["coalesced"]["audio_data"] == 48
+
+    async def test_append_merges_same_sender(self):
+        sio = FakeSio()
+        emitter = SocketEmitter(sio)
+        for word in ["Hel", "lo ", "there"]:
+            emitter.emit("transcription", {"sender": "JARVIS", "text": word})
+        emitter.emit("transcription", {"sender": "User", "text": "hi"})
+        await emitter.flush()
+        assert sio.emitted == [
+            ("transcription", {"sender": "JARVIS", "text": "Hello there"}),
+            ("transcription", {"sender": "User", "text": "hi"}),
+        ]
+
+    async def test_fifo_bound_drops_oldest(self):
+        sio = FakeSio()
+        emitter = SocketEmitter(sio, policies={"cad_status": FIFO}, max_queue=4)
+        for i in range(10):
+            emitter.emit("cad_status", {"status": i})
+        await emitter.flush()
+        assert [d["status"] for _, d in sio.emitted] == [6, 7, 8, 9]
+        stats = emitter.stats()
+        assert stats["dropped"]["cad_status"] == 6
+        assert stats["sent"]["cad_status"] == 4
+        assert stats["queued"] == 0
+        assert stats["avg_latency_ms"] is not None
+
+    async def test_emit_error_does_not_stop_sender(self):
+        class FailingSio(FakeSio):
+            async def emit(self, event, data=None):
+                if event == "bad":
+                    raise RuntimeError("boom")
+                await super().emit(event, data)
+
+        sio = FailingSio()
+        emitter = SocketEmitter(sio, policies={"frame": LATEST})
+        emitter.emit("bad", {})
+        emitter.emit("frame", {"n": 1})
+        await emitter.flush()
+        assert sio.emitted == [("frame", {"n": 1})]
+        assert emitter.stats()["emit_errors"] == 1
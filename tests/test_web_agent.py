@@ -27,6 +27,35 @@ class TestWebAgentInit:
         assert hasattr(agent, 'context')
 
 
+class _SlowPool:
+    """Pool whose start() never finishes, to observe the warm-up task."""
+
+    def __init__(self):
+        self.closed = False
+
+    async def start(self):
+        await asyncio.sleep(3600)
+
+    async def close(self):
+        self.closed = True
+
+
+class TestWebAgentWarmUp:
+    """warm_up keeps its task and close() stops it."""
+
+    async def test_warm_task_is_kept_and_cancelled_on_close(self):
+        pool = _SlowPool()
+        agent = WebAgent(pool=pool)
+        task = agent.warm_up()
+        assert agent._warm_task is task
+        assert agent.warm_up() is task  # no second launch while warming
+        await asyncio.sleep(0)
+        await agent.close()
+        assert task.cancelled()
+        assert agent._warm_task is None
+        assert pool.closed
+
+
 class TestCoordinateDenormalization:
     """Test coordinate conversion functions."""
     
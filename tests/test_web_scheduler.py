@@ -0,0 +1,237 @@
+# File: test_web_scheduler.py - Purpose: This file handles Test Web Scheduler functionality.
+"""
+Tests for the concurrent WebAgent task scheduler (uses a stand-in agent, no browser).
+"""
+import asyncio
+
+import pytest
+
+from socket_emitter import SocketEmitter
+from web_scheduler import WebTaskScheduler, PRIORITY_HIGH, PRIORITY_LOW, update_events
+
+
+class FakeAgent:
+    """run_task stand-in: reports two progress frames, then returns after `delay`."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+        self.order = []
+        self.cancelled = []
+        self.gate = None  # asyncio.Event holding tasks until set
+
+    async def run_task(self, prompt, update_callback=None, task=None):
+        self.order.append(prompt)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            if prompt == "boom":
+                raise RuntimeError("page crashed")
+            for turn in (1, 2):
+                task.turn = turn
+                await update_callback(f"img-{prompt}-{turn}", f"turn {turn}")
+                await asyncio.sleep(self.delay / 2)
+            if self.gate is not None:
+                await self.gate.wait()
+            return f"result of {prompt}"
+        except asyncio.CancelledError:
+            self.cancelled.append(prompt)
+            raise
+        finally:
+            self.running -= 1
+
+
+@pytest.fixture
+async def agent():
+    return FakeAgent()
+
+
+@pytest.fixture
+async def updates():
+    return []
+
+
+@pytest.fixture
+async def scheduler(agent, updates):
+    scheduler = WebTaskScheduler(agent, max_concurrent=2,
+                                 on_update=lambda task, image, log: updates.append((task.id, task.state, image, log)))
+    yield scheduler
+    await scheduler.close()
+
+
+class TestConcurrency:
+    """Tasks overlap up to the limit and each result reaches its own caller."""
+
+    async def test_runs_up_to_limit(self, scheduler, agent):
+        tasks = [scheduler.submit(f"task {i}") for i in range(5)]
+        results = await asyncio.gather(*(scheduler.wait(t.id) for t in tasks))
+        assert results == [f"result of task {i}" for i in range(5)]
+        assert agent.max_running == 2
+        assert scheduler.stats()["done"] == 5
+
+    async def test_progress_tagged_by_task(self, scheduler, updates):
+        first, second = scheduler.submit("a"), scheduler.submit("b")
+        await asyncio.gather(scheduler.wait(first.id), scheduler.wait(second.id))
+        frames = [(task_id, image) for task_id, _, image, _ in updates if image]
+        assert (first.id, "img-a-2") in frames and (second.id, "img-b-2") in frames
+        states = [state for task_id, state, _, _ in updates if task_id == first.id]
+        assert states[0] == "queued" and states[-1] == "done"
+
+
+class TestPriority:
+    """Higher priority waiting tasks start first."""
+
+    async def test_high_priority_jumps_queue(self, agent):
+        scheduler = WebTaskScheduler(agent, max_concurrent=1)
+        agent.gate = asyncio.Event()
+        blocker = scheduler.submit("blocker")
+        await asyncio.sleep(0.01)
+        low = scheduler.submit("low", priority=PRIORITY_LOW)
+        normal = scheduler.submit("normal")
+        high = scheduler.submit("high", priority=PRIORITY_HIGH)
+        agent.gate.set()
+        for task in (blocker, low, normal, high):
+            await scheduler.wait(task.id)
+        assert agent.order == ["blocker", "high", "normal", "low"]
+        await scheduler.close()
+
+
+class TestCancellation:
+    """Queued tasks never start; running tasks are interrupted."""
+
+    async def test_cancel_queued(self, agent):
+        scheduler = WebTaskScheduler(agent, max_concurrent=1)
+        agent.gate = asyncio.Event()
+        running = scheduler.submit("running")
+        queued = scheduler.submit("queued")
+        assert scheduler.cancel(queued.id)
+        agent.gate.set()
+        await scheduler.wait(running.id)
+        with pytest.raises(asyncio.CancelledError):
+            await scheduler.wait(queued.id)
+        assert "queued" not in agent.order
+        assert queued.state == "cancelled"
+        await scheduler.close()
+
+    async def test_cancel_running(self, scheduler, agent):
+        agent.gate = asyncio.Event()
+        task = scheduler.submit("slow")
+        while task.state != "running" or task.turn < 2:
+            await asyncio.sleep(0.01)
+        assert scheduler.cancel(task.id)
+        with pytest.raises(asyncio.CancelledError):
+            await scheduler.wait(task.id)
+        assert agent.cancelled == ["slow"]
+        assert task.state == "cancelled"
+        assert not scheduler.cancel(task.id)
+
+        # The worker slot is free again
+        agent.gate.set()
+        assert await scheduler.run("next") == "result of next"
+
+    async def test_failure_is_reported(self, scheduler):
+        task = scheduler.submit("boom")
+        with pytest.raises(RuntimeError, match="page crashed"):
+            await scheduler.wait(task.id)
+        assert task.state == "failed"
+        assert scheduler.stats()["failed"] == 1
+
+
+class TestTransitions:
+    """on_update sees each task's states in order, even with tasks interleaving."""
+
+    async def test_state_order_per_task(self, agent, updates):
+        scheduler = WebTaskScheduler(agent, max_concurrent=2,
+                                     on_update=lambda task, image, log: updates.append((task.id, task.state)))
+        agent.gate = asyncio.Event()
+        done, stopped = scheduler.submit("done"), scheduler.submit("stopped")
+        never = scheduler.submit("never")
+        while stopped.state != "running" or stopped.turn < 2:
+            await asyncio.sleep(0.01)
+        assert scheduler.cancel(stopped.id)
+        assert scheduler.cancel(never.id)
+        agent.gate.set()
+        await scheduler.wait(done.id)
+
+        def transitions(task):
+            states = [state for task_id, state in updates if task_id == task.id]
+            return [state for i, state in enumerate(states) if i == 0 or states[i - 1] != state]
+
+        assert transitions(done) == ["queued", "running", "done"]
+        assert transitions(stopped) == ["queued", "running", "cancelled"]
+        assert transitions(never) == ["queued", "cancelled"]
+        # The terminal update is each task's last one
+        last = {task_id: state for task_id, state in updates}
+        assert last == {done.id: "done", stopped.id: "cancelled", never.id: "cancelled"}
+        await scheduler.close()
+
+
+class TestRetention:
+    """Only the last keep_finished finished tasks stay in the table."""
+
+    async def test_finished_tasks_are_bounded(self, agent):
+        scheduler = WebTaskScheduler(agent, max_concurrent=2, keep_finished=3)
+        tasks = [scheduler.submit(f"task {i}") for i in range(6)]
+        results = await asyncio.gather(*(scheduler.wait(t.id) for t in tasks))
+        assert results == [f"result of task {i}" for i in range(6)]
+        assert len(scheduler.list()) == 3
+        assert scheduler.stats()["done"] == 3 and scheduler.completed == 6
+        last_finished = sorted(tasks, key=lambda t: t.finished)[-3:]
+        assert {t["id"] for t in scheduler.list()} == {t.id for t in last_finished}
+        await scheduler.close()
+
+    async def test_active_tasks_are_never_dropped(self, agent):
+        scheduler = WebTaskScheduler(agent, max_concurrent=1, keep_finished=0)
+        agent.gate = asyncio.Event()
+        running = scheduler.submit("running")
+        queued = scheduler.submit("queued")
+        assert scheduler.cancel(scheduler.submit("dropped").id)
+        assert [t["id"] for t in scheduler.list()] == [running.id, queued.id]
+        agent.gate.set()
+        assert await scheduler.wait(queued.id) == "result of queued"
+        assert scheduler.list() == []
+        await scheduler.close()
+
+
+class SlowSio:
+    """Socket stand-in that holds every emit until released, so updates pile up in the emitter."""
+
+    def __init__(self):
+        self.emitted = []
+        self.gate = asyncio.Event()
+
+    async def emit(self, event, data=None):
+        await self.gate.wait()
+        self.emitted.append((event, data))
+
+
+class TestSocketDelivery:
+    """Updates of concurrent tasks through the real emitter, as server.on_web_data sends them."""
+
+    async def test_final_states_of_concurrent_tasks_arrive(self, agent):
+        sio = SlowSio()
+        emitter = SocketEmitter(sio)
+
+        def on_update(task, image, log):
+            for event, payload in update_events(task.update(image, log)):
+                emitter.emit(event, payload)
+
+        scheduler = WebTaskScheduler(agent, max_concurrent=2, on_update=on_update)
+        first, second = scheduler.submit("a"), scheduler.submit("b")
+        await asyncio.gather(scheduler.wait(first.id), scheduler.wait(second.id))
+        sio.gate.set()
+        await emitter.stop()
+
+        updates = [data for event, data in sio.emitted if event == "web_task_update"]
+        for task in (first, second):
+            states = [u["state"] for u in updates if u["task_id"] == task.id]
+            assert states[0] == "queued" and states[-1] == "done"
+            logs = [u["log"] for u in updates if u["task_id"] == task.id]
+            assert logs[-3:] == ["turn 1", "turn 2", "Task done"]
+            assert all("image" not in u for u in updates)
+        # Screenshots stay latest-wins: the backlog collapsed into a single pending frame
+        frames = [data for event, data in sio.emitted if event == "browser_frame"]
+        assert 1 <= len(frames) < 4 and frames[-1]["image"] in ("img-a-2", "img-b-2")
+        await scheduler.close()
+